@@ -0,0 +1,175 @@
+"""Client of the ``ezrunner serve`` pack daemon.
+
+Uses ``http.client`` rather than requests: the daemon listens on a Unix
+socket by default, which requests cannot reach without an extra adapter.
+"""
+
+import http.client
+import json
+import os
+import socket
+from collections.abc import Iterator
+from typing import Any
+
+from ezrunner.core.cache import cache_dir
+from ezrunner.exceptions import DaemonError
+
+# Address of the daemon ("unix:/path/to.sock" or "host:port")
+DAEMON_ENV = "EZRUNNER_DAEMON"
+
+
+def default_address() -> str:
+    """Address the daemon listens on unless told otherwise."""
+    return os.environ.get(DAEMON_ENV) or f"unix:{cache_dir() / 'daemon.sock'}"
+
+
+def parse_address(address: str) -> str | tuple[str, int]:
+    """Parse a daemon address.
+
+    Args:
+        address: ``unix:<path>``, ``<host>:<port>`` or ``http://<host>:<port>``
+
+    Returns:
+        Socket path, or host and port
+
+    Raises:
+        DaemonError: Invalid address
+    """
+    if address.startswith("unix:"):
+        return address.removeprefix("unix:")
+    host, sep, port = address.removeprefix("http://").rstrip("/").rpartition(":")
+    if not sep or not port.isdigit():
+        raise DaemonError(f"Invalid daemon address {address!r}")
+    return host or "127.0.0.1", int(port)
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix socket."""
+
+    def __init__(self, path: str, timeout: float | None) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+class DaemonClient:
+    """Client for the pack daemon's job API."""
+
+    def __init__(self, address: str | None = None, timeout: float = 30.0) -> None:
+        """Initialize client.
+
+        Args:
+            address: Daemon address (default: ``$EZRUNNER_DAEMON``, else the
+                socket in the cache directory)
+            timeout: Request timeout in seconds (progress streams wait
+                indefinitely)
+        """
+        self.address = address or default_address()
+        self.timeout = timeout
+        self._target = parse_address(self.address)
+
+    def health(self) -> dict[str, Any]:
+        """Queue and worker counts of the daemon."""
+        result: dict[str, Any] = self._request("GET", "/health")
+        return result
+
+    def submit(
+        self, kind: str, params: dict[str, Any], priority: int = 0
+    ) -> dict[str, Any]:
+        """Queue a job.
+
+        Args:
+            kind: "pack", "export" or "verify"
+            params: Job parameters
+            priority: Higher runs first; equal priorities run in order
+
+        Returns:
+            The queued job
+
+        Raises:
+            DaemonError: Daemon unreachable or job rejected
+        """
+        body = {"kind": kind, "params": params, "priority": priority}
+        result: dict[str, Any] = self._request("POST", "/jobs", body)
+        return result
+
+    def job(self, job_id: str) -> dict[str, Any]:
+        """Current state of a job."""
+        result: dict[str, Any] = self._request("GET", f"/jobs/{job_id}")
+        return result
+
+    def jobs(self) -> list[dict[str, Any]]:
+        """Every job the daemon knows, oldest first."""
+        result: list[dict[str, Any]] = self._request("GET", "/jobs")["jobs"]
+        return result
+
+    def cancel(self, job_id: str) -> dict[str, Any]:
+        """Cancel a queued job."""
+        result: dict[str, Any] = self._request("DELETE", f"/jobs/{job_id}")
+        return result
+
+    def follow(self, job_id: str) -> Iterator[dict[str, Any]]:
+        """Stream the progress of a job until it finishes.
+
+        Yields:
+            Progress events (``time``, ``message``), then ``{"job": ...}``
+            with the final state
+        """
+        connection = self._connect(timeout=None)
+        try:
+            response = self._send(connection, "GET", f"/jobs/{job_id}/events")
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            connection.close()
+
+    def _request(self, method: str, path: str, body: object = None) -> Any:
+        """Send a request and decode the JSON response."""
+        connection = self._connect(self.timeout)
+        try:
+            return json.loads(self._send(connection, method, path, body).read())
+        finally:
+            connection.close()
+
+    def _connect(self, timeout: float | None) -> http.client.HTTPConnection:
+        """Open a connection to the daemon."""
+        if isinstance(self._target, str):
+            return _UnixConnection(self._target, timeout)
+        host, port = self._target
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _send(
+        self,
+        connection: http.client.HTTPConnection,
+        method: str,
+        path: str,
+        body: object = None,
+    ) -> http.client.HTTPResponse:
+        """Send a request and check its status.
+
+        Raises:
+            DaemonError: Daemon unreachable, or the request failed
+        """
+        payload = None if body is None else json.dumps(body).encode()
+        headers = {"Content-Type": "application/json"} if payload else {}
+        try:
+            connection.request(method, path, payload, headers)
+            response = connection.getresponse()
+        except OSError as e:
+            raise DaemonError(
+                f"No ezrunner daemon at {self.address} "
+                f"(start one with `ezrunner serve`): {e}"
+            ) from e
+        if response.status >= 400:
+            try:
+                message = json.loads(response.read())["error"]
+            except (ValueError, KeyError, TypeError):
+                message = response.reason
+            raise DaemonError(f"Daemon refused {method} {path}: {message}")
+        return response
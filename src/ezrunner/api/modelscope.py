@@ -1,8 +1,11 @@
 """ModelScope API client."""
 
-import requests
 from typing import Any
 
+import requests
+
+from ezrunner.utils.tracing import span
+
 
 class ModelScopeClient:
     """Client for ModelScope API."""
@@ -30,9 +33,7 @@ class ModelScopeClient:
             requests.RequestException: API request failed
         """
         url = f"{self.BASE_URL}/models/{model_id}"
-        response = requests.get(url, timeout=self.timeout)
-        response.raise_for_status()
-        return response.json()
+        return self._get(url)
 
     def get_model_files(self, model_id: str) -> list[dict[str, Any]]:
         """Get list of model files.
@@ -47,6 +48,16 @@ class ModelScopeClient:
             requests.RequestException: API request failed
         """
         url = f"{self.BASE_URL}/models/{model_id}/repo/files"
-        response = requests.get(url, timeout=self.timeout)
-        response.raise_for_status()
-        return response.json().get("files", [])
+        return self._get(url).get("files", [])
+
+    def _get(self, url: str) -> Any:
+        """GET a JSON resource.
+
+        Raises:
+            requests.RequestException: API request failed
+        """
+        with span(f"GET {url}", "http") as call:
+            response = requests.get(url, timeout=self.timeout)
+            call.set(status=response.status_code, bytes=len(response.content))
+            response.raise_for_status()
+            return response.json()
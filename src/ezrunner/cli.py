@@ -1,194 +1,131 @@
-"""CLI interface for EZ Runner."""
+"""CLI interface for EZ Runner.
 
-from pathlib import Path
+Only click is imported here. Each command lives in its own module under
+``ezrunner.commands`` and is imported when it is invoked (or its own
+``--help`` is shown), so ``ezrunner --help`` and ``ezrunner --version``
+do not pay for docker, requests, jinja2 or rich.
 
-import click
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn
+Set ``EZRUNNER_IMPORT_TIME=1`` to print how long the CLI and the
+invoked command took to import.
+"""
 
-from ezrunner.core.builder import ImageBuilder
-from ezrunner.core.discovery import ModelDiscovery
-from ezrunner.core.dockerfile import DockerfileGenerator
-from ezrunner.core.engine import EngineSelector
-from ezrunner.core.exporter import TarExporter
-from ezrunner.core.hardware import HardwareAnalyzer
-from ezrunner.exceptions import DockerError, ModelNotFoundError
-from ezrunner.models.engine import Engine
+import sys
+import time
 
-console = Console()
+_START = time.perf_counter()
+_MODULES = len(sys.modules)
 
+import importlib  # noqa: E402
+import os  # noqa: E402
+from dataclasses import dataclass  # noqa: E402
 
-@click.group()
-@click.version_option(version="0.1.0")
-def main() -> None:
-    """EZ Runner - Run any LLM, anywhere, offline."""
-    pass
+import click  # noqa: E402
 
+IMPORT_TIME_ENV = "EZRUNNER_IMPORT_TIME"
 
-@main.command()
-@click.argument("model_id")
-@click.option(
-    "-o",
-    "--output",
-    type=click.Path(path_type=Path),
-    default=Path("model.tar"),
-    help="Output tar file path",
-)
-@click.option(
-    "--engine",
-    type=click.Choice(["auto", "transformers", "vllm"]),
-    default="auto",
-    help="Inference engine",
-)
-@click.option(
-    "--target-gpu",
-    type=float,
-    default=0.0,
-    help="Target GPU memory in GB",
-)
-@click.option(
-    "--port",
-    type=int,
-    default=8080,
-    help="API port",
-)
-def pack(
-    model_id: str,
-    output: Path,
-    engine: str,
-    target_gpu: float,
-    port: int,
-) -> None:
-    """Pack a model into offline-runnable Docker image.
-
-    Example:
-        ezrunner pack qwen/Qwen-7B-Chat -o qwen.tar
-    """
-    try:
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-        ) as progress:
-            # Step 1: Discover model
-            task = progress.add_task("[cyan]Discovering model...", total=None)
-            discovery = ModelDiscovery()
-            model = discovery.discover(model_id)
-            progress.update(
-                task,
-                description=f"[green]✓[/green] Model: {model.model_id} "
-                f"({model.size_gb} GB, {model.format})",
-                completed=True,
-            )
 
-            # Step 2: Analyze hardware
-            task = progress.add_task("[cyan]Analyzing hardware...", total=None)
-            analyzer = HardwareAnalyzer()
-            hardware = analyzer.analyze(gpu_memory_gb=target_gpu)
-            progress.update(
-                task,
-                description=f"[green]✓[/green] Target: {hardware.gpu_memory_gb} GB GPU",
-                completed=True,
-            )
+@dataclass(frozen=True)
+class LazyCommand:
+    """A command registered without importing it.
 
-            # Step 3: Select engine
-            task = progress.add_task("[cyan]Selecting engine...", total=None)
-            selector = EngineSelector()
-            force_engine = None if engine == "auto" else Engine(engine)
-            selected_engine = selector.select(model, hardware, force_engine)
-            progress.update(
-                task,
-                description=f"[green]✓[/green] Engine: {selected_engine.value}",
-                completed=True,
-            )
+    Attributes:
+        module: Module defining the command, as a function of the same name
+            (with underscores for dashes)
+        help: One-line help shown by ``ezrunner --help``
+    """
 
-            # Step 4: Generate Dockerfile
-            task = progress.add_task("[cyan]Generating Dockerfile...", total=None)
-            generator = DockerfileGenerator()
-            dockerfile = generator.generate(model, selected_engine, port)
-            progress.update(
-                task, description="[green]✓[/green] Dockerfile generated", completed=True
-            )
+    module: str
+    help: str
+
+
+COMMANDS = {
+    "pack": LazyCommand(
+        "ezrunner.commands.pack", "Pack a model into offline-runnable Docker image."
+    ),
+    "pack-batch": LazyCommand(
+        "ezrunner.commands.pack_batch",
+        "Pack several models concurrently from a manifest.",
+    ),
+    "run": LazyCommand("ezrunner.commands.run", "Run a packed model."),
+    "tune": LazyCommand(
+        "ezrunner.commands.tune",
+        "Find the fastest server settings that meet a latency SLO.",
+    ),
+    "bench": LazyCommand(
+        "ezrunner.commands.bench",
+        "Measure latency and throughput of a packed model server.",
+    ),
+    "bundle": LazyCommand(
+        "ezrunner.commands.bundle", "Bundle several packed models into one archive."
+    ),
+    "load": LazyCommand(
+        "ezrunner.commands.load",
+        "Load packed models into Docker without starting them.",
+    ),
+    "serve": LazyCommand(
+        "ezrunner.commands.serve",
+        "Run a pack daemon accepting jobs from `ezrunner submit`.",
+    ),
+    "submit": LazyCommand(
+        "ezrunner.commands.jobs",
+        "Queue a pack, export or verify job on `ezrunner serve`.",
+    ),
+    "jobs": LazyCommand("ezrunner.commands.jobs", "Show the jobs of `ezrunner serve`."),
+}
+
+
+def _report(name: str, seconds: float, modules: int) -> None:
+    """Print an import timing when ``EZRUNNER_IMPORT_TIME`` is set."""
+    if os.environ.get(IMPORT_TIME_ENV):
+        click.echo(
+            f"import {name}: {seconds * 1000:.1f} ms ({modules} modules)", err=True
+        )
 
-            # Step 5: Build image
-            task = progress.add_task("[cyan]Building Docker image...", total=None)
-            builder = ImageBuilder()
-            image_tag = f"ezrunner-{model_id.replace('/', '-').lower()}"
-            image = builder.build(dockerfile, image_tag)
-            progress.update(
-                task,
-                description=f"[green]✓[/green] Image built: {image_tag}",
-                completed=True,
-            )
 
-            # Step 6: Export image
-            task = progress.add_task("[cyan]Exporting image...", total=None)
-            exporter = TarExporter()
-            exporter.export(image, output)
-            size_mb = output.stat().st_size / (1024 * 1024)
-            progress.update(
-                task,
-                description=f"[green]✓[/green] Exported: {output} ({size_mb:.1f} MB)",
-                completed=True,
+class LazyGroup(click.Group):
+    """Command group importing each command from the registry on first use."""
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        """Names of every command, registered or added directly."""
+        return sorted({*COMMANDS, *self.commands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        """Return a command, importing its module if it is not loaded yet."""
+        if cmd_name in self.commands or cmd_name not in COMMANDS:
+            return self.commands.get(cmd_name)
+        entry = COMMANDS[cmd_name]
+        before = len(sys.modules)
+        start = time.perf_counter()
+        module = importlib.import_module(entry.module)
+        _report(entry.module, time.perf_counter() - start, len(sys.modules) - before)
+        command: click.Command = getattr(module, cmd_name.replace("-", "_"))
+        self.add_command(command, cmd_name)
+        return command
+
+    def format_commands(
+        self, ctx: click.Context, formatter: click.HelpFormatter
+    ) -> None:
+        """List commands from the registry, without importing them."""
+        limit = formatter.width - 6 - max(len(name) for name in self.list_commands(ctx))
+        rows = []
+        for name in self.list_commands(ctx):
+            # A placeholder stands in for commands not imported yet
+            command = self.commands.get(name) or click.Command(
+                name, help=COMMANDS[name].help
             )
+            rows.append((name, command.get_short_help_str(limit)))
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
 
-        console.print("\n[bold green]✅ Success![/bold green]")
-        console.print(f"\nTo run on offline machine:")
-        console.print(f"  ezrunner run {output}")
-
-    except ModelNotFoundError as e:
-        console.print(f"[red]❌ Error:[/red] {e}")
-        raise click.Abort()
-    except DockerError as e:
-        console.print(f"[red]❌ Docker Error:[/red] {e}")
-        raise click.Abort()
-    except Exception as e:
-        console.print(f"[red]❌ Unexpected Error:[/red] {e}")
-        raise
-
-
-@main.command()
-@click.argument("tar_path", type=click.Path(exists=True, path_type=Path))
-@click.option("--port", type=int, default=8080, help="API port")
-def run(tar_path: Path, port: int) -> None:
-    """Run a packed model.
-
-    Example:
-        ezrunner run model.tar
-    """
-    import docker
-
-    try:
-        console.print(f"[cyan]Loading image from {tar_path}...[/cyan]")
-        client = docker.from_env()
-
-        # Load image
-        with open(tar_path, "rb") as f:
-            images = client.images.load(f.read())
-
-        if not images:
-            console.print("[red]❌ No images found in tar file[/red]")
-            raise click.Abort()
-
-        image = images[0]
-        console.print(f"[green]✓ Image loaded: {image.tags[0]}[/green]")
-
-        # Run container
-        console.print(f"\n[cyan]Starting container on port {port}...[/cyan]")
-        container = client.containers.run(
-            image.tags[0],
-            detach=True,
-            ports={f"{port}/tcp": port},
-            remove=True,
-        )
 
-        console.print(f"[bold green]✅ Container started![/bold green]")
-        console.print(f"\nAPI: http://localhost:{port}")
-        console.print(f"Container ID: {container.short_id}")
+@click.group(cls=LazyGroup)
+@click.version_option(version="0.1.0")
+def main() -> None:
+    """EZ Runner - Run any LLM, anywhere, offline."""
+    pass
+
 
-    except docker.errors.DockerException as e:
-        console.print(f"[red]❌ Docker Error:[/red] {e}")
-        raise click.Abort()
+_report(__name__, time.perf_counter() - _START, len(sys.modules) - _MODULES)
 
 
 if __name__ == "__main__":
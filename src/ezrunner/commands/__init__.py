@@ -0,0 +1 @@
+"""CLI commands, each imported by ``ezrunner.cli`` on first use."""
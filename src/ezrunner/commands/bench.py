@@ -0,0 +1,246 @@
+"""``ezrunner bench`` command."""
+
+import json
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any
+
+import click
+import docker
+from rich.table import Table
+
+from ezrunner.commands.common import console, image_name, load_image, parse_env
+from ezrunner.core.loadgen import (
+    LengthDistribution,
+    LoadGenerator,
+    LoadStats,
+    served_model,
+)
+from ezrunner.core.sweep import ContainerLauncher, load_tuning
+from ezrunner.exceptions import StartupError
+
+
+@click.command()
+@click.argument("target")
+@click.option("--port", type=int, default=8080, help="API port (archive targets)")
+@click.option("--model", default=None, help="Image to start from a bundle")
+@click.option(
+    "--force-load",
+    is_flag=True,
+    help="Load the archive even if the image is already in Docker",
+)
+@click.option(
+    "-e",
+    "--env",
+    "env",
+    multiple=True,
+    help="Server setting NAME=VALUE for a started container",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Requests in flight (closed loop)",
+)
+@click.option(
+    "--rate",
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help="Poisson arrival rate in requests/s (open loop; overrides " "--concurrency)",
+)
+@click.option(
+    "--requests",
+    "requests_total",
+    type=click.IntRange(min=1),
+    default=200,
+    show_default=True,
+    help="Requests to send",
+)
+@click.option(
+    "--prompt-tokens",
+    default="256",
+    show_default=True,
+    help="Prompt length: N, LOW-HIGH (uniform) or normal:MEAN,STD",
+)
+@click.option(
+    "--max-tokens",
+    default="128",
+    show_default=True,
+    help="Output length: N, LOW-HIGH (uniform) or normal:MEAN,STD",
+)
+@click.option(
+    "--stream/--no-stream",
+    default=True,
+    show_default=True,
+    help="Stream responses (TTFT and inter-token latency need streaming)",
+)
+@click.option(
+    "--ignore-eos",
+    is_flag=True,
+    help="Generate exactly the requested output length (vLLM images)",
+)
+@click.option(
+    "--seed",
+    type=int,
+    default=0,
+    show_default=True,
+    help="Workload seed (keep it fixed to compare images)",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the JSON report to this file",
+)
+@click.option(
+    "--wait-timeout",
+    type=click.FloatRange(min=0),
+    default=900.0,
+    show_default=True,
+    help="Seconds to wait for a started server to become ready",
+)
+def bench(
+    target: str,
+    port: int,
+    model: str | None,
+    force_load: bool,
+    env: tuple[str, ...],
+    concurrency: int,
+    rate: float | None,
+    requests_total: int,
+    prompt_tokens: str,
+    max_tokens: str,
+    stream: bool,
+    ignore_eos: bool,
+    seed: int,
+    output: Path | None,
+    wait_timeout: float,
+) -> None:
+    """Measure latency and throughput of a packed model server.
+
+    TARGET is the URL of a running server, or a packed archive, bundle or
+    OCI image-layout directory to start (and stop afterwards).
+
+    Example:
+        ezrunner bench http://localhost:8080
+        ezrunner bench model.tar --concurrency 32 -o report.json
+        ezrunner bench model.tar --rate 4 --prompt-tokens 128-1024
+    """
+    try:
+        prompt_lengths = LengthDistribution.parse(prompt_tokens)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--prompt-tokens") from e
+    try:
+        output_lengths = LengthDistribution.parse(max_tokens)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--max-tokens") from e
+    environment = parse_env(env)
+
+    workload = {
+        "mode": "rate" if rate is not None else "concurrency",
+        "rate": rate,
+        "concurrency": None if rate is not None else concurrency,
+        "requests": requests_total,
+        "prompt_tokens": str(prompt_lengths),
+        "max_tokens": str(output_lengths),
+        "stream": stream,
+        "ignore_eos": ignore_eos,
+        "seed": seed,
+    }
+
+    def measure(url: str, served: str | None) -> LoadStats:
+        generator = LoadGenerator(
+            url,
+            model=served or served_model(url) or "model",
+            prompt_tokens=prompt_lengths,
+            max_tokens=output_lengths,
+            stream=stream,
+            ignore_eos=ignore_eos,
+            seed=seed,
+        )
+        pattern = f"{rate:g} req/s" if rate is not None else f"{concurrency} concurrent"
+        with console.status(
+            f"[cyan]Sending {requests_total} requests ({pattern})...[/cyan]"
+        ):
+            if rate is not None:
+                return generator.run_rate(rate, requests_total)
+            return generator.run(concurrency, requests_total)
+
+    image_info = None
+    try:
+        if target.startswith(("http://", "https://")):
+            stats = measure(target, None)
+        else:
+            tar_path = Path(target)
+            if not tar_path.exists():
+                raise click.BadParameter(
+                    f"{target!r} is neither a URL nor an existing path",
+                    param_hint="TARGET",
+                )
+            client = docker.from_env()
+            image = load_image(client, tar_path, model, force_load)
+            labels = image.labels or {}
+            environment = {**load_tuning(tar_path, image.id), **environment}
+            image_info = {"id": image.id, "tag": image_name(image), "labels": labels}
+            launcher = ContainerLauncher(client, image_name(image), port, wait_timeout)
+            with ExitStack() as stack:
+                with console.status("[cyan]Waiting for the model server...[/cyan]"):
+                    url = stack.enter_context(launcher.launch(environment))
+                stats = measure(url, labels.get("ezrunner.model.id"))
+    except StartupError as e:
+        console.print(f"[red]❌ Error:[/red] {e}")
+        raise click.Abort() from e
+    except docker.errors.DockerException as e:
+        console.print(f"[red]❌ Docker Error:[/red] {e}")
+        raise click.Abort() from e
+
+    summary = stats.summary()
+    _print_bench(summary)
+    if output is not None:
+        report = {
+            "target": target,
+            "image": image_info,
+            "settings": environment,
+            "workload": workload,
+            "results": summary,
+        }
+        output.write_text(json.dumps(report, indent=2))
+        console.print(f"Report: {output}")
+    if stats.errors == stats.requests:
+        console.print("[red]❌ Every request failed[/red]")
+        raise click.Abort()
+
+
+def _print_bench(summary: dict[str, Any]) -> None:
+    """Print a benchmark summary as a table."""
+    console.print(
+        f"\n[bold]{summary['requests']} requests[/bold] in "
+        f"{summary['duration_s']:.1f}s, {summary['errors']} errors"
+    )
+    throughput = (
+        f"Throughput: {summary['request_throughput']:.2f} req/s, "
+        f"{summary['output_throughput_tok_s']:.1f} output tok/s"
+    )
+    if summary["total_throughput_tok_s"] is not None:
+        throughput += f", {summary['total_throughput_tok_s']:.1f} total tok/s"
+    console.print(throughput)
+    table = Table()
+    table.add_column("Metric")
+    for column in ("mean", "p50", "p95", "p99"):
+        table.add_column(f"{column} (ms)", justify="right")
+    names = {
+        "latency_s": "Request latency",
+        "ttft_s": "Time to first token",
+        "itl_s": "Inter-token latency",
+        "tpot_s": "Time per output token",
+    }
+    for key, name in names.items():
+        values = summary[key]
+        if values is not None:
+            table.add_row(
+                name,
+                *(f"{values[c] * 1000:.1f}" for c in ("mean", "p50", "p95", "p99")),
+            )
+    console.print(table)
@@ -0,0 +1,72 @@
+"""``ezrunner bundle`` command."""
+
+import tempfile
+from pathlib import Path
+
+import click
+import docker
+
+from ezrunner.commands.common import console, image_name
+from ezrunner.core.archive import image_tag
+from ezrunner.core.bundle import BundleWriter
+from ezrunner.core.exporter import TarExporter
+from ezrunner.exceptions import ArchiveError, DockerError
+
+
+@click.command()
+@click.argument("sources", nargs=-1, required=True)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(path_type=Path),
+    default=Path("bundle.tar"),
+    help="Output bundle path",
+)
+def bundle(sources: tuple[str, ...], output: Path) -> None:
+    """Bundle several packed models into one archive.
+
+    SOURCES are tar files from `ezrunner pack`, or model IDs / image tags
+    already present in the local Docker daemon. Layers shared between
+    images (CUDA, Python, engine) are stored once.
+
+    Example:
+        ezrunner bundle qwen.tar llama.tar -o site.tar
+    """
+    try:
+        with tempfile.TemporaryDirectory(dir=output.parent) as tmpdir:
+            archives = [_bundle_source(source, Path(tmpdir)) for source in sources]
+            console.print(f"[cyan]Writing bundle {output}...[/cyan]")
+            stats = BundleWriter().write(archives, output)
+
+        saved_mb = stats.bytes_deduplicated / (1024 * 1024)
+        size_mb = output.stat().st_size / (1024 * 1024)
+        console.print(
+            f"[bold green]✅ Bundled {stats.images} images:[/bold green] "
+            f"{output} ({size_mb:.1f} MB, {saved_mb:.1f} MB deduplicated)"
+        )
+        console.print("\nTo run on offline machine:")
+        console.print(f"  ezrunner run {output} --model <model>")
+
+    except ArchiveError as e:
+        console.print(f"[red]❌ Error:[/red] {e}")
+        raise click.Abort() from e
+    except (DockerError, docker.errors.DockerException) as e:
+        console.print(f"[red]❌ Docker Error:[/red] {e}")
+        raise click.Abort() from e
+
+
+def _bundle_source(source: str, tmpdir: Path) -> Path:
+    """Resolve a bundle source to an archive path, exporting daemon images."""
+    path = Path(source)
+    if path.is_file():
+        return path
+
+    client = docker.from_env()
+    try:
+        image = client.images.get(source)
+    except docker.errors.ImageNotFound:
+        image = client.images.get(image_tag(source))
+    console.print(f"[cyan]Exporting {image_name(image)}...[/cyan]")
+    archive = tmpdir / f"{image.short_id.split(':')[-1]}.tar"
+    TarExporter().export(image, archive)
+    return archive
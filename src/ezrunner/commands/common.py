@@ -0,0 +1,65 @@
+"""Helpers shared by the CLI commands."""
+
+from pathlib import Path
+from typing import Any
+
+import click
+from docker.models.images import Image
+from rich.console import Console
+
+from ezrunner.core.loader import ImageLoader
+
+console = Console()
+# Status output while the archive itself goes to stdout.
+err_console = Console(stderr=True)
+
+
+def load_image(
+    client: Any, tar_path: Path, model: str | None, force_load: bool
+) -> Image:
+    """Load the image to run from an archive, unless Docker already has it."""
+    console.print(f"[cyan]Loading image from {tar_path}...[/cyan]")
+    # Skip the load if the daemon already has the image (e.g. after a restart)
+    loader = ImageLoader(client)
+    images = None if force_load else loader.find_loaded(tar_path, model=model)
+    if images:
+        console.print("[green]✓ Image already loaded, skipping load[/green]")
+    else:
+        images = loader.load(tar_path, model=model)
+
+    if not images:
+        console.print("[red]❌ No images found in tar file[/red]")
+        raise click.Abort()
+    if len(images) > 1:
+        tags = ", ".join(tag for image in images for tag in image.tags)
+        console.print(
+            f"[red]❌ Bundle contains several images ({tags}), "
+            "pick one with --model[/red]"
+        )
+        raise click.Abort()
+
+    image = images[0]
+    console.print(f"[green]✓ Image loaded: {image_name(image)}[/green]")
+    return image
+
+
+def image_name(image: Image) -> str:
+    """Name to run an image by: its first tag, or its ID if it has none.
+
+    Another pack of the same model may have moved the tag to its image.
+    """
+    tags: list[str] = image.tags
+    return tags[0] if tags else str(image.id)
+
+
+def parse_env(env: tuple[str, ...]) -> dict[str, str]:
+    """Parse repeated NAME=VALUE options."""
+    environment = {}
+    for item in env:
+        name, sep, value = item.partition("=")
+        if not sep or not name:
+            raise click.BadParameter(
+                f"expected NAME=VALUE, got {item!r}", param_hint="--env"
+            )
+        environment[name] = value
+    return environment
@@ -0,0 +1,267 @@
+"""``ezrunner submit`` and ``ezrunner jobs`` commands."""
+
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import click
+from rich.markup import escape
+from rich.table import Table
+
+from ezrunner.api.daemon import DaemonClient
+from ezrunner.commands.common import console
+from ezrunner.exceptions import DaemonError
+
+STATUS_STYLES = {
+    "queued": "[dim]queued[/dim]",
+    "running": "[cyan]running[/cyan]",
+    "done": "[green]done[/green]",
+    "failed": "[red]failed[/red]",
+    "cancelled": "[yellow]cancelled[/yellow]",
+}
+
+
+def _client_options(command: Callable[..., Any]) -> Callable[..., Any]:
+    """Options every job submission takes."""
+    for option in reversed(
+        [
+            click.option(
+                "--priority", type=int, default=0, help="Higher runs first (default 0)"
+            ),
+            click.option(
+                "--follow", is_flag=True, help="Stream progress until the job ends"
+            ),
+            click.option(
+                "--address",
+                default=None,
+                help="Daemon address (default: $EZRUNNER_DAEMON, else the "
+                "socket in the cache directory)",
+            ),
+        ]
+    ):
+        command = option(command)
+    return command
+
+
+@click.group()
+def submit() -> None:
+    """Queue a pack, export or verify job on `ezrunner serve`.
+
+    Paths are sent as absolute paths and written by the daemon.
+
+    Example:
+        ezrunner submit pack qwen/Qwen-7B-Chat -o qwen.tar --follow
+        ezrunner submit verify qwen.tar --priority 10
+    """
+
+
+@submit.command("pack")
+@click.argument("model_id")
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Output tar file path (directory for --format oci)",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["tar", "oci"]),
+    default=None,
+    help="Output format (default: tar)",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["auto", "transformers", "vllm"]),
+    default=None,
+    help="Inference engine (default: auto)",
+)
+@click.option("--target-gpu", type=float, default=None, help="Target GPU memory in GB")
+@click.option("--port", type=int, default=None, help="API port (default: 8080)")
+@click.option(
+    "--max-batch-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Maximum number of requests decoded together",
+)
+@click.option(
+    "--warmup",
+    default=None,
+    help="Prompt lengths (comma-separated tokens) to warm up with",
+)
+@_client_options
+def submit_pack(
+    model_id: str,
+    output: Path | None,
+    output_format: str | None,
+    engine: str | None,
+    target_gpu: float | None,
+    port: int | None,
+    max_batch_size: int | None,
+    warmup: str | None,
+    priority: int,
+    follow: bool,
+    address: str | None,
+) -> None:
+    """Queue packing a model (the options of `ezrunner pack`)."""
+    options = {
+        "output": str(output.absolute()) if output else None,
+        "format": output_format,
+        "engine": engine,
+        "target_gpu": target_gpu,
+        "port": port,
+        "max_batch_size": max_batch_size,
+        "warmup": warmup,
+    }
+    params: dict[str, Any] = {"id": model_id}
+    params |= {name: value for name, value in options.items() if value is not None}
+    _submit(address, "pack", params, priority, follow)
+
+
+@submit.command("export")
+@click.argument("image")
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(path_type=Path),
+    required=True,
+    help="Output tar file path (directory for --format oci)",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["tar", "oci"]),
+    default="tar",
+    help="Output format",
+)
+@_client_options
+def submit_export(
+    image: str,
+    output: Path,
+    output_format: str,
+    priority: int,
+    follow: bool,
+    address: str | None,
+) -> None:
+    """Queue exporting an image the daemon's Docker has."""
+    params = {"image": image, "output": str(output.absolute()), "format": output_format}
+    _submit(address, "export", params, priority, follow)
+
+
+@submit.command("verify")
+@click.argument("archive", type=click.Path(exists=True, path_type=Path))
+@_client_options
+def submit_verify(
+    archive: Path, priority: int, follow: bool, address: str | None
+) -> None:
+    """Queue checking an archive's layers against their digests."""
+    params = {"archive": str(archive.absolute())}
+    _submit(address, "verify", params, priority, follow)
+
+
+@click.command()
+@click.argument("job_id", required=False)
+@click.option("--follow", is_flag=True, help="Stream progress until the job ends")
+@click.option("--cancel", is_flag=True, help="Cancel the job if it has not started")
+@click.option(
+    "--address",
+    default=None,
+    help="Daemon address (default: $EZRUNNER_DAEMON, else the socket in the "
+    "cache directory)",
+)
+def jobs(job_id: str | None, follow: bool, cancel: bool, address: str | None) -> None:
+    """Show the jobs of `ezrunner serve`.
+
+    Example:
+        ezrunner jobs
+        ezrunner jobs 3f2a9c1b7d40 --follow
+        ezrunner jobs 3f2a9c1b7d40 --cancel
+    """
+    if (follow or cancel) and job_id is None:
+        raise click.UsageError("--follow and --cancel need a JOB_ID")
+    try:
+        client = DaemonClient(address)
+        if cancel:
+            job = client.cancel(str(job_id))
+            console.print(f"[yellow]Cancelled job {job['id']}[/yellow]")
+        elif follow:
+            _follow(client, str(job_id))
+        elif job_id is not None:
+            _print_job(client.job(job_id))
+        else:
+            _print_jobs(client.jobs())
+    except DaemonError as e:
+        console.print(f"[red]❌ Error:[/red] {e}")
+        raise click.Abort() from e
+
+
+def _submit(
+    address: str | None,
+    kind: str,
+    params: dict[str, Any],
+    priority: int,
+    follow: bool,
+) -> None:
+    """Queue a job, and follow it if asked."""
+    try:
+        client = DaemonClient(address)
+        job = client.submit(kind, params, priority)
+        console.print(f"[green]✓ Queued {kind} job {job['id']}[/green]")
+        if follow:
+            _follow(client, job["id"])
+    except DaemonError as e:
+        console.print(f"[red]❌ Error:[/red] {e}")
+        raise click.Abort() from e
+
+
+def _follow(client: DaemonClient, job_id: str) -> None:
+    """Print a job's progress until it ends; abort if it did not succeed."""
+    final: dict[str, Any] = {}
+    for event in client.follow(job_id):
+        if "job" in event:
+            final = event["job"]
+        else:
+            clock = time.strftime("%H:%M:%S", time.localtime(event["time"]))
+            console.print(f"[dim]{clock}[/dim] {escape(event['message'])}")
+    if not final:
+        raise DaemonError(f"Lost the progress stream of job {job_id}")
+    _print_job(final)
+    if final["status"] != "done":
+        raise click.Abort()
+
+
+def _print_job(job: dict[str, Any]) -> None:
+    """Print the state of one job."""
+    console.print(
+        f"Job {job['id']} ({job['kind']}): "
+        f"{STATUS_STYLES.get(job['status'], job['status'])}"
+    )
+    if job.get("error"):
+        console.print(f"[red]{escape(job['error'])}[/red]")
+    for name, value in (job.get("result") or {}).items():
+        if value not in (None, "", {}):
+            console.print(f"  {name}: {escape(str(value))}")
+
+
+def _print_jobs(jobs: list[dict[str, Any]]) -> None:
+    """Print every job as a table."""
+    if not jobs:
+        console.print("No jobs")
+        return
+    table = Table(title="Jobs")
+    for column in ("ID", "Kind", "Priority", "Status", "Time (s)", "Progress"):
+        table.add_column(column, justify="right" if column == "Time (s)" else "left")
+    for job in jobs:
+        started = job.get("started")
+        seconds = (job.get("finished") or time.time()) - started if started else None
+        table.add_row(
+            job["id"],
+            job["kind"],
+            str(job["priority"]),
+            STATUS_STYLES.get(job["status"], job["status"]),
+            f"{seconds:.1f}" if seconds is not None else "",
+            escape(job.get("progress") or ""),
+        )
+    console.print(table)
@@ -0,0 +1,44 @@
+"""``ezrunner load`` command."""
+
+from pathlib import Path
+
+import click
+import docker
+
+from ezrunner.commands.common import console
+from ezrunner.core.loader import ImageLoader
+from ezrunner.exceptions import ArchiveError, DockerError
+
+
+@click.command()
+@click.argument("tar_path", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--model",
+    "models",
+    multiple=True,
+    help="Image to load from a bundle (repeatable)",
+)
+@click.option("--all", "load_all", is_flag=True, help="Load every image (default)")
+def load(tar_path: Path, models: tuple[str, ...], load_all: bool) -> None:
+    """Load packed models into Docker without starting them.
+
+    Example:
+        ezrunner load bundle.tar --all
+        ezrunner load bundle.tar --model qwen/Qwen-7B-Chat
+    """
+    if load_all and models:
+        raise click.UsageError("--all and --model are mutually exclusive")
+
+    try:
+        loader = ImageLoader()
+        names: list[str | None] = list(models) or [None]
+        for name in names:
+            for image in loader.load(tar_path, model=name):
+                console.print(f"[green]✓ Image loaded: {', '.join(image.tags)}[/green]")
+
+    except ArchiveError as e:
+        console.print(f"[red]❌ Error:[/red] {e}")
+        raise click.Abort() from e
+    except (DockerError, docker.errors.DockerException) as e:
+        console.print(f"[red]❌ Docker Error:[/red] {e}")
+        raise click.Abort() from e
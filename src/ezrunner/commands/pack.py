@@ -0,0 +1,267 @@
+"""``ezrunner pack`` command."""
+
+from pathlib import Path
+
+import click
+from rich.console import Console
+from rich.markup import escape
+from rich.progress import Progress, SpinnerColumn, TaskID, TextColumn
+from rich.table import Table
+
+from ezrunner.commands.common import console, err_console
+from ezrunner.core.pipeline import STAGES, PackJob, PackPipeline, PackProgress
+from ezrunner.core.sinks import is_sink
+from ezrunner.exceptions import DockerError, ModelNotFoundError
+from ezrunner.utils.tracing import Tracer, tracing
+
+
+@click.command()
+@click.argument("model_ids", metavar="MODEL_ID...", nargs=-1, required=True)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(path_type=Path, allow_dash=True),
+    default=Path("model.tar"),
+    help="Output tar file path (directory for --format oci); '-' for stdout, "
+    "a named pipe, or unix:<socket>",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["tar", "oci"]),
+    default="tar",
+    help="Output format: docker-save tar, or OCI image-layout directory",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["auto", "transformers", "vllm"]),
+    default="auto",
+    help="Inference engine",
+)
+@click.option(
+    "--target-gpu",
+    type=float,
+    default=0.0,
+    help="Target GPU memory in GB",
+)
+@click.option(
+    "--port",
+    type=int,
+    default=8080,
+    help="API port",
+)
+@click.option(
+    "--max-batch-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Maximum number of requests decoded together "
+    "(default: 8, or sized to the target GPU for vLLM)",
+)
+@click.option(
+    "--max-wait-ms",
+    type=click.FloatRange(min=0),
+    default=10.0,
+    help="How long an idle server waits to fill a batch",
+)
+@click.option(
+    "--response-cache",
+    type=click.IntRange(min=0),
+    default=0,
+    help="Cache this many responses to temperature-0 requests (0 disables)",
+)
+@click.option(
+    "--response-cache-ttl",
+    type=click.FloatRange(min=0),
+    default=3600.0,
+    help="Seconds a cached response stays valid (0 for no expiry)",
+)
+@click.option(
+    "--warmup",
+    default="32,512",
+    help="Prompt lengths (comma-separated tokens) to warm up with before "
+    'reporting ready ("" disables)',
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Rebuild and re-export even if an identical pack is cached",
+)
+@click.option(
+    "--trace",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write a per-stage timing trace (Chrome trace-event JSON)",
+)
+def pack(
+    model_ids: tuple[str, ...],
+    output: Path,
+    output_format: str,
+    engine: str,
+    target_gpu: float,
+    port: int,
+    max_batch_size: int | None,
+    max_wait_ms: float,
+    response_cache: int,
+    response_cache_ttl: float,
+    warmup: str,
+    force: bool,
+    trace: Path | None,
+) -> None:
+    """Pack a model into offline-runnable Docker image.
+
+    Several models make one image serving them all: the first is loaded
+    at startup, the others on their first request (by the ``model``
+    field), and the least recently used are swapped out when GPU memory
+    runs short.
+
+    Example:
+        ezrunner pack qwen/Qwen-7B-Chat -o qwen.tar
+        ezrunner pack qwen/Qwen-7B-Chat -o qwen.tar --trace pack-trace.json
+        ezrunner pack qwen/Qwen-7B-Chat --format oci -o models/
+        ezrunner pack qwen/Qwen-7B-Chat -o - | ssh offline-host docker load
+        ezrunner pack qwen/Qwen2-1.5B-Instruct meta-llama/Llama-3.2-1B -o small.tar
+    """
+    model_id, *extra_ids = model_ids
+    if len(set(model_ids)) < len(model_ids):
+        raise click.UsageError("Each model can be packed only once")
+    if extra_ids and engine == "vllm":
+        raise click.UsageError(
+            "vLLM serves one model per container; pack several models with "
+            "--engine transformers"
+        )
+    warmup = _parse_lengths(warmup)
+    streaming = is_sink(output)
+    if streaming and output_format == "oci":
+        raise click.UsageError("--format oci needs a directory output")
+    ui = err_console if streaming else console
+    tracer = Tracer()
+
+    job = PackJob(
+        model_id,
+        output,
+        output_format,
+        engine,
+        target_gpu,
+        port,
+        max_batch_size,
+        max_wait_ms,
+        response_cache,
+        response_cache_ttl,
+        warmup,
+        extra_model_ids=tuple(extra_ids),
+    )
+
+    try:
+        with (
+            tracing(tracer),
+            Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=ui,
+            ) as progress,
+        ):
+            result = PackPipeline(force=force).pack(job, _ProgressDisplay(progress))
+
+        _print_trace(ui, tracer)
+        ui.print("\n[bold green]✅ Success![/bold green]")
+        if streaming:
+            ui.print(f"Streamed to {output} ({result.detail})")
+        else:
+            ui.print("\nTo run on offline machine:")
+            ui.print(f"  ezrunner run {output}")
+
+    except ModelNotFoundError as e:
+        ui.print(f"[red]❌ Error:[/red] {e}")
+        raise click.Abort() from e
+    except DockerError as e:
+        ui.print(f"[red]❌ Docker Error:[/red] {e}")
+        raise click.Abort() from e
+    except Exception as e:
+        ui.print(f"[red]❌ Unexpected Error:[/red] {e}")
+        raise
+    finally:
+        # Written on failure too: that is when the timings matter most
+        if trace is not None:
+            tracer.write(trace)
+            ui.print(f"Trace: {trace}")
+
+
+class _ProgressDisplay(PackProgress):
+    """Show the pack stages as spinner lines, ticked off as they finish."""
+
+    def __init__(self, progress: Progress) -> None:
+        super().__init__()
+        self.progress = progress
+        self.task: TaskID | None = None
+        self.label = ""
+
+    def start(self, stage: str) -> None:
+        self.label = f"[cyan]{STAGES[stage]}..."
+        self.task = self.progress.add_task(self.label, total=None)
+
+    def step(self, message: str) -> None:
+        if self.task is not None:
+            self.progress.update(
+                self.task, description=f"{self.label} {escape(message[:60])}"
+            )
+
+    def done(self, outcome: str) -> None:
+        # A stage with several outcomes (e.g., models) gets a line each
+        if self.task is None:
+            self.task = self.progress.add_task("", total=None)
+        self.progress.update(
+            self.task, description=f"[green]✓[/green] {outcome}", completed=True
+        )
+        self.task = None
+
+
+def _print_trace(ui: Console, tracer: Tracer) -> None:
+    """Print the time, data and cache use of each pack stage."""
+    table = Table(title="Pack stages")
+    table.add_column("Stage")
+    for column in ("Time (s)", "Data (MB)", "MB/s", "HTTP calls", "Cache hits"):
+        table.add_column(column, justify="right")
+    for row in tracer.summary():
+        throughput = row.get("throughput_mb_s")
+        table.add_row(
+            row["name"],
+            f"{row['seconds']:.2f}",
+            f"{row['bytes'] / 1e6:.1f}" if row["bytes"] else "",
+            f"{throughput:.0f}" if throughput is not None else "",
+            str(row["http_calls"] or ""),
+            (
+                f"{row['cache_hits']}/{row['cache_hits'] + row['cache_misses']}"
+                if row["cache_hits"] + row["cache_misses"]
+                else ""
+            ),
+        )
+    ui.print(table)
+
+    # Dockerfile steps, to show which template step is the bottleneck
+    steps = [step for step in tracer.spans if step.category == "step"]
+    if not steps:
+        return
+    table = Table(title="Slowest build steps")
+    table.add_column("Step")
+    for column in ("Time (s)", "Layer (MB)", "Cached"):
+        table.add_column(column, justify="right")
+    for step in sorted(steps, key=lambda step: step.seconds, reverse=True)[:5]:
+        size = step.args.get("layer_bytes")
+        table.add_row(
+            escape(step.name),
+            f"{step.seconds:.1f}",
+            f"{size / 1e6:.1f}" if size else "",
+            "yes" if step.args.get("cache_hits") else "",
+        )
+    ui.print(table)
+
+
+def _parse_lengths(value: str) -> str:
+    """Validate a comma-separated list of token counts."""
+    lengths = [item.strip() for item in value.split(",") if item.strip()]
+    if not all(item.isdigit() for item in lengths):
+        raise click.BadParameter(
+            f"expected comma-separated token counts, got {value!r}",
+            param_hint="--warmup",
+        )
+    return ",".join(lengths)
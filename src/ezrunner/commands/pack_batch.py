@@ -0,0 +1,168 @@
+"""``ezrunner pack-batch`` command."""
+
+import time
+from pathlib import Path
+
+import click
+from rich.table import Table
+
+from ezrunner.commands.common import console
+from ezrunner.core.batch import BatchPacker, load_manifest, load_report, write_report
+from ezrunner.core.pipeline import JobResult
+from ezrunner.exceptions import DockerError, ManifestError
+
+STATUS_STYLES = {
+    "built": "[green]built[/green]",
+    "exported": "[green]exported[/green]",
+    "cached": "[green]cached[/green]",
+    "resumed": "[cyan]resumed[/cyan]",
+    "failed": "[red]failed[/red]",
+}
+
+
+@click.command()
+@click.argument("manifest", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--network",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Concurrent discoveries (default: manifest, else 4)",
+)
+@click.option(
+    "--daemon",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Concurrent image builds (default: manifest, else 2)",
+)
+@click.option(
+    "--disk",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Concurrent exports (default: manifest, else 1)",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Skip models the previous run packed, if their output is unchanged",
+)
+@click.option(
+    "--report",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Summary report path (default: <manifest>.report.json)",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Rebuild and re-export even if an identical pack is cached",
+)
+def pack_batch(
+    manifest: Path,
+    network: int | None,
+    daemon: int | None,
+    disk: int | None,
+    resume: bool,
+    report: Path | None,
+    force: bool,
+) -> None:
+    """Pack several models concurrently from a manifest.
+
+    The report is updated as each model finishes, so a batch stopped
+    part-way can be continued with --resume.
+
+    Example:
+        ezrunner pack-batch models.yaml
+        ezrunner pack-batch models.yaml --daemon 1 --resume
+    """
+    report = report or manifest.with_name(f"{manifest.stem}.report.json")
+    try:
+        batch = load_manifest(manifest)
+        overrides = {"network": network, "daemon": daemon, "disk": disk}
+        limits = batch.limits | {
+            name: value for name, value in overrides.items() if value is not None
+        }
+        packer = BatchPacker(limits, force=force)
+    except ManifestError as e:
+        console.print(f"[red]❌ Error:[/red] {e}")
+        raise click.Abort() from e
+    except DockerError as e:
+        console.print(f"[red]❌ Docker Error:[/red] {e}")
+        raise click.Abort() from e
+
+    previous = load_report(report) if resume else {}
+    console.print(
+        f"[cyan]Packing {len(batch.jobs)} models "
+        f"({limits['network']} network, {limits['daemon']} daemon, "
+        f"{limits['disk']} disk)...[/cyan]"
+    )
+    start = time.perf_counter()
+    finished: dict[str, JobResult] = {}
+
+    def on_result(result: JobResult) -> None:
+        if result.ok:
+            console.print(
+                f"[green]✓[/green] {result.model_id}: {result.status} "
+                f"→ {result.output}"
+            )
+        else:
+            error = (result.error or "").splitlines()[0]
+            console.print(f"[red]✗[/red] {result.model_id}: {error}")
+        # Keep the report current, so an interrupted batch can resume
+        finished[result.output] = result
+        write_report(
+            report,
+            [
+                *finished.values(),
+                *(r for r in previous.values() if r.output not in finished),
+            ],
+            limits,
+            time.perf_counter() - start,
+        )
+
+    results = packer.run(batch.jobs, previous, on_result)
+    write_report(report, results, limits, time.perf_counter() - start)
+
+    _print_summary(results, time.perf_counter() - start)
+    console.print(f"Report: {report}")
+    failed = [result for result in results if not result.ok]
+    if failed:
+        console.print(
+            f"[red]❌ {len(failed)} of {len(results)} models failed[/red] "
+            "(rerun with --resume to retry only those)"
+        )
+        raise click.Abort()
+
+
+def _print_summary(results: list[JobResult], seconds: float) -> None:
+    """Print the outcome and timings of every job."""
+    table = Table(title="Pack batch")
+    table.add_column("Model")
+    table.add_column("Status")
+    for column in ("Time (s)", "Waited (s)", "Build (s)", "Export (s)"):
+        table.add_column(column, justify="right")
+    table.add_column("Output")
+    for result in results:
+        build = result.stages.get("build")
+        export = result.stages.get("export")
+        if not result.ok:
+            output = (result.error or "").splitlines()[0]
+        elif result.detail:
+            output = f"{result.output} ({result.detail})"
+        else:
+            output = result.output
+        table.add_row(
+            result.model_id,
+            STATUS_STYLES.get(result.status, result.status),
+            f"{result.seconds:.1f}",
+            f"{result.waited_s:.1f}",
+            f"{build:.1f}" if build is not None else "",
+            f"{export:.1f}" if export is not None else "",
+            output,
+        )
+    console.print(table)
+    # Sum of job times over wall time: how much the stages overlapped
+    busy = sum(result.seconds for result in results)
+    console.print(
+        f"Wall time {seconds:.1f} s for {busy:.1f} s of packing "
+        f"({busy / max(seconds, 1e-9):.1f}x overlap)"
+    )
@@ -0,0 +1,355 @@
+"""``ezrunner run`` command."""
+
+import asyncio
+import contextlib
+import signal
+import time
+from pathlib import Path
+from typing import Any
+
+import click
+import docker
+
+from ezrunner.commands.common import console, image_name, load_image, parse_env
+from ezrunner.core.balancer import LoadBalancer, Replica
+from ezrunner.core.placement import (
+    GPUDevice,
+    PlacementStore,
+    container_options,
+    gpu_request,
+    load_profile,
+    probe_gpus,
+    save_profile,
+)
+from ezrunner.core.readiness import ReadinessProbe
+from ezrunner.core.sweep import load_tuning, tuning_path
+from ezrunner.exceptions import ArchiveError, PlacementError, StartupError
+
+# Where `run --response-cache-dir` is mounted in the container
+RESPONSE_CACHE_MOUNT = "/var/cache/ezrunner"
+
+
+@click.command()
+@click.argument("tar_path", type=click.Path(exists=True, path_type=Path))
+@click.option("--port", type=int, default=8080, help="API port")
+@click.option("--model", default=None, help="Image to run from a bundle")
+@click.option(
+    "--force-load",
+    is_flag=True,
+    help="Load the archive even if the image is already in Docker",
+)
+@click.option(
+    "--response-cache",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Cache this many responses to temperature-0 requests (0 disables)",
+)
+@click.option(
+    "--response-cache-ttl",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="Seconds a cached response stays valid (0 for no expiry)",
+)
+@click.option(
+    "--response-cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Host directory persisting the response cache across restarts",
+)
+@click.option(
+    "-e",
+    "--env",
+    "env",
+    multiple=True,
+    help="Server setting NAME=VALUE (e.g., EZRUNNER_MAX_BATCH_SIZE=16)",
+)
+@click.option(
+    "--gpus",
+    type=click.IntRange(min=0),
+    default=None,
+    help="GPUs to assign (default: 1 if the node has any; 0 for CPU only)",
+)
+@click.option(
+    "--gpu-memory",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="GPU memory in GB the model needs per device (default: from its size)",
+)
+@click.option(
+    "--gpu-profile",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Node GPU profile (JSON) to place containers with; probed with "
+    "nvidia-smi and written there if missing",
+)
+@click.option(
+    "--replicas",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Containers to start, on distinct GPUs, behind a load balancer on --port",
+)
+@click.option(
+    "--shm-size",
+    default=None,
+    help="Container shared memory (default: 16g with GPUs, else 2g)",
+)
+@click.option(
+    "--wait",
+    is_flag=True,
+    help="Block until the model is loaded, warmed up and ready to serve",
+)
+@click.option(
+    "--wait-timeout",
+    type=click.FloatRange(min=0),
+    default=900.0,
+    show_default=True,
+    help="Seconds to wait for the server to become ready",
+)
+def run(
+    tar_path: Path,
+    port: int,
+    model: str | None,
+    force_load: bool,
+    response_cache: int | None,
+    response_cache_ttl: float | None,
+    response_cache_dir: Path | None,
+    env: tuple[str, ...],
+    gpus: int | None,
+    gpu_memory: float | None,
+    gpu_profile: Path | None,
+    replicas: int,
+    shm_size: str | None,
+    wait: bool,
+    wait_timeout: float,
+) -> None:
+    """Run a packed model.
+
+    TAR_PATH is a packed tar, a bundle, or an OCI image-layout directory.
+
+    GPUs are assigned explicitly: containers are bin-packed onto the
+    node's devices by model size and NVLink/NUMA locality, around the
+    ones other runs placed, and a restarted model gets its GPUs back.
+
+    With --replicas, each replica gets its own GPUs and a loopback port
+    (--port + 1, + 2, ...), and ``run`` stays in the foreground proxying
+    --port to the least busy ready replica until interrupted.
+
+    Example:
+        ezrunner run model.tar
+        ezrunner run bundle.tar --model qwen/Qwen-7B-Chat
+        ezrunner run models/ --model qwen/Qwen-7B-Chat
+        ezrunner run model.tar -e EZRUNNER_MAX_BATCH_SIZE=16
+        ezrunner run model.tar -e EZRUNNER_VLLM_MAX_MODEL_LEN=8192
+        ezrunner run model.tar --response-cache 10000 --response-cache-dir cache/
+        ezrunner run model.tar --wait
+        ezrunner run llama-70b.tar --gpus 4 --port 8081
+        ezrunner run model.tar --replicas 4 --wait
+    """
+    environment: dict[str, str] = {}
+    volumes: dict[str, dict[str, str]] = {}
+    if response_cache is not None:
+        environment["EZRUNNER_RESPONSE_CACHE_SIZE"] = str(response_cache)
+    if response_cache_ttl is not None:
+        environment["EZRUNNER_RESPONSE_CACHE_TTL"] = f"{response_cache_ttl:g}"
+    if response_cache_dir is not None:
+        response_cache_dir.mkdir(parents=True, exist_ok=True)
+        volumes[str(response_cache_dir.resolve())] = {
+            "bind": RESPONSE_CACHE_MOUNT,
+            "mode": "rw",
+        }
+        environment["EZRUNNER_RESPONSE_CACHE_PATH"] = (
+            f"{RESPONSE_CACHE_MOUNT}/responses.db"
+        )
+    environment.update(parse_env(env))
+    try:
+        client = docker.from_env()
+        image = load_image(client, tar_path, model, force_load)
+        tuned = load_tuning(tar_path, image.id)
+        if tuned:
+            # Explicit settings still win over tuned ones
+            console.print(
+                f"[green]✓ Tuned settings from {tuning_path(tar_path)}[/green]"
+            )
+            environment = {**tuned, **environment}
+
+        devices = _gpu_devices(gpu_profile)
+        if gpus is None:
+            gpus = 1 if devices else 0
+
+        def running(container_id: str) -> bool:
+            try:
+                status = client.containers.get(container_id).status
+            except docker.errors.NotFound:
+                return False
+            return status in ("created", "running", "restarting")
+
+        # Replicas are published on loopback, behind the balancer on --port
+        host_ports = (
+            [port] if replicas == 1 else [port + 1 + i for i in range(replicas)]
+        )
+        container_port = _exposed_port(image, port)
+        labels = image.labels or {}
+        if gpus > 1 and labels.get("ezrunner.engine") == "vllm":
+            environment.setdefault(
+                "EZRUNNER_VLLM_ARGS", f"--tensor-parallel-size {gpus}"
+            )
+        containers: list[Any] = []
+        store = PlacementStore()
+        try:
+            # Placing and starting under the lock keeps concurrent runs apart
+            with store.lock():
+                placed: set[int] = set()
+                for host_port in host_ports:
+                    placement = None
+                    if gpus:
+                        request = gpu_request(
+                            f"{image_name(image)}@{host_port}",
+                            labels,
+                            gpus,
+                            gpu_memory,
+                            avoid=frozenset(placed),
+                        )
+                        placement = store.place(request, devices, running)
+                        placed.update(placement.devices)
+                        share = (
+                            "whole"
+                            if placement.exclusive
+                            else f"{request.memory_gb:g} GB"
+                        )
+                        console.print(
+                            f"[green]✓ GPU {','.join(map(str, placement.devices))} "
+                            f"({share} each)[/green]"
+                        )
+
+                    # Run container
+                    console.print(
+                        f"\n[cyan]Starting container on port {host_port}...[/cyan]"
+                    )
+                    started = time.monotonic()
+                    container = client.containers.run(
+                        image_name(image),
+                        detach=True,
+                        ports={
+                            container_port: (
+                                host_port if replicas == 1 else ("127.0.0.1", host_port)
+                            )
+                        },
+                        environment=environment,
+                        volumes=volumes,
+                        remove=True,
+                        **container_options(placement, devices, shm_size),
+                    )
+                    containers.append(container)
+                    if placement is not None:
+                        store.record(placement, container.id)
+        except BaseException:
+            if replicas > 1:
+                _stop(containers)
+            raise
+
+        if replicas > 1:
+            try:
+                _serve_replicas(containers, host_ports, port, wait, wait_timeout)
+            finally:
+                _stop(containers)
+            return
+
+        console.print("[bold green]✅ Container started![/bold green]")
+        console.print(f"\nAPI: http://localhost:{port}")
+        console.print(f"Container ID: {container.short_id}")
+
+        if wait:
+            status = _wait_ready(container, port, wait_timeout)
+            elapsed = time.monotonic() - started
+            console.print(f"\n[bold green]✅ Ready in {elapsed:.1f}s[/bold green]")
+            for phase, seconds in status.get("phases", {}).items():
+                console.print(f"  {phase:<10} {seconds:8.2f}s")
+                if phase == "load":
+                    for step, step_s in status.get("breakdown", {}).items():
+                        console.print(f"    {step:<8} {step_s:8.2f}s", style="dim")
+
+    except (ArchiveError, PlacementError, StartupError) as e:
+        console.print(f"[red]❌ Error:[/red] {e}")
+        raise click.Abort() from e
+    except docker.errors.DockerException as e:
+        console.print(f"[red]❌ Docker Error:[/red] {e}")
+        raise click.Abort() from e
+
+
+def _gpu_devices(profile: Path | None) -> list[GPUDevice]:
+    """GPUs of the node, from a profile or probed (and saved to the profile)."""
+    if profile is not None and profile.exists():
+        return load_profile(profile)
+    devices = probe_gpus()
+    if profile is not None and devices:
+        save_profile(profile, devices)
+        console.print(f"[green]✓ GPU profile written to {profile}[/green]")
+    return devices
+
+
+def _exposed_port(image: Any, default: int) -> str:
+    """Container port the image's server listens on, as ``"<port>/tcp"``.
+
+    Images expose the port they were packed with, which need not match the
+    host --port; images without an EXPOSE fall back to ``default``.
+    """
+    attrs = image.attrs if isinstance(image.attrs, dict) else {}
+    exposed = (attrs.get("Config") or {}).get("ExposedPorts") or {}
+    tcp = sorted(p for p in exposed if p.endswith("/tcp"))
+    return tcp[0] if tcp else f"{default}/tcp"
+
+
+def _serve_replicas(
+    containers: list[Any],
+    host_ports: list[int],
+    port: int,
+    wait: bool,
+    wait_timeout: float,
+) -> None:
+    """Balance requests over started replicas until interrupted."""
+    console.print(f"[bold green]✅ {len(containers)} containers started![/bold green]")
+    for host_port, container in zip(host_ports, containers, strict=True):
+        console.print(f"  Replica 127.0.0.1:{host_port}  {container.short_id}")
+    # Stop the same way on SIGTERM as on Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        if wait:
+            started = time.monotonic()
+            for host_port, container in zip(host_ports, containers, strict=True):
+                _wait_ready(container, host_port, wait_timeout)
+            elapsed = time.monotonic() - started
+            console.print(f"\n[bold green]✅ Ready in {elapsed:.1f}s[/bold green]")
+        balancer = LoadBalancer([Replica("127.0.0.1", p) for p in host_ports])
+        console.print(f"\nAPI: http://localhost:{port}")
+        console.print("Balancing requests over the replicas; Ctrl+C stops them")
+        asyncio.run(balancer.serve("0.0.0.0", port))
+    except KeyboardInterrupt:
+        console.print("[yellow]Stopping replicas...[/yellow]")
+
+
+def _stop(containers: list[Any]) -> None:
+    """Stop containers, ignoring ones already gone."""
+    for container in containers:
+        with contextlib.suppress(docker.errors.DockerException):
+            container.stop()
+
+
+def _wait_ready(container: Any, port: int, timeout: float) -> dict[str, Any]:
+    """Wait for a started container's server, showing the current phase."""
+
+    def alive() -> bool:
+        try:
+            container.reload()
+        except docker.errors.NotFound:
+            return False
+        return container.status in ("created", "running")
+
+    probe = ReadinessProbe(f"http://localhost:{port}")
+    with console.status("[cyan]Waiting for the model server...[/cyan]") as spinner:
+
+        def show(status: dict[str, Any] | None) -> None:
+            phase = (status or {}).get("phase") or "starting"
+            spinner.update(f"[cyan]Waiting for the model server ({phase})...[/cyan]")
+
+        return probe.wait(timeout, alive=alive, on_status=show)
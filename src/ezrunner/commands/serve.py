@@ -0,0 +1,89 @@
+"""``ezrunner serve`` command."""
+
+import signal
+
+import click
+
+from ezrunner.api.daemon import default_address
+from ezrunner.commands.common import console
+from ezrunner.core.batch import BatchPacker
+from ezrunner.core.daemon import DaemonServer, JobQueue, JobRunner
+from ezrunner.exceptions import DaemonError, DockerError
+
+
+@click.command()
+@click.option(
+    "--listen",
+    default=None,
+    help="unix:<path> or <host>:<port> (default: $EZRUNNER_DAEMON, "
+    "else a socket in the cache directory). The API has no authentication: "
+    "only loopback hosts are accepted without --allow-remote",
+)
+@click.option(
+    "--allow-remote",
+    is_flag=True,
+    help="Listen on a non-loopback host. Anyone who can reach the port can "
+    "then run jobs writing files anywhere the daemon user may, with its "
+    "Docker access",
+)
+@click.option(
+    "--workers", type=click.IntRange(min=1), default=2, help="Jobs run at once"
+)
+@click.option(
+    "--network", type=click.IntRange(min=1), default=4, help="Concurrent discoveries"
+)
+@click.option(
+    "--daemon", type=click.IntRange(min=1), default=2, help="Concurrent image builds"
+)
+@click.option(
+    "--disk",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Concurrent exports and verifications",
+)
+def serve(
+    listen: str | None,
+    allow_remote: bool,
+    workers: int,
+    network: int,
+    daemon: int,
+    disk: int,
+) -> None:
+    """Run a pack daemon accepting jobs from `ezrunner submit`.
+
+    The daemon keeps the Docker client, templates and pack cache warm
+    between jobs. Jobs are queued by priority and run by --workers
+    threads; builds and exports are further limited per resource.
+
+    Example:
+        ezrunner serve
+        ezrunner serve --listen 127.0.0.1:8700 --workers 4
+    """
+    address = listen or default_address()
+    try:
+        runner = JobRunner(
+            BatchPacker({"network": network, "daemon": daemon, "disk": disk})
+        )
+        runner.warm_up()
+        server = DaemonServer(JobQueue(workers), runner, address, allow_remote)
+    except DockerError as e:
+        console.print(f"[red]❌ Docker Error:[/red] {e}")
+        raise click.Abort() from e
+    except DaemonError as e:
+        console.print(f"[red]❌ Error:[/red] {e}")
+        raise click.Abort() from e
+
+    server.jobs.start()
+    console.print(
+        f"[green]✓ Pack daemon listening on {server.address}[/green] "
+        f"({workers} workers)"
+    )
+    # Stop the same way on SIGTERM as on Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("[yellow]Stopping: waiting for running jobs...[/yellow]")
+    finally:
+        server.close()
+        server.jobs.stop()
@@ -0,0 +1,189 @@
+"""``ezrunner tune`` command."""
+
+from pathlib import Path
+
+import click
+import docker
+
+from ezrunner.commands.common import console, image_name, load_image
+from ezrunner.core.loadgen import LoadGenerator, LoadStats
+from ezrunner.core.sweep import (
+    DEFAULT_GRIDS,
+    ContainerLauncher,
+    ParameterSweep,
+    SweepResult,
+    best,
+    grid_points,
+    save_tuning,
+)
+from ezrunner.models.engine import Engine
+
+
+@click.command()
+@click.argument("tar_path", type=click.Path(exists=True, path_type=Path))
+@click.option("--port", type=int, default=8080, help="API port")
+@click.option("--model", default=None, help="Image to tune from a bundle")
+@click.option(
+    "--force-load",
+    is_flag=True,
+    help="Load the archive even if the image is already in Docker",
+)
+@click.option(
+    "--grid",
+    "grid_options",
+    multiple=True,
+    help="Setting to sweep as NAME=V1,V2,... (replaces the default grid; "
+    "e.g., EZRUNNER_MAX_BATCH_SIZE=8,16,32)",
+)
+@click.option(
+    "--max-p95-latency",
+    type=click.FloatRange(min=0, min_open=True),
+    default=30.0,
+    show_default=True,
+    help="Latency SLO: 95th percentile seconds per request",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=32,
+    show_default=True,
+    help="Requests in flight during each measurement",
+)
+@click.option(
+    "--requests",
+    "requests_total",
+    type=click.IntRange(min=1),
+    default=128,
+    show_default=True,
+    help="Requests sent per measurement",
+)
+@click.option(
+    "--prompt-tokens",
+    type=click.IntRange(min=1),
+    default=256,
+    show_default=True,
+    help="Approximate prompt length of each request",
+)
+@click.option(
+    "--max-tokens",
+    type=click.IntRange(min=1),
+    default=128,
+    show_default=True,
+    help="Tokens generated per request",
+)
+@click.option(
+    "--wait-timeout",
+    type=click.FloatRange(min=0),
+    default=900.0,
+    show_default=True,
+    help="Seconds to wait for each server to become ready",
+)
+def tune(
+    tar_path: Path,
+    port: int,
+    model: str | None,
+    force_load: bool,
+    grid_options: tuple[str, ...],
+    max_p95_latency: float,
+    concurrency: int,
+    requests_total: int,
+    prompt_tokens: int,
+    max_tokens: int,
+    wait_timeout: float,
+) -> None:
+    """Find the fastest server settings that meet a latency SLO.
+
+    Starts the packed model once per combination of settings, measures
+    throughput under synthetic load, and records the best combination
+    next to TAR_PATH, where `ezrunner run` picks it up.
+
+    Example:
+        ezrunner tune model.tar
+        ezrunner tune model.tar --max-p95-latency 5 --concurrency 64
+        ezrunner tune model.tar --grid EZRUNNER_MAX_BATCH_SIZE=8,16,32
+    """
+    grid = _parse_grid(grid_options)
+    try:
+        client = docker.from_env()
+        image = load_image(client, tar_path, model, force_load)
+        labels = image.labels or {}
+        engine = labels.get("ezrunner.engine", Engine.TRANSFORMERS.value)
+        grid = grid or DEFAULT_GRIDS.get(engine, DEFAULT_GRIDS["transformers"])
+        points = grid_points(grid)
+        generator_model = labels.get("ezrunner.model.id", "model")
+
+        def load(url: str) -> LoadStats:
+            generator = LoadGenerator(
+                url,
+                model=generator_model,
+                prompt_tokens=prompt_tokens,
+                max_tokens=max_tokens,
+            )
+            return generator.run(concurrency, requests_total)
+
+        def show(result: SweepResult) -> None:
+            settings = " ".join(f"{k}={v}" for k, v in result.settings.items())
+            if result.stats is None:
+                console.print(f"  [red]✗[/red] {settings}: {result.error}")
+                return
+            mark = (
+                "[green]✓[/green]" if result.meets(max_p95_latency) else "[red]✗[/red]"
+            )
+            console.print(
+                f"  {mark} {settings}: "
+                f"{result.stats.throughput_tok_s:.1f} tok/s, "
+                f"p95 {result.stats.latency(0.95):.2f}s, "
+                f"{result.stats.errors} errors"
+            )
+
+        console.print(
+            f"\n[cyan]Measuring {len(points)} configurations "
+            f"({concurrency} concurrent, {requests_total} requests each)...[/cyan]"
+        )
+        launcher = ContainerLauncher(client, image_name(image), port, wait_timeout)
+        results = ParameterSweep(launcher.launch, load).run(points, on_result=show)
+    except docker.errors.DockerException as e:
+        console.print(f"[red]❌ Docker Error:[/red] {e}")
+        raise click.Abort() from e
+
+    winner = best(results, max_p95_latency)
+    if winner is None:
+        console.print(
+            f"[red]❌ No configuration met the p95 latency SLO of "
+            f"{max_p95_latency:g}s[/red]"
+        )
+        raise click.Abort()
+
+    path = save_tuning(
+        tar_path,
+        image.id,
+        {
+            "tag": image_name(image),
+            "settings": winner.settings,
+            "slo": {"p95_s": max_p95_latency},
+            "load": {
+                "concurrency": concurrency,
+                "requests": requests_total,
+                "prompt_tokens": prompt_tokens,
+                "max_tokens": max_tokens,
+            },
+            "results": [result.summary() for result in results],
+        },
+    )
+    settings = " ".join(f"{k}={v}" for k, v in winner.settings.items())
+    console.print(f"\n[bold green]✅ Best: {settings}[/bold green]")
+    console.print(f"Saved to: {path}")
+
+
+def _parse_grid(grid_options: tuple[str, ...]) -> dict[str, list[str]]:
+    """Parse repeated NAME=V1,V2,... options."""
+    grid = {}
+    for item in grid_options:
+        name, sep, values = item.partition("=")
+        choices = [value.strip() for value in values.split(",") if value.strip()]
+        if not sep or not name or not choices:
+            raise click.BadParameter(
+                f"expected NAME=V1,V2,..., got {item!r}", param_hint="--grid"
+            )
+        grid[name] = choices
+    return grid
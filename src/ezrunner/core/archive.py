@@ -0,0 +1,285 @@
+"""Docker image archive helpers.
+
+Works on the archives produced by ``docker save`` (both the legacy layout
+with ``<id>/layer.tar`` and the OCI layout with ``blobs/sha256/<digest>``).
+Everything here reads tar headers and seeks over member data, so inspecting
+a multi-GB archive only touches a few KB.
+"""
+
+import hashlib
+import io
+import json
+import posixpath
+import tarfile
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+
+from ezrunner.exceptions import ArchiveError
+
+CHUNK_SIZE = 1024 * 1024
+
+# Archive-level metadata; rewritten rather than copied when images are
+# combined into or picked out of a bundle.
+METADATA_FILES = ("manifest.json", "repositories", "index.json", "oci-layout")
+
+
+@dataclass(frozen=True)
+class ArchiveImage:
+    """One image entry of an archive's ``manifest.json``.
+
+    Attributes:
+        config: Archive path of the image config
+        repo_tags: Repository tags (e.g., "ezrunner-qwen-qwen-7b:latest")
+        layers: Archive paths of the layer tars, base layer first
+    """
+
+    config: str
+    repo_tags: tuple[str, ...]
+    layers: tuple[str, ...]
+
+    @property
+    def image_id(self) -> str:
+        """Image ID; the config file is named after its own digest."""
+        name = posixpath.basename(self.config)
+        return f"sha256:{name.removesuffix('.json')}"
+
+    def matches(self, name: str) -> bool:
+        """Check if a model ID, image name or full tag refers to this image."""
+        candidates = {name, f"{name}:latest", f"{image_tag(name)}:latest"}
+        return any(tag in candidates for tag in self.repo_tags)
+
+    def to_manifest(self) -> dict[str, object]:
+        """Convert back to a ``manifest.json`` entry."""
+        return {
+            "Config": self.config,
+            "RepoTags": list(self.repo_tags),
+            "Layers": list(self.layers),
+        }
+
+
+class HashingReader:
+    """File wrapper computing a SHA-256 of everything read through it."""
+
+    def __init__(self, fileobj: IO[bytes] | None) -> None:
+        if fileobj is None:
+            raise ArchiveError("Archive member has no data")
+        self._fileobj = fileobj
+        self._hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._fileobj.read(size)
+        self._hash.update(data)
+        return data
+
+    def drain(self) -> str:
+        """Read to the end and return the digest."""
+        while self.read(CHUNK_SIZE):
+            pass
+        return self.hexdigest()
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+class ChunkReader(io.RawIOBase):
+    """File-like view of a byte-chunk iterator, e.g. ``Image.save()``.
+
+    Read-only and not seekable, which is all ``tarfile`` needs in stream
+    mode (``"r|"``).
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        super().__init__()
+        self._chunks = iter(chunks)
+        self._chunk = b""
+        self._offset = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        # Slice only what is asked for; re-buffering whole chunks on every
+        # small tarfile read would copy each chunk hundreds of times.
+        parts = []
+        while size != 0:
+            if self._offset >= len(self._chunk):
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    break
+                self._chunk, self._offset = chunk, 0
+                continue
+            end = len(self._chunk)
+            if size > 0:
+                end = min(end, self._offset + size)
+                size -= end - self._offset
+            parts.append(self._chunk[self._offset : end])
+            self._offset = end
+        return b"".join(parts)
+
+
+def image_tag(model_id: str, *extra_model_ids: str) -> str:
+    """Image tag ``ezrunner pack`` uses for a model.
+
+    Args:
+        model_id: Model (the default model of a multi-model image)
+        extra_model_ids: Further models the image serves
+
+    Returns:
+        Tag; multi-model images get a suffix identifying the model set
+    """
+    tag = f"ezrunner-{model_id.replace('/', '-').lower()}"
+    if extra_model_ids:
+        digest = hashlib.sha256(",".join(extra_model_ids).encode()).hexdigest()
+        tag = f"{tag}-multi-{digest[:8]}"
+    return tag
+
+
+def read_manifest(path: Path) -> list[ArchiveImage]:
+    """Read the image entries of an archive.
+
+    Args:
+        path: Archive path
+
+    Returns:
+        Images in archive order
+
+    Raises:
+        ArchiveError: Not a readable image archive
+    """
+    try:
+        with tarfile.open(path, "r:") as tar:
+            return _parse_manifest(tar)
+    except (tarfile.TarError, KeyError, ValueError) as e:
+        raise ArchiveError(f"Invalid image archive {path}: {e}") from e
+
+
+def _parse_manifest(tar: tarfile.TarFile) -> list[ArchiveImage]:
+    """Parse ``manifest.json`` of an open archive."""
+    fileobj = tar.extractfile("manifest.json")
+    if fileobj is None:
+        raise ValueError("manifest.json is not a regular file")
+    return [
+        ArchiveImage(
+            config=entry["Config"],
+            repo_tags=tuple(entry.get("RepoTags") or ()),
+            layers=tuple(entry["Layers"]),
+        )
+        for entry in json.load(fileobj)
+    ]
+
+
+def select_image(images: list[ArchiveImage], name: str) -> ArchiveImage:
+    """Pick the image a user asked for by name.
+
+    Raises:
+        ArchiveError: No image matches
+    """
+    for image in images:
+        if image.matches(name):
+            return image
+    available = ", ".join(tag for image in images for tag in image.repo_tags)
+    raise ArchiveError(f"No image named {name} in archive (available: {available})")
+
+
+def iter_tar(
+    entries: Iterable[tuple[tarfile.TarInfo, IO[bytes] | None]],
+) -> Iterator[bytes]:
+    """Serialize tar members as a byte stream.
+
+    Unlike ``tarfile`` in stream mode this never buffers a whole member,
+    so multi-GB layers flow through with constant memory.
+
+    Args:
+        entries: Member headers with their data (None for non-files)
+
+    Yields:
+        Chunks of the tar stream
+    """
+    for info, fileobj in entries:
+        yield info.tobuf(format=tarfile.PAX_FORMAT)
+        if fileobj is None or not info.isfile():
+            continue
+        remaining = info.size
+        while remaining:
+            chunk = fileobj.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                raise ArchiveError(f"Unexpected end of data for {info.name}")
+            remaining -= len(chunk)
+            yield chunk
+        padding = -info.size % tarfile.BLOCKSIZE
+        if padding:
+            yield tarfile.NUL * padding
+    yield tarfile.NUL * (2 * tarfile.BLOCKSIZE)
+
+
+def json_member(name: str, data: object) -> tuple[tarfile.TarInfo, IO[bytes]]:
+    """Build a tar member holding a JSON document."""
+    payload = json.dumps(data).encode()
+    info = tarfile.TarInfo(name)
+    info.size = len(payload)
+    info.mode = 0o644
+    return info, io.BytesIO(payload)
+
+
+def iter_image(path: Path, image: ArchiveImage) -> Iterator[bytes]:
+    """Stream a single-image archive out of a (multi-image) archive.
+
+    Symlinked members (how bundles store shared layers) are resolved, so
+    the result is a self-contained ``docker load`` input.
+
+    Args:
+        path: Source archive
+        image: Image to extract
+
+    Yields:
+        Chunks of the single-image tar stream
+    """
+    with tarfile.open(path, "r:") as tar:
+        yield from iter_tar(_image_members(tar, image))
+
+
+def _image_members(
+    tar: tarfile.TarFile, image: ArchiveImage
+) -> Iterator[tuple[tarfile.TarInfo, IO[bytes] | None]]:
+    """Yield the members one image needs, followed by its metadata."""
+    for name in (image.config, *image.layers):
+        member = _resolve(tar, name)
+        info = tarfile.TarInfo(name)
+        info.size = member.size
+        info.mode = member.mode
+        info.mtime = member.mtime
+        yield info, tar.extractfile(member)
+
+    yield json_member("manifest.json", [image.to_manifest()])
+
+
+def open_member(tar: tarfile.TarFile, name: str) -> IO[bytes]:
+    """Open the data of an archive member, following symlinks.
+
+    Raises:
+        ArchiveError: The member is not a regular file
+    """
+    fileobj = tar.extractfile(_resolve(tar, name))
+    if fileobj is None:
+        raise ArchiveError(f"{name} is not a regular file")
+    return fileobj
+
+
+def resolve_member(tar: tarfile.TarFile, name: str) -> str:
+    """Name of the regular file a member refers to, following symlinks."""
+    return _resolve(tar, name).name
+
+
+def _resolve(tar: tarfile.TarFile, name: str) -> tarfile.TarInfo:
+    """Follow symlinks inside the archive until a regular file is reached."""
+    member = tar.getmember(name)
+    for _ in range(16):
+        if not member.issym():
+            return member
+        target = posixpath.normpath(
+            posixpath.join(posixpath.dirname(member.name), member.linkname)
+        )
+        member = tar.getmember(target)
+    raise ArchiveError(f"Too many levels of symbolic links: {name}")
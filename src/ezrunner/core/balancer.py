@@ -0,0 +1,511 @@
+"""Replica load balancer module.
+
+``ezrunner run --replicas N`` starts N containers of one image and puts
+this reverse proxy in front of them, so clients keep a single
+OpenAI-compatible address. It is plain asyncio (the host CLI has no
+async HTTP dependency) and speaks the HTTP/1.1 the model servers need:
+keep-alive on both sides, Content-Length and chunked bodies, and
+streamed responses passed through chunk by chunk.
+
+Each request goes to the ready replica with the fewest requests in
+flight (least outstanding requests): generations vary in length by
+orders of magnitude, so round robin would queue short requests behind
+long ones. Replicas are health checked on ``/ready``. A replica that
+refuses a connection is taken out until its next successful check, and
+the request is retried on another one.
+"""
+
+import asyncio
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from ezrunner.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+HEALTH_PATH = "/ready"
+HEALTH_INTERVAL_S = 2.0
+HEALTH_TIMEOUT_S = 5.0
+# Idle upstream connections kept per replica
+POOL_SIZE = 32
+# Balancer status, answered by the balancer itself
+STATS_PATH = "/balancer"
+# Hop-by-hop headers, which apply to one connection and are not forwarded
+HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+    "expect",
+}
+CHUNK_SIZE = 64 * 1024
+
+Connection = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+@dataclass(frozen=True)
+class Head:
+    """Start line and headers of an HTTP message.
+
+    Attributes:
+        start: Request line or status line
+        headers: Header names and values, in order
+    """
+
+    start: str
+    headers: tuple[tuple[str, str], ...]
+
+    def header(self, name: str) -> str | None:
+        """Value of a header (case-insensitive; None if absent)."""
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    @property
+    def chunked(self) -> bool:
+        """Whether the body uses chunked transfer encoding."""
+        return "chunked" in (self.header("transfer-encoding") or "").lower()
+
+    def forwarded(self) -> list[tuple[str, str]]:
+        """Headers minus the hop-by-hop and framing ones."""
+        return [
+            (key, value)
+            for key, value in self.headers
+            if key.lower() not in HOP_HEADERS and key.lower() != "content-length"
+        ]
+
+
+class Replica:
+    """A model server behind the balancer."""
+
+    def __init__(self, host: str, port: int, pool_size: int = POOL_SIZE) -> None:
+        """Initialize replica.
+
+        Args:
+            host: Server host
+            port: Server port
+            pool_size: Idle connections kept for reuse
+        """
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.healthy = False
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self._idle: list[Connection] = []
+
+    @property
+    def address(self) -> str:
+        """``host:port`` of the server."""
+        return f"{self.host}:{self.port}"
+
+    async def connect(self, fresh: bool = False) -> tuple[Connection, bool]:
+        """Take a pooled connection, or open one.
+
+        Args:
+            fresh: Open a new connection even if one is pooled
+
+        Returns:
+            Connection, and whether it was reused from the pool
+        """
+        while self._idle and not fresh:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return (reader, writer), True
+            writer.close()
+        return await asyncio.open_connection(self.host, self.port), False
+
+    def release(self, connection: Connection, reusable: bool) -> None:
+        """Return a connection to the pool, or close it."""
+        if reusable and len(self._idle) < self.pool_size:
+            self._idle.append(connection)
+        else:
+            connection[1].close()
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+    def to_dict(self) -> dict[str, Any]:
+        """Status, for the balancer's stats endpoint."""
+        return {
+            "address": self.address,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class LoadBalancer:
+    """Least-outstanding-requests reverse proxy over model server replicas."""
+
+    def __init__(
+        self,
+        replicas: list[Replica],
+        health_interval_s: float = HEALTH_INTERVAL_S,
+        health_path: str = HEALTH_PATH,
+    ) -> None:
+        """Initialize balancer.
+
+        Args:
+            replicas: Servers to balance over
+            health_interval_s: Seconds between health checks
+            health_path: Path answering 200 once a server is ready
+        """
+        self.replicas = replicas
+        self.health_interval_s = health_interval_s
+        self.health_path = health_path
+        self._turn = 0
+        self._health: asyncio.Task[None] | None = None
+
+    def pick(self, exclude: Iterable[Replica] = ()) -> Replica | None:
+        """Healthy replica with the fewest requests in flight.
+
+        Ties rotate, so idle replicas share a light load.
+
+        Args:
+            exclude: Replicas already tried for this request
+
+        Returns:
+            Replica (None if none is healthy)
+        """
+        excluded = set(map(id, exclude))
+        healthy = [r for r in self.replicas if r.healthy and id(r) not in excluded]
+        if not healthy:
+            return None
+        least = min(replica.outstanding for replica in healthy)
+        candidates = [r for r in healthy if r.outstanding == least]
+        self._turn += 1
+        return candidates[self._turn % len(candidates)]
+
+    async def check(self, replica: Replica) -> bool:
+        """Health check one replica, updating its state.
+
+        Returns:
+            Whether the replica is ready
+        """
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(replica.host, replica.port), HEALTH_TIMEOUT_S
+            )
+            try:
+                writer.write(
+                    f"GET {self.health_path} HTTP/1.1\r\nHost: {replica.address}\r\n"
+                    "Connection: close\r\n\r\n".encode()
+                )
+                await writer.drain()
+                status = await asyncio.wait_for(reader.readline(), HEALTH_TIMEOUT_S)
+            finally:
+                writer.close()
+            healthy = _status(status.decode("latin-1")) == 200
+        except (OSError, ValueError, TimeoutError):
+            healthy = False
+        if healthy != replica.healthy:
+            logger.info(f"Replica {replica.address} is {'up' if healthy else 'down'}")
+        replica.healthy = healthy
+        return healthy
+
+    async def check_all(self) -> None:
+        """Health check every replica."""
+        await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+
+    async def start(self, host: str, port: int) -> asyncio.Server:
+        """Check the replicas once and start accepting connections.
+
+        Args:
+            host: Address to listen on
+            port: Port to listen on (0 picks one)
+
+        Returns:
+            Listening server; health checks run until ``close``
+        """
+        await self.check_all()
+        server = await asyncio.start_server(self._client, host, port)
+        self._health = asyncio.create_task(self._health_loop())
+        return server
+
+    async def serve(self, host: str, port: int) -> None:
+        """Proxy requests until cancelled."""
+        server = await self.start(host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop health checks and close pooled connections."""
+        if self._health is not None:
+            self._health.cancel()
+            self._health = None
+        for replica in self.replicas:
+            replica.close()
+
+    async def _health_loop(self) -> None:
+        """Re-check the replicas periodically."""
+        while True:
+            await asyncio.sleep(self.health_interval_s)
+            await self.check_all()
+
+    async def _client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve the requests of one client connection."""
+        try:
+            while True:
+                head = await _read_head(reader)
+                if head is None:
+                    break
+                if head.header("expect") == "100-continue":
+                    writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                body = await _read_body(reader, head)
+                method, target, version = head.start.split(" ", 2)
+                keep_alive = _keep_alive(head, version)
+                if method == "GET" and target.split("?")[0] == STATS_PATH:
+                    stats = {"replicas": [r.to_dict() for r in self.replicas]}
+                    _respond(writer, 200, stats, keep_alive)
+                else:
+                    keep_alive = await self._forward(head, body, writer) and keep_alive
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.LimitOverrunError):
+            _respond(writer, 400, _error("Malformed request", "invalid_request"), False)
+        except (OSError, asyncio.IncompleteReadError):
+            pass  # Client gone
+        finally:
+            writer.close()
+
+    async def _forward(
+        self, head: Head, body: bytes, writer: asyncio.StreamWriter
+    ) -> bool:
+        """Proxy one request to a replica, retrying elsewhere if it is down.
+
+        Returns:
+            Whether the client connection can be reused
+        """
+        method, target, _ = head.start.split(" ", 2)
+        tried: list[Replica] = []
+        fresh = False
+        while True:
+            replica = self.pick(tried)
+            if replica is None:
+                if tried:
+                    _respond(writer, 502, _error("Every replica failed", "bad_gateway"))
+                else:
+                    message = "No replica is ready"
+                    _respond(writer, 503, _error(message, "service_unavailable"))
+                return True
+            replica.outstanding += 1
+            replica.requests += 1
+            started = False
+            # Open upstream connection, closed unless returned to the pool
+            connection: Connection | None = None
+            try:
+                connection, reused = await replica.connect(fresh)
+                try:
+                    response = await _exchange(connection, replica, head, body)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    if reused:
+                        # Idle connection the server had closed: not a failure
+                        fresh = True
+                        continue
+                    raise
+                started = True
+                reusable, client_reusable = await _relay(
+                    connection[0], response, method, writer
+                )
+                replica.release(connection, reusable)
+                connection = None
+                return client_reusable
+            except _ClientWriteError as e:
+                # The client hung up: the replica is fine, but the rest of
+                # the response is still coming on the upstream connection
+                logger.debug(f"Client went away during a response: {e}")
+                return False
+            except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                replica.failures += 1
+                if started:
+                    # Part of the response was sent: all we can do is hang up
+                    logger.warning(
+                        f"Replica {replica.address} failed mid-response: {e}"
+                    )
+                    return False
+                logger.warning(f"Replica {replica.address} failed: {e}")
+                replica.healthy = False
+                tried.append(replica)
+                fresh = False
+            finally:
+                replica.outstanding -= 1
+                if connection is not None:
+                    connection[1].close()
+
+
+class _ClientWriteError(Exception):
+    """The client connection failed while a response was relayed to it."""
+
+
+async def _exchange(
+    connection: Connection, replica: Replica, head: Head, body: bytes
+) -> Head:
+    """Send a request upstream and read the response head."""
+    reader, writer = connection
+    lines = [head.start.rsplit(" ", 1)[0] + " HTTP/1.1"]
+    lines += [
+        f"{key}: {value}" for key, value in head.forwarded() if key.lower() != "host"
+    ]
+    lines += [
+        f"Host: {replica.address}",
+        f"Content-Length: {len(body)}",
+        "Connection: keep-alive",
+    ]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    response = await _read_head(reader)
+    if response is None:
+        raise asyncio.IncompleteReadError(b"", None)
+    return response
+
+
+async def _relay(
+    upstream: asyncio.StreamReader,
+    response: Head,
+    method: str,
+    writer: asyncio.StreamWriter,
+) -> tuple[bool, bool]:
+    """Pass a response from upstream to the client.
+
+    Returns:
+        Whether the upstream and the client connections can be reused
+
+    Raises:
+        _ClientWriteError: Writing to the client failed
+    """
+    status = _status(response.start)
+    length = response.header("content-length")
+    no_body = method == "HEAD" or status in (204, 304) or 100 <= status < 200
+    lines = ["HTTP/1.1 " + response.start.split(" ", 1)[1]]
+    lines += [f"{key}: {value}" for key, value in response.forwarded()]
+    if no_body:
+        framing = [f"Content-Length: {length or 0}"]
+    elif response.chunked:
+        framing = ["Transfer-Encoding: chunked"]
+    elif length is not None:
+        framing = [f"Content-Length: {length}"]
+    else:
+        # Body delimited by the upstream closing: the client's must be too
+        framing = ["Connection: close"]
+    writer.write(("\r\n".join(lines + framing) + "\r\n\r\n").encode("latin-1"))
+    upstream_reusable = (response.header("connection") or "").lower() != "close"
+
+    if no_body:
+        return upstream_reusable, True
+    if response.chunked:
+        while True:
+            size_line = await upstream.readuntil(b"\r\n")
+            size = int(size_line.split(b";")[0], 16)
+            if size == 0:
+                # Trailers (dropped), up to the final empty line
+                while await upstream.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                writer.write(b"0\r\n\r\n")
+                return upstream_reusable, True
+            writer.write(size_line + await upstream.readexactly(size + 2))
+            await _drain(writer)
+    if length is not None:
+        remaining = int(length)
+        while remaining:
+            data = await upstream.readexactly(min(remaining, CHUNK_SIZE))
+            remaining -= len(data)
+            writer.write(data)
+            await _drain(writer)
+        return upstream_reusable, True
+    while data := await upstream.read(CHUNK_SIZE):
+        writer.write(data)
+        await _drain(writer)
+    return False, False
+
+
+async def _drain(writer: asyncio.StreamWriter) -> None:
+    """Flush data written to the client."""
+    try:
+        await writer.drain()
+    except OSError as e:
+        raise _ClientWriteError(str(e) or repr(e)) from e
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Head | None:
+    """Read a message head (None at a clean end of stream)."""
+    try:
+        data = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if not e.partial.strip():
+            return None
+        raise
+    start, *fields = data.decode("latin-1").split("\r\n")[:-2]
+    headers = []
+    for field in fields:
+        name, sep, value = field.partition(":")
+        if not sep:
+            raise ValueError(f"Invalid header line {field!r}")
+        headers.append((name.strip(), value.strip()))
+    return Head(start, tuple(headers))
+
+
+async def _read_body(reader: asyncio.StreamReader, head: Head) -> bytes:
+    """Read a request body (chunked bodies are collected whole)."""
+    if head.chunked:
+        chunks: list[bytes] = []
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return b"".join(chunks)
+            chunks.append((await reader.readexactly(size + 2))[:-2])
+    return await reader.readexactly(int(head.header("content-length") or 0))
+
+
+def _status(start: str) -> int:
+    """Status code of a status line."""
+    return int(start.split(" ", 2)[1])
+
+
+def _keep_alive(head: Head, version: str) -> bool:
+    """Whether the client wants its connection kept open."""
+    connection = (head.header("connection") or "").lower()
+    if version.strip() == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+def _error(message: str, kind: str) -> dict[str, Any]:
+    """OpenAI-style error body."""
+    return {"error": {"message": message, "type": kind}}
+
+
+def _respond(
+    writer: asyncio.StreamWriter, status: int, body: object, keep_alive: bool = True
+) -> None:
+    """Write a JSON response of the balancer itself."""
+    reasons = {200: "OK", 400: "Bad Request", 502: "Bad Gateway"}
+    payload = json.dumps(body).encode()
+    writer.write(
+        (
+            f"HTTP/1.1 {status} {reasons.get(status, 'Service Unavailable')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        ).encode()
+        + payload
+    )
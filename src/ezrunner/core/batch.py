@@ -0,0 +1,396 @@
+"""Batch packing module.
+
+Packs the models listed in a manifest concurrently. Each job goes through
+the ``pack`` stages, holding a slot of the resource the stage is bound by
+only while the stage runs:
+
+- network: model discovery (hub API calls)
+- daemon: the image build, which also downloads the weights
+- disk: the export
+
+so discovery of later models overlaps with builds, and builds overlap
+with exports, without asking the daemon or the disk for more
+concurrency than they have. Jobs share one Docker client, the pack cache
+and the daemon's layer cache; the first build of each engine is preceded
+by a build of its base layers alone, which the others then reuse. Packs
+of one model with different settings share its image tag, so they build
+and export one after the other.
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, fields, replace
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from ezrunner.core.builder import ImageBuilder
+from ezrunner.core.cache import PackCache
+from ezrunner.core.pipeline import (
+    JobResult,
+    PackJob,
+    PackPipeline,
+    PackPlan,
+    PackProgress,
+)
+from ezrunner.core.sinks import is_sink
+from ezrunner.exceptions import DockerError, ManifestError
+from ezrunner.models.engine import Engine
+from ezrunner.utils.logger import get_logger
+from ezrunner.utils.tracing import Tracer, record, span, tracing
+
+logger = get_logger(__name__)
+
+RESOURCES = ("network", "daemon", "disk")
+# Concurrent stages per resource: a few hub calls at once, two builds
+# (each downloads weights), one export (sequential writes are fastest)
+DEFAULT_LIMITS = {"network": 4, "daemon": 2, "disk": 1}
+FORMATS = ("tar", "oci")
+ENGINES = ("auto", "transformers", "vllm")
+
+
+# Manifest keys of a model entry, and the type of each
+_OPTIONS: dict[str, type] = {
+    "format": str,
+    "engine": str,
+    "target_gpu": float,
+    "port": int,
+    "max_batch_size": int,
+    "max_wait_ms": float,
+    "response_cache": int,
+    "response_cache_ttl": float,
+    "warmup": str,
+}
+
+
+@dataclass(frozen=True)
+class BatchManifest:
+    """Models to pack and the concurrency to pack them with.
+
+    Attributes:
+        jobs: One job per model, in manifest order
+        limits: Concurrent stages per resource class
+    """
+
+    jobs: tuple[PackJob, ...]
+    limits: dict[str, int]
+
+
+def load_manifest(path: Path) -> BatchManifest:
+    """Read a batch manifest (YAML or JSON).
+
+    Example::
+
+        output_dir: packs          # relative to the manifest
+        limits: {daemon: 1}        # merged with DEFAULT_LIMITS
+        defaults: {engine: vllm, target_gpu: 24}
+        models:
+          - qwen/Qwen2-7B-Instruct
+          - id: meta-llama/Llama-3-8B-Instruct
+            output: llama.tar
+            max_batch_size: 16
+
+    A tar output defaults to ``<output_dir>/<model>.tar``; an OCI one to
+    the layout ``<output_dir>/oci``, shared by all OCI jobs so their
+    common blobs are stored once.
+
+    Args:
+        path: Manifest file (``.yaml``/``.yml`` for YAML, else JSON)
+
+    Returns:
+        Manifest
+
+    Raises:
+        ManifestError: File unreadable or invalid
+    """
+    try:
+        text = path.read_text()
+    except OSError as e:
+        raise ManifestError(f"Cannot read manifest {path}: {e}") from e
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ManifestError(f"Invalid YAML in {path}: {e}") from e
+    else:
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise ManifestError(f"Invalid JSON in {path}: {e}") from e
+
+    if not isinstance(data, dict) or not isinstance(data.get("models"), list):
+        raise ManifestError(f"{path}: expected a mapping with a 'models' list")
+    unknown = set(data) - {"output_dir", "limits", "defaults", "models"}
+    if unknown:
+        raise ManifestError(f"{path}: unknown keys {', '.join(sorted(unknown))}")
+
+    output_dir = path.parent / str(data.get("output_dir", "."))
+    defaults = data.get("defaults") or {}
+    if not isinstance(defaults, dict):
+        raise ManifestError(f"{path}: 'defaults' must be a mapping")
+    jobs = tuple(parse_job(entry, defaults, output_dir) for entry in data["models"])
+    if not jobs:
+        raise ManifestError(f"{path}: no models")
+    tars = [job.output for job in jobs if job.output_format == "tar"]
+    duplicates = sorted({str(output) for output in tars if tars.count(output) > 1})
+    if duplicates:
+        raise ManifestError(f"{path}: several models write {duplicates[0]}")
+    return BatchManifest(jobs, _limits(data.get("limits") or {}))
+
+
+def parse_job(
+    entry: Any, defaults: dict[str, Any] | None = None, output_dir: Path = Path()
+) -> PackJob:
+    """Build the job of one manifest entry.
+
+    Args:
+        entry: Model ID, or mapping with ``id`` and pack options
+        defaults: Options of entries that do not set them
+        output_dir: Directory relative outputs are placed in
+
+    Returns:
+        Job
+
+    Raises:
+        ManifestError: Invalid entry
+    """
+    if isinstance(entry, str):
+        entry = {"id": entry}
+    if not isinstance(entry, dict) or not isinstance(entry.get("id"), str):
+        raise ManifestError(f"Model entry needs an 'id': {entry!r}")
+    options = {**(defaults or {}), **entry}
+    model_id = options.pop("id")
+    output = options.pop("output", None)
+    unknown = set(options) - set(_OPTIONS)
+    if unknown:
+        raise ManifestError(f"{model_id}: unknown options {', '.join(sorted(unknown))}")
+
+    if isinstance(options.get("warmup"), list):
+        options["warmup"] = ",".join(str(length) for length in options["warmup"])
+    for name, value in options.items():
+        expected = _OPTIONS[name]
+        # Integers are valid floats; booleans are not numbers here
+        valid = isinstance(value, expected) or (
+            expected is float and isinstance(value, int)
+        )
+        if not valid or isinstance(value, bool):
+            raise ManifestError(
+                f"{model_id}: {name} must be {expected.__name__}, got {value!r}"
+            )
+    output_format = options.pop("format", "tar")
+    if output_format not in FORMATS:
+        raise ManifestError(f"{model_id}: format must be one of {', '.join(FORMATS)}")
+    if options.get("engine", "auto") not in ENGINES:
+        raise ManifestError(f"{model_id}: engine must be one of {', '.join(ENGINES)}")
+    lengths = [item.strip() for item in options.get("warmup", "").split(",")]
+    if not all(item.isdigit() for item in lengths if item):
+        raise ManifestError(f"{model_id}: warmup must be token counts")
+    if "warmup" in options:
+        options["warmup"] = ",".join(item for item in lengths if item)
+
+    if output is None:
+        name = f"{model_id.replace('/', '-').lower()}.tar"
+        output = output_dir / ("oci" if output_format == "oci" else name)
+    else:
+        output = output_dir / str(output)
+    if is_sink(output):
+        raise ManifestError(f"{model_id}: output must be a file or directory")
+    return PackJob(model_id, output, output_format, **options)
+
+
+def _limits(limits: Any) -> dict[str, int]:
+    """Merge manifest concurrency limits with the defaults."""
+    if not isinstance(limits, dict) or set(limits) - set(RESOURCES):
+        raise ManifestError(f"'limits' keys must be among {', '.join(RESOURCES)}")
+    for name, value in limits.items():
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            raise ManifestError(f"limits.{name} must be a positive integer")
+    return {**DEFAULT_LIMITS, **limits}
+
+
+def load_report(path: Path) -> dict[str, JobResult]:
+    """Results of a previous run, by output path (empty if none)."""
+    try:
+        document = json.loads(path.read_text())
+        names = {f.name for f in fields(JobResult)}
+        results = [
+            JobResult(**{k: v for k, v in job.items() if k in names})
+            for job in document["jobs"]
+        ]
+    except FileNotFoundError:
+        return {}
+    except (ValueError, TypeError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable batch report {path}: {e}")
+        return {}
+    return {result.output: result for result in results}
+
+
+def write_report(
+    path: Path,
+    results: Sequence[JobResult],
+    limits: dict[str, int],
+    seconds: float,
+) -> None:
+    """Write the batch report (atomically, so a crash never truncates it)."""
+    totals: dict[str, int] = {}
+    for result in results:
+        totals[result.status] = totals.get(result.status, 0) + 1
+    document = {
+        "seconds": seconds,
+        "limits": limits,
+        "totals": totals,
+        "jobs": [asdict(result) for result in results],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(document, indent=2))
+    os.replace(tmp, path)
+
+
+class BatchPacker(PackPipeline):
+    """Pack several models concurrently, bounded per resource class."""
+
+    def __init__(
+        self,
+        limits: dict[str, int] | None = None,
+        client: Any | None = None,
+        cache: PackCache | None = None,
+        force: bool = False,
+    ) -> None:
+        """Initialize packer.
+
+        Args:
+            limits: Concurrent stages per resource class (default:
+                DEFAULT_LIMITS)
+            client: Docker client (default: from environment)
+            cache: Pack cache (default: the user's)
+            force: Rebuild and re-export even if an identical pack is cached
+
+        Raises:
+            DockerError: Docker is not running
+        """
+        # Connect now, before jobs share the client
+        super().__init__(client or ImageBuilder().client, cache, force)
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self._slots = {
+            name: threading.BoundedSemaphore(n) for name, n in self.limits.items()
+        }
+        self._lock = threading.Lock()
+        self._locks: dict[str, threading.Lock] = {}
+        self._warmed: set[Engine] = set()
+
+    def run(
+        self,
+        jobs: Sequence[PackJob],
+        previous: dict[str, JobResult] | None = None,
+        on_result: Callable[[JobResult], None] | None = None,
+    ) -> list[JobResult]:
+        """Pack every job.
+
+        A failed job does not stop the others.
+
+        Args:
+            jobs: Jobs to run
+            previous: Results of an earlier run; jobs it finished whose
+                output is unchanged are not run again
+            on_result: Called (from a worker thread) as each job finishes
+
+        Returns:
+            One result per job, in job order
+        """
+        previous = previous or {}
+
+        def run_job(job: PackJob) -> JobResult:
+            done = previous.get(str(job.output))
+            if done is not None and done.model_id == job.model_id and done.resumable():
+                result = replace(done, status="resumed", seconds=0.0, waited_s=0.0)
+            else:
+                result = self.pack(job)
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        # Workers mostly wait for a slot; enough to keep every slot busy
+        workers = max(1, min(len(jobs), sum(self.limits.values())))
+        with ThreadPoolExecutor(workers, thread_name_prefix="pack") as pool:
+            return list(pool.map(run_job, jobs))
+
+    def pack(self, job: PackJob, progress: PackProgress | None = None) -> JobResult:
+        """Pack one model.
+
+        Args:
+            job: Job to run
+            progress: Receives the stages as they run
+
+        Returns:
+            Result (failed, with the error, rather than raising)
+        """
+        tracer = Tracer()
+        start = time.perf_counter()
+        try:
+            with tracing(tracer):
+                result = super().pack(job, progress)
+        except Exception as e:
+            logger.debug(f"Packing {job.model_id} failed", exc_info=True)
+            result = JobResult(
+                job.model_id, str(job.output), "failed", error=str(e) or repr(e)
+            )
+
+        stages: dict[str, float] = {}
+        for row in tracer.summary():
+            stages[row["name"]] = stages.get(row["name"], 0.0) + row["seconds"]
+        waited = sum(stages.pop(f"wait {name}", 0.0) for name in RESOURCES)
+        return replace(
+            result,
+            seconds=time.perf_counter() - start,
+            waited_s=waited,
+            stages=stages,
+        )
+
+    @contextmanager
+    def slot(self, resource: str) -> Iterator[None]:
+        """Hold a slot of a resource class, recording the wait for it."""
+        start = time.perf_counter()
+        with self._slots[resource]:
+            record(f"wait {resource}", "wait", start, time.perf_counter())
+            yield
+
+    @contextmanager
+    def _locked(self, name: str) -> Iterator[None]:
+        """Hold the lock of a named shared item."""
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            yield
+
+    def _warm_up(self, plan: PackPlan) -> None:
+        """Build the base layers of an engine before its first model build.
+
+        Images of an engine share their base and dependency layers. Built
+        once, on their own, they are in the daemon's layer cache before
+        concurrent builds of the engine reach them, so those builds reuse
+        them instead of each installing them again. Model builds wait
+        only for these layers, not for another model's weights.
+        """
+        engine = plan.engine
+        start = time.perf_counter()
+        with self._locked(f"warm:{engine.value}"):
+            record("wait daemon", "wait", start, time.perf_counter())
+            if engine in self._warmed:
+                return
+            # Marked on failure too: the builds install the layers themselves
+            self._warmed.add(engine)
+            try:
+                with self.slot("daemon"), span("warm"):
+                    ImageBuilder(self.client).build(
+                        self.generator.base(plan.dockerfile),
+                        f"ezrunner-base-{engine.value}",
+                    )
+            except (DockerError, ValueError) as e:
+                logger.warning(f"Cannot warm the {engine.value} layers: {e}")
@@ -1,6 +1,12 @@
 """Docker image builder module."""
 
+import re
+import shutil
 import tempfile
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Any
 
@@ -8,27 +14,187 @@ import docker
 from docker.models.images import Image
 
 from ezrunner.exceptions import BuildError, DockerError
+from ezrunner.utils.logger import get_logger
+from ezrunner.utils.tracing import Span, record, span
+
+logger = get_logger(__name__)
+
+STEP_RE = re.compile(r"^Step (\d+)/(\d+) : (.*)$")
+LAYER_RE = re.compile(r"^ ---> ([0-9a-f]{12,64})$")
+BUILT_RE = re.compile(r"^Successfully built ([0-9a-f]+)$")
+
+# Output lines of the failing step quoted in a build error
+ERROR_TAIL_LINES = 10
+
+
+@dataclass(frozen=True)
+class BuildStep:
+    """A finished Dockerfile step.
+
+    Attributes:
+        number: Step number (1-based)
+        total: Number of steps in the Dockerfile
+        instruction: Dockerfile instruction (e.g., "RUN pip install vllm")
+        seconds: Wall time of the step
+        cached: Whether the layer cache served the step
+        layer_id: Short ID of the image the step produced
+        size_bytes: Size of the layer the step added (None if unknown)
+    """
+
+    number: int
+    total: int
+    instruction: str
+    seconds: float
+    cached: bool
+    layer_id: str | None = None
+    size_bytes: int | None = None
+
+
+class BuildLog:
+    """Follow a streaming (classic builder) build log step by step."""
+
+    def __init__(
+        self,
+        on_step: Callable[[int, int, str], None] | None = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        """Initialize log.
+
+        Args:
+            on_step: Called with the step number, step count and
+                instruction as each step starts
+            clock: Time source for step timings
+        """
+        self.on_step = on_step
+        self.clock = clock
+        self.steps: list[BuildStep] = []
+        self.spans: list[Span] = []
+        self.image_id: str | None = None
+        self._pending = ""
+        self._current: tuple[int, int, str, float] | None = None
+        self._cached = False
+        self._layer: str | None = None
+        self._output: deque[str] = deque(maxlen=ERROR_TAIL_LINES)
+
+    def feed(self, chunk: dict[str, Any]) -> None:
+        """Consume one decoded chunk of the build stream.
+
+        Raises:
+            BuildError: The chunk reports a build error
+        """
+        if "error" in chunk:
+            self._fail(chunk["error"])
+        image_id = chunk.get("aux", {}).get("ID")
+        if image_id:
+            self.image_id = image_id
+        self._pending += chunk.get("stream", "")
+        *lines, self._pending = self._pending.split("\n")
+        for line in lines:
+            self._line(line.rstrip("\r"))
+
+    def finish(self) -> list[BuildStep]:
+        """Close the last step at the end of the stream.
+
+        Returns:
+            Every step of the build, in order
+        """
+        if self._pending:
+            self._line(self._pending)
+            self._pending = ""
+        self._close_step()
+        return self.steps
+
+    def _line(self, line: str) -> None:
+        """Track step boundaries, cache hits and layers in one log line."""
+        if step := STEP_RE.match(line):
+            self._close_step()
+            number, total, instruction = step.groups()
+            self._current = (int(number), int(total), instruction, self.clock())
+            if self.on_step is not None:
+                self.on_step(int(number), int(total), instruction)
+        elif line == " ---> Using cache":
+            self._cached = True
+        elif layer := LAYER_RE.match(line):
+            self._layer = layer.group(1)
+        elif built := BUILT_RE.match(line):
+            self._close_step()
+            self.image_id = self.image_id or built.group(1)
+        elif line.strip() and not line.startswith((" ---> ", "Removing intermediate")):
+            logger.debug(line)
+            self._output.append(line)
+
+    def _close_step(self) -> None:
+        """Record the running step as finished."""
+        if self._current is None:
+            return
+        number, total, instruction, start = self._current
+        end = self.clock()
+        step = BuildStep(
+            number, total, instruction, end - start, self._cached, self._layer
+        )
+        self.steps.append(step)
+        self.spans.append(
+            record(
+                f"step {number}/{total}: {instruction[:60]}",
+                "step",
+                start,
+                end,
+                **{"cache_hits" if step.cached else "cache_misses": 1},
+            )
+        )
+        self._current = None
+        self._cached = False
+        self._layer = None
+        self._output.clear()
+
+    def _fail(self, message: str) -> None:
+        """Raise the build error, with the failing step and its output."""
+        where = ""
+        if self._current is not None:
+            number, total, instruction, _ = self._current
+            where = f" at step {number}/{total} ({instruction})"
+        tail = "".join(f"\n  {line}" for line in self._output)
+        raise BuildError(f"Image build failed{where}: {message.strip()}{tail}")
 
 
 class ImageBuilder:
     """Build Docker images."""
 
-    def __init__(self) -> None:
-        """Initialize builder."""
-        try:
-            self.client = docker.from_env()
-        except docker.errors.DockerException as e:
-            raise DockerError("Docker is not running") from e
+    def __init__(self, client: Any | None = None) -> None:
+        """Initialize builder.
+
+        Args:
+            client: Docker client (default: from environment)
+        """
+        if client is None:
+            try:
+                client = docker.from_env()
+            except docker.errors.DockerException as e:
+                raise DockerError("Docker is not running") from e
+        self.client = client
+        self.steps: list[BuildStep] = []
 
     def build(
-        self, dockerfile: str, tag: str, buildargs: dict[str, str] | None = None
+        self,
+        dockerfile: str,
+        tag: str,
+        buildargs: dict[str, str] | None = None,
+        context: dict[str, Path] | None = None,
+        on_step: Callable[[int, int, str], None] | None = None,
     ) -> Image:
         """Build Docker image.
 
+        The build log is streamed and parsed as it arrives; the timing,
+        cache use and layer size of each step are kept in ``steps``.
+
         Args:
             dockerfile: Dockerfile content
             tag: Image tag
             buildargs: Build arguments
+            context: Files or directories to place in the build context,
+                keyed by the name the Dockerfile COPYs them from
+            on_step: Called with the step number, step count and
+                instruction as each step starts
 
         Returns:
             Built image
@@ -40,15 +206,67 @@ class ImageBuilder:
             # Write Dockerfile
             dockerfile_path = Path(tmpdir) / "Dockerfile"
             dockerfile_path.write_text(dockerfile)
+            for name, source in (context or {}).items():
+                _copy_context(source, Path(tmpdir) / name)
 
             # Build image
-            try:
-                image, logs = self.client.images.build(
-                    path=tmpdir,
-                    tag=tag,
-                    rm=True,
-                    buildargs=buildargs or {},
-                )
+            with span("docker build", "docker", tag=tag) as build:
+                log = BuildLog(on_step)
+                try:
+                    for chunk in self.client.api.build(
+                        path=tmpdir,
+                        tag=tag,
+                        rm=True,
+                        buildargs=buildargs or {},
+                        decode=True,
+                    ):
+                        log.feed(chunk)
+                except docker.errors.APIError as e:
+                    raise BuildError(f"Image build failed: {e}") from e
+                steps = log.finish()
+                if log.image_id is None:
+                    raise BuildError("Image build failed: no image was produced")
+
+                image = self.client.images.get(log.image_id)
+                sizes = self._layer_sizes(log.image_id)
+                self.steps = [
+                    replace(step, size_bytes=_layer_size(sizes, step.layer_id))
+                    for step in steps
+                ]
+                for step, step_span in zip(self.steps, log.spans, strict=True):
+                    if step.size_bytes is not None:
+                        step_span.set(layer_bytes=step.size_bytes)
+                        # Only layers actually written count as data moved
+                        if not step.cached:
+                            step_span.set(bytes=step.size_bytes)
+                build.set(steps=len(steps))
                 return image
-            except docker.errors.BuildError as e:
-                raise BuildError(f"Image build failed: {e}") from e
+
+    def _layer_sizes(self, image_id: str) -> dict[str, int]:
+        """Size of each layer of an image, by image ID."""
+        try:
+            history = self.client.api.history(image_id)
+        except docker.errors.APIError as e:
+            logger.debug(f"No layer sizes for {image_id}: {e}")
+            return {}
+        return {entry["Id"]: entry.get("Size", 0) for entry in history}
+
+
+def _layer_size(sizes: dict[str, int], layer_id: str | None) -> int | None:
+    """Size of the layer whose (short) image ID is ``layer_id``."""
+    if layer_id is None:
+        return None
+    for image_id, size in sizes.items():
+        if image_id.removeprefix("sha256:").startswith(layer_id):
+            return size
+    return None
+
+
+def _copy_context(source: Path, target: Path) -> None:
+    """Copy a file or directory into the build context, skipping bytecode."""
+    if source.is_dir():
+        shutil.copytree(
+            source, target, ignore=shutil.ignore_patterns("__pycache__", "*.pyc")
+        )
+    else:
+        shutil.copy2(source, target)
@@ -0,0 +1,184 @@
+"""Multi-image bundle module."""
+
+import json
+import posixpath
+import tarfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+
+from ezrunner.core.archive import (
+    CHUNK_SIZE,
+    METADATA_FILES,
+    ArchiveImage,
+    HashingReader,
+    json_member,
+    read_manifest,
+)
+from ezrunner.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class BundleStats:
+    """Result of writing a bundle.
+
+    Attributes:
+        images: Images in the bundle
+        bytes_written: Layer and config bytes stored in the bundle
+        bytes_deduplicated: Bytes skipped because they were already stored
+    """
+
+    images: int
+    bytes_written: int
+    bytes_deduplicated: int
+
+
+class BundleWriter:
+    """Combine packed image archives into one archive.
+
+    The result is a regular ``docker save`` archive holding several images,
+    so ``docker load`` accepts it as is. Files with identical paths (OCI
+    blobs, identical legacy layer IDs) are stored once; files with identical
+    content under different paths are stored once and symlinked, the same
+    way ``docker save`` links shared layers.
+    """
+
+    def write(self, archives: list[Path], output: Path) -> BundleStats:
+        """Write a bundle.
+
+        Args:
+            archives: Image archives produced by ``ezrunner pack``
+            output: Output bundle path
+
+        Returns:
+            Bundle statistics
+
+        Raises:
+            ArchiveError: An input is not a valid image archive
+        """
+        state = _BundleState()
+        with tarfile.open(output, "w", format=tarfile.PAX_FORMAT) as bundle:
+            for archive in archives:
+                logger.info(f"Adding {archive} to bundle")
+                images = read_manifest(archive)
+                with tarfile.open(archive, "r:") as tar:
+                    self._add_archive(bundle, tar, state)
+                state.add_images(images)
+
+            for info, fileobj in state.metadata():
+                bundle.addfile(info, fileobj)
+
+        return BundleStats(
+            images=len(state.images),
+            bytes_written=state.bytes_written,
+            bytes_deduplicated=state.bytes_deduplicated,
+        )
+
+    def _add_archive(
+        self, bundle: tarfile.TarFile, tar: tarfile.TarFile, state: "_BundleState"
+    ) -> None:
+        """Copy the members of one archive that the bundle does not have yet."""
+        for member in tar:
+            if member.name in METADATA_FILES:
+                state.add_metadata(member.name, tar.extractfile(member))
+                continue
+            if member.name in state.paths:
+                state.bytes_deduplicated += member.size
+                continue
+            state.paths.add(member.name)
+
+            if not member.isfile():
+                bundle.addfile(member)
+                continue
+
+            existing = state.find_duplicate(tar, member)
+            if existing is not None:
+                bundle.addfile(_symlink(member, existing))
+                state.bytes_deduplicated += member.size
+                continue
+
+            reader = HashingReader(tar.extractfile(member))
+            bundle.addfile(member, reader)
+            state.add_file(member, reader.hexdigest())
+
+
+class _BundleState:
+    """Bookkeeping while a bundle is written."""
+
+    def __init__(self) -> None:
+        self.paths: set[str] = set()
+        self.images: list[ArchiveImage] = []
+        self.bytes_written = 0
+        self.bytes_deduplicated = 0
+        self._by_digest: dict[str, str] = {}
+        self._sizes: set[int] = set()
+        self._repositories: dict[str, dict[str, str]] = {}
+        self._index: list[dict[str, object]] = []
+        self._oci_layout: object = None
+
+    def add_file(self, member: tarfile.TarInfo, digest: str) -> None:
+        """Record a file stored in the bundle."""
+        self._by_digest.setdefault(digest, member.name)
+        self._sizes.add(member.size)
+        self.bytes_written += member.size
+
+    def find_duplicate(
+        self, tar: tarfile.TarFile, member: tarfile.TarInfo
+    ) -> str | None:
+        """Find a stored file with the same content.
+
+        Only files matching the size of a stored file are hashed up front,
+        so unique layers are read once. Small files (layer ``json`` and
+        ``VERSION`` stubs) are not worth a symlink.
+        """
+        if member.size < CHUNK_SIZE or member.size not in self._sizes:
+            return None
+        digest = HashingReader(tar.extractfile(member)).drain()
+        return self._by_digest.get(digest)
+
+    def add_images(self, images: list[ArchiveImage]) -> None:
+        """Record the images of an archive, skipping ones already bundled."""
+        for image in images:
+            if image not in self.images:
+                self.images.append(image)
+
+    def add_metadata(self, name: str, fileobj: IO[bytes] | None) -> None:
+        """Merge archive-level metadata."""
+        if fileobj is None:
+            return
+        if name == "repositories":
+            for repo, tags in json.load(fileobj).items():
+                self._repositories.setdefault(repo, {}).update(tags)
+        elif name == "index.json":
+            for entry in json.load(fileobj).get("manifests", []):
+                if entry not in self._index:
+                    self._index.append(entry)
+        elif name == "oci-layout":
+            self._oci_layout = json.load(fileobj)
+
+    def metadata(self) -> list[tuple[tarfile.TarInfo, IO[bytes]]]:
+        """Build the merged metadata members."""
+        members = [json_member("manifest.json", [i.to_manifest() for i in self.images])]
+        if self._repositories:
+            members.append(json_member("repositories", self._repositories))
+        if self._oci_layout is not None:
+            members.append(json_member("oci-layout", self._oci_layout))
+            members.append(
+                json_member(
+                    "index.json",
+                    {"schemaVersion": 2, "manifests": self._index},
+                )
+            )
+        return members
+
+
+def _symlink(member: tarfile.TarInfo, target: str) -> tarfile.TarInfo:
+    """Build a relative symlink member pointing at another archive path."""
+    link = tarfile.TarInfo(member.name)
+    link.type = tarfile.SYMTYPE
+    link.linkname = posixpath.relpath(target, posixpath.dirname(member.name) or ".")
+    link.mtime = member.mtime
+    link.mode = 0o777
+    return link
@@ -0,0 +1,203 @@
+"""Pack result cache module.
+
+Remembers which image and which exported artifact an identical ``pack``
+produced before, so repacking an unchanged model skips the build (and,
+when the previous archive is still intact, the export too).
+"""
+
+import errno
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from ezrunner import __version__
+from ezrunner.models.engine import Engine
+from ezrunner.models.model_info import ModelInfo
+from ezrunner.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Linux FICLONE ioctl: copy-on-write clone on btrfs, XFS, etc.
+_FICLONE = 0x40049409
+
+
+def cache_dir() -> Path:
+    """Root directory for ezrunner caches."""
+    if "EZRUNNER_CACHE_DIR" in os.environ:
+        return Path(os.environ["EZRUNNER_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "ezrunner"
+
+
+@dataclass(frozen=True)
+class PackEntry:
+    """A cached pack result.
+
+    Attributes:
+        image_id: ID of the built image
+        tag: Image tag
+        artifact: Absolute path of the exported tar (None if not a file)
+        artifact_size: Size of the artifact when it was exported
+        artifact_mtime_ns: Modification time of the artifact when exported
+    """
+
+    image_id: str
+    tag: str
+    artifact: str | None = None
+    artifact_size: int = 0
+    artifact_mtime_ns: int = 0
+
+    @classmethod
+    def for_artifact(cls, image_id: str, tag: str, artifact: Path) -> "PackEntry":
+        """Create an entry recording an exported tar file."""
+        st = artifact.stat()
+        return cls(
+            image_id=image_id,
+            tag=tag,
+            artifact=str(artifact.resolve()),
+            artifact_size=st.st_size,
+            artifact_mtime_ns=st.st_mtime_ns,
+        )
+
+    def artifact_valid(self) -> bool:
+        """Check the artifact still exists and was not rewritten since."""
+        if self.artifact is None:
+            return False
+        try:
+            st = os.stat(self.artifact)
+        except OSError:
+            return False
+        return (
+            st.st_size == self.artifact_size
+            and st.st_mtime_ns == self.artifact_mtime_ns
+        )
+
+
+class PackCache:
+    """Cache of pack results keyed by everything that affects the image."""
+
+    def __init__(self, root: Path | None = None) -> None:
+        """Initialize cache.
+
+        Args:
+            root: Cache directory (default: ``<cache_dir>/packs``)
+        """
+        self.root = root or cache_dir() / "packs"
+
+    def key(
+        self,
+        model: ModelInfo,
+        engine: Engine,
+        dockerfile: str,
+        port: int,
+        context: dict[str, Path] | None = None,
+        extra_models: Sequence[ModelInfo] = (),
+    ) -> str:
+        """Compute the cache key of a pack.
+
+        Args:
+            model: Discovered model (its revision pins the weights)
+            engine: Selected engine
+            dockerfile: Rendered Dockerfile
+            port: API port
+            context: Extra build-context files (their contents are hashed)
+            extra_models: Further models of a multi-model image
+
+        Returns:
+            Hex digest identifying the pack inputs
+        """
+        inputs: dict[str, object] = {
+            "model_id": model.model_id,
+            "revision": model.revision,
+            "engine": engine.value,
+            "dockerfile": hashlib.sha256(dockerfile.encode()).hexdigest(),
+            "port": port,
+            "context": {
+                name: _tree_digest(path) for name, path in (context or {}).items()
+            },
+            "version": __version__,
+        }
+        if extra_models:
+            inputs["models"] = [[m.model_id, m.revision] for m in extra_models]
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+    def lookup(self, key: str) -> PackEntry | None:
+        """Find a cached pack result."""
+        path = self.root / f"{key}.json"
+        try:
+            return PackEntry(**json.loads(path.read_text()))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring corrupt pack cache entry {path}: {e}")
+            return None
+
+    def store(self, key: str, entry: PackEntry) -> None:
+        """Record a pack result."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.root / f"{key}.json.tmp"
+        tmp_path.write_text(json.dumps(asdict(entry)))
+        os.replace(tmp_path, self.root / f"{key}.json")
+
+    def materialize(self, entry: PackEntry, output: Path) -> str:
+        """Produce the output file from a cached artifact without re-exporting.
+
+        Tries a hardlink, then a copy-on-write clone, then a plain copy.
+
+        Args:
+            entry: Cache entry with a valid artifact
+            output: Output path
+
+        Returns:
+            How the output was produced ("existing", "hardlink", "reflink"
+            or "copy")
+        """
+        assert entry.artifact is not None
+        source = Path(entry.artifact)
+        if output.exists() and output.resolve() == source:
+            return "existing"
+
+        tmp_path = output.with_name(f".{output.name}.tmp")
+        tmp_path.unlink(missing_ok=True)
+        try:
+            os.link(source, tmp_path)
+            method = "hardlink"
+        except OSError:
+            method = _clone_or_copy(source, tmp_path)
+        os.replace(tmp_path, output)
+        return method
+
+
+def _tree_digest(path: Path) -> str:
+    """Hash a file, or every file under a directory, by path and content."""
+    digest = hashlib.sha256()
+    files = sorted(path.rglob("*")) if path.is_dir() else [path]
+    for file in files:
+        if not file.is_file() or "__pycache__" in file.parts:
+            continue
+        digest.update(str(file.relative_to(path) if file != path else "").encode())
+        digest.update(hashlib.sha256(file.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def _clone_or_copy(source: Path, target: Path) -> str:
+    """Clone a file copy-on-write where supported, else copy it."""
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            return "reflink"
+        except OSError as e:
+            if e.errno not in (
+                errno.EOPNOTSUPP,
+                errno.EXDEV,
+                errno.EINVAL,
+                errno.ENOTTY,
+            ):
+                raise
+        shutil.copyfileobj(src, dst, length=16 * 1024 * 1024)
+    return "copy"
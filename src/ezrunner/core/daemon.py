@@ -0,0 +1,554 @@
+"""Pack daemon module.
+
+``ezrunner serve`` keeps one process running with warm state: the Docker
+client, the compiled Dockerfile templates, the pack cache and resource
+slots shared by every job. Jobs (pack, export, verify) are submitted over
+a small JSON API on a Unix socket or TCP port, queued by priority and run
+by a bounded pool of workers.
+
+API:
+    GET    /health             Queue and worker counts
+    GET    /jobs               Every known job
+    POST   /jobs               Queue ``{"kind", "params", "priority"}``
+    GET    /jobs/<id>          One job
+    DELETE /jobs/<id>          Cancel a queued job
+    GET    /jobs/<id>/events   Progress as JSON lines until the job ends
+"""
+
+import heapq
+import ipaddress
+import itertools
+import json
+import os
+import re
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import docker
+
+from ezrunner.api.daemon import parse_address
+from ezrunner.core.batch import BatchPacker, parse_job
+from ezrunner.core.pipeline import PackProgress, export_image
+from ezrunner.core.verify import verify_archive
+from ezrunner.exceptions import DaemonError, DockerError, EZRunnerError
+from ezrunner.models.engine import Engine
+from ezrunner.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+JOB_KINDS = ("pack", "export", "verify")
+FINISHED = ("done", "failed", "cancelled")
+# Finished jobs kept for status queries
+HISTORY = 1000
+
+# Runs a job, reporting progress through the callback; returns its result
+Task = Callable[[Callable[[str], None]], dict[str, Any]]
+
+_JOB_PATH = re.compile(r"^/jobs/([0-9a-f]+)(/events)?$")
+
+
+@dataclass
+class Job:
+    """A job of the daemon queue (guarded by the queue's lock).
+
+    Attributes:
+        id: Job ID
+        kind: "pack", "export" or "verify"
+        params: Parameters as submitted
+        priority: Higher runs first
+        status: "queued", "running", "done", "failed" or "cancelled"
+        submitted: Submission time (epoch seconds)
+        started: Start time
+        finished: End time
+        events: Progress events (``time``, ``message``)
+        result: What the job produced
+        error: Why the job failed
+    """
+
+    id: str
+    kind: str
+    params: dict[str, Any]
+    priority: int = 0
+    status: str = "queued"
+    submitted: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    events: list[dict[str, Any]] = field(default_factory=list)
+    result: dict[str, Any] | None = None
+    error: str | None = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the job will not change any more."""
+        return self.status in FINISHED
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON form, with the latest progress message instead of all events."""
+        data = asdict(self)
+        events = data.pop("events")
+        data["progress"] = events[-1]["message"] if events else None
+        return data
+
+
+class JobQueue:
+    """Priority queue of jobs run by a bounded pool of worker threads."""
+
+    def __init__(self, workers: int = 2, history: int = HISTORY) -> None:
+        """Initialize queue.
+
+        Args:
+            workers: Jobs run at once
+            history: Finished jobs kept for status queries
+        """
+        self.workers = workers
+        self._cond = threading.Condition()
+        self._heap: list[tuple[int, int, str]] = []
+        self._seq = itertools.count()
+        self._jobs: dict[str, Job] = {}
+        self._tasks: dict[str, Task] = {}
+        self._finished: deque[str] = deque()
+        self._history = history
+        self._closed = False
+        self._threads: list[threading.Thread] = []
+
+    def start(self) -> None:
+        """Start the workers."""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Cancel queued jobs and wait for running ones to finish."""
+        with self._cond:
+            self._closed = True
+            for job in list(self._jobs.values()):
+                if job.status == "queued":
+                    self._finish(job, "cancelled", error="Daemon stopped")
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def submit(
+        self, kind: str, params: dict[str, Any], task: Task, priority: int = 0
+    ) -> Job:
+        """Queue a job.
+
+        Args:
+            kind: Job kind
+            params: Parameters as submitted
+            task: Function running the job
+            priority: Higher runs first; equal priorities run in order
+
+        Returns:
+            The queued job
+        """
+        job = Job(uuid.uuid4().hex[:12], kind, params, priority)
+        with self._cond:
+            if self._closed:
+                raise DaemonError("Daemon is stopping")
+            self._jobs[job.id] = job
+            self._tasks[job.id] = task
+            heapq.heappush(self._heap, (-priority, next(self._seq), job.id))
+            self._event(job, "queued")
+            self._cond.notify_all()
+        return job
+
+    def snapshot(self, job_id: str) -> dict[str, Any] | None:
+        """JSON form of a job (None if unknown)."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job is not None else None
+
+    def snapshots(self) -> list[dict[str, Any]]:
+        """JSON form of every known job, oldest first."""
+        with self._cond:
+            return [job.to_dict() for job in self._jobs.values()]
+
+    def counts(self) -> dict[str, int]:
+        """Number of jobs per status."""
+        with self._cond:
+            counts = dict.fromkeys(("queued", "running", *FINISHED), 0)
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def cancel(self, job_id: str) -> dict[str, Any]:
+        """Cancel a queued job.
+
+        Raises:
+            KeyError: Unknown job
+            DaemonError: The job already started
+        """
+        with self._cond:
+            job = self._jobs[job_id]
+            if job.status != "queued":
+                raise DaemonError(f"Job {job_id} is {job.status}")
+            self._finish(job, "cancelled")
+            return job.to_dict()
+
+    def follow(self, job_id: str, poll_s: float = 1.0) -> Iterator[dict[str, Any]]:
+        """Yield the events of a job as they happen, until it finishes.
+
+        Raises:
+            KeyError: Unknown job
+        """
+        sent = 0
+        while True:
+            with self._cond:
+                job = self._jobs[job_id]
+
+                def ready(job: Job = job, sent: int = sent) -> bool:
+                    return len(job.events) > sent or job.done
+
+                self._cond.wait_for(ready, poll_s)
+                events = job.events[sent:]
+                done = job.done
+            sent += len(events)
+            yield from events
+            if done and not events:
+                return
+
+    def _work(self) -> None:
+        """Run queued jobs, highest priority first, until stopped."""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._heap or self._closed)
+                if self._closed:
+                    return
+                _, _, job_id = heapq.heappop(self._heap)
+                job = self._jobs.get(job_id)
+                if job is None or job.status != "queued":
+                    continue
+                task = self._tasks.pop(job_id)
+                job.status = "running"
+                job.started = time.time()
+                self._event(job, "started")
+
+            def progress(message: str, job: Job = job) -> None:
+                with self._cond:
+                    self._event(job, message)
+
+            try:
+                result = task(progress)
+            except Exception as e:
+                logger.debug(f"Job {job.id} failed", exc_info=True)
+                with self._cond:
+                    self._finish(job, "failed", error=str(e) or repr(e))
+            else:
+                with self._cond:
+                    self._finish(job, "done", result=result)
+
+    def _event(self, job: Job, message: str) -> None:
+        """Record a progress event (lock held)."""
+        job.events.append({"time": time.time(), "message": message})
+        self._cond.notify_all()
+
+    def _finish(
+        self,
+        job: Job,
+        status: str,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Mark a job finished and forget the oldest finished ones (lock held)."""
+        job.status = status
+        job.finished = time.time()
+        job.result = result
+        job.error = error
+        self._tasks.pop(job.id, None)
+        self._event(job, status if error is None else f"{status}: {error}")
+        self._finished.append(job.id)
+        while len(self._finished) > self._history:
+            self._jobs.pop(self._finished.popleft(), None)
+
+
+class JobRunner:
+    """Turn job requests into tasks run against shared, warm state."""
+
+    def __init__(self, packer: BatchPacker) -> None:
+        """Initialize runner.
+
+        Args:
+            packer: Packer holding the Docker client, caches and resource
+                slots every job shares
+        """
+        self.packer = packer
+
+    def warm_up(self) -> None:
+        """Compile the Dockerfile templates before the first job needs them."""
+        for engine in Engine:
+            self.packer.generator.env.get_template(f"{engine.value}.dockerfile")
+
+    def task(self, kind: str, params: dict[str, Any]) -> Task:
+        """Validate a job request and prepare its task.
+
+        Args:
+            kind: "pack" (params: a pack-batch manifest entry), "export"
+                (``image``, ``output``, optional ``format``) or "verify"
+                (``archive``)
+            params: Job parameters; relative paths are relative to the
+                daemon's working directory
+
+        Returns:
+            Task running the job
+
+        Raises:
+            EZRunnerError: Invalid request
+        """
+        if kind == "pack":
+            job = parse_job(params, output_dir=Path.cwd())
+
+            def pack(progress: Callable[[str], None]) -> dict[str, Any]:
+                result = self.packer.pack(job, PackProgress(progress))
+                if not result.ok:
+                    raise EZRunnerError(result.error)
+                return asdict(result)
+
+            return pack
+
+        if kind == "export":
+            image_ref, output = _require(params, "image", "output")
+            output_format = params.get("format", "tar")
+            if output_format not in ("tar", "oci"):
+                raise DaemonError("format must be tar or oci")
+
+            def export(progress: Callable[[str], None]) -> dict[str, Any]:
+                try:
+                    image = self.packer.client.images.get(image_ref)
+                except docker.errors.ImageNotFound as e:
+                    raise DockerError(f"No image {image_ref}") from e
+                with self.packer.slot("disk"):
+                    progress("exporting image")
+                    detail = export_image(image, Path(output), output_format)
+                return {"image_id": image.id, "output": output, "detail": detail}
+
+            return export
+
+        if kind == "verify":
+            (archive,) = _require(params, "archive")
+
+            def verify(progress: Callable[[str], None]) -> dict[str, Any]:
+                with self.packer.slot("disk"):
+                    progress("verifying archive")
+                    stats = verify_archive(Path(archive))
+                return {"archive": archive, **asdict(stats)}
+
+            return verify
+
+        raise DaemonError(f"Unknown job kind {kind!r} (one of {', '.join(JOB_KINDS)})")
+
+
+def _require(params: dict[str, Any], *names: str) -> list[str]:
+    """Required string parameters of a job."""
+    values = [params.get(name) for name in names]
+    for name, value in zip(names, values, strict=True):
+        if not isinstance(value, str) or not value:
+            raise DaemonError(f"Missing parameter {name!r}")
+    return [str(value) for value in values]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler of the job API."""
+
+    server: "_TCPServer | _UnixServer"
+
+    def do_GET(self) -> None:
+        path = self.path.partition("?")[0].rstrip("/")
+        jobs = self.server.jobs
+        if path == "/health":
+            self._json(200, {"status": "ok", "workers": jobs.workers, **jobs.counts()})
+        elif path == "/jobs":
+            self._json(200, {"jobs": jobs.snapshots()})
+        elif (match := _JOB_PATH.match(path)) is None:
+            self._json(404, {"error": f"No route {path}"})
+        elif match.group(2):
+            self._events(match.group(1))
+        elif (job := jobs.snapshot(match.group(1))) is None:
+            self._json(404, {"error": f"No job {match.group(1)}"})
+        else:
+            self._json(200, job)
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/jobs":
+            self._json(404, {"error": f"No route {self.path}"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            kind, params = request["kind"], request.get("params", {})
+            priority = int(request.get("priority", 0))
+            if not isinstance(params, dict):
+                raise DaemonError("params must be a mapping")
+            task = self.server.runner.task(kind, params)
+            job = self.server.jobs.submit(kind, params, task, priority)
+        except (ValueError, KeyError, TypeError) as e:
+            self._json(400, {"error": f"Invalid job request: {e}"})
+        except EZRunnerError as e:
+            self._json(400, {"error": str(e)})
+        else:
+            self._json(202, job.to_dict())
+
+    def do_DELETE(self) -> None:
+        match = _JOB_PATH.match(self.path.rstrip("/"))
+        if match is None or match.group(2):
+            self._json(404, {"error": f"No route {self.path}"})
+            return
+        try:
+            self._json(200, self.server.jobs.cancel(match.group(1)))
+        except KeyError:
+            self._json(404, {"error": f"No job {match.group(1)}"})
+        except DaemonError as e:
+            self._json(409, {"error": str(e)})
+
+    def _events(self, job_id: str) -> None:
+        """Stream a job's events as JSON lines, then its final state."""
+        jobs = self.server.jobs
+        if jobs.snapshot(job_id) is None:
+            self._json(404, {"error": f"No job {job_id}"})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            for event in jobs.follow(job_id):
+                self.wfile.write(json.dumps(event).encode() + b"\n")
+                self.wfile.flush()
+            self.wfile.write(
+                json.dumps({"job": jobs.snapshot(job_id)}).encode() + b"\n"
+            )
+        except (BrokenPipeError, ConnectionResetError, KeyError):
+            # Client gone, or the job aged out of the history
+            pass
+
+    def _json(self, status: int, body: object) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Unix-socket clients have no address for the default format
+        logger.debug(format % args)
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    jobs: JobQueue
+    runner: JobRunner
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    jobs: JobQueue
+    runner: JobRunner
+
+
+class DaemonServer:
+    """The job API, listening on a Unix socket or TCP port."""
+
+    def __init__(
+        self,
+        jobs: JobQueue,
+        runner: JobRunner,
+        address: str,
+        allow_remote: bool = False,
+    ) -> None:
+        """Bind the API.
+
+        Whoever can submit jobs can make the daemon write files wherever it
+        may, and the API has no authentication. A Unix socket is therefore
+        made accessible to its owner only, and a TCP port is only bound on
+        a loopback host unless remote access is explicitly allowed. Bind
+        before starting the job queue's workers: the umask is
+        process-wide.
+
+        Args:
+            jobs: Queue jobs are submitted to
+            runner: Runner preparing the submitted jobs
+            address: ``unix:<path>`` or ``<host>:<port>`` (port 0 picks one)
+            allow_remote: Bind TCP ports on hosts other than loopback too
+
+        Raises:
+            DaemonError: Address in use, invalid, or not loopback
+        """
+        target = parse_address(address)
+        self.server: _TCPServer | _UnixServer
+        try:
+            if isinstance(target, str):
+                _remove_stale_socket(target)
+                Path(target).parent.mkdir(parents=True, exist_ok=True)
+                # Created owner-only: a chmod after the bind would leave a
+                # window in which others could connect
+                umask = os.umask(0o177)
+                try:
+                    self.server = _UnixServer(target, _Handler)
+                finally:
+                    os.umask(umask)
+                self.address = f"unix:{target}"
+            else:
+                if not allow_remote and not _is_loopback(target[0]):
+                    raise DaemonError(
+                        f"Refusing to listen on {address}: anyone reaching it "
+                        "could submit jobs (use a loopback host, or allow "
+                        "remote access explicitly)"
+                    )
+                self.server = _TCPServer(target, _Handler)
+                host, port = self.server.server_address[:2]
+                self.address = f"{host!s}:{port}"
+        except OSError as e:
+            raise DaemonError(f"Cannot listen on {address}: {e}") from e
+        self.server.jobs = self.jobs = jobs
+        self.server.runner = runner
+
+    def serve_forever(self) -> None:
+        """Handle requests until :meth:`shutdown` is called."""
+        self.server.serve_forever()
+
+    def shutdown(self) -> None:
+        """Stop serving and release the address."""
+        self.server.shutdown()
+        self.close()
+
+    def close(self) -> None:
+        """Release the address."""
+        self.server.server_close()
+        if self.address.startswith("unix:"):
+            Path(self.address.removeprefix("unix:")).unlink(missing_ok=True)
+
+
+def _is_loopback(host: str) -> bool:
+    """Check if a host only accepts connections from this machine."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _remove_stale_socket(path: str) -> None:
+    """Remove the socket of a daemon that is no longer running.
+
+    Raises:
+        DaemonError: Another daemon is listening on it
+    """
+    if not os.path.exists(path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            os.unlink(path)
+            return
+    raise DaemonError(f"Another daemon is listening on {path}")
@@ -1,11 +1,17 @@
 """Model discovery module."""
 
+import hashlib
+import json
+from typing import Any
+
 import requests
+
 from ezrunner.api.huggingface import HuggingFaceClient
 from ezrunner.api.modelscope import ModelScopeClient
 from ezrunner.exceptions import ModelNotFoundError
 from ezrunner.models.model_info import ModelInfo
 from ezrunner.utils.logger import get_logger
+from ezrunner.utils.tracing import span
 
 logger = get_logger(__name__)
 
@@ -37,14 +43,16 @@ class ModelDiscovery:
         # Try ModelScope first
         try:
             logger.debug("Trying ModelScope API...")
-            return self._discover_modelscope(model_id)
+            with span("modelscope", "discovery"):
+                return self._discover_modelscope(model_id)
         except requests.RequestException as e:
             logger.debug(f"ModelScope failed: {e}")
 
         # Fall back to HuggingFace
         try:
             logger.debug("Trying HuggingFace API...")
-            return self._discover_huggingface(model_id)
+            with span("huggingface", "discovery"):
+                return self._discover_huggingface(model_id)
         except requests.RequestException as e:
             logger.error(f"HuggingFace failed: {e}")
             raise ModelNotFoundError(
@@ -73,6 +81,7 @@ class ModelDiscovery:
             format=model_format,
             repo_type="modelscope",
             architecture=architecture,
+            revision=info.get("Revision") or _files_digest(files),
         )
 
     def _discover_huggingface(self, model_id: str) -> ModelInfo:
@@ -99,4 +108,15 @@ class ModelDiscovery:
             format=model_format,
             repo_type="huggingface",
             architecture=architecture,
+            revision=info.get("sha") or _files_digest(files),
         )
+
+
+def _files_digest(files: list[dict[str, Any]]) -> str:
+    """Stand-in revision for repositories that do not report a commit SHA.
+
+    Any added, removed or resized file changes the digest, which is what
+    the pack cache needs to tell a changed model from an unchanged one.
+    """
+    listing = sorted((f.get("path", ""), f.get("size", 0)) for f in files)
+    return "files:" + hashlib.sha256(json.dumps(listing).encode()).hexdigest()
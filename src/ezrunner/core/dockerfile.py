@@ -1,11 +1,18 @@
 """Dockerfile generation module."""
 
+from collections.abc import Sequence
 from pathlib import Path
 
 from jinja2 import Environment, FileSystemLoader
 
 from ezrunner.models.engine import Engine
 from ezrunner.models.model_info import ModelInfo
+from ezrunner.runtime import RUNTIME_DIR, RUNTIME_PACKAGE
+
+# Comment opening the model steps of every template; the steps above it
+# (base image, system packages, engine dependencies) are the same for
+# every model of an engine
+MODEL_STEPS = "# Download model at build time"
 
 
 class DockerfileGenerator:
@@ -17,7 +24,12 @@ class DockerfileGenerator:
         self.env = Environment(loader=FileSystemLoader(str(template_dir)))
 
     def generate(
-        self, model: ModelInfo, engine: Engine, port: int = 8080
+        self,
+        model: ModelInfo,
+        engine: Engine,
+        port: int = 8080,
+        settings: dict[str, str] | None = None,
+        extra_models: Sequence[ModelInfo] = (),
     ) -> str:
         """Generate Dockerfile content.
 
@@ -25,16 +37,129 @@ class DockerfileGenerator:
             model: Model information
             engine: Selected inference engine
             port: API port
+            settings: Server settings baked in as ENV (e.g.,
+                {"EZRUNNER_MAX_BATCH_SIZE": "8"})
+            extra_models: Further models the image serves, loaded on
+                demand (Transformers engine only)
 
         Returns:
             Dockerfile content
+
+        Raises:
+            ValueError: Extra models with an engine serving one model
         """
+        if extra_models and engine != Engine.TRANSFORMERS:
+            raise ValueError(f"The {engine.value} engine serves one model per image")
         template_name = f"{engine.value}.dockerfile"
         template = self.env.get_template(template_name)
 
-        # Extract model name from model_id
-        model_name = model.model_id.replace("/", "-").lower()
+        extras = [
+            {
+                "model_id": extra.model_id,
+                "model_name": _model_name(extra),
+                "revision": extra.revision or "",
+                "pin_revision": _pinnable(extra),
+                "convert": extra.converted_from is not None,
+            }
+            for extra in extra_models
+        ]
+        models = ",".join(
+            f"{m.model_id}=/models/{_model_name(m)}" for m in (model, *extra_models)
+        )
 
         return template.render(
-            model_id=model.model_id, model_name=model_name, port=port
+            model_id=model.model_id,
+            model_name=_model_name(model),
+            revision=model.revision or "",
+            pin_revision=_pinnable(model),
+            convert=model.converted_from is not None,
+            extra_models=extras,
+            models=models if extras else "",
+            labels=self.labels(model, engine, extra_models),
+            port=port,
+            settings=settings or {},
         )
+
+    def base(self, dockerfile: str) -> str:
+        """The steps of a generated Dockerfile shared by every model.
+
+        Building them alone puts the engine's base and dependency layers
+        in the daemon's layer cache, without downloading any weights.
+
+        Args:
+            dockerfile: Generated Dockerfile content
+
+        Returns:
+            Dockerfile content up to the model steps
+
+        Raises:
+            ValueError: Not a generated Dockerfile
+        """
+        head, marker, _ = dockerfile.partition(MODEL_STEPS)
+        if not marker:
+            raise ValueError("Dockerfile has no model steps")
+        return head.rstrip() + "\n"
+
+    def labels(
+        self,
+        model: ModelInfo,
+        engine: Engine,
+        extra_models: Sequence[ModelInfo] = (),
+    ) -> dict[str, str]:
+        """Image labels describing the packed model.
+
+        Args:
+            model: Model information (the default model of the image)
+            engine: Selected inference engine
+            extra_models: Further models the image serves
+
+        Returns:
+            Label names and values
+        """
+        labels = {
+            "ezrunner.model.id": model.model_id,
+            "ezrunner.model.revision": model.revision or "",
+            "ezrunner.model.size-gb": f"{model.size_gb:g}",
+            "ezrunner.weights.format": model.format,
+            "ezrunner.engine": engine.value,
+        }
+        if model.converted_from is not None:
+            labels["ezrunner.weights.converted-from"] = model.converted_from
+        if extra_models:
+            labels["ezrunner.models"] = ",".join(
+                m.model_id for m in (model, *extra_models)
+            )
+        return labels
+
+    def context(self, engine: Engine) -> dict[str, Path]:
+        """Files the engine's Dockerfile copies from the build context.
+
+        Both engines ship the runtime package: the Transformers server
+        itself, or the front end in front of vLLM.
+
+        Args:
+            engine: Selected inference engine
+
+        Returns:
+            Mapping of build-context names to local files or directories
+        """
+        return {RUNTIME_PACKAGE: RUNTIME_DIR}
+
+
+def _model_name(model: ModelInfo) -> str:
+    """Directory name of a model under ``/models``."""
+    return model.model_id.replace("/", "-").lower()
+
+
+def _pinnable(model: ModelInfo) -> bool:
+    """Check if the model's revision can pin its download from the Hub.
+
+    File-listing digests, and ModelScope revisions, do not name a Hub
+    commit; they still change the build argument, so Docker does not
+    reuse a download layer of other weights.
+    """
+    return (
+        model.repo_type == "huggingface"
+        and model.revision is not None
+        and not model.revision.startswith("files:")
+    )
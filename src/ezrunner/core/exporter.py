@@ -1,33 +1,224 @@
 """Docker image exporter module."""
 
+import json
+import os
+import posixpath
+import tarfile
+import time
+from dataclasses import dataclass
 from pathlib import Path
+from typing import IO
 
 from docker.models.images import Image
 
+from ezrunner.core.archive import METADATA_FILES, ChunkReader
+from ezrunner.core.layout import (
+    CONFIG_MEDIA_TYPE,
+    LAYER_MEDIA_TYPE,
+    MANIFEST_MEDIA_TYPE,
+    Blob,
+    ImageLayout,
+)
 from ezrunner.exceptions import DockerError
+from ezrunner.utils.tracing import span
+
+
+@dataclass(frozen=True)
+class ExportStats:
+    """Result of a tar export.
+
+    Attributes:
+        bytes_written: Bytes written to the output
+        seconds: Wall time of the export
+    """
+
+    bytes_written: int
+    seconds: float
+
+    @property
+    def throughput_mb_s(self) -> float:
+        """Export throughput in MB/s."""
+        return self.bytes_written / (1024 * 1024) / max(self.seconds, 1e-9)
 
 
 class TarExporter:
     """Export Docker images to tar files."""
 
-    def export(self, image: Image, output_path: Path) -> None:
+    def export(
+        self, image: Image, output_path: Path, tag: str | None = None
+    ) -> ExportStats:
         """Export image to tar file.
 
         Args:
             image: Docker image
             output_path: Output tar file path
+            tag: Repository tag the archive records (default: the image's
+                first tag)
+
+        Returns:
+            Export statistics
+
+        Raises:
+            DockerError: Export failed
+        """
+        # Write next to the target and rename: a half-written export never
+        # masquerades as a complete archive, and an output that is a
+        # hardlink to a cached archive is replaced rather than truncated.
+        tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                stats = self.stream(image, f, tag)
+            os.replace(tmp_path, output_path)
+            return stats
+        except OSError as e:
+            raise DockerError(f"Failed to export image: {e}") from e
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def stream(
+        self, image: Image, sink: IO[bytes], tag: str | None = None
+    ) -> ExportStats:
+        """Stream image to an open binary sink without staging it on disk.
+
+        Args:
+            image: Docker image
+            sink: Writable binary stream (file, stdout, pipe, socket)
+            tag: Repository tag the archive records (default: the image's
+                first tag)
+
+        Returns:
+            Export statistics
 
         Raises:
             DockerError: Export failed
         """
+        start = time.perf_counter()
+        written = 0
         try:
-            # Get image data as generator
-            image_data = image.save()
+            with span("docker save", "docker") as save:
+                # Naming the save keeps the repository tag in the archive,
+                # so the image comes back tagged on `docker load`.
+                for chunk in image.save(named=tag or True):
+                    sink.write(chunk)
+                    written += len(chunk)
+                sink.flush()
+                save.set(bytes=written)
+
+        except Exception as e:
+            raise DockerError(f"Failed to export image: {e}") from e
+
+        return ExportStats(bytes_written=written, seconds=time.perf_counter() - start)
+
 
-            # Write to file
-            with open(output_path, "wb") as f:
-                for chunk in image_data:
-                    f.write(chunk)
+@dataclass(frozen=True)
+class LayoutStats:
+    """Result of an image-layout export.
+
+    Attributes:
+        blobs_written: Blobs added to the layout
+        blobs_shared: Blobs that were already present
+        bytes_written: Bytes added to the layout
+    """
+
+    blobs_written: int
+    blobs_shared: int
+    bytes_written: int
+
+
+class LayoutExporter:
+    """Export Docker images to OCI image-layout directories."""
+
+    def export(
+        self, image: Image, output_dir: Path, tag: str | None = None
+    ) -> LayoutStats:
+        """Export image into an image-layout directory.
+
+        The ``docker save`` stream is converted on the fly: every file is
+        hashed while it is written and stored under its digest, so blobs
+        already in the directory (e.g. from another model) are not kept
+        twice.
+
+        Args:
+            image: Docker image
+            output_dir: Layout directory (may already hold other images)
+            tag: Repository tag the layout records (default: the image's
+                first tag)
+
+        Returns:
+            Export statistics
+
+        Raises:
+            DockerError: Export failed
+        """
+        layout = ImageLayout(output_dir)
+        try:
+            with span("docker save", "docker") as save:
+                blobs, metadata = self._store_blobs(layout, image, tag)
+            manifests = []
+            for entry in json.loads(metadata["manifest.json"]):
+                manifest = layout.add_json(
+                    {
+                        "schemaVersion": 2,
+                        "mediaType": MANIFEST_MEDIA_TYPE,
+                        "config": blobs[entry["Config"]].descriptor(CONFIG_MEDIA_TYPE),
+                        "layers": [
+                            blobs[path].descriptor(LAYER_MEDIA_TYPE)
+                            for path in entry["Layers"]
+                        ],
+                    }
+                )
+                manifests.append(manifest)
+                for tag in entry.get("RepoTags") or ():
+                    layout.tag(tag, manifest)
 
         except Exception as e:
             raise DockerError(f"Failed to export image: {e}") from e
+
+        stored = {blob.digest: blob for blob in [*blobs.values(), *manifests]}.values()
+        stats = LayoutStats(
+            blobs_written=sum(blob.new for blob in stored),
+            blobs_shared=sum(not blob.new for blob in stored),
+            bytes_written=sum(blob.size for blob in stored if blob.new),
+        )
+        # Blobs the layout already held are cache hits
+        save.set(
+            bytes=stats.bytes_written,
+            cache_hits=stats.blobs_shared,
+            cache_misses=stats.blobs_written,
+        )
+        return stats
+
+    def _store_blobs(
+        self, layout: ImageLayout, image: Image, tag: str | None = None
+    ) -> tuple[dict[str, Blob], dict[str, bytes]]:
+        """Store every file of the save stream as a blob.
+
+        Returns:
+            Blob of each archive path, and the archive metadata files
+        """
+        blobs: dict[str, Blob] = {}
+        links: dict[str, str] = {}
+        metadata: dict[str, bytes] = {}
+
+        with tarfile.open(
+            fileobj=ChunkReader(image.save(named=tag or True)), mode="r|"
+        ) as tar:
+            for member in tar:
+                if member.name in METADATA_FILES:
+                    fileobj = tar.extractfile(member)
+                    metadata[member.name] = fileobj.read() if fileobj else b""
+                elif member.issym():
+                    links[member.name] = posixpath.normpath(
+                        posixpath.join(posixpath.dirname(member.name), member.linkname)
+                    )
+                elif member.isfile():
+                    blobs[member.name] = layout.add_blob(tar.extractfile(member))
+
+        # Legacy archives symlink shared layers; targets may come later.
+        for name, target in links.items():
+            while target in links:
+                target = links[target]
+            if target in blobs:
+                blobs[name] = blobs[target]
+
+        return blobs, metadata
@@ -0,0 +1,200 @@
+"""OCI image-layout module.
+
+An image-layout directory stores every config, layer and manifest as
+``blobs/sha256/<digest>``. Blobs are immutable and named by content, so
+rsync and hardlink-based tooling only move new blobs, and several models
+exported into the same directory share their common layers.
+"""
+
+import io
+import json
+import os
+import shutil
+import tarfile
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+from ezrunner.core.archive import (
+    CHUNK_SIZE,
+    ArchiveImage,
+    HashingReader,
+    iter_tar,
+    json_member,
+)
+from ezrunner.exceptions import ArchiveError
+
+MANIFEST_MEDIA_TYPE = "application/vnd.oci.image.manifest.v1+json"
+CONFIG_MEDIA_TYPE = "application/vnd.oci.image.config.v1+json"
+LAYER_MEDIA_TYPE = "application/vnd.oci.image.layer.v1.tar"
+
+# Docker writes the full reference to the containerd annotation and only
+# the tag to the OCI one; both are kept for compatibility with skopeo et al.
+IMAGE_NAME_ANNOTATION = "io.containerd.image.name"
+REF_NAME_ANNOTATION = "org.opencontainers.image.ref.name"
+
+
+@dataclass(frozen=True)
+class Blob:
+    """A content-addressed blob.
+
+    Attributes:
+        digest: Digest (e.g., "sha256:abc...")
+        size: Size in bytes
+        new: Whether the blob was added (False if it already existed)
+    """
+
+    digest: str
+    size: int
+    new: bool = False
+
+    def descriptor(self, media_type: str) -> dict[str, Any]:
+        """OCI descriptor referencing this blob."""
+        return {"mediaType": media_type, "digest": self.digest, "size": self.size}
+
+
+class ImageLayout:
+    """An OCI image-layout directory."""
+
+    def __init__(self, root: Path) -> None:
+        """Initialize layout.
+
+        Args:
+            root: Layout directory (created on first write)
+        """
+        self.root = root
+
+    def blob_path(self, digest: str) -> Path:
+        """Path of a blob in the layout."""
+        algorithm, _, hexdigest = digest.partition(":")
+        return self.root / "blobs" / algorithm / hexdigest
+
+    def add_blob(self, fileobj: IO[bytes] | None) -> Blob:
+        """Store a blob, hashing it while it is written.
+
+        The data goes to a temporary file first and is renamed to its digest
+        once complete, so an interrupted export never leaves a truncated
+        blob under a valid name.
+        """
+        blob_dir = self.root / "blobs" / "sha256"
+        blob_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = blob_dir / f".{uuid.uuid4().hex}.tmp"
+        reader = HashingReader(fileobj)
+        try:
+            with open(tmp_path, "wb") as f:
+                shutil.copyfileobj(reader, f, length=CHUNK_SIZE)
+                size = f.tell()
+            path = self.blob_path(f"sha256:{reader.hexdigest()}")
+            if path.exists():
+                return Blob(f"sha256:{reader.hexdigest()}", size)
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, path)
+            return Blob(f"sha256:{reader.hexdigest()}", size, new=True)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def add_json(self, data: object) -> Blob:
+        """Store a JSON document as a blob."""
+        return self.add_blob(io.BytesIO(json.dumps(data).encode()))
+
+    def read_json(self, digest: str) -> Any:
+        """Read a JSON blob."""
+        return json.loads(self.blob_path(digest).read_bytes())
+
+    def tag(self, name: str, manifest: Blob) -> None:
+        """Point an image name at a manifest, replacing any previous one."""
+        index = self._read_index()
+        manifests = [
+            entry
+            for entry in index["manifests"]
+            if entry.get("annotations", {}).get(IMAGE_NAME_ANNOTATION) != name
+        ]
+        descriptor = manifest.descriptor(MANIFEST_MEDIA_TYPE)
+        descriptor["annotations"] = {
+            IMAGE_NAME_ANNOTATION: name,
+            REF_NAME_ANNOTATION: name.rpartition(":")[2] or "latest",
+        }
+        manifests.append(descriptor)
+        index["manifests"] = manifests
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / "oci-layout").write_text(
+            json.dumps({"imageLayoutVersion": "1.0.0"})
+        )
+        tmp_path = self.root / "index.json.tmp"
+        tmp_path.write_text(json.dumps(index, indent=2))
+        os.replace(tmp_path, self.root / "index.json")
+
+    def read_images(self) -> list[ArchiveImage]:
+        """List the images in the layout as archive entries.
+
+        Config and layer paths are blob paths relative to the layout root,
+        which is exactly what ``docker load`` expects in ``manifest.json``.
+
+        Raises:
+            ArchiveError: Not an image-layout directory
+        """
+        if not (self.root / "index.json").exists():
+            raise ArchiveError(f"Not an OCI image layout: {self.root}")
+
+        tags: dict[str, list[str]] = {}
+        for entry in self._read_index()["manifests"]:
+            annotations = entry.get("annotations", {})
+            name = annotations.get(IMAGE_NAME_ANNOTATION) or annotations.get(
+                REF_NAME_ANNOTATION
+            )
+            tags.setdefault(entry["digest"], [])
+            if name:
+                tags[entry["digest"]].append(name)
+
+        images = []
+        for digest, repo_tags in tags.items():
+            manifest = self.read_json(digest)
+            images.append(
+                ArchiveImage(
+                    config=self._relative(manifest["config"]["digest"]),
+                    repo_tags=tuple(repo_tags),
+                    layers=tuple(
+                        self._relative(layer["digest"]) for layer in manifest["layers"]
+                    ),
+                )
+            )
+        return images
+
+    def iter_archive(self, images: list[ArchiveImage]) -> Iterator[bytes]:
+        """Stream images as a ``docker load`` archive.
+
+        Blobs are read straight from the layout; nothing is staged on disk
+        and shared blobs are sent once.
+        """
+        return iter_tar(self._archive_members(images))
+
+    def _archive_members(
+        self, images: list[ArchiveImage]
+    ) -> Iterator[tuple[tarfile.TarInfo, IO[bytes] | None]]:
+        """Yield blob members followed by the archive manifest."""
+        paths = dict.fromkeys(
+            path for image in images for path in (image.config, *image.layers)
+        )
+        for path in paths:
+            with open(self.root / path, "rb") as f:
+                info = tarfile.TarInfo(path)
+                info.size = os.fstat(f.fileno()).st_size
+                info.mode = 0o644
+                yield info, f
+
+        yield json_member("manifest.json", [image.to_manifest() for image in images])
+
+    def _read_index(self) -> dict[str, Any]:
+        """Read ``index.json``, or an empty index for a new layout."""
+        path = self.root / "index.json"
+        if not path.exists():
+            return {"schemaVersion": 2, "manifests": []}
+        index: dict[str, Any] = json.loads(path.read_text())
+        return index
+
+    def _relative(self, digest: str) -> str:
+        """Blob path relative to the layout root."""
+        return self.blob_path(digest).relative_to(self.root).as_posix()
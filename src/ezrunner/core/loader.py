@@ -0,0 +1,117 @@
+"""Docker image loader module."""
+
+from pathlib import Path
+from typing import Any
+
+import docker
+from docker.models.images import Image
+
+from ezrunner.core.archive import iter_image, read_manifest, select_image
+from ezrunner.core.layout import ImageLayout
+from ezrunner.exceptions import ArchiveError, DockerError
+from ezrunner.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ImageLoader:
+    """Load packed images and bundles into the local Docker daemon."""
+
+    def __init__(self, client: Any | None = None) -> None:
+        """Initialize loader.
+
+        Args:
+            client: Docker client (default: from environment)
+        """
+        if client is None:
+            try:
+                client = docker.from_env()
+            except docker.errors.DockerException as e:
+                raise DockerError("Docker is not running") from e
+        self.client = client
+
+    def load(self, archive: Path, model: str | None = None) -> list[Image]:
+        """Load images from an archive.
+
+        The archive is streamed to the daemon instead of being read into
+        memory. With ``model`` set, only that image's config and layers are
+        streamed out of a bundle. OCI image-layout directories are streamed
+        blob by blob as a ``docker load`` archive.
+
+        Args:
+            archive: Archive, bundle or image-layout directory
+            model: Model ID or image tag to load (default: all images)
+
+        Returns:
+            Loaded images
+
+        Raises:
+            ArchiveError: Requested image is not in the archive
+        """
+        if archive.is_dir():
+            return self._load_layout(ImageLayout(archive), model)
+
+        if model is None:
+            with open(archive, "rb") as f:
+                return list(self.client.images.load(f))
+
+        image = select_image(read_manifest(archive), model)
+        logger.info(f"Loading {image.repo_tags} from {archive}")
+        return list(self.client.images.load(iter_image(archive, image)))
+
+    def find_loaded(
+        self, archive: Path, model: str | None = None
+    ) -> list[Image] | None:
+        """Find the archive's images in the daemon without loading anything.
+
+        Only the archive's ``manifest.json`` is read (tar headers are
+        skipped over, so this touches a few KB of a multi-GB archive). The
+        config digest of each image is its image ID, which is compared with
+        the daemon's images. Missing repository tags are re-applied.
+
+        Args:
+            archive: Archive, bundle or image-layout directory
+            model: Model ID or image tag (default: all images)
+
+        Returns:
+            Matching local images, or None if any image needs loading
+        """
+        try:
+            if archive.is_dir():
+                entries = ImageLayout(archive).read_images()
+            else:
+                entries = read_manifest(archive)
+            if model is not None:
+                entries = [select_image(entries, model)]
+        except ArchiveError as e:
+            logger.debug(f"Cannot inspect {archive}: {e}")
+            return None
+        if not entries:
+            return None
+
+        images = []
+        for entry in entries:
+            try:
+                image = self.client.images.get(entry.image_id)
+            except docker.errors.ImageNotFound:
+                return None
+            images.append(self._retag(image, entry.repo_tags))
+        return images
+
+    def _retag(self, image: Image, repo_tags: tuple[str, ...]) -> Image:
+        """Make sure a local image carries the archive's tags."""
+        missing = [tag for tag in repo_tags if tag not in image.tags]
+        for tag in missing:
+            repository, _, name = tag.rpartition(":")
+            image.tag(repository, name)
+        if missing:
+            image.reload()
+        return image
+
+    def _load_layout(self, layout: ImageLayout, model: str | None) -> list[Image]:
+        """Load images from an OCI image-layout directory."""
+        images = layout.read_images()
+        if model is not None:
+            images = [select_image(images, model)]
+        logger.info(f"Loading {len(images)} image(s) from {layout.root}")
+        return list(self.client.images.load(layout.iter_archive(images)))
@@ -0,0 +1,438 @@
+"""Synthetic load generation module.
+
+Drives a packed model server's OpenAI-compatible chat endpoint from a
+pool of threads and records per-request latency, time to first token,
+inter-token gaps and token counts.
+
+Two arrival patterns are supported: fixed concurrency (closed loop: each
+worker sends its next request when the previous one completes) and a
+Poisson arrival rate (open loop: requests are sent on schedule whether
+or not earlier ones finished). Open-loop latencies are measured from the
+scheduled send time, so time spent waiting for a free worker counts.
+
+Prompt lengths, output lengths and arrival times are drawn from a seeded
+generator, so runs against different images see the same workload.
+"""
+
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import requests
+
+from ezrunner.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@dataclass(frozen=True)
+class LengthDistribution:
+    """Distribution of prompt or output lengths in tokens.
+
+    Attributes:
+        kind: "fixed", "uniform" or "normal"
+        a: Length (fixed), lower bound (uniform) or mean (normal)
+        b: Upper bound (uniform) or standard deviation (normal)
+    """
+
+    kind: str
+    a: float
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LengthDistribution":
+        """Parse a distribution.
+
+        Accepted forms: ``256`` (fixed), ``128-512`` (uniform) and
+        ``normal:256,64`` (normal, with mean and standard deviation).
+
+        Raises:
+            ValueError: Unrecognized specification
+        """
+        spec = spec.strip()
+        if match := re.fullmatch(r"(\d+)", spec):
+            return cls("fixed", int(match.group(1)))
+        if match := re.fullmatch(r"(\d+)\s*-\s*(\d+)", spec):
+            low, high = int(match.group(1)), int(match.group(2))
+            if low <= high:
+                return cls("uniform", low, high)
+        if match := re.fullmatch(r"normal:(\d+(?:\.\d+)?),(\d+(?:\.\d+)?)", spec):
+            return cls("normal", float(match.group(1)), float(match.group(2)))
+        raise ValueError(
+            f"Invalid length distribution {spec!r} "
+            "(expected N, LOW-HIGH or normal:MEAN,STD)"
+        )
+
+    def sample(self, rng: random.Random) -> int:
+        """Draw a length (at least 1)."""
+        if self.kind == "uniform":
+            value = rng.randint(int(self.a), int(self.b))
+        elif self.kind == "normal":
+            value = round(rng.gauss(self.a, self.b))
+        else:
+            value = int(self.a)
+        return max(value, 1)
+
+    def __str__(self) -> str:
+        if self.kind == "uniform":
+            return f"{self.a:g}-{self.b:g}"
+        if self.kind == "normal":
+            return f"normal:{self.a:g},{self.b:g}"
+        return f"{self.a:g}"
+
+
+@dataclass(frozen=True)
+class RequestResult:
+    """Outcome of one request.
+
+    Attributes:
+        latency_s: Time from sending the request to the full response
+        completion_tokens: Tokens generated (0 on error)
+        error: Error message, or None on success
+        prompt_tokens: Prompt tokens reported by the server (0 if unknown)
+        ttft_s: Time to the first generated token (streaming only)
+        inter_token_s: Gaps between successive streamed tokens
+    """
+
+    latency_s: float
+    completion_tokens: int = 0
+    error: str | None = None
+    prompt_tokens: int = 0
+    ttft_s: float | None = None
+    inter_token_s: tuple[float, ...] = ()
+
+    @property
+    def tpot_s(self) -> float | None:
+        """Mean time per output token after the first (streaming only)."""
+        if self.ttft_s is None or self.completion_tokens < 2:
+            return None
+        return (self.latency_s - self.ttft_s) / (self.completion_tokens - 1)
+
+
+@dataclass(frozen=True)
+class LoadStats:
+    """Results of a load run.
+
+    Attributes:
+        results: Per-request outcomes, in request order
+        seconds: Wall time of the run
+    """
+
+    results: tuple[RequestResult, ...]
+    seconds: float
+
+    @property
+    def requests(self) -> int:
+        """Number of requests sent."""
+        return len(self.results)
+
+    @property
+    def errors(self) -> int:
+        """Number of failed requests."""
+        return sum(1 for r in self.results if r.error is not None)
+
+    @property
+    def completion_tokens(self) -> int:
+        """Tokens generated across all requests."""
+        return sum(r.completion_tokens for r in self.results)
+
+    @property
+    def throughput_tok_s(self) -> float:
+        """Generated tokens per second."""
+        return self.completion_tokens / max(self.seconds, 1e-9)
+
+    def latency(self, quantile: float) -> float:
+        """Latency quantile of successful requests in seconds.
+
+        Args:
+            quantile: Quantile between 0 and 1 (e.g., 0.95)
+
+        Returns:
+            Latency (nearest rank), or 0 if no request succeeded
+        """
+        return percentile(self._ok(lambda r: [r.latency_s]), quantile)
+
+    def summary(self) -> dict[str, Any]:
+        """Throughput and latency distributions, JSON-serializable.
+
+        Latency metrics of failed requests are left out; TTFT, inter-token
+        latency (ITL) and time per output token (TPOT) are only measured
+        on streamed responses.
+        """
+        ok = self.requests - self.errors
+        prompt_tokens = sum(r.prompt_tokens for r in self.results)
+        seconds = max(self.seconds, 1e-9)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "duration_s": round(self.seconds, 3),
+            "request_throughput": round(ok / seconds, 3),
+            "output_throughput_tok_s": round(self.throughput_tok_s, 2),
+            # Unknown unless the server reports prompt token counts
+            "total_throughput_tok_s": (
+                round((prompt_tokens + self.completion_tokens) / seconds, 2)
+                if prompt_tokens
+                else None
+            ),
+            "latency_s": _distribution(self._ok(lambda r: [r.latency_s])),
+            "ttft_s": _distribution(self._ok(lambda r: _present(r.ttft_s))),
+            "itl_s": _distribution(self._ok(lambda r: list(r.inter_token_s))),
+            "tpot_s": _distribution(self._ok(lambda r: _present(r.tpot_s))),
+        }
+
+    def _ok(self, values: Callable[[RequestResult], list[float]]) -> list[float]:
+        """Values extracted from every successful result."""
+        return [v for r in self.results if r.error is None for v in values(r)]
+
+
+def percentile(values: list[float], quantile: float) -> float:
+    """Nearest-rank quantile of ``values`` (0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(quantile * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def served_model(url: str, timeout: float = 10.0) -> str | None:
+    """First model a server lists under ``/v1/models`` (None if unknown)."""
+    try:
+        response = requests.get(url.rstrip("/") + "/v1/models", timeout=timeout)
+        response.raise_for_status()
+        return str(response.json()["data"][0]["id"])
+    except (requests.RequestException, ValueError, LookupError, TypeError) as e:
+        logger.debug(f"Could not list models of {url}: {e}")
+        return None
+
+
+def synthetic_prompt(words: int, index: int = 0) -> str:
+    """Prompt of roughly ``words`` tokens.
+
+    Prompts with different ``index`` differ in their first word, so
+    concurrent requests do not share a cached prefix.
+    """
+    return " ".join([str(index), *["hello"] * (words - 1)])
+
+
+class LoadGenerator:
+    """Send synthetic chat completion requests."""
+
+    def __init__(
+        self,
+        url: str,
+        model: str = "model",
+        prompt_tokens: int | LengthDistribution = 256,
+        max_tokens: int | LengthDistribution = 128,
+        stream: bool = False,
+        ignore_eos: bool = False,
+        timeout: float = 300.0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize generator.
+
+        Args:
+            url: Server base URL (e.g., ``http://localhost:8080``)
+            model: Model name sent with each request
+            prompt_tokens: Approximate prompt length, or its distribution
+            max_tokens: Tokens to generate per request, or their
+                distribution
+            stream: Stream responses (needed for TTFT and ITL)
+            ignore_eos: Ask the server to generate exactly ``max_tokens``
+                (a vLLM extension other servers ignore)
+            timeout: Per-request timeout in seconds
+            seed: Seed of the workload's random lengths and arrivals
+        """
+        self.url = url.rstrip("/") + "/v1/chat/completions"
+        self.model = model
+        self.prompt_tokens = _distribution_of(prompt_tokens)
+        self.max_tokens = _distribution_of(max_tokens)
+        self.stream = stream
+        self.ignore_eos = ignore_eos
+        self.timeout = timeout
+        self.seed = seed
+        self._local = threading.local()
+
+    def workload(self, requests_total: int) -> list[tuple[int, int]]:
+        """(prompt tokens, max tokens) of each request, the same every run."""
+        rng = random.Random(self.seed)
+        return [
+            (self.prompt_tokens.sample(rng), self.max_tokens.sample(rng))
+            for _ in range(requests_total)
+        ]
+
+    def run(self, concurrency: int, requests_total: int) -> LoadStats:
+        """Send ``requests_total`` requests, ``concurrency`` at a time.
+
+        Args:
+            concurrency: Requests in flight
+            requests_total: Requests to send
+
+        Returns:
+            Load statistics
+        """
+        workload = self.workload(requests_total)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(
+            concurrency, thread_name_prefix="ezrunner-load"
+        ) as executor:
+            results = tuple(executor.map(self._send_indexed, enumerate(workload)))
+        return LoadStats(results, time.perf_counter() - started)
+
+    def run_rate(
+        self, rate: float, requests_total: int, max_in_flight: int = 256
+    ) -> LoadStats:
+        """Send ``requests_total`` requests at Poisson-distributed times.
+
+        Args:
+            rate: Mean requests per second
+            requests_total: Requests to send
+            max_in_flight: Worker threads (requests beyond it wait, and
+                the wait counts toward their latency)
+
+        Returns:
+            Load statistics
+        """
+        workload = self.workload(requests_total)
+        rng = random.Random(self.seed + 1)
+        offsets, t = [], 0.0
+        for _ in workload:
+            offsets.append(t)
+            t += rng.expovariate(rate)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_in_flight, thread_name_prefix="ezrunner-load"
+        ) as executor:
+            futures = []
+            for index, (lengths, offset) in enumerate(
+                zip(workload, offsets, strict=True)
+            ):
+                scheduled = started + offset
+                time.sleep(max(scheduled - time.perf_counter(), 0.0))
+                futures.append(executor.submit(self.send, index, *lengths, scheduled))
+            results = tuple(future.result() for future in futures)
+        return LoadStats(results, time.perf_counter() - started)
+
+    def send(
+        self,
+        index: int,
+        prompt_tokens: int,
+        max_tokens: int,
+        scheduled: float | None = None,
+    ) -> RequestResult:
+        """Send one request and wait for the full response.
+
+        Args:
+            index: Request number (varies the prompt)
+            prompt_tokens: Approximate prompt length
+            max_tokens: Tokens to generate
+            scheduled: ``time.perf_counter()`` the request was due at
+                (default: now)
+
+        Returns:
+            Request outcome
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        payload: dict[str, Any] = {
+            "model": self.model,
+            "messages": [
+                {"role": "user", "content": synthetic_prompt(prompt_tokens, index)}
+            ],
+            "max_tokens": max_tokens,
+            # Sampled, so a response cache cannot answer
+            "temperature": 1.0,
+        }
+        if self.ignore_eos:
+            payload["ignore_eos"] = True
+        if self.stream:
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+        started = time.perf_counter() if scheduled is None else scheduled
+        try:
+            response = session.post(
+                self.url, json=payload, timeout=self.timeout, stream=self.stream
+            )
+            response.raise_for_status()
+            if self.stream:
+                return _read_stream(response, started)
+            usage = response.json().get("usage") or {}
+        except (requests.RequestException, ValueError) as e:
+            logger.debug(f"Request {index} failed: {e}")
+            return RequestResult(time.perf_counter() - started, error=str(e))
+        return RequestResult(
+            time.perf_counter() - started,
+            usage.get("completion_tokens", 0),
+            prompt_tokens=usage.get("prompt_tokens", 0),
+        )
+
+    def _send_indexed(self, item: tuple[int, tuple[int, int]]) -> RequestResult:
+        index, (prompt_tokens, max_tokens) = item
+        return self.send(index, prompt_tokens, max_tokens)
+
+
+def _read_stream(response: requests.Response, started: float) -> RequestResult:
+    """Consume a server-sent event stream, timing each content chunk."""
+    token_times: list[float] = []
+    usage: dict[str, Any] = {}
+    with response:
+        for line in response.iter_lines():
+            if not line.startswith(b"data:"):
+                continue
+            data = line[len(b"data:") :].strip()
+            if data == b"[DONE]":
+                break
+            chunk = json.loads(data)
+            if "error" in chunk:
+                message = chunk["error"].get("message", "stream error")
+                return RequestResult(time.perf_counter() - started, error=message)
+            usage = chunk.get("usage") or usage
+            for choice in chunk.get("choices") or []:
+                if (choice.get("delta") or {}).get("content"):
+                    token_times.append(time.perf_counter())
+    finished = time.perf_counter()
+    if not token_times:
+        return RequestResult(
+            finished - started, prompt_tokens=usage.get("prompt_tokens", 0)
+        )
+    return RequestResult(
+        finished - started,
+        # Servers that do not report usage send one token per chunk
+        usage.get("completion_tokens", len(token_times)),
+        prompt_tokens=usage.get("prompt_tokens", 0),
+        ttft_s=token_times[0] - started,
+        inter_token_s=tuple(b - a for a, b in itertools.pairwise(token_times)),
+    )
+
+
+def _distribution_of(value: int | LengthDistribution) -> LengthDistribution:
+    """Length distribution of a fixed length or a distribution."""
+    if isinstance(value, LengthDistribution):
+        return value
+    return LengthDistribution("fixed", value)
+
+
+def _present(value: float | None) -> list[float]:
+    """``[value]``, or nothing if it was not measured."""
+    return [] if value is None else [value]
+
+
+def _distribution(values: list[float]) -> dict[str, float] | None:
+    """Mean and quantiles of ``values`` (None if there are none)."""
+    if not values:
+        return None
+    summary = {"mean": round(sum(values) / len(values), 5)}
+    for quantile in QUANTILES:
+        summary[f"p{quantile * 100:g}"] = round(percentile(values, quantile), 5)
+    return summary
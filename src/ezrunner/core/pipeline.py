@@ -0,0 +1,474 @@
+"""Pack pipeline module.
+
+The stages of a pack, shared by ``ezrunner pack`` and the batch packer:
+
+1. discover: look up the model(s) on the hub
+2. analyze: describe the target hardware
+3. select engine: pick the engine and its server settings
+4. generate: render the Dockerfile and compute the pack cache key
+5. build: build the image, unless an identical pack is cached
+6. export: write the archive (or reuse the cached one)
+
+:class:`PackPipeline` runs them for one job at a time. The batch packer
+runs many jobs at once and adds what that needs (resource slots, locks,
+layer-cache warm-up) through the hooks it overrides.
+"""
+
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import docker
+from docker.models.images import Image
+
+from ezrunner.core.archive import image_tag
+from ezrunner.core.builder import ImageBuilder
+from ezrunner.core.cache import PackCache, PackEntry
+from ezrunner.core.discovery import ModelDiscovery
+from ezrunner.core.dockerfile import DockerfileGenerator
+from ezrunner.core.engine import EngineSelector
+from ezrunner.core.exporter import LayoutExporter, TarExporter
+from ezrunner.core.hardware import HardwareAnalyzer
+from ezrunner.core.sinks import is_sink, open_sink
+from ezrunner.core.tuning import server_settings
+from ezrunner.models.engine import Engine
+from ezrunner.models.model_info import ModelInfo
+from ezrunner.utils.tracing import Span, span
+
+# Progress description of each stage
+STAGES = {
+    "discover": "Discovering model",
+    "analyze": "Analyzing hardware",
+    "select engine": "Selecting engine",
+    "generate": "Generating Dockerfile",
+    "build": "Building Docker image",
+    "export": "Exporting image",
+}
+
+
+@dataclass(frozen=True)
+class PackJob:
+    """One pack: the model and the ``pack`` options it is packed with.
+
+    Attributes:
+        model_id: Model ID (e.g., "qwen/Qwen-7B-Chat")
+        output: Output tar file (layout directory for "oci"), or a sink
+            (see ``sinks.is_sink``)
+        output_format: "tar" or "oci"
+        engine: "auto", "transformers" or "vllm"
+        target_gpu: Target GPU memory in GB
+        port: API port
+        max_batch_size: Maximum requests decoded together (None: default)
+        max_wait_ms: How long an idle server waits to fill a batch
+        response_cache: Cached temperature-0 responses (0 disables)
+        response_cache_ttl: Seconds a cached response stays valid
+        warmup: Comma-separated prompt lengths to warm up with
+        extra_model_ids: Further models the image serves, loaded on demand
+    """
+
+    model_id: str
+    output: Path
+    output_format: str = "tar"
+    engine: str = "auto"
+    target_gpu: float = 0.0
+    port: int = 8080
+    max_batch_size: int | None = None
+    max_wait_ms: float = 10.0
+    response_cache: int = 0
+    response_cache_ttl: float = 3600.0
+    warmup: str = "32,512"
+    extra_model_ids: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class JobResult:
+    """Outcome of one job.
+
+    Attributes:
+        model_id: Model ID
+        output: Output path
+        status: "built" (new image), "exported" (cached image exported
+            again), "cached" (cached archive reused), "resumed" (finished
+            by a previous run) or "failed"
+        seconds: Wall time of the job
+        waited_s: Time spent waiting for resource slots
+        detail: Export summary
+        error: Why the job failed
+        image_id: ID of the packed image
+        cache_key: Pack cache key
+        stages: Seconds per stage
+        fingerprint: Size and mtime of the output when it was written
+    """
+
+    model_id: str
+    output: str
+    status: str
+    seconds: float = 0.0
+    waited_s: float = 0.0
+    detail: str = ""
+    error: str | None = None
+    image_id: str | None = None
+    cache_key: str | None = None
+    stages: dict[str, float] = field(default_factory=dict)
+    fingerprint: list[int] | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the output was produced."""
+        return self.status != "failed"
+
+    def resumable(self) -> bool:
+        """Check the job finished and its output was not changed since."""
+        return (
+            self.ok
+            and self.fingerprint is not None
+            and self.fingerprint == _fingerprint(Path(self.output))
+        )
+
+
+@dataclass(frozen=True)
+class PackPlan:
+    """What a job builds, once its inputs are known.
+
+    Attributes:
+        model: Discovered model (the default model of the image)
+        extra_models: Further models of a multi-model image
+        engine: Selected engine
+        dockerfile: Rendered Dockerfile
+        context: Build-context files
+        key: Pack cache key
+        tag: Image tag
+    """
+
+    model: ModelInfo
+    extra_models: tuple[ModelInfo, ...]
+    engine: Engine
+    dockerfile: str
+    context: dict[str, Path]
+    key: str
+    tag: str
+
+
+class PackProgress:
+    """Receives the stages of a pack as they run.
+
+    The base class passes a one-line message per stage and build step to
+    ``on_message``; subclasses can show more.
+    """
+
+    def __init__(self, on_message: Callable[[str], None] | None = None) -> None:
+        """Initialize progress.
+
+        Args:
+            on_message: Called with a description of each stage (and
+                build step) as it starts
+        """
+        self.on_message = on_message
+
+    def start(self, stage: str) -> None:
+        """A stage (a key of ``STAGES``) started."""
+        self._emit(STAGES[stage].lower())
+
+    def step(self, message: str) -> None:
+        """Progress within the running stage (e.g., a build step)."""
+        self._emit(message)
+
+    def done(self, outcome: str) -> None:
+        """The running stage finished; ``outcome`` describes its result.
+
+        Discovery of a multi-model image reports one outcome per model.
+        """
+
+    def _emit(self, message: str) -> None:
+        if self.on_message is not None:
+            self.on_message(message)
+
+
+class PackPipeline:
+    """Run the pack stages of one job."""
+
+    def __init__(
+        self,
+        client: Any | None = None,
+        cache: PackCache | None = None,
+        force: bool = False,
+    ) -> None:
+        """Initialize pipeline.
+
+        Args:
+            client: Docker client (default: from environment, once a
+                stage needs the daemon)
+            cache: Pack cache (default: the user's)
+            force: Rebuild and re-export even if an identical pack is cached
+        """
+        self._client = client
+        self.cache = cache or PackCache()
+        self.force = force
+        self.discovery = ModelDiscovery()
+        self.generator = DockerfileGenerator()
+
+    @property
+    def client(self) -> Any:
+        """Docker client, connected on first use.
+
+        Raises:
+            DockerError: Docker is not running
+        """
+        if self._client is None:
+            self._client = ImageBuilder().client
+        return self._client
+
+    def pack(self, job: PackJob, progress: PackProgress | None = None) -> JobResult:
+        """Pack one job.
+
+        Args:
+            job: Job to run
+            progress: Receives the stages as they run
+
+        Returns:
+            Result
+
+        Raises:
+            EZRunnerError: A stage failed
+        """
+        progress = progress or PackProgress()
+        plan = self.prepare(job, progress)
+        # Identical packs run one at a time, so later ones hit the cache;
+        # jobs sharing an OCI layout write it one at a time
+        with self._locked(f"pack:{plan.key}"), self._locked(f"output:{job.output}"):
+            return self.produce(job, plan, progress)
+
+    def prepare(self, job: PackJob, progress: PackProgress) -> PackPlan:
+        """Discover the models and generate the Dockerfile of a job.
+
+        Args:
+            job: Job to run
+            progress: Receives the stages as they run
+
+        Returns:
+            Plan of the image to build
+        """
+        with self.slot("network"), self._stage("discover", progress):
+            # Pickle checkpoints are converted during the build
+            model = self.discovery.discover(job.model_id).with_safetensors()
+            extra_models = tuple(
+                self.discovery.discover(extra_id).with_safetensors()
+                for extra_id in job.extra_model_ids
+            )
+        for found in (model, *extra_models):
+            progress.done(_describe(found))
+
+        with self._stage("analyze", progress):
+            hardware = HardwareAnalyzer().analyze(gpu_memory_gb=job.target_gpu)
+        progress.done(f"Target: {hardware.gpu_memory_gb} GB GPU")
+
+        with self._stage("select engine", progress):
+            force_engine = None if job.engine == "auto" else Engine(job.engine)
+            if extra_models:
+                # Only the Transformers server loads models on demand
+                force_engine = Engine.TRANSFORMERS
+            engine = EngineSelector().select(model, hardware, force_engine=force_engine)
+            settings, tuning = server_settings(
+                model,
+                hardware,
+                engine,
+                job.max_batch_size,
+                job.max_wait_ms,
+                job.response_cache,
+                job.response_cache_ttl,
+                job.warmup,
+            )
+        tuned = ""
+        if tuning is not None:
+            tuned = (
+                f" ({tuning.max_num_seqs} seqs, {tuning.max_model_len} tokens, "
+                f"{tuning.kv_cache_dtype} KV cache)"
+            )
+        progress.done(f"Engine: {engine.value}{tuned}")
+
+        with self._stage("generate", progress):
+            dockerfile = self.generator.generate(
+                model, engine, job.port, settings, extra_models=extra_models
+            )
+            context = self.generator.context(engine)
+            key = self.cache.key(
+                model,
+                engine,
+                dockerfile,
+                job.port,
+                context,
+                extra_models=extra_models,
+            )
+        progress.done("Dockerfile generated")
+        tag = image_tag(job.model_id, *job.extra_model_ids)
+        return PackPlan(model, extra_models, engine, dockerfile, context, key, tag)
+
+    def produce(
+        self, job: PackJob, plan: PackPlan, progress: PackProgress
+    ) -> JobResult:
+        """Build (unless cached) and export the image of a job.
+
+        Args:
+            job: Job to run
+            plan: Plan from :meth:`prepare`
+            progress: Receives the stages as they run
+
+        Returns:
+            Result
+        """
+        cached = None if self.force else self.cache.lookup(plan.key)
+        streaming = is_sink(job.output)
+        if not streaming:
+            job.output.parent.mkdir(parents=True, exist_ok=True)
+        if (
+            cached is not None
+            and job.output_format == "tar"
+            and not streaming
+            and cached.artifact_valid()
+        ):
+            # Identical inputs and the previous archive is intact
+            with self.slot("disk"), self._stage("export", progress) as stage:
+                stage.add("cache_hits")
+                method = self.cache.materialize(cached, job.output)
+            progress.done(f"Reused cached archive ({method})")
+            return _result(
+                job, "cached", plan, cached.image_id, f"cached archive, {method}"
+            )
+
+        image = self._cached_image(cached)
+        if image is None:
+            self._warm_up(plan)
+        # Other packs of the model (with other settings) build and export
+        # under the same tag: one at a time, so the tag names this job's
+        # image until the archive, which records the tag, is written
+        with self._locked(f"tag:{plan.tag}"):
+            if image is None:
+                with self.slot("daemon"), self._stage("build", progress) as stage:
+                    stage.add("cache_misses")
+                    image = ImageBuilder(self.client).build(
+                        plan.dockerfile,
+                        plan.tag,
+                        context=plan.context,
+                        on_step=lambda number, total, instruction: progress.step(
+                            f"step {number}/{total}: {instruction}"
+                        ),
+                    )
+                status, action = "built", "Image built"
+            else:
+                with self._stage("build", progress) as stage:
+                    stage.add("cache_hits")
+                status, action = "exported", "Image reused"
+            progress.done(f"{action}: {plan.tag}")
+
+            with self.slot("disk"), self._stage("export", progress):
+                # A reused image may have lost the tag to a later pack of the model
+                image.tag(plan.tag)
+                image.reload()
+                detail = export_image(
+                    image, job.output, job.output_format, f"{plan.tag}:latest"
+                )
+                entry = PackEntry(image_id=image.id, tag=plan.tag)
+                if job.output_format == "tar" and not streaming:
+                    entry = PackEntry.for_artifact(image.id, plan.tag, job.output)
+                self.cache.store(plan.key, entry)
+        progress.done(f"Exported: {job.output} ({detail})")
+        return _result(job, status, plan, image.id, detail)
+
+    def slot(self, resource: str) -> AbstractContextManager[None]:
+        """Hold a slot of a resource class ("network", "daemon" or "disk").
+
+        A single job never waits; the batch packer bounds concurrent jobs.
+        """
+        return nullcontext()
+
+    def _locked(self, name: str) -> AbstractContextManager[None]:
+        """Hold the lock of a named item jobs share (no-op for one job)."""
+        return nullcontext()
+
+    def _warm_up(self, plan: PackPlan) -> None:
+        """Prepare the daemon's layer cache before a build (no-op for one job)."""
+
+    def _cached_image(self, entry: PackEntry | None) -> Image | None:
+        """Look up the image of a cached pack in the daemon."""
+        if entry is None:
+            return None
+        try:
+            image: Image = self.client.images.get(entry.image_id)
+        except docker.errors.ImageNotFound:
+            return None
+        return image
+
+    @contextmanager
+    def _stage(self, name: str, progress: PackProgress) -> Iterator[Span]:
+        """Report and trace a stage."""
+        progress.start(name)
+        with span(name) as stage:
+            yield stage
+
+
+def export_image(
+    image: Image, output: Path, output_format: str = "tar", tag: str | None = None
+) -> str:
+    """Export an image and describe the result.
+
+    Args:
+        image: Docker image
+        output: Tar file, layout directory (for "oci") or sink
+        output_format: "tar" or "oci"
+        tag: Repository tag the archive records (default: the image's
+            first tag)
+
+    Returns:
+        Export summary
+    """
+    if output_format == "oci":
+        layout_stats = LayoutExporter().export(image, output, tag)
+        size_mb = layout_stats.bytes_written / (1024 * 1024)
+        return (
+            f"{layout_stats.blobs_written} new blobs, {size_mb:.1f} MB, "
+            f"{layout_stats.blobs_shared} shared"
+        )
+
+    exporter = TarExporter()
+    if is_sink(output):
+        with open_sink(output) as sink:
+            stats = exporter.stream(image, sink, tag)
+    else:
+        stats = exporter.export(image, output, tag)
+    size_mb = stats.bytes_written / (1024 * 1024)
+    return f"{size_mb:.1f} MB, {stats.throughput_mb_s:.0f} MB/s"
+
+
+def _fingerprint(output: Path) -> list[int] | None:
+    """Size and mtime of an output (of the index, for a layout directory)."""
+    target = output / "index.json" if output.is_dir() else output
+    try:
+        st = target.stat()
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _describe(model: ModelInfo) -> str:
+    """Outcome line of a discovered model."""
+    weights = model.format
+    if model.converted_from is not None:
+        weights = f"{model.converted_from} → {model.format}"
+    return f"Model: {model.model_id} ({model.size_gb} GB, {weights})"
+
+
+def _result(
+    job: PackJob, status: str, plan: PackPlan, image_id: str, detail: str
+) -> JobResult:
+    """Result of a job that produced its output."""
+    return JobResult(
+        job.model_id,
+        str(job.output),
+        status,
+        detail=detail,
+        image_id=image_id,
+        cache_key=plan.key,
+        fingerprint=None if is_sink(job.output) else _fingerprint(job.output),
+    )
@@ -0,0 +1,506 @@
+"""GPU placement module.
+
+Decides which GPUs of the node each ``ezrunner run`` container gets.
+Containers are bin-packed onto devices by the memory their model needs
+(best fit, so large models still find room later), multi-GPU containers
+prefer NVLink-connected devices on one NUMA node, and vLLM containers,
+which preallocate a fraction of every GPU they see, get whole devices.
+
+Placements are recorded in the cache directory: a restarted container
+gets the same GPUs back while they are still free, so its CUDA caches
+and NUMA pinning stay where they were.
+"""
+
+import fcntl
+import json
+import os
+import re
+import subprocess
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from itertools import combinations
+from pathlib import Path
+from typing import Any
+
+import docker
+
+from ezrunner.core.cache import cache_dir
+from ezrunner.core.tuning import RESERVED_GB
+from ezrunner.exceptions import PlacementError
+from ezrunner.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# GPU memory a model needs per GB of weights (activations, a small KV cache)
+WEIGHT_OVERHEAD = 1.2
+# Shared memory for PyTorch DataLoader workers and NCCL's intra-node
+# transport; Docker's 64 MB default makes both fall back or fail
+GPU_SHM_SIZE = "16g"
+CPU_SHM_SIZE = "2g"
+# Limits NVIDIA recommends for CUDA containers: unlimited pinned memory,
+# and a stack deep enough for NCCL's threads
+ULIMITS = {"memlock": -1, "stack": 64 * 1024 * 1024}
+
+_ANSI = re.compile(r"\x1b\[[0-9;]*m")
+
+
+@dataclass(frozen=True)
+class GPUDevice:
+    """A GPU of the node.
+
+    Attributes:
+        index: Device index (as ``nvidia-smi`` numbers it)
+        uuid: Device UUID (stable across reboots, unlike the index)
+        name: Product name
+        memory_gb: Total memory in GB
+        numa_node: NUMA node of the device's PCIe root (None if unknown)
+        cpus: CPUs of that NUMA node, as a cpuset list (e.g., "0-31")
+        nvlink: Indexes of the devices it has an NVLink to
+    """
+
+    index: int
+    uuid: str
+    name: str
+    memory_gb: float
+    numa_node: int | None = None
+    cpus: str | None = None
+    nvlink: tuple[int, ...] = ()
+
+
+@dataclass(frozen=True)
+class GPURequest:
+    """GPUs a container needs.
+
+    Attributes:
+        key: Container identity kept across restarts (image and port)
+        gpus: Number of devices
+        memory_gb: Memory needed on each device
+        exclusive: Needs the devices to itself
+        avoid: Devices it must not use (those of its sibling replicas)
+    """
+
+    key: str
+    gpus: int
+    memory_gb: float
+    exclusive: bool = False
+    avoid: frozenset[int] = frozenset()
+
+
+@dataclass(frozen=True)
+class Placement:
+    """GPUs assigned to a container.
+
+    Attributes:
+        key: Container identity kept across restarts
+        devices: Device indexes
+        uuids: Device UUIDs, in the same order
+        memory_gb: Memory claimed on each device
+        exclusive: Whether the devices are the container's alone
+        container: ID of the container using them (None until started)
+    """
+
+    key: str
+    devices: tuple[int, ...]
+    uuids: tuple[str, ...]
+    memory_gb: float
+    exclusive: bool = False
+    container: str | None = None
+
+
+def gpu_request(
+    key: str,
+    labels: dict[str, str],
+    gpus: int,
+    memory_gb: float | None = None,
+    avoid: frozenset[int] = frozenset(),
+) -> GPURequest:
+    """GPUs a packed image needs.
+
+    Args:
+        key: Container identity kept across restarts
+        labels: Image labels (engine and model size, set by ``pack``)
+        gpus: Number of devices
+        memory_gb: Memory needed per device (default: from the model size)
+        avoid: Devices it must not use
+
+    Returns:
+        Request; vLLM images, multi-model images (which fill the device
+        with the models they load on demand), and images of unknown size
+        need whole devices
+    """
+    exclusive = labels.get("ezrunner.engine") == "vllm" or "ezrunner.models" in labels
+    if memory_gb is None:
+        try:
+            size_gb = float(labels["ezrunner.model.size-gb"])
+        except (KeyError, ValueError):
+            return GPURequest(key, gpus, 0.0, exclusive=True, avoid=avoid)
+        memory_gb = size_gb * WEIGHT_OVERHEAD / gpus + RESERVED_GB
+    return GPURequest(key, gpus, round(memory_gb, 2), exclusive, avoid)
+
+
+def plan(
+    requests: list[GPURequest],
+    devices: list[GPUDevice],
+    used: list[Placement] | None = None,
+    previous: dict[str, Placement] | None = None,
+) -> dict[str, Placement]:
+    """Assign GPUs to containers.
+
+    Largest requests are placed first. A container keeps its previous
+    devices if they still fit; otherwise candidate device sets are ranked
+    by NVLink connectivity, then NUMA spread, then best fit (least memory
+    left over).
+
+    Args:
+        requests: Containers to place
+        devices: GPUs of the node
+        used: Placements of containers already running
+        previous: Earlier placements, by key
+
+    Returns:
+        Placement of each request, by key
+
+    Raises:
+        PlacementError: Some request fits on no set of devices
+    """
+    by_index = {device.index: device for device in devices}
+    free = {device.index: device.memory_gb for device in devices}
+    shared: set[int] = set()
+    taken: set[int] = set()
+
+    def claim(placement: Placement) -> None:
+        for index in placement.devices:
+            if index not in free:
+                continue
+            if placement.exclusive:
+                taken.add(index)
+                free[index] = 0.0
+            else:
+                shared.add(index)
+                free[index] -= placement.memory_gb
+
+    def fits(index: int, request: GPURequest) -> bool:
+        if index in taken or index in request.avoid:
+            return False
+        if request.exclusive and index in shared:
+            return False
+        return free[index] >= request.memory_gb
+
+    for placement in used or []:
+        claim(placement)
+
+    placements: dict[str, Placement] = {}
+    ordered = sorted(
+        requests, key=lambda r: (r.exclusive, r.gpus * r.memory_gb), reverse=True
+    )
+    for request in ordered:
+        chosen = _previous(request, (previous or {}).get(request.key), by_index)
+        if chosen is None or not all(fits(index, request) for index in chosen):
+            candidates = [
+                combo
+                for combo in combinations(sorted(free), request.gpus)
+                if all(fits(index, request) for index in combo)
+            ]
+            if not candidates:
+                raise PlacementError(_no_room(request, devices, free, taken))
+            chosen = min(
+                candidates,
+                key=lambda combo: _score(combo, request, by_index, free),
+            )
+        placement = Placement(
+            request.key,
+            chosen,
+            tuple(by_index[index].uuid for index in chosen),
+            request.memory_gb,
+            request.exclusive,
+        )
+        claim(placement)
+        placements[request.key] = placement
+    return placements
+
+
+def _previous(
+    request: GPURequest, placement: Placement | None, by_index: dict[int, GPUDevice]
+) -> tuple[int, ...] | None:
+    """Devices of an earlier placement, if they are still the same GPUs."""
+    if placement is None or len(placement.devices) != request.gpus:
+        return None
+    for index, uuid in zip(placement.devices, placement.uuids, strict=True):
+        if index not in by_index or by_index[index].uuid != uuid:
+            return None
+    return placement.devices
+
+
+def _score(
+    combo: tuple[int, ...],
+    request: GPURequest,
+    by_index: dict[int, GPUDevice],
+    free: dict[int, float],
+) -> tuple[int, int, float, tuple[int, ...]]:
+    """Rank a device set; lower is better."""
+    linked = all(b in by_index[a].nvlink for a, b in combinations(combo, 2))
+    numa_nodes = {by_index[index].numa_node for index in combo}
+    leftover = sum(free[index] - request.memory_gb for index in combo)
+    return (0 if linked else 1, len(numa_nodes), leftover, combo)
+
+
+def _no_room(
+    request: GPURequest,
+    devices: list[GPUDevice],
+    free: dict[int, float],
+    taken: set[int],
+) -> str:
+    """Explain why a request does not fit."""
+    if request.gpus > len(devices):
+        return f"{request.key} needs {request.gpus} GPUs, the node has {len(devices)}"
+    need = "whole GPU" if request.exclusive else f"{request.memory_gb:.1f} GB"
+
+    def status(index: int) -> str:
+        if index in request.avoid:
+            return "has another replica"
+        return "in use" if index in taken else f"{free[index]:.1f} GB free"
+
+    state = ", ".join(f"GPU{index} {status(index)}" for index in sorted(free))
+    return f"{request.key} needs {request.gpus} x {need}; {state}"
+
+
+def probe_gpus(
+    run: Callable[..., subprocess.CompletedProcess[str]] = subprocess.run,
+    sysfs: Path = Path("/sys"),
+) -> list[GPUDevice]:
+    """Probe the node's NVIDIA GPUs and their topology.
+
+    Args:
+        run: Runs ``nvidia-smi`` (for tests)
+        sysfs: Root of sysfs, for NUMA nodes
+
+    Returns:
+        GPUs by index (empty if ``nvidia-smi`` is unavailable)
+    """
+    query = "index,uuid,name,memory.total,pci.bus_id"
+    output = _nvidia_smi(run, f"--query-gpu={query}", "--format=csv,noheader,nounits")
+    if output is None:
+        return []
+    links = _nvlinks(_nvidia_smi(run, "topo", "-m") or "")
+    devices = []
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        index, uuid, name, memory_mib, bus_id = (
+            item.strip() for item in line.split(",")
+        )
+        numa_node = _numa_node(sysfs, bus_id)
+        cpus = None
+        if numa_node is not None:
+            cpus = _read(sysfs / f"devices/system/node/node{numa_node}/cpulist")
+        devices.append(
+            GPUDevice(
+                index=int(index),
+                uuid=uuid,
+                name=name,
+                memory_gb=round(int(memory_mib) * 2**20 / 1e9, 1),
+                numa_node=numa_node,
+                cpus=cpus,
+                nvlink=tuple(sorted(links.get(int(index), ()))),
+            )
+        )
+    return sorted(devices, key=lambda device: device.index)
+
+
+def _nvidia_smi(
+    run: Callable[..., subprocess.CompletedProcess[str]], *args: str
+) -> str | None:
+    """Output of ``nvidia-smi`` (None if it is missing or fails)."""
+    try:
+        return run(
+            ["nvidia-smi", *args],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=10,
+        ).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"nvidia-smi {' '.join(args)} failed: {e}")
+        return None
+
+
+def _nvlinks(topology: str) -> dict[int, set[int]]:
+    """NVLink peers of each GPU, from the ``nvidia-smi topo -m`` matrix."""
+    lines = [_ANSI.sub("", line) for line in topology.splitlines() if line.strip()]
+    if not lines:
+        return {}
+    columns = [name for name in lines[0].split() if re.fullmatch(r"GPU\d+", name)]
+    links: dict[int, set[int]] = {}
+    for line in lines[1:]:
+        cells = line.split()
+        if not re.fullmatch(r"GPU\d+", cells[0]):
+            continue
+        peers = links.setdefault(int(cells[0][3:]), set())
+        for column, cell in zip(columns, cells[1:], strict=False):
+            if cell.startswith("NV"):
+                peers.add(int(column[3:]))
+    return links
+
+
+def _numa_node(sysfs: Path, bus_id: str) -> int | None:
+    """NUMA node of a PCI device (``nvidia-smi`` bus IDs have 8-digit domains)."""
+    try:
+        domain, bus, device = bus_id.lower().split(":")
+    except ValueError:
+        return None
+    value = _read(sysfs / f"bus/pci/devices/{domain[-4:]}:{bus}:{device}/numa_node")
+    if value is None or not value.lstrip("-").isdigit() or int(value) < 0:
+        return None
+    return int(value)
+
+
+def _read(path: Path) -> str | None:
+    """Stripped content of a small file (None if unreadable)."""
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def load_profile(path: Path) -> list[GPUDevice]:
+    """Read a node's GPUs from a profile written by :func:`save_profile`.
+
+    Raises:
+        PlacementError: Unreadable profile
+    """
+    try:
+        entries = json.loads(path.read_text())["gpus"]
+        return [
+            GPUDevice(**{**entry, "nvlink": tuple(entry.get("nvlink", ()))})
+            for entry in entries
+        ]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise PlacementError(f"Invalid GPU profile {path}: {e}") from e
+
+
+def save_profile(path: Path, devices: list[GPUDevice]) -> None:
+    """Write a node's GPUs, for placing containers without probing."""
+    path.write_text(
+        json.dumps({"gpus": [asdict(device) for device in devices]}, indent=2)
+    )
+
+
+def container_options(
+    placement: Placement | None,
+    devices: list[GPUDevice],
+    shm_size: str | None = None,
+) -> dict[str, Any]:
+    """Docker ``containers.run`` options for a placement.
+
+    Args:
+        placement: Assigned GPUs (None for a CPU-only container)
+        devices: GPUs of the node
+        shm_size: Shared memory size (default: 16g with GPUs, else 2g)
+
+    Returns:
+        Device requests, shared memory, ulimits and, when every device
+        is on one NUMA node, CPU and memory pinning to that node
+    """
+    options: dict[str, Any] = {
+        "shm_size": shm_size or (GPU_SHM_SIZE if placement else CPU_SHM_SIZE),
+        "ulimits": [
+            docker.types.Ulimit(name=name, soft=limit, hard=limit)
+            for name, limit in ULIMITS.items()
+        ],
+    }
+    if placement is None:
+        return options
+    options["device_requests"] = [
+        docker.types.DeviceRequest(
+            device_ids=list(placement.uuids), capabilities=[["gpu"]]
+        )
+    ]
+    by_index = {device.index: device for device in devices}
+    placed = [by_index[index] for index in placement.devices if index in by_index]
+    nodes = {device.numa_node for device in placed}
+    if len(nodes) == 1 and None not in nodes and placed[0].cpus:
+        options["cpuset_cpus"] = placed[0].cpus
+        options["cpuset_mems"] = str(placed[0].numa_node)
+    return options
+
+
+class PlacementStore:
+    """Placements recorded across ``ezrunner run`` invocations."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        """Initialize store.
+
+        Args:
+            path: Placement file (default: in the cache directory)
+        """
+        self.path = path or cache_dir() / "placements.json"
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold the store while placing and starting a container."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_name(self.path.name + ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def load(self) -> dict[str, Placement]:
+        """Recorded placements, by key."""
+        try:
+            entries = json.loads(self.path.read_text())["placements"]
+            return {
+                key: Placement(
+                    **{
+                        **entry,
+                        "devices": tuple(entry["devices"]),
+                        "uuids": tuple(entry["uuids"]),
+                    }
+                )
+                for key, entry in entries.items()
+            }
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable placement file {self.path}: {e}")
+            return {}
+
+    def place(
+        self,
+        request: GPURequest,
+        devices: list[GPUDevice],
+        running: Callable[[str], bool],
+    ) -> Placement:
+        """Place a container around the recorded ones still running.
+
+        Args:
+            request: GPUs the container needs
+            devices: GPUs of the node
+            running: Whether a container ID is still running
+
+        Returns:
+            Placement (its previous one, if those GPUs are still free)
+
+        Raises:
+            PlacementError: No room on the node
+        """
+        records = self.load()
+        used = [
+            placement
+            for key, placement in records.items()
+            if key != request.key
+            and placement.container is not None
+            and running(placement.container)
+        ]
+        return plan([request], devices, used, records)[request.key]
+
+    def record(self, placement: Placement, container_id: str) -> None:
+        """Remember the placement of a started container."""
+        records = self.load()
+        records[placement.key] = replace(placement, container=container_id)
+        data = {"placements": {key: asdict(p) for key, p in records.items()}}
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data, indent=2))
+        os.replace(tmp, self.path)
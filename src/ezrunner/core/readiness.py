@@ -0,0 +1,88 @@
+"""Model server readiness probe module."""
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+import requests
+
+from ezrunner.exceptions import StartupError
+from ezrunner.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ReadinessProbe:
+    """Poll a packed model server's ``/ready`` endpoint."""
+
+    def __init__(
+        self,
+        url: str,
+        interval: float = 1.0,
+        session: requests.Session | None = None,
+    ) -> None:
+        """Initialize probe.
+
+        Args:
+            url: Server base URL (e.g., ``http://localhost:8080``)
+            interval: Seconds between polls
+            session: HTTP session (default: a new one)
+        """
+        self.url = url.rstrip("/") + "/ready"
+        self.interval = interval
+        self.session = session or requests.Session()
+
+    def check(self) -> dict[str, Any] | None:
+        """Fetch the server's startup status.
+
+        Returns:
+            Status reported by the server (``status``, ``phase`` and
+            ``phases``), or None while it is not accepting connections
+        """
+        try:
+            response = self.session.get(self.url, timeout=5)
+            status = response.json()
+        except (requests.RequestException, ValueError) as e:
+            logger.debug(f"Server not reachable yet: {e}")
+            return None
+        if not isinstance(status, dict):
+            logger.debug(f"Unexpected readiness response: {status!r}")
+            return None
+        return status
+
+    def wait(
+        self,
+        timeout: float,
+        alive: Callable[[], bool] | None = None,
+        on_status: Callable[[dict[str, Any] | None], None] | None = None,
+    ) -> dict[str, Any]:
+        """Block until the server is ready.
+
+        Args:
+            timeout: Maximum seconds to wait
+            alive: Returns False once the server's container has exited
+            on_status: Called with every status that is not ready yet
+
+        Returns:
+            Status of the ready server, with startup phase timings
+
+        Raises:
+            StartupError: Startup failed, the container exited or the
+                timeout expired
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            status = self.check()
+            if status is not None and status.get("status") == "ready":
+                return status
+            if status is not None and status.get("status") == "failed":
+                raise StartupError(
+                    f"Model server failed to start: {status.get('error')}"
+                )
+            if alive is not None and not alive():
+                raise StartupError("Container exited before the server was ready")
+            if time.monotonic() >= deadline:
+                raise StartupError(f"Model server not ready after {timeout:g}s")
+            if on_status is not None:
+                on_status(status)
+            time.sleep(self.interval)
@@ -0,0 +1,96 @@
+"""Output sinks for streamed image exports.
+
+A sink is where ``ezrunner pack`` streams the ``docker save`` output when
+it should not be staged as a regular file: stdout (``-``), a named pipe,
+or a local socket (``unix:/path/to.sock``). Further schemes can be added
+with :func:`register_sink`.
+"""
+
+import os
+import socket
+import stat
+import sys
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import BinaryIO
+
+from ezrunner.exceptions import DockerError
+
+SinkOpener = Callable[[str], BinaryIO]
+
+_SINKS: dict[str, SinkOpener] = {}
+
+
+def register_sink(scheme: str, opener: SinkOpener) -> None:
+    """Register a sink for ``<scheme>:<target>`` outputs.
+
+    Args:
+        scheme: URL-style scheme (e.g., "unix")
+        opener: Function opening a writable binary stream for a target
+    """
+    _SINKS[scheme] = opener
+
+
+def is_sink(output: Path) -> bool:
+    """Check if an output refers to a stream sink rather than a regular file."""
+    name = str(output)
+    if name == "-" or name.partition(":")[0] in _SINKS:
+        return True
+    try:
+        mode = output.stat().st_mode
+    except OSError:
+        return False
+    return stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode)
+
+
+@contextmanager
+def open_sink(output: Path) -> Iterator[BinaryIO]:
+    """Open a stream sink for writing.
+
+    Args:
+        output: "-", "<scheme>:<target>", a named pipe or a socket path
+
+    Yields:
+        Writable binary stream
+
+    Raises:
+        DockerError: Sink could not be opened
+    """
+    name = str(output)
+    if name == "-":
+        # Never close stdout; the caller's process still owns it.
+        yield sys.stdout.buffer
+        sys.stdout.buffer.flush()
+        return
+
+    scheme, _, target = name.partition(":")
+    with ExitStack() as stack:
+        try:
+            if scheme in _SINKS:
+                stream = stack.enter_context(_SINKS[scheme](target))
+            elif stat.S_ISSOCK(os.stat(output).st_mode):
+                stream = stack.enter_context(_open_unix(name))
+            else:
+                # Named pipe: open() blocks until a reader attaches.
+                stream = stack.enter_context(open(output, "wb"))
+        except OSError as e:
+            raise DockerError(f"Cannot open output {name}: {e}") from e
+        yield stream
+
+
+def _open_unix(path: str) -> BinaryIO:
+    """Connect to a Unix stream socket."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    stream = sock.makefile("wb")
+    # makefile() holds its own reference; closing the stream closes the socket.
+    sock.close()
+    return stream
+
+
+register_sink("unix", _open_unix)
@@ -0,0 +1,263 @@
+"""Serving parameter sweep module.
+
+``ezrunner tune`` starts a packed image once per point of a grid of
+server settings, measures each under the same synthetic load and keeps
+the configuration with the highest throughput that meets a latency SLO.
+The winner is written to a tuning file next to the archive, which
+``ezrunner run`` applies to the image it was measured on.
+"""
+
+import itertools
+import json
+import os
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import docker
+
+from ezrunner.core.loadgen import LoadStats
+from ezrunner.core.readiness import ReadinessProbe
+from ezrunner.exceptions import StartupError
+from ezrunner.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Settings swept by default, per engine (``ezrunner.engine`` image label).
+# vLLM's front end does not batch, so only its concurrency limit matters.
+DEFAULT_GRIDS: dict[str, dict[str, list[str]]] = {
+    "transformers": {
+        "EZRUNNER_MAX_BATCH_SIZE": ["4", "8", "16", "32"],
+        "EZRUNNER_MAX_WAIT_MS": ["2", "10", "25"],
+    },
+    "vllm": {
+        "EZRUNNER_MAX_BATCH_SIZE": ["16", "32", "64", "128", "256"],
+    },
+}
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    """Measurement of one grid point.
+
+    Attributes:
+        settings: Server settings of the point
+        stats: Load statistics (None if the server did not start)
+        error: Why the point could not be measured
+    """
+
+    settings: dict[str, str]
+    stats: LoadStats | None = None
+    error: str | None = None
+
+    def meets(self, max_p95_s: float) -> bool:
+        """Whether every request succeeded within the latency SLO."""
+        return (
+            self.stats is not None
+            and self.stats.errors == 0
+            and self.stats.latency(0.95) <= max_p95_s
+        )
+
+    def summary(self) -> dict[str, Any]:
+        """JSON-serializable summary of the measurement."""
+        summary: dict[str, Any] = {"settings": self.settings}
+        if self.stats is not None:
+            summary.update(
+                throughput_tok_s=round(self.stats.throughput_tok_s, 2),
+                p50_s=round(self.stats.latency(0.5), 4),
+                p95_s=round(self.stats.latency(0.95), 4),
+                errors=self.stats.errors,
+            )
+        if self.error is not None:
+            summary["error"] = self.error
+        return summary
+
+
+def grid_points(grid: dict[str, list[str]]) -> list[dict[str, str]]:
+    """Every combination of the grid's values, in order."""
+    names = list(grid)
+    return [
+        dict(zip(names, values, strict=True))
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+def best(results: list[SweepResult], max_p95_s: float) -> SweepResult | None:
+    """Highest-throughput result meeting the latency SLO.
+
+    Args:
+        results: Sweep results
+        max_p95_s: Maximum 95th percentile request latency in seconds
+
+    Returns:
+        Best result, or None if no point meets the SLO
+    """
+    eligible = [r for r in results if r.meets(max_p95_s)]
+    if not eligible:
+        return None
+    return max(eligible, key=lambda r: r.stats.throughput_tok_s)  # type: ignore[union-attr]
+
+
+class ParameterSweep:
+    """Measure a server under load at each point of a settings grid."""
+
+    def __init__(
+        self,
+        launch: Callable[[dict[str, str]], AbstractContextManager[str]],
+        load: Callable[[str], LoadStats],
+    ) -> None:
+        """Initialize sweep.
+
+        Args:
+            launch: Start a server with the given settings, yielding its
+                base URL once ready and stopping it on exit
+            load: Run the load against a server URL
+        """
+        self.launch = launch
+        self.load = load
+
+    def run(
+        self,
+        points: list[dict[str, str]],
+        on_result: Callable[[SweepResult], None] | None = None,
+    ) -> list[SweepResult]:
+        """Measure every point.
+
+        A point whose server fails to start (e.g. out of GPU memory at a
+        large batch size) is recorded as failed and the sweep continues.
+
+        Args:
+            points: Settings to measure
+            on_result: Called with each result as it completes
+
+        Returns:
+            Results, in the order of ``points``
+        """
+        results = []
+        for settings in points:
+            try:
+                with self.launch(settings) as url:
+                    result = SweepResult(settings, stats=self.load(url))
+            except StartupError as e:
+                logger.warning(f"Skipping {settings}: {e}")
+                result = SweepResult(settings, error=str(e))
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+        return results
+
+
+class ContainerLauncher:
+    """Start a packed image as a container for each sweep point."""
+
+    def __init__(
+        self, client: Any, image: str, port: int = 8080, timeout: float = 900.0
+    ) -> None:
+        """Initialize launcher.
+
+        Args:
+            client: Docker client
+            image: Image tag
+            port: Port the image serves on, published on the host
+            timeout: Seconds to wait for each container to become ready
+        """
+        self.client = client
+        self.image = image
+        self.port = port
+        self.timeout = timeout
+
+    @contextmanager
+    def launch(self, settings: dict[str, str]) -> Iterator[str]:
+        """Run the image with ``settings`` until the context exits.
+
+        Yields:
+            Base URL of the ready server
+
+        Raises:
+            StartupError: The server did not become ready
+        """
+        container = self.client.containers.run(
+            self.image,
+            detach=True,
+            ports={f"{self.port}/tcp": self.port},
+            environment=settings,
+            remove=True,
+        )
+        url = f"http://localhost:{self.port}"
+
+        def alive() -> bool:
+            try:
+                container.reload()
+            except docker.errors.NotFound:
+                return False
+            return container.status in ("created", "running")
+
+        try:
+            ReadinessProbe(url).wait(self.timeout, alive=alive)
+            yield url
+        finally:
+            try:
+                container.stop()
+            except docker.errors.APIError as e:
+                logger.debug(f"Container already gone: {e}")
+
+
+def tuning_path(archive: Path) -> Path:
+    """Tuning file kept next to an archive (or image-layout directory)."""
+    archive = archive.resolve()
+    return archive.with_name(archive.name + ".tuning.json")
+
+
+def save_tuning(archive: Path, image_id: str, entry: dict[str, Any]) -> Path:
+    """Record tuned settings for an image of an archive.
+
+    Entries are keyed by image ID, so repacking the archive (which
+    produces a new image) leaves stale settings unused.
+
+    Args:
+        archive: Archive the image was loaded from
+        image_id: ID of the tuned image
+        entry: Tuning record, with the winning ``settings``
+
+    Returns:
+        Path of the tuning file
+    """
+    path = tuning_path(archive)
+    images = _read_tuning(path)
+    images[image_id] = entry
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps({"images": images}, indent=2))
+    os.replace(tmp, path)
+    return path
+
+
+def load_tuning(archive: Path, image_id: str) -> dict[str, str]:
+    """Tuned settings recorded for an image of an archive.
+
+    Args:
+        archive: Archive the image was loaded from
+        image_id: Image ID
+
+    Returns:
+        Server settings (empty if the image was never tuned)
+    """
+    entry = _read_tuning(tuning_path(archive)).get(image_id, {})
+    return dict(entry.get("settings", {}))
+
+
+def _read_tuning(path: Path) -> dict[str, Any]:
+    """Tuning entries of a tuning file, by image ID."""
+    try:
+        document = json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable tuning file {path}: {e}")
+        return {}
+    images = document.get("images", {}) if isinstance(document, dict) else None
+    if not isinstance(images, dict):
+        logger.warning(f"Ignoring tuning file {path}: no 'images' mapping")
+        return {}
+    return images
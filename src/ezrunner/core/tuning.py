@@ -0,0 +1,171 @@
+"""vLLM tuning module."""
+
+from dataclasses import dataclass
+
+from ezrunner.models.engine import Engine
+from ezrunner.models.hardware import Hardware
+from ezrunner.models.model_info import ModelInfo
+
+# GPU memory kept out of vLLM's pool for the CUDA context, activations
+# and CUDA graphs
+RESERVED_GB = 2.0
+# KV cache bytes per token per GB of fp16 weights with full multi-head
+# attention (Llama-2-7B: 512 KiB per token for 13.5 GB). Grouped-query
+# models need several times less, so the estimate errs on the safe side.
+KV_BYTES_PER_TOKEN_PER_GB = 40 * 1024
+# Context length range the KV cache is sized for
+MIN_MODEL_LEN = 2048
+MAX_MODEL_LEN = 32768
+# Tokens a typical sequence holds (prompt and completion)
+TYPICAL_SEQUENCE_TOKENS = 2048
+# Concurrent sequence range
+MIN_NUM_SEQS = 8
+MAX_NUM_SEQS = 256
+
+
+@dataclass(frozen=True)
+class VLLMTuning:
+    """vLLM engine arguments for a model on target hardware.
+
+    Attributes:
+        gpu_memory_utilization: Fraction of GPU memory vLLM may use
+        max_model_len: Longest sequence (prompt and completion) in tokens
+        max_num_seqs: Maximum number of sequences decoded together
+        max_num_batched_tokens: Token budget of one scheduler step
+        kv_cache_dtype: KV cache data type ("auto" or "fp8")
+        enable_chunked_prefill: Split long prompts across steps
+        enable_prefix_caching: Reuse KV cache blocks of shared prompt prefixes
+    """
+
+    gpu_memory_utilization: float
+    max_model_len: int
+    max_num_seqs: int
+    max_num_batched_tokens: int
+    kv_cache_dtype: str
+    enable_chunked_prefill: bool
+    enable_prefix_caching: bool
+
+    def settings(self) -> dict[str, str]:
+        """Server settings (environment variables) applying the tuning."""
+        return {
+            "EZRUNNER_MAX_BATCH_SIZE": str(self.max_num_seqs),
+            "EZRUNNER_VLLM_GPU_MEMORY_UTILIZATION": f"{self.gpu_memory_utilization:g}",
+            "EZRUNNER_VLLM_MAX_MODEL_LEN": str(self.max_model_len),
+            "EZRUNNER_VLLM_MAX_NUM_BATCHED_TOKENS": str(self.max_num_batched_tokens),
+            "EZRUNNER_VLLM_KV_CACHE_DTYPE": self.kv_cache_dtype,
+            "EZRUNNER_VLLM_ENABLE_CHUNKED_PREFILL": str(self.enable_chunked_prefill),
+            "EZRUNNER_VLLM_ENABLE_PREFIX_CACHING": str(self.enable_prefix_caching),
+        }
+
+
+class VLLMTuner:
+    """Derive vLLM engine arguments from the target hardware."""
+
+    def tune(self, model: ModelInfo, hardware: Hardware) -> VLLMTuning:
+        """Size vLLM's KV cache and batching for one GPU of the target.
+
+        Tuning logic:
+        1. Give vLLM all GPU memory but a fixed reserve
+        2. Estimate KV cache capacity in tokens from what the weights leave
+        3. If fewer than MIN_NUM_SEQS short sequences fit -> fp8 KV cache
+        4. Context length: at least 4 full-length sequences fit
+        5. Concurrent sequences: as many typical sequences as fit
+        6. Prompts longer than the step budget -> chunked prefill
+
+        The context length is capped again at startup to what the model
+        supports.
+
+        Args:
+            model: Model information
+            hardware: Hardware specifications (must have a GPU)
+
+        Returns:
+            vLLM tuning
+        """
+        gpu_gb = hardware.gpu_memory_gb
+        utilization = min(max(1.0 - RESERVED_GB / gpu_gb, 0.80), 0.95)
+        utilization = int(utilization * 100) / 100
+
+        kv_gb = max(gpu_gb * utilization - model.size_gb, 0.0)
+        bytes_per_token = model.size_gb * KV_BYTES_PER_TOKEN_PER_GB
+        capacity = int(kv_gb * 1e9 / bytes_per_token)
+        kv_cache_dtype = "auto"
+        if capacity < MIN_NUM_SEQS * MIN_MODEL_LEN:
+            # fp8 halves the KV cache footprint
+            kv_cache_dtype = "fp8"
+            capacity *= 2
+
+        max_model_len = _clamp(_floor_pow2(capacity // 4), MIN_MODEL_LEN, MAX_MODEL_LEN)
+        max_num_seqs = _clamp(
+            _floor_pow2(capacity // TYPICAL_SEQUENCE_TOKENS), MIN_NUM_SEQS, MAX_NUM_SEQS
+        )
+        # Larger GPUs have the compute for larger steps
+        if gpu_gb >= 48:
+            step_tokens = 8192
+        elif gpu_gb >= 24:
+            step_tokens = 4096
+        else:
+            step_tokens = 2048
+
+        return VLLMTuning(
+            gpu_memory_utilization=utilization,
+            max_model_len=max_model_len,
+            max_num_seqs=max_num_seqs,
+            max_num_batched_tokens=step_tokens,
+            kv_cache_dtype=kv_cache_dtype,
+            enable_chunked_prefill=max_model_len > step_tokens,
+            enable_prefix_caching=True,
+        )
+
+
+def server_settings(
+    model: ModelInfo,
+    hardware: Hardware,
+    engine: Engine,
+    max_batch_size: int | None = None,
+    max_wait_ms: float = 10.0,
+    response_cache: int = 0,
+    response_cache_ttl: float = 3600.0,
+    warmup: str = "32,512",
+) -> tuple[dict[str, str], VLLMTuning | None]:
+    """Server settings a pack bakes into the image.
+
+    Args:
+        model: Model information
+        hardware: Target hardware
+        engine: Selected engine
+        max_batch_size: Maximum requests decoded together (default: 8,
+            or sized to the target GPU for vLLM)
+        max_wait_ms: How long an idle server waits to fill a batch
+        response_cache: Cached temperature-0 responses (0 disables)
+        response_cache_ttl: Seconds a cached response stays valid
+        warmup: Comma-separated prompt lengths to warm up with
+
+    Returns:
+        Settings (environment variables), and the vLLM tuning they
+        include (None unless vLLM on a GPU)
+    """
+    settings = {
+        "EZRUNNER_MAX_BATCH_SIZE": "8",
+        "EZRUNNER_MAX_WAIT_MS": f"{max_wait_ms:g}",
+        "EZRUNNER_RESPONSE_CACHE_SIZE": str(response_cache),
+        "EZRUNNER_RESPONSE_CACHE_TTL": f"{response_cache_ttl:g}",
+        "EZRUNNER_WARMUP_PROMPT_TOKENS": warmup,
+    }
+    tuning = None
+    if engine == Engine.VLLM and hardware.has_gpu:
+        tuning = VLLMTuner().tune(model, hardware)
+        settings.update(tuning.settings())
+    if max_batch_size is not None:
+        settings["EZRUNNER_MAX_BATCH_SIZE"] = str(max_batch_size)
+    return settings, tuning
+
+
+def _floor_pow2(n: int) -> int:
+    """Largest power of two not above ``n`` (0 for ``n`` < 1)."""
+    return 1 << (n.bit_length() - 1) if n >= 1 else 0
+
+
+def _clamp(n: int, low: int, high: int) -> int:
+    """Limit ``n`` to ``[low, high]``."""
+    return min(max(n, low), high)
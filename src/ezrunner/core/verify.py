@@ -0,0 +1,117 @@
+"""Image archive verification module.
+
+Checks a packed archive (or OCI layout directory) end to end before it is
+shipped: every image config must hash to the image ID, and every layer to
+the diff ID its config records. Unlike the rest of the archive helpers
+this reads all the data, so it is as slow as reading the archive once.
+"""
+
+import hashlib
+import json
+import tarfile
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+
+from ezrunner.core.archive import (
+    CHUNK_SIZE,
+    ArchiveImage,
+    open_member,
+    read_manifest,
+    resolve_member,
+)
+from ezrunner.core.layout import ImageLayout
+from ezrunner.exceptions import ArchiveError
+
+
+@dataclass(frozen=True)
+class VerifyStats:
+    """Result of a successful verification.
+
+    Attributes:
+        images: Images checked
+        layers: Distinct layers hashed
+        bytes_read: Bytes hashed
+    """
+
+    images: int
+    layers: int
+    bytes_read: int
+
+
+def verify_archive(path: Path) -> VerifyStats:
+    """Check every image of an archive against its digests.
+
+    Args:
+        path: ``docker save`` archive or bundle, or OCI layout directory
+
+    Returns:
+        What was checked
+
+    Raises:
+        ArchiveError: Unreadable, or some data does not match its digest
+    """
+    try:
+        if path.is_dir():
+            layout = ImageLayout(path)
+            return _verify(layout.read_images(), lambda name: open(path / name, "rb"))
+        images = read_manifest(path)
+        with tarfile.open(path, "r:") as tar:
+            return _verify(
+                images,
+                lambda name: open_member(tar, name),
+                lambda name: resolve_member(tar, name),
+            )
+    except (OSError, tarfile.TarError, KeyError, ValueError) as e:
+        raise ArchiveError(f"Invalid image archive {path}: {e}") from e
+
+
+def _verify(
+    images: list[ArchiveImage],
+    open_file: Callable[[str], IO[bytes]],
+    resolve: Callable[[str], str] = str,
+) -> VerifyStats:
+    """Hash the configs and layers of ``images``.
+
+    Args:
+        images: Images to check
+        open_file: Opens a file of the archive
+        resolve: Canonical name of a file, so data stored once (bundle
+            layers linked from several images) is hashed once
+    """
+    digests: dict[str, str] = {}
+    bytes_read = 0
+
+    def digest(name: str) -> str:
+        nonlocal bytes_read
+        name = resolve(name)
+        if name not in digests:
+            hasher = hashlib.sha256()
+            with open_file(name) as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    hasher.update(chunk)
+                    bytes_read += len(chunk)
+            digests[name] = f"sha256:{hasher.hexdigest()}"
+        return digests[name]
+
+    for image in images:
+        name = ", ".join(image.repo_tags) or image.image_id
+        if digest(image.config) != image.image_id:
+            raise ArchiveError(f"{name}: config does not match the image ID")
+        with open_file(image.config) as f:
+            config = json.load(f)
+        diff_ids = config.get("rootfs", {}).get("diff_ids")
+        if diff_ids is not None and len(diff_ids) != len(image.layers):
+            raise ArchiveError(
+                f"{name}: {len(image.layers)} layers, config lists {len(diff_ids)}"
+            )
+        for i, layer in enumerate(image.layers):
+            actual = digest(layer)
+            if diff_ids is not None and actual != diff_ids[i]:
+                raise ArchiveError(
+                    f"{name}: layer {layer} is corrupt "
+                    f"(expected {diff_ids[i]}, got {actual})"
+                )
+    layers = len(digests) - len({resolve(image.config) for image in images})
+    return VerifyStats(len(images), layers, bytes_read)
@@ -23,3 +23,33 @@ class BuildError(EZRunnerError):
     """Image build error."""
 
     pass
+
+
+class ArchiveError(EZRunnerError):
+    """Image archive error."""
+
+    pass
+
+
+class StartupError(EZRunnerError):
+    """Model server failed to become ready."""
+
+    pass
+
+
+class ManifestError(EZRunnerError):
+    """Invalid batch manifest."""
+
+    pass
+
+
+class DaemonError(EZRunnerError):
+    """Pack daemon unreachable or request rejected."""
+
+    pass
+
+
+class PlacementError(EZRunnerError):
+    """No GPUs can host a container."""
+
+    pass
@@ -1,6 +1,6 @@
 """Model metadata."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 
 @dataclass(frozen=True)
@@ -13,6 +13,10 @@ class ModelInfo:
         format: Model format ("safetensors" or "pytorch")
         repo_type: Repository type ("modelscope" or "huggingface")
         architecture: Model architecture (e.g., "qwen2", "llama")
+        revision: Resolved commit SHA, or a digest of the file listing when
+            the repository does not report one
+        converted_from: Original checkpoint format when the packed image
+            stores converted weights (e.g., "pytorch")
     """
 
     model_id: str
@@ -20,6 +24,8 @@ class ModelInfo:
     format: str
     repo_type: str
     architecture: str
+    revision: str | None = None
+    converted_from: str | None = None
 
     def __post_init__(self) -> None:
         """Validate model info."""
@@ -29,3 +35,16 @@ class ModelInfo:
             raise ValueError(f"Unsupported format: {self.format}")
         if self.repo_type not in ("modelscope", "huggingface"):
             raise ValueError(f"Unsupported repo type: {self.repo_type}")
+        if self.converted_from not in (None, "pytorch"):
+            raise ValueError(f"Unsupported source format: {self.converted_from}")
+
+    def with_safetensors(self) -> "ModelInfo":
+        """Model info for an image storing the weights as safetensors.
+
+        Returns:
+            This model info if the weights already are safetensors, else a
+            copy recording the conversion from the original format
+        """
+        if self.format == "safetensors":
+            return self
+        return replace(self, format="safetensors", converted_from=self.format)
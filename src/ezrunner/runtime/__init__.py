@@ -0,0 +1,13 @@
+"""Inference server runtime shipped inside packed images.
+
+This package is copied into the image as ``ezrunner_runtime`` and started
+with ``python3 -m ezrunner_runtime.server``. It only uses relative imports
+and must run on the image's Python (3.10 on Ubuntu 22.04). FastAPI and
+torch are imported where they are needed, so the host CLI never needs
+them.
+"""
+
+from pathlib import Path
+
+RUNTIME_DIR = Path(__file__).parent
+RUNTIME_PACKAGE = "ezrunner_runtime"
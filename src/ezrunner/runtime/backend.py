@@ -0,0 +1,476 @@
+"""Transformers model backend.
+
+The running batch keeps one KV cache, each sequence a row of it,
+left-padded to the longest sequence. A decode step runs one forward pass
+for the whole batch and grows that cache in place of re-batching it.
+Sequences can join and leave between any two steps: the cache is
+re-padded only when they do, keeping the rows of the sequences still
+running and adding those of newly prefilled ones. Prefill starts from
+the KV cache of the longest cached prompt prefix, if any.
+
+In multi-model images a backend can be parked: its weights move to
+pinned (page-locked) CPU memory, from which ``resume`` copies them back
+by DMA at full PCIe bandwidth instead of reloading them from disk.
+"""
+
+import gc
+import inspect
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import torch
+import torch.nn.functional as F  # noqa: N812
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from .metrics import Registry
+from .prefix_cache import PrefixCache
+from .scheduler import Sequence
+from .weights import weight_files
+
+logger = logging.getLogger(__name__)
+
+KVCache = tuple[tuple[torch.Tensor, torch.Tensor], ...]
+
+
+@dataclass
+class _Batch:
+    """KV cache of the running batch.
+
+    Row ``i`` holds ``sequences[i]``, left-padded to ``width`` positions.
+    """
+
+    sequences: list[Sequence]
+    cache: KVCache
+    width: int
+
+
+@dataclass
+class _SequenceState:
+    """Backend state of one sequence.
+
+    ``cache`` holds the sequence's own KV cache from prefill until it
+    joins the running batch's cache (None from then on).
+    """
+
+    cache: KVCache | None
+    length: int
+    tokens: list[int] = field(default_factory=list)
+    prefix_offset: int = 0
+    read_offset: int = 0
+
+
+class TransformersBackend:
+    """Generate with a Hugging Face causal language model."""
+
+    def __init__(
+        self, model: Any, tokenizer: Any, prefix_cache: PrefixCache | None = None
+    ) -> None:
+        """Initialize backend.
+
+        Args:
+            model: Causal LM using the standard per-layer (key, value) cache
+            tokenizer: Matching tokenizer
+            prefix_cache: Cache of prompt-prefix KV caches (default: none)
+        """
+        self.model = model
+        self.tokenizer = tokenizer
+        self.prefix_cache = prefix_cache
+        self.device = model.device
+        self.pad_token_id = _first_id(tokenizer.pad_token_id, tokenizer.eos_token_id, 0)
+        self.eos_token_ids = {
+            token_id
+            for ids in (tokenizer.eos_token_id, model.generation_config.eos_token_id)
+            for token_id in (ids if isinstance(ids, list) else [ids])
+            if token_id is not None
+        }
+        self.max_length = getattr(model.config, "max_position_embeddings", None)
+        self._position_ids = (
+            "position_ids" in inspect.signature(model.forward).parameters
+        )
+        # Seconds spent in each step of ``load``
+        self.load_timings: dict[str, float] = {}
+        # Device of each tensor while parked on the CPU
+        self._parked: list[torch.device] | None = None
+        self._batch: _Batch | None = None
+
+    @classmethod
+    def load(cls, model_path: str, prefix_cache_mb: int = 0) -> "TransformersBackend":
+        """Load a model saved with ``save_pretrained``.
+
+        Safetensors weights are memory-mapped and copied straight to their
+        device, without materializing a CPU copy of the model first.
+
+        Args:
+            model_path: Model directory
+            prefix_cache_mb: Prefix cache budget in MB (0 disables it)
+
+        Returns:
+            Backend for the model
+        """
+        started = time.perf_counter()
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
+        tokenized = time.perf_counter()
+        safetensors = any(
+            path.suffix == ".safetensors" for path in weight_files(model_path)
+        )
+        model = AutoModelForCausalLM.from_pretrained(
+            model_path,
+            device_map="auto",
+            torch_dtype="auto",
+            low_cpu_mem_usage=True,
+            use_safetensors=safetensors or None,
+        )
+        model.eval()
+        prefix_cache = None
+        if prefix_cache_mb > 0:
+            prefix_cache = PrefixCache(prefix_cache_mb * 1024 * 1024)
+        backend = cls(model, tokenizer, prefix_cache)
+        backend.load_timings = {
+            "tokenizer": tokenized - started,
+            "weights": time.perf_counter() - tokenized,
+        }
+        return backend
+
+    def stats(self) -> dict[str, Any]:
+        """Counters for monitoring."""
+        if self.prefix_cache is None:
+            return {}
+        return {"prefix_cache": self.prefix_cache.stats()}
+
+    def register_metrics(self, registry: Registry) -> None:
+        """Expose prefix cache and GPU memory metrics."""
+        if self.prefix_cache is not None:
+            self.prefix_cache.register_metrics(registry)
+        if torch.cuda.is_available():
+            registry.gauge(
+                "ezrunner_gpu_memory_allocated_bytes",
+                "GPU memory held by tensors",
+                function=torch.cuda.memory_allocated,
+            )
+            registry.gauge(
+                "ezrunner_gpu_memory_reserved_bytes",
+                "GPU memory reserved by the caching allocator",
+                function=torch.cuda.memory_reserved,
+            )
+
+    @property
+    def memory_bytes(self) -> int:
+        """Memory held by the model's weights."""
+        return sum(t.numel() * t.element_size() for t in self._tensors())
+
+    def park(self) -> None:
+        """Move the weights to pinned CPU memory, freeing the GPU.
+
+        The prefix cache and the batch's KV cache are dropped: they live
+        on the GPU.
+        """
+        if self._parked is not None:
+            return
+        if self.prefix_cache is not None:
+            self.prefix_cache.clear()
+        self._batch = None
+        tensors = self._tensors()
+        self._parked = [tensor.device for tensor in tensors]
+        pin = torch.cuda.is_available()
+        for tensor in tensors:
+            data = tensor.data.to("cpu")
+            tensor.data = data.pin_memory() if pin else data
+        _free_cuda()
+
+    def resume(self) -> None:
+        """Move parked weights back to their devices."""
+        if self._parked is None:
+            return
+        for tensor, device in zip(self._tensors(), self._parked, strict=True):
+            tensor.data = tensor.data.to(device, non_blocking=True)
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+        self._parked = None
+
+    def unload(self) -> None:
+        """Free the model's memory; the backend is unusable afterwards."""
+        if self.prefix_cache is not None:
+            self.prefix_cache.clear()
+        self._batch = None
+        self.model = None
+        _free_cuda()
+
+    def format_prompt(self, messages: list[dict[str, Any]]) -> str:
+        """Render chat messages with the tokenizer's chat template.
+
+        Falls back to the last message's content for tokenizers without a
+        usable template.
+        """
+        try:
+            prompt: str = self.tokenizer.apply_chat_template(
+                messages, tokenize=False, add_generation_prompt=True
+            )
+        except Exception as e:
+            logger.debug(f"No chat template, using the last message: {e}")
+            return str(messages[-1].get("content", ""))
+        return prompt
+
+    @torch.inference_mode()
+    def prefill(self, sequences: list[Sequence]) -> None:
+        """Run the prompts as one batch, resuming from cached prefixes.
+
+        Row ``i`` of the batch is laid out as ``[pad][cached prefix]`` in
+        the past KV cache followed by ``[pad][remaining prompt]`` as input;
+        the attention mask hides both paddings.
+        """
+        if self._batch is not None and all(
+            sequence.state is None for sequence in self._batch.sequences
+        ):
+            # Every row left (the scheduler clears their state): free it
+            self._batch = None
+        prompts = [self._encode(sequence.request.prompt) for sequence in sequences]
+        matches = [self._match(prompt) for prompt in prompts]
+        cached = [length for length, _ in matches]
+        inputs = [prompt[n:] for prompt, n in zip(prompts, cached, strict=True)]
+        past_width = max(cached)
+        width = max(len(tokens) for tokens in inputs)
+
+        input_ids = torch.tensor(
+            [[self.pad_token_id] * (width - len(t)) + t for t in inputs],
+            device=self.device,
+        )
+        attention_mask = torch.tensor(
+            [
+                [0] * (past_width - n) + [1] * n + [0] * (width - len(t)) + [1] * len(t)
+                for n, t in zip(cached, inputs, strict=True)
+            ],
+            device=self.device,
+        )
+        position_ids = torch.tensor(
+            [
+                [0] * (width - len(t)) + list(range(n, n + len(t)))
+                for n, t in zip(cached, inputs, strict=True)
+            ],
+            device=self.device,
+        )
+        past = None
+        if past_width:
+            past = _stack([kv for _, kv in matches], cached, past_width)
+        logits, cache = self._forward(input_ids, attention_mask, position_ids, past)
+
+        for i, sequence in enumerate(sequences):
+            spans = [
+                slice(past_width - cached[i], past_width),
+                slice(past_width + width - len(inputs[i]), None),
+            ]
+            sequence.prompt_tokens = len(prompts[i])
+            sequence.cached_tokens = cached[i]
+            sequence.state = _SequenceState(
+                cache=_extract(cache, i, spans if cached[i] else spans[1:]),
+                length=len(prompts[i]),
+            )
+            self._remember(prompts[i], cached[i], sequence.state.cache)
+        self._advance(sequences, logits[:, -1, :])
+
+    @torch.inference_mode()
+    def decode(self, sequences: list[Sequence]) -> None:
+        """Feed each sequence's last token against the batch's cache."""
+        batch = self._batched(sequences)
+        states: list[_SequenceState] = [sequence.state for sequence in sequences]
+        lengths = [state.length for state in states]
+        width = batch.width
+
+        input_ids = torch.tensor([[s.tokens[-1]] for s in states], device=self.device)
+        attention_mask = torch.tensor(
+            [[0] * (width - n) + [1] * (n + 1) for n in lengths], device=self.device
+        )
+        position_ids = torch.tensor([[n] for n in lengths], device=self.device)
+        logits, batch.cache = self._forward(
+            input_ids, attention_mask, position_ids, batch.cache
+        )
+        batch.width += 1
+        for state in states:
+            state.length += 1
+        self._advance(sequences, logits[:, -1, :])
+        if all(sequence.finished for sequence in sequences):
+            self._batch = None
+
+    def _batched(self, sequences: list[Sequence]) -> _Batch:
+        """The batch's cache, re-padded if sequences joined or left it."""
+        batch = self._batch
+        if (
+            batch is not None
+            and len(batch.sequences) == len(sequences)
+            and all(a is b for a, b in zip(batch.sequences, sequences, strict=True))
+        ):
+            return batch
+
+        rows: dict[Sequence, int] = {}
+        running: KVCache = ()
+        running_width = 0
+        if batch is not None:
+            rows = {sequence: i for i, sequence in enumerate(batch.sequences)}
+            running, running_width = batch.cache, batch.width
+        caches: list[KVCache | None] = []
+        for sequence in sequences:
+            state: _SequenceState = sequence.state
+            if state.cache is None:
+                # Already in the batch: its row, without the left padding
+                start = running_width - state.length
+                state.cache = _extract(running, rows[sequence], [slice(start, None)])
+            caches.append(state.cache)
+        lengths = [sequence.state.length for sequence in sequences]
+        width = max(lengths)
+        self._batch = _Batch(list(sequences), _stack(caches, lengths, width), width)
+        for sequence in sequences:
+            sequence.state.cache = None
+        return self._batch
+
+    def _tensors(self) -> list[torch.Tensor]:
+        """Parameters and buffers of the model (shared ones once)."""
+        return [*self.model.parameters(), *self.model.buffers()]
+
+    def _match(self, prompt: list[int]) -> tuple[int, KVCache | None]:
+        """Longest cached prefix of a prompt and its KV cache."""
+        if self.prefix_cache is None:
+            return 0, None
+        length, cache = self.prefix_cache.match(prompt)
+        if cache is None:
+            return 0, None
+        return length, tuple((k[:, :, :length], v[:, :, :length]) for k, v in cache)
+
+    def _remember(self, prompt: list[int], cached: int, cache: KVCache) -> None:
+        """Add a prompt's block-aligned prefix to the prefix cache."""
+        if self.prefix_cache is None:
+            return
+        length = self.prefix_cache.aligned(len(prompt))
+        if length <= cached:
+            return
+        # Copy, so the entry does not pin this step's whole batched cache
+        prefix = tuple(
+            (k[:, :, :length].clone(), v[:, :, :length].clone()) for k, v in cache
+        )
+        nbytes = sum(t.numel() * t.element_size() for kv in prefix for t in kv)
+        self.prefix_cache.put(prompt[:length], prefix, nbytes)
+
+    def _encode(self, prompt: str) -> list[int]:
+        """Tokenize a prompt, without a second BOS if the template added one."""
+        bos = self.tokenizer.bos_token
+        add_special_tokens = not (bos and prompt.startswith(bos))
+        encoded = self.tokenizer(prompt, add_special_tokens=add_special_tokens)
+        return list(encoded["input_ids"])
+
+    def _forward(
+        self,
+        input_ids: torch.Tensor,
+        attention_mask: torch.Tensor,
+        position_ids: torch.Tensor,
+        cache: KVCache | None,
+    ) -> tuple[torch.Tensor, KVCache]:
+        """Run the model and return logits and the legacy-format cache."""
+        kwargs: dict[str, Any] = {}
+        if self._position_ids:
+            kwargs["position_ids"] = position_ids
+        output = self.model(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            past_key_values=cache,
+            use_cache=True,
+            **kwargs,
+        )
+        return output.logits, tuple(tuple(kv) for kv in output.past_key_values)
+
+    def _advance(self, sequences: list[Sequence], logits: torch.Tensor) -> None:
+        """Sample the next token of every sequence and emit its text."""
+        temperatures = torch.tensor(
+            [sequence.request.temperature for sequence in sequences],
+            device=logits.device,
+        )
+        greedy = logits.argmax(dim=-1)
+        scaled = logits.float() / temperatures.clamp(min=1e-5).unsqueeze(-1)
+        sampled = torch.multinomial(torch.softmax(scaled, dim=-1), 1).squeeze(-1)
+        tokens = torch.where(temperatures > 0, sampled, greedy).tolist()
+
+        for sequence, token in zip(sequences, tokens, strict=True):
+            state: _SequenceState = sequence.state
+            sequence.completion_tokens += 1
+            if token in self.eos_token_ids:
+                sequence.finish_reason = "stop"
+                continue
+            state.tokens.append(token)
+            sequence.emit(self._detokenize(state))
+            total = state.length + 1
+            if sequence.completion_tokens >= sequence.request.max_tokens or (
+                self.max_length is not None and total >= self.max_length
+            ):
+                sequence.finish_reason = "length"
+
+    def _detokenize(self, state: _SequenceState) -> str:
+        """Decode the text added by the newest token.
+
+        Decodes a short window instead of the whole completion, and holds
+        back text ending in a partial UTF-8 character until it completes.
+        """
+        decode = self.tokenizer.decode
+        prefix: str = decode(
+            state.tokens[state.prefix_offset : state.read_offset],
+            skip_special_tokens=True,
+        )
+        text: str = decode(
+            state.tokens[state.prefix_offset :], skip_special_tokens=True
+        )
+        if len(text) <= len(prefix) or text.endswith("�"):
+            return ""
+        state.prefix_offset = state.read_offset
+        state.read_offset = len(state.tokens)
+        return text[len(prefix) :]
+
+
+def _free_cuda() -> None:
+    """Return freed GPU memory to the device."""
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def _first_id(*ids: Any) -> int:
+    """First token ID that is set (eos may be a list)."""
+    for token_id in ids:
+        if isinstance(token_id, list):
+            token_id = token_id[0] if token_id else None
+        if token_id is not None:
+            return int(token_id)
+    return 0
+
+
+def _left(padding: int) -> tuple[int, int, int, int]:
+    """``F.pad`` spec adding ``padding`` positions before the sequence axis."""
+    return (0, 0, padding, 0)
+
+
+def _stack(caches: list[KVCache | None], lengths: list[int], width: int) -> KVCache:
+    """Batch per-sequence caches, left-padding each to ``width`` positions.
+
+    A missing cache (a sequence without a cached prefix) becomes all
+    padding.
+    """
+    reference = next(cache for cache in caches if cache is not None)
+    layers = []
+    for layer, (ref_key, ref_value) in enumerate(reference):
+        keys, values = [], []
+        for cache, length in zip(caches, lengths, strict=True):
+            if cache is None:
+                key, value = ref_key[:, :, :0], ref_value[:, :, :0]
+            else:
+                key, value = cache[layer]
+            keys.append(F.pad(key, _left(width - length)))
+            values.append(F.pad(value, _left(width - length)))
+        layers.append((torch.cat(keys), torch.cat(values)))
+    return tuple(layers)
+
+
+def _extract(cache: KVCache, index: int, spans: list[slice]) -> KVCache:
+    """One sequence's cache from a batched cache, keeping only ``spans``."""
+
+    def take(tensor: torch.Tensor) -> torch.Tensor:
+        parts = [tensor[index : index + 1, :, span] for span in spans]
+        return parts[0] if len(parts) == 1 else torch.cat(parts, dim=2)
+
+    return tuple((take(key), take(value)) for key, value in cache)
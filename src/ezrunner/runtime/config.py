@@ -0,0 +1,124 @@
+"""Server configuration read from the container environment."""
+
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields
+from typing import Any
+
+
+def _env(name: str, default: Any) -> Any:
+    """Declare a setting read from environment variable ``name``."""
+    return field(default=default, metadata={"env": name})
+
+
+def _parse(raw: str, default: Any) -> Any:
+    """Convert an environment value to the type of the setting's default."""
+    if isinstance(default, bool):
+        return raw.strip().lower() in ("1", "true", "yes", "on")
+    if default is None:
+        return raw
+    return type(default)(raw)
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """Inference server settings.
+
+    Every field is read from the environment variable named in its
+    metadata; ``pack`` bakes the values into the image with ``ENV`` and
+    ``run`` can override them per container.
+
+    Attributes:
+        model_id: Model identifier reported by ``/v1/models``
+        model_path: Directory holding the model weights
+        models: Every model of a multi-model image, as comma-separated
+            ``id=path`` pairs ("" for a single-model image)
+        gpu_memory_gb: GPU memory the models of a multi-model image may
+            take together (0 for 90% of the device)
+        park_models: Keep evicted models in pinned CPU memory instead of
+            unloading them
+        max_batch_size: Maximum number of sequences decoded together
+        max_wait_ms: How long an idle scheduler waits to fill a batch
+        prefix_cache_mb: Memory for cached prompt-prefix KV caches (0 disables)
+        response_cache_size: Cached responses to deterministic requests
+            (0 disables)
+        response_cache_ttl_s: Lifetime of cached responses (0 for no expiry)
+        response_cache_path: SQLite file persisting the response cache
+        prefetch_threads: Threads reading weights into the page cache at
+            startup (0 disables)
+        warmup_prompt_tokens: Comma-separated prompt lengths run before
+            reporting ready ("" disables warmup)
+        warmup_max_tokens: Tokens generated per warmup request
+        vllm_port: Internal port of the vLLM server behind the front end
+        vllm_gpu_memory_utilization: Fraction of GPU memory vLLM may use
+        vllm_max_model_len: Longest sequence vLLM admits (0 for the
+            model's own limit)
+        vllm_max_num_batched_tokens: Token budget of one vLLM scheduler
+            step (0 for vLLM's default)
+        vllm_kv_cache_dtype: vLLM KV cache data type ("auto" or "fp8")
+        vllm_enable_chunked_prefill: Split long prompts across vLLM steps
+        vllm_enable_prefix_caching: Reuse vLLM KV cache blocks of shared
+            prompt prefixes
+        vllm_args: Extra vLLM command-line arguments (take precedence)
+    """
+
+    model_id: str = _env("MODEL_ID", "model")
+    model_path: str = _env("MODEL_PATH", "/models")
+    models: str = _env("EZRUNNER_MODELS", "")
+    gpu_memory_gb: float = _env("EZRUNNER_GPU_MEMORY_GB", 0.0)
+    park_models: bool = _env("EZRUNNER_PARK_MODELS", True)
+    max_batch_size: int = _env("EZRUNNER_MAX_BATCH_SIZE", 8)
+    max_wait_ms: float = _env("EZRUNNER_MAX_WAIT_MS", 10.0)
+    prefix_cache_mb: int = _env("EZRUNNER_PREFIX_CACHE_MB", 1024)
+    response_cache_size: int = _env("EZRUNNER_RESPONSE_CACHE_SIZE", 0)
+    response_cache_ttl_s: float = _env("EZRUNNER_RESPONSE_CACHE_TTL", 3600.0)
+    response_cache_path: str = _env("EZRUNNER_RESPONSE_CACHE_PATH", "")
+    prefetch_threads: int = _env("EZRUNNER_PREFETCH_THREADS", 8)
+    warmup_prompt_tokens: str = _env("EZRUNNER_WARMUP_PROMPT_TOKENS", "32,512")
+    warmup_max_tokens: int = _env("EZRUNNER_WARMUP_MAX_TOKENS", 8)
+    vllm_port: int = _env("EZRUNNER_VLLM_PORT", 8001)
+    vllm_gpu_memory_utilization: float = _env(
+        "EZRUNNER_VLLM_GPU_MEMORY_UTILIZATION", 0.9
+    )
+    vllm_max_model_len: int = _env("EZRUNNER_VLLM_MAX_MODEL_LEN", 0)
+    vllm_max_num_batched_tokens: int = _env("EZRUNNER_VLLM_MAX_NUM_BATCHED_TOKENS", 0)
+    vllm_kv_cache_dtype: str = _env("EZRUNNER_VLLM_KV_CACHE_DTYPE", "auto")
+    vllm_enable_chunked_prefill: bool = _env(
+        "EZRUNNER_VLLM_ENABLE_CHUNKED_PREFILL", False
+    )
+    vllm_enable_prefix_caching: bool = _env(
+        "EZRUNNER_VLLM_ENABLE_PREFIX_CACHING", False
+    )
+    vllm_args: str = _env("EZRUNNER_VLLM_ARGS", "")
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] | None = None) -> "ServerConfig":
+        """Read the configuration from environment variables.
+
+        Args:
+            environ: Environment (default: ``os.environ``)
+
+        Returns:
+            Server configuration, with defaults for unset variables
+        """
+        environ = os.environ if environ is None else environ
+        values = {}
+        for f in fields(cls):
+            raw = environ.get(f.metadata["env"])
+            if raw is not None:
+                values[f.name] = _parse(raw, f.default)
+        return cls(**values)
+
+    def model_paths(self) -> dict[str, str]:
+        """Directory of every served model, by ID (the default model first).
+
+        Raises:
+            ValueError: If ``models`` is malformed
+        """
+        paths = {self.model_id: self.model_path}
+        for item in filter(None, (item.strip() for item in self.models.split(","))):
+            model_id, sep, path = item.partition("=")
+            if not sep or not model_id or not path:
+                raise ValueError(f"Invalid EZRUNNER_MODELS entry: {item!r}")
+            paths[model_id] = path
+        return paths
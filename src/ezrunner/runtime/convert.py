@@ -0,0 +1,164 @@
+"""Convert a pickle (``pytorch_model*.bin``) checkpoint to safetensors.
+
+Runs at image build time, in the same layer that downloads the model, so
+the image only ever contains the safetensors shards. Input shards are
+opened with ``torch.load(mmap=True)`` and written out tensor by tensor
+into shards of bounded size; memory use is bounded by the output shard
+size (and mapped pages, which the kernel can drop) rather than by the
+model size.
+
+Standalone: also run as a plain script before the runtime is installed.
+
+Example:
+    python3 convert.py /models/qwen-qwen-7b --max-shard-size 2GB
+"""
+
+import argparse
+import json
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+PICKLE_INDEX = "pytorch_model.bin.index.json"
+SAFETENSORS_INDEX = "model.safetensors.index.json"
+_UNITS = {"": 1, "KB": 10**3, "MB": 10**6, "GB": 10**9}
+
+
+def parse_size(size: str) -> int:
+    """Parse a shard size like ``"2GB"`` into bytes.
+
+    Raises:
+        ValueError: Unrecognized size
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*([KMG]?B?)\s*", size.upper())
+    if match is None or match.group(2) not in _UNITS:
+        raise ValueError(f"Invalid size: {size!r}")
+    return int(match.group(1)) * _UNITS[match.group(2)]
+
+
+def pickle_shards(model_dir: Path) -> list[Path]:
+    """Pickle checkpoint files of a model, in index order."""
+    index = model_dir / PICKLE_INDEX
+    if index.is_file():
+        weight_map = json.loads(index.read_text())["weight_map"]
+        return [model_dir / name for name in dict.fromkeys(weight_map.values())]
+    return sorted(model_dir.glob("pytorch_model*.bin"))
+
+
+def convert(model_dir: Path, max_shard_size: int = 2 * 10**9) -> int:
+    """Convert a model directory's pickle checkpoint in place.
+
+    Tensors that share storage (tied weights) are written once; the model
+    re-ties them when it loads. The pickle files are deleted afterwards.
+
+    Args:
+        model_dir: Directory written by ``save_pretrained`` or downloaded
+            from a hub
+        max_shard_size: Maximum bytes per safetensors shard
+
+    Returns:
+        Number of safetensors shards written (0 if there was nothing to
+        convert)
+    """
+    import torch
+    from safetensors.torch import save_file
+
+    inputs = pickle_shards(model_dir)
+    if not inputs:
+        logger.info(f"No pickle checkpoint in {model_dir}")
+        return 0
+
+    started = time.perf_counter()
+    written: list[Path] = []
+    weight_map: dict[str, int] = {}
+    shard: dict[str, Any] = {}
+    shard_bytes = 0
+    total = 0
+
+    def flush() -> None:
+        nonlocal shard, shard_bytes
+        if shard:
+            path = model_dir / f"model-{len(written) + 1:05d}.safetensors.tmp"
+            save_file(shard, str(path), metadata={"format": "pt"})
+            written.append(path)
+            shard, shard_bytes = {}, 0
+
+    for source in inputs:
+        state = _load(source)
+        seen: set[tuple[int, int]] = set()
+        for name, tensor in state.items():
+            if not isinstance(tensor, torch.Tensor):
+                continue
+            storage = (
+                tensor.untyped_storage().data_ptr(),
+                int(tensor.storage_offset()),
+            )
+            if storage in seen:
+                logger.info(f"Skipping {name}: shares storage with another tensor")
+                continue
+            seen.add(storage)
+            nbytes = tensor.numel() * tensor.element_size()
+            if shard and shard_bytes + nbytes > max_shard_size:
+                flush()
+            shard[name] = tensor.contiguous()
+            shard_bytes += nbytes
+            total += nbytes
+            weight_map[name] = len(written)
+        flush()
+        del state
+        logger.info(f"Converted {source.name}")
+
+    # Final names need the shard count, known only now
+    names = [
+        f"model-{i + 1:05d}-of-{len(written):05d}.safetensors"
+        for i in range(len(written))
+    ]
+    for path, name in zip(written, names, strict=True):
+        path.rename(model_dir / name)
+    index = {
+        "metadata": {"total_size": total},
+        "weight_map": {tensor: names[i] for tensor, i in weight_map.items()},
+    }
+    (model_dir / SAFETENSORS_INDEX).write_text(json.dumps(index, indent=2))
+    for source in inputs:
+        source.unlink()
+    (model_dir / PICKLE_INDEX).unlink(missing_ok=True)
+
+    logger.info(
+        f"Converted {len(inputs)} pickle file(s) to {len(names)} safetensors "
+        f"shard(s), {total / 1e9:.1f} GB in {time.perf_counter() - started:.1f}s"
+    )
+    return len(names)
+
+
+def _load(path: Path) -> dict[str, Any]:
+    """Load a pickle checkpoint, memory-mapped when its format allows."""
+    import torch
+
+    state: dict[str, Any]
+    try:
+        state = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    except RuntimeError:
+        # Legacy (pre-zipfile) checkpoints cannot be memory-mapped
+        logger.info(f"{path.name} is not memory-mappable, loading it fully")
+        state = torch.load(path, map_location="cpu", weights_only=True)
+    return state
+
+
+def main() -> None:
+    """Convert the model directory given on the command line."""
+    parser = argparse.ArgumentParser(description="Convert .bin weights to safetensors")
+    parser.add_argument("model_dir", type=Path)
+    parser.add_argument("--max-shard-size", default="2GB")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    convert(args.model_dir, parse_size(args.max_shard_size))
+
+
+if __name__ == "__main__":
+    main()
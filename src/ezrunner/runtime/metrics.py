@@ -0,0 +1,239 @@
+"""Prometheus metrics.
+
+A minimal implementation of counters, gauges and histograms rendered in
+the Prometheus text exposition format, so the images need no extra
+dependency. Recording is a few integer operations and takes no lock:
+metrics are only updated from the event loop thread. Values that other
+components already count (cache hits, GPU memory) are read through a
+callback when ``/metrics`` is scraped instead of being recorded twice.
+"""
+
+import bisect
+import math
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any, TypeVar
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from sub-millisecond decode steps to
+# multi-minute completions
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+_Sample = tuple[str, dict[str, str], float]
+
+
+class Metric:
+    """Base class of a named metric family."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        """Initialize metric.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+        """
+        self.name = name
+        self.documentation = documentation
+
+    def samples(self) -> Iterator[_Sample]:
+        """Current samples as (name, labels, value)."""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing count, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        function: Callable[[], float] | None = None,
+    ) -> None:
+        """Initialize counter.
+
+        Args:
+            name: Metric name (conventionally ending in ``_total``)
+            documentation: Help text
+            labelnames: Label names, given as keyword arguments to ``inc``
+            function: Read the value from this callback instead
+        """
+        super().__init__(name, documentation)
+        self.labelnames = tuple(labelnames)
+        self.function = function
+        self._values: dict[tuple[str, ...], float] = {} if labelnames else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the count for a label combination."""
+        key = tuple(labels[name] for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Current count for a label combination."""
+        if self.function is not None:
+            return self.function()
+        return self._values.get(tuple(labels[name] for name in self.labelnames), 0.0)
+
+    def samples(self) -> Iterator[_Sample]:
+        if self.function is not None:
+            yield self.name, {}, self.function()
+            return
+        for key, value in self._values.items():
+            yield self.name, dict(zip(self.labelnames, key, strict=True)), value
+
+
+class Gauge(Metric):
+    """Value that goes up and down, usually read through a callback."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        function: Callable[[], float | None] | None = None,
+    ) -> None:
+        """Initialize gauge.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            function: Read the value from this callback at scrape time
+                (returning None omits the sample)
+        """
+        super().__init__(name, documentation)
+        self.function = function
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        """Set the value."""
+        self._value = value
+
+    def samples(self) -> Iterator[_Sample]:
+        value = self._value if self.function is None else self.function()
+        if value is not None:
+            yield self.name, {}, value
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        """Initialize histogram.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            buckets: Sorted upper bounds (``+Inf`` is added)
+        """
+        super().__init__(name, documentation)
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record an observation."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def samples(self) -> Iterator[_Sample]:
+        cumulative = 0
+        for bound, count in zip((*self.buckets, math.inf), self.counts, strict=True):
+            cumulative += count
+            yield f"{self.name}_bucket", {"le": _format(bound)}, cumulative
+        yield f"{self.name}_sum", {}, self.sum
+        yield f"{self.name}_count", {}, self.count
+
+
+_MetricT = TypeVar("_MetricT", bound=Metric)
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        """Initialize empty registry."""
+        self._metrics: dict[str, Metric] = {}
+
+    def counter(self, name: str, documentation: str, **kwargs: Any) -> Counter:
+        """Create and register a counter (see :class:`Counter`)."""
+        return self.register(Counter(name, documentation, **kwargs))
+
+    def gauge(self, name: str, documentation: str, **kwargs: Any) -> Gauge:
+        """Create and register a gauge (see :class:`Gauge`)."""
+        return self.register(Gauge(name, documentation, **kwargs))
+
+    def histogram(self, name: str, documentation: str, **kwargs: Any) -> Histogram:
+        """Create and register a histogram (see :class:`Histogram`)."""
+        return self.register(Histogram(name, documentation, **kwargs))
+
+    def register(self, metric: _MetricT) -> _MetricT:
+        """Add a metric.
+
+        Raises:
+            ValueError: If a metric with the same name is registered
+        """
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_labels(labels)} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: dict[str, str]) -> str:
+    """Render a label set."""
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format(value: float) -> str:
+    """Render a sample value."""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,286 @@
+"""Models of a multi-model image, loaded on demand.
+
+A multi-model image serves several (typically small) models from one
+container. Requests are routed by the OpenAI ``model`` field; a model is
+loaded on its first request, and models that do not fit the GPU memory
+budget together are evicted least recently used first. Evicted models
+are parked in pinned CPU memory when the backend supports it, so
+switching back costs a host-to-device copy rather than a load from
+disk. A model is only evicted while none of its requests are in flight.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from .metrics import Counter, Registry
+from .scheduler import BatchScheduler, SchedulerMetrics
+
+logger = logging.getLogger(__name__)
+
+# States of a pooled model
+UNLOADED = "unloaded"
+PARKED = "parked"
+EVICTING = "evicting"
+LOADED = "loaded"
+
+
+@dataclass(eq=False)
+class PooledModel:
+    """A model of the pool.
+
+    Attributes:
+        model_id: Model identifier requests ask for
+        load: Loads the backend (runs on a worker thread)
+        size: GPU memory the model takes, in bytes (estimated until loaded)
+        state: "unloaded", "parked" (in CPU memory), "evicting" (being
+            parked) or "loaded" (on the GPU)
+        backend: Model backend (None while unloaded)
+        scheduler: Batch scheduler of the backend (None while unloaded)
+        active: Requests in flight
+        last_used: ``time.monotonic()`` of the latest request
+    """
+
+    model_id: str
+    load: Callable[[], Any]
+    size: int
+    state: str = UNLOADED
+    backend: Any = None
+    scheduler: BatchScheduler | None = None
+    active: int = 0
+    last_used: float = 0.0
+
+
+class ModelPool:
+    """Load models on demand and evict them LRU within a GPU memory budget."""
+
+    def __init__(
+        self,
+        loaders: dict[str, tuple[Callable[[], Any], int]],
+        budget: Callable[[], int],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        park: bool = True,
+    ) -> None:
+        """Initialize pool.
+
+        Args:
+            loaders: Function loading each model's backend, and the
+                model's estimated size in bytes, by model ID (the default
+                model first)
+            budget: Returns the GPU memory the loaded models may take
+                together, in bytes; called once, when the first model has
+                loaded (so it may query the device)
+            max_batch_size: Maximum sequences per batch, for each model
+            max_wait_ms: How long an idle scheduler waits to fill a batch
+            park: Park evicted models in CPU memory, if the backend
+                supports it (``park``/``resume``), instead of unloading them
+        """
+        self.models = {
+            model_id: PooledModel(model_id, load, size)
+            for model_id, (load, size) in loaders.items()
+        }
+        self.default = next(iter(self.models))
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.park = park
+        self.budget_bytes: int | None = None
+        self._budget = budget
+        self._lock = asyncio.Lock()
+        self._released = asyncio.Event()
+        self._metrics: SchedulerMetrics | None = None
+        self._swap_counter: Counter | None = None
+        self._swap_seconds: Counter | None = None
+        self.swaps: dict[str, int] = {"load": 0, "resume": 0, "park": 0, "unload": 0}
+
+    @property
+    def used_bytes(self) -> int:
+        """GPU memory taken by the loaded models."""
+        return sum(m.size for m in self.models.values() if m.state == LOADED)
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests waiting to join a batch, over all models."""
+        return sum(s.queue_depth for s in self._schedulers())
+
+    @property
+    def batch_size(self) -> int:
+        """Sequences in the running batches, over all models."""
+        return sum(s.batch_size for s in self._schedulers())
+
+    def register_metrics(self, registry: Registry) -> None:
+        """Record every model's scheduler metrics, and the pool's, together."""
+        self._metrics = SchedulerMetrics(registry)
+        registry.gauge(
+            "ezrunner_queue_depth",
+            "Requests waiting to join the batch",
+            function=lambda: self.queue_depth,
+        )
+        registry.gauge(
+            "ezrunner_running_sequences",
+            "Sequences in the running batch",
+            function=lambda: self.batch_size,
+        )
+        registry.gauge(
+            "ezrunner_models_loaded",
+            "Models on the GPU",
+            function=lambda: sum(m.state == LOADED for m in self.models.values()),
+        )
+        registry.gauge(
+            "ezrunner_models_gpu_bytes",
+            "GPU memory taken by the loaded models",
+            function=lambda: self.used_bytes,
+        )
+        self._swap_counter = registry.counter(
+            "ezrunner_model_swaps_total",
+            "Models loaded from disk, resumed from CPU memory, parked or unloaded",
+            labelnames=("kind",),
+        )
+        self._swap_seconds = registry.counter(
+            "ezrunner_model_swap_seconds_total", "Time spent moving models"
+        )
+
+    async def acquire(self, model_id: str) -> PooledModel:
+        """Get a model onto the GPU and count a request in flight on it.
+
+        Every ``acquire`` must be paired with a ``release`` once the
+        request has finished (for streams, once the stream has ended).
+
+        Args:
+            model_id: Model the request asked for
+
+        Returns:
+            The model, loaded
+
+        Raises:
+            KeyError: The pool has no such model
+            RuntimeError: The model could not be loaded
+        """
+        model = self.models[model_id]
+        if model.state != LOADED:
+            async with self._lock:
+                if model.state != LOADED:
+                    await self._make_room(model)
+                    await self._bring_in(model)
+        model.active += 1
+        model.last_used = time.monotonic()
+        return model
+
+    def release(self, model: PooledModel) -> None:
+        """Count a request of ``model`` as finished."""
+        model.active -= 1
+        model.last_used = time.monotonic()
+        self._released.set()
+
+    async def stop(self) -> None:
+        """Stop every model's scheduler."""
+        for scheduler in self._schedulers():
+            await scheduler.stop()
+
+    def stats(self) -> dict[str, Any]:
+        """State of every model, for monitoring."""
+        return {
+            "budget_gb": (
+                None if self.budget_bytes is None else round(self.budget_bytes / 1e9, 2)
+            ),
+            "used_gb": round(self.used_bytes / 1e9, 2),
+            "swaps": dict(self.swaps),
+            "models": {
+                m.model_id: {
+                    "state": m.state,
+                    "gb": round(m.size / 1e9, 2),
+                    "active": m.active,
+                }
+                for m in self.models.values()
+            },
+        }
+
+    async def _make_room(self, model: PooledModel) -> None:
+        """Evict idle models, LRU first, until ``model`` fits the budget.
+
+        Waits for requests to finish while every other loaded model is
+        busy. A model larger than the whole budget is let in alone.
+        """
+        while self.budget_bytes is not None:
+            loaded = [
+                m for m in self.models.values() if m.state == LOADED and m is not model
+            ]
+            if not loaded or self.used_bytes + model.size <= self.budget_bytes:
+                if model.size > self.budget_bytes:
+                    logger.warning(
+                        f"{model.model_id} ({model.size / 1e9:.1f} GB) exceeds the "
+                        f"{self.budget_bytes / 1e9:.1f} GB model budget"
+                    )
+                return
+            idle = [m for m in loaded if m.active == 0]
+            if idle:
+                await self._evict(min(idle, key=lambda m: m.last_used))
+                continue
+            self._released.clear()
+            await self._released.wait()
+
+    async def _evict(self, model: PooledModel) -> None:
+        """Park or unload a model that has no request in flight."""
+        started = time.perf_counter()
+        if self.park and hasattr(model.backend, "park"):
+            # Set before moving the weights, so no request takes the model
+            # while they are on their way to CPU memory
+            model.state = EVICTING
+            try:
+                await asyncio.to_thread(model.backend.park)
+            except BaseException:
+                model.state = LOADED
+                raise
+            model.state = PARKED
+            self._count("park", started)
+        else:
+            backend, scheduler = model.backend, model.scheduler
+            model.backend, model.scheduler, model.state = None, None, UNLOADED
+            if scheduler is not None:
+                await scheduler.stop()
+            if hasattr(backend, "unload"):
+                await asyncio.to_thread(backend.unload)
+            self._count("unload", started)
+        logger.info(f"Evicted {model.model_id} ({model.state})")
+
+    async def _bring_in(self, model: PooledModel) -> None:
+        """Resume a parked model, or load an unloaded one."""
+        started = time.perf_counter()
+        if model.state == PARKED:
+            await asyncio.to_thread(model.backend.resume)
+            self._count("resume", started)
+        else:
+            try:
+                model.backend = await asyncio.to_thread(model.load)
+            except Exception as e:
+                logger.exception(f"Could not load {model.model_id}")
+                raise RuntimeError(f"Could not load {model.model_id}: {e}") from e
+            model.scheduler = BatchScheduler(
+                model.backend,
+                self.max_batch_size,
+                self.max_wait_ms,
+                metrics=self._metrics,
+            )
+            model.scheduler.start()
+            self._count("load", started)
+        model.size = getattr(model.backend, "memory_bytes", model.size)
+        model.state = LOADED
+        logger.info(
+            f"{model.model_id} on the GPU in {time.perf_counter() - started:.2f}s"
+        )
+        if self.budget_bytes is None:
+            self.budget_bytes = await asyncio.to_thread(self._budget)
+
+    def _count(self, kind: str, started: float) -> None:
+        """Record a swap and its duration."""
+        self.swaps[kind] += 1
+        if self._swap_counter is not None and self._swap_seconds is not None:
+            self._swap_counter.inc(kind=kind)
+            self._swap_seconds.inc(time.perf_counter() - started)
+
+    def _schedulers(self) -> list[BatchScheduler]:
+        """Schedulers of the models that have one."""
+        return [m.scheduler for m in self.models.values() if m.scheduler is not None]
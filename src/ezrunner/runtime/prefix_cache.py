@@ -0,0 +1,174 @@
+"""Prompt prefix cache.
+
+Keeps the KV cache of recently seen prompts so a new prompt that starts
+with the same system prompt or few-shot preamble only runs prefill on the
+tokens after the shared prefix. Prompts are matched in fixed-size token
+blocks; each block's hash chains the previous one, so looking up the
+longest cached prefix costs one dictionary probe per block.
+"""
+
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from .metrics import Registry
+
+
+@dataclass
+class _Entry:
+    """A cached prompt prefix."""
+
+    tokens: tuple[int, ...]
+    value: Any
+    nbytes: int
+    hashes: list[int]
+
+
+class PrefixCache:
+    """Memory-bounded LRU cache of KV caches keyed by token prefix."""
+
+    def __init__(self, max_bytes: int, block_size: int = 16) -> None:
+        """Initialize cache.
+
+        Args:
+            max_bytes: Memory budget for cached values
+            block_size: Prefix granularity in tokens
+        """
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self.hits = 0
+        self.misses = 0
+        self.hit_tokens = 0
+        self.bytes = 0
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        # Hash of every block-aligned prefix -> key of an entry holding it
+        self._index: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def aligned(self, length: int) -> int:
+        """Longest block-aligned prefix length within ``length`` tokens."""
+        return length - length % self.block_size
+
+    def match(self, tokens: Sequence[int]) -> tuple[int, Any]:
+        """Find the longest cached prefix of a prompt.
+
+        At least one prompt token is always left uncached, since prefill
+        needs it to produce the first output token.
+
+        Args:
+            tokens: Prompt token IDs
+
+        Returns:
+            Number of matched tokens and the cached value (which covers at
+            least that many tokens), or ``(0, None)``
+        """
+        hashes = self._hashes(tokens, len(tokens) - 1)
+        for i in reversed(range(len(hashes))):
+            key = self._index.get(hashes[i])
+            if key is None:
+                continue
+            entry = self._entries[key]
+            length = (i + 1) * self.block_size
+            if entry.tokens[:length] == tuple(tokens[:length]):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.hit_tokens += length
+                return length, entry.value
+        self.misses += 1
+        return 0, None
+
+    def put(self, tokens: Sequence[int], value: Any, nbytes: int) -> None:
+        """Cache the value of a block-aligned prefix, evicting LRU entries.
+
+        Args:
+            tokens: Prefix token IDs (a multiple of ``block_size`` long)
+            value: Cached value (e.g. the prefix's KV cache)
+            nbytes: Memory held by ``value``
+        """
+        hashes = self._hashes(tokens, len(tokens))
+        if not hashes or nbytes > self.max_bytes:
+            return
+        key = hashes[-1]
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+
+        self._entries[key] = _Entry(tuple(tokens), value, nbytes, hashes)
+        for block_hash in hashes:
+            self._index[block_hash] = key
+        self.bytes += nbytes
+        while self.bytes > self.max_bytes:
+            self._evict()
+
+    def clear(self) -> None:
+        """Drop every entry (the counters are kept)."""
+        self._entries.clear()
+        self._index.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Counters for monitoring."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_tokens": self.hit_tokens,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+        }
+
+    def register_metrics(self, registry: Registry) -> None:
+        """Expose the counters as Prometheus metrics."""
+        registry.counter(
+            "ezrunner_prefix_cache_hits_total",
+            "Prompts that reused a cached prefix",
+            function=lambda: self.hits,
+        )
+        registry.counter(
+            "ezrunner_prefix_cache_misses_total",
+            "Prompts without a cached prefix",
+            function=lambda: self.misses,
+        )
+        registry.gauge(
+            "ezrunner_prefix_cache_bytes",
+            "Memory held by cached prefixes",
+            function=lambda: self.bytes,
+        )
+
+    def _evict(self) -> None:
+        """Drop the least recently used entry.
+
+        Its blocks that other entries share (a shorter prefix it extended,
+        or one it branched off) are pointed back at the longest of them, so
+        those entries stay reachable.
+        """
+        key, entry = self._entries.popitem(last=False)
+        self.bytes -= entry.nbytes
+        freed = {h for h in entry.hashes if self._index.get(h) == key}
+        for block_hash in freed:
+            del self._index[block_hash]
+        if not freed:
+            return
+        for other_key, other in self._entries.items():
+            # Chained hashes: entries share blocks up to where they diverge
+            shared = zip(entry.hashes, other.hashes, strict=False)
+            for block_hash, other_hash in shared:
+                if block_hash != other_hash:
+                    break
+                holder = self._index.get(block_hash)
+                if block_hash in freed and (
+                    holder is None
+                    or len(self._entries[holder].tokens) < len(other.tokens)
+                ):
+                    self._index[block_hash] = other_key
+
+    def _hashes(self, tokens: Sequence[int], limit: int) -> list[int]:
+        """Chained hashes of the full blocks within ``tokens[:limit]``."""
+        hashes = []
+        previous = 0
+        for end in range(self.block_size, limit + 1, self.block_size):
+            previous = hash((previous, tuple(tokens[end - self.block_size : end])))
+            hashes.append(previous)
+        return hashes
@@ -0,0 +1,214 @@
+"""Response cache for deterministic completion requests.
+
+Requests with ``temperature == 0`` always produce the same completion, so
+their responses are cached under a hash of the normalized request body.
+Identical requests that arrive while the first one is still generating
+wait for it instead of generating again. Entries can be persisted to an
+SQLite file so the cache survives container restarts.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from .config import ServerConfig
+from .metrics import Registry
+
+logger = logging.getLogger(__name__)
+
+# Request fields that do not change the completion
+IGNORED_FIELDS = ("stream", "stream_options", "user")
+
+
+def request_key(body: dict[str, Any]) -> str | None:
+    """Cache key of a request body.
+
+    Args:
+        body: Completion request body
+
+    Returns:
+        Hex digest of the normalized request, or None if the request is
+        not cacheable (sampled or streamed)
+    """
+    if body.get("stream") or body.get("temperature", 1.0) != 0:
+        return None
+    normalized = {
+        name: value
+        for name, value in body.items()
+        if name not in IGNORED_FIELDS and value is not None
+    }
+    encoded = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ResponseCache:
+    """LRU/TTL cache of responses with in-flight request coalescing."""
+
+    def __init__(
+        self, max_entries: int, ttl_s: float = 0.0, path: str | None = None
+    ) -> None:
+        """Initialize cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            ttl_s: Time to live in seconds (0 for no expiry)
+            path: SQLite file to persist entries to (default: memory only)
+        """
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future[dict[str, Any]]] = {}
+        self._db: sqlite3.Connection | None = None
+        if path:
+            self._open(Path(path))
+
+    @classmethod
+    def from_config(cls, config: ServerConfig) -> "ResponseCache | None":
+        """Create the cache configured for a server, if enabled."""
+        if config.response_cache_size <= 0:
+            return None
+        return cls(
+            config.response_cache_size,
+            config.response_cache_ttl_s,
+            config.response_cache_path or None,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Look up a response, dropping it if it expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self.ttl_s and time.time() - stored_at > self.ttl_s:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: dict[str, Any]) -> None:
+        """Store a response, evicting the least recently used ones."""
+        stored_at = time.time()
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        if self._db is not None:
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                    (key, stored_at, json.dumps(value)),
+                )
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> dict[str, Any]:
+        """Return the cached response, or compute it once for all waiters.
+
+        The computation runs as its own task, so a caller disconnecting
+        does not cancel it for the others. Failures are not cached.
+
+        Args:
+            key: Cache key (see :func:`request_key`)
+            compute: Coroutine function producing the response
+
+        Returns:
+            Response body
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        future = self._in_flight.get(key)
+        if future is None:
+            self.misses += 1
+            future = asyncio.ensure_future(compute())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def stats(self) -> dict[str, int]:
+        """Counters for monitoring."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": len(self._entries),
+        }
+
+    def register_metrics(self, registry: Registry) -> None:
+        """Expose the counters as Prometheus metrics."""
+        registry.counter(
+            "ezrunner_response_cache_hits_total",
+            "Responses served from the cache",
+            function=lambda: self.hits,
+        )
+        registry.counter(
+            "ezrunner_response_cache_misses_total",
+            "Cacheable requests that were generated",
+            function=lambda: self.misses,
+        )
+        registry.counter(
+            "ezrunner_response_cache_coalesced_total",
+            "Requests that waited for an identical in-flight request",
+            function=lambda: self.coalesced,
+        )
+        registry.gauge(
+            "ezrunner_response_cache_entries",
+            "Cached responses",
+            function=lambda: len(self._entries),
+        )
+
+    def _finish(self, key: str, future: "asyncio.Future[dict[str, Any]]") -> None:
+        """Cache a finished computation."""
+        self._in_flight.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self.put(key, future.result())
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry from memory and disk."""
+        self._entries.pop(key, None)
+        if self._db is not None:
+            with self._db:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _open(self, path: Path) -> None:
+        """Open the SQLite store and load its most recent entries."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, stored_at REAL, value TEXT)"
+            )
+        rows = self._db.execute(
+            "SELECT key, stored_at, value FROM responses "
+            "ORDER BY stored_at DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        with self._db:
+            self._db.execute(
+                "DELETE FROM responses WHERE key NOT IN (SELECT key FROM responses "
+                "ORDER BY stored_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+        now = time.time()
+        for key, stored_at, value in reversed(rows):
+            if not self.ttl_s or now - stored_at <= self.ttl_s:
+                self._entries[key] = (stored_at, json.loads(value))
+        logger.info(f"Loaded {len(self._entries)} cached responses from {path}")
@@ -0,0 +1,390 @@
+"""Continuous batching scheduler.
+
+Requests wait in a queue until the scheduler admits them into the running
+batch. Scheduling happens per decode step rather than per request: after
+every step finished sequences leave the batch and waiting ones join it,
+so a long completion never holds up short ones queued behind it. Backend
+calls run on a dedicated worker thread, off the event loop, and stream
+their text back to it through :class:`TokenStream`. Queueing, prefill,
+decode and end-to-end latencies are recorded in :class:`SchedulerMetrics`.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from .metrics import Histogram, Registry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GenerationRequest:
+    """A completion request.
+
+    Attributes:
+        prompt: Formatted prompt text
+        max_tokens: Maximum number of tokens to generate
+        temperature: Sampling temperature (0 for greedy decoding)
+    """
+
+    prompt: str
+    max_tokens: int = 100
+    temperature: float = 0.7
+
+
+class TokenStream:
+    """Text deltas of a sequence, readable from the event loop.
+
+    The backend emits on the worker thread; each delta is handed to the
+    event loop with ``call_soon_threadsafe``, so neither side blocks.
+    """
+
+    def __init__(self) -> None:
+        """Initialize stream on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[str | None] = asyncio.Queue()
+
+    def put(self, delta: str) -> None:
+        """Send a delta (from any thread)."""
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, delta)
+
+    def close(self) -> None:
+        """End the stream after the deltas sent so far."""
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+
+    def __aiter__(self) -> "TokenStream":
+        return self
+
+    async def __anext__(self) -> str:
+        delta = await self._queue.get()
+        if delta is None:
+            raise StopAsyncIteration
+        return delta
+
+
+@dataclass(eq=False)
+class Sequence:
+    """A request while it is being generated.
+
+    Attributes:
+        request: The request
+        text: Completion generated so far
+        prompt_tokens: Number of prompt tokens
+        cached_tokens: Number of prompt tokens served from the prefix cache
+        completion_tokens: Number of generated tokens
+        finish_reason: "stop", "length" or "error" once finished
+        state: Backend-private state (token IDs, KV cache, ...)
+        enqueued_at: ``time.perf_counter()`` when the request was submitted
+        stream: Receives text deltas as they are generated, if streaming
+    """
+
+    request: GenerationRequest
+    text: str = ""
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+    finish_reason: str | None = None
+    state: Any = None
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    stream: TokenStream | None = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        """Whether generation has stopped."""
+        return self.finish_reason is not None
+
+    def emit(self, delta: str) -> None:
+        """Append newly decoded text to the completion."""
+        if not delta:
+            return
+        self.text += delta
+        if self.stream is not None:
+            self.stream.put(delta)
+
+
+class Backend(Protocol):
+    """Model backend driven by the scheduler.
+
+    Both methods are called on the scheduler's worker thread, never
+    concurrently, and must set ``finish_reason`` on sequences that stop.
+    """
+
+    def prefill(self, sequences: list[Sequence]) -> None:
+        """Process new prompts and generate their first token."""
+
+    def decode(self, sequences: list[Sequence]) -> None:
+        """Generate one more token for each running sequence."""
+
+
+_Pending = tuple[Sequence, "asyncio.Future[Sequence]"]
+
+# Batch size buckets (sequences per step)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class SchedulerMetrics:
+    """Latency histograms and token counters of a scheduler."""
+
+    def __init__(self, registry: Registry) -> None:
+        """Create the metrics.
+
+        Args:
+            registry: Registry to add them to
+        """
+        self.queue = registry.histogram(
+            "ezrunner_queue_seconds", "Time from submission to joining the batch"
+        )
+        self.first_token = registry.histogram(
+            "ezrunner_time_to_first_token_seconds",
+            "Time from submission to the first generated token",
+        )
+        self.prefill = registry.histogram(
+            "ezrunner_prefill_seconds", "Duration of prefill steps"
+        )
+        self.decode = registry.histogram(
+            "ezrunner_decode_step_seconds", "Duration of decode steps"
+        )
+        self.total = registry.histogram(
+            "ezrunner_request_seconds", "Time from submission to the last token"
+        )
+        self.batch_size = registry.histogram(
+            "ezrunner_batch_size", "Sequences per decode step", buckets=BATCH_BUCKETS
+        )
+        self.requests = registry.counter(
+            "ezrunner_requests_total",
+            "Finished requests by finish reason",
+            labelnames=("finish_reason",),
+        )
+        self.prompt_tokens = registry.counter(
+            "ezrunner_prompt_tokens_total", "Prompt tokens processed"
+        )
+        self.cached_tokens = registry.counter(
+            "ezrunner_cached_prompt_tokens_total",
+            "Prompt tokens served from the prefix cache",
+        )
+        self.completion_tokens = registry.counter(
+            "ezrunner_completion_tokens_total", "Tokens generated"
+        )
+
+
+class BatchScheduler:
+    """Group concurrent requests into batches for a backend."""
+
+    def __init__(
+        self,
+        backend: Backend,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        registry: Registry | None = None,
+        metrics: SchedulerMetrics | None = None,
+    ) -> None:
+        """Initialize scheduler.
+
+        Args:
+            backend: Model backend
+            max_batch_size: Maximum number of sequences in the running batch
+            max_wait_ms: How long to wait for more requests before starting
+                a batch when nothing is running
+            registry: Registry for the scheduler's metrics (default: a
+                private one)
+            metrics: Metrics shared with other schedulers, recorded
+                instead of new ones (the owner then reports the queue
+                gauges)
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"Invalid max batch size: {max_batch_size}")
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._waiting: deque[_Pending] = deque()
+        self._running: list[_Pending] = []
+        self._arrived = asyncio.Event()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ezrunner-generate"
+        )
+        self._task: asyncio.Task[None] | None = None
+        if metrics is not None:
+            self.metrics = metrics
+            return
+        registry = registry or Registry()
+        self.metrics = SchedulerMetrics(registry)
+        registry.gauge(
+            "ezrunner_queue_depth",
+            "Requests waiting to join the batch",
+            function=lambda: self.queue_depth,
+        )
+        registry.gauge(
+            "ezrunner_running_sequences",
+            "Sequences in the running batch",
+            function=lambda: self.batch_size,
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting to be admitted."""
+        return len(self._waiting)
+
+    @property
+    def batch_size(self) -> int:
+        """Number of sequences in the running batch."""
+        return len(self._running)
+
+    def start(self) -> None:
+        """Start the scheduling loop on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Stop scheduling and cancel unfinished requests."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for sequence, future in [*self._waiting, *self._running]:
+            future.cancel()
+            if sequence.stream is not None:
+                sequence.stream.close()
+        self._waiting.clear()
+        self._running.clear()
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, request: GenerationRequest) -> Sequence:
+        """Queue a request and wait for its completion.
+
+        Cancelling the caller (e.g. when the client disconnects) drops the
+        sequence from the batch after the current step.
+
+        Args:
+            request: Completion request
+
+        Returns:
+            The finished sequence
+
+        Raises:
+            Exception: Whatever the backend raised while generating it
+        """
+        return await self.enqueue(request)[1]
+
+    def enqueue(self, request: GenerationRequest, stream: bool = False) -> _Pending:
+        """Queue a request without waiting for it.
+
+        Args:
+            request: Completion request
+            stream: Attach a :class:`TokenStream` to the sequence
+
+        Returns:
+            The sequence and a future resolved when it finishes
+        """
+        future: asyncio.Future[Sequence] = asyncio.get_running_loop().create_future()
+        sequence = Sequence(request, stream=TokenStream() if stream else None)
+        pending = (sequence, future)
+        self._waiting.append(pending)
+        self._arrived.set()
+        return pending
+
+    async def _loop(self) -> None:
+        """Alternate between admitting requests and decode steps."""
+        while True:
+            admitted = await self._admit()
+            if admitted:
+                await self._step(self.backend.prefill, admitted, self.metrics.prefill)
+                now = time.perf_counter()
+                for sequence, _ in admitted:
+                    self.metrics.first_token.observe(now - sequence.enqueued_at)
+                self._running.extend(admitted)
+                self._retire()
+            if self._running:
+                self.metrics.batch_size.observe(len(self._running))
+                await self._step(
+                    self.backend.decode, self._running, self.metrics.decode
+                )
+                self._retire()
+
+    async def _admit(self) -> list[_Pending]:
+        """Take waiting requests into the batch.
+
+        When idle, blocks for the first request and then waits up to
+        ``max_wait`` for the batch to fill. While sequences are running,
+        only requests that are already waiting are taken so decoding never
+        stalls.
+        """
+        free = self.max_batch_size - len(self._running)
+        if free <= 0:
+            return []
+
+        if not self._running:
+            while not self._waiting:
+                self._arrived.clear()
+                await self._arrived.wait()
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.max_wait
+            while len(self._waiting) < free:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._arrived.clear()
+                try:
+                    await asyncio.wait_for(self._arrived.wait(), remaining)
+                except asyncio.TimeoutError:  # noqa: UP041 (not builtin on 3.10)
+                    break
+
+        admitted: list[_Pending] = []
+        now = time.perf_counter()
+        while self._waiting and len(admitted) < free:
+            pending = self._waiting.popleft()
+            if not pending[1].done():
+                self.metrics.queue.observe(now - pending[0].enqueued_at)
+                admitted.append(pending)
+        return admitted
+
+    async def _step(
+        self,
+        step: Callable[[list[Sequence]], None],
+        batch: list[_Pending],
+        duration: Histogram,
+    ) -> None:
+        """Run one backend call on the worker thread."""
+        sequences = [sequence for sequence, _ in batch]
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            await loop.run_in_executor(self._executor, step, sequences)
+            duration.observe(time.perf_counter() - started)
+        except Exception as e:
+            logger.exception(f"Generation failed for {len(batch)} sequence(s)")
+            for sequence, future in batch:
+                sequence.finish_reason = "error"
+                if not future.done():
+                    future.set_exception(e)
+
+    def _retire(self) -> None:
+        """Remove finished and abandoned sequences from the batch."""
+        running = []
+        for sequence, future in self._running:
+            if sequence.finished or future.done():
+                self._record(sequence)
+                sequence.state = None
+                if sequence.stream is not None:
+                    sequence.stream.close()
+                if not future.done():
+                    future.set_result(sequence)
+            else:
+                running.append((sequence, future))
+        self._running = running
+
+    def _record(self, sequence: Sequence) -> None:
+        """Count a sequence leaving the batch."""
+        metrics = self.metrics
+        metrics.total.observe(time.perf_counter() - sequence.enqueued_at)
+        metrics.requests.inc(finish_reason=sequence.finish_reason or "cancelled")
+        metrics.prompt_tokens.inc(sequence.prompt_tokens)
+        metrics.cached_tokens.inc(sequence.cached_tokens)
+        metrics.completion_tokens.inc(sequence.completion_tokens)
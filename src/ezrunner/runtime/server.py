@@ -0,0 +1,416 @@
+"""OpenAI-compatible inference server.
+
+The server listens while the model loads and warms up; ``/health``
+reports liveness and ``/ready`` readiness (see :mod:`.startup`).
+Completion requests that arrive early wait until the server is ready.
+Multi-model images serve every model of ``EZRUNNER_MODELS``, routed by
+the request's ``model`` and loaded on demand (see :mod:`.pool`).
+
+Example:
+    python3 -m ezrunner_runtime.server --port 8080
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from fastapi import FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+
+from .config import ServerConfig
+from .metrics import CONTENT_TYPE, Registry
+from .pool import ModelPool, PooledModel
+from .response_cache import ResponseCache, request_key
+from .scheduler import BatchScheduler, GenerationRequest, Sequence
+from .startup import Startup, warmup_prompt, warmup_shapes
+from .weights import Prefetcher, weight_files
+
+logger = logging.getLogger(__name__)
+
+# Share of the device memory a model pool may fill with weights; the
+# rest is left to KV caches and activations
+POOL_MEMORY_FRACTION = 0.9
+
+
+class ChatRequest(BaseModel):
+    """Chat completion request body."""
+
+    model: str = ""
+    messages: list[dict[str, Any]]
+    max_tokens: int = 100
+    temperature: float = 0.7
+    stream: bool = False
+
+
+def create_app(backend: Any, config: ServerConfig) -> FastAPI:
+    """Create the server application.
+
+    Args:
+        backend: Model backend (see ``scheduler.Backend``) that also
+            provides ``format_prompt(messages)``, a function loading it,
+            which is then called on startup in a worker thread, or a
+            :class:`ModelPool` of several models (the default model is
+            loaded on startup, the others on their first request)
+        config: Server configuration
+
+    Returns:
+        FastAPI application
+    """
+    load = backend if callable(backend) else None
+    pool = backend if isinstance(backend, ModelPool) else None
+    registry = Registry()
+    startup = Startup(registry)
+    scheduler = None
+    if pool is None:
+        # With a loader, the backend is set once it has loaded
+        scheduler = BatchScheduler(
+            backend, config.max_batch_size, config.max_wait_ms, registry
+        )
+    else:
+        pool.register_metrics(registry)
+    batches: Any = pool or scheduler
+    response_cache = ResponseCache.from_config(config)
+    if response_cache is not None:
+        response_cache.register_metrics(registry)
+
+    async def start() -> None:
+        nonlocal backend
+        try:
+            if load is not None and scheduler is not None:
+                with startup.phase("load"):
+                    backend = scheduler.backend = await asyncio.to_thread(load)
+                startup.breakdown.update(getattr(backend, "load_timings", {}))
+            elif pool is not None:
+                with startup.phase("load"):
+                    default = await pool.acquire(pool.default)
+                    pool.release(default)
+                backend = default.backend
+                startup.breakdown.update(getattr(backend, "load_timings", {}))
+            if hasattr(backend, "register_metrics"):
+                backend.register_metrics(registry)
+            shapes = warmup_shapes(config)
+            if shapes:
+                with startup.phase("warmup"):
+                    await _warmup(backend, config, shapes)
+            if scheduler is not None:
+                scheduler.start()
+        except Exception as e:
+            logger.exception("Server failed to start")
+            startup.finish(e)
+        else:
+            startup.finish()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        task = asyncio.create_task(start())
+        yield
+        task.cancel()
+        await batches.stop()
+
+    app = FastAPI(title="EZ Runner - Transformers", lifespan=lifespan)
+    app.state.scheduler = scheduler
+    app.state.pool = pool
+    app.state.startup = startup
+
+    @app.get("/health")
+    async def health() -> dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/ready")
+    async def ready() -> JSONResponse:
+        status_code = 200 if startup.ready else 503
+        return JSONResponse(startup.status(), status_code=status_code)
+
+    @app.get("/v1/models")
+    async def list_models() -> dict[str, Any]:
+        model_ids = [config.model_id] if pool is None else list(pool.models)
+        return {
+            "object": "list",
+            "data": [
+                {
+                    "id": model_id,
+                    "object": "model",
+                    "created": 0,
+                    "owned_by": "ezrunner",
+                }
+                for model_id in model_ids
+            ],
+        }
+
+    @app.get("/stats")
+    async def stats() -> dict[str, Any]:
+        stats: dict[str, Any] = {
+            "queue_depth": batches.queue_depth,
+            "batch_size": batches.batch_size,
+            **getattr(backend, "stats", dict)(),
+        }
+        if pool is not None:
+            stats["pool"] = pool.stats()
+        if response_cache is not None:
+            stats["response_cache"] = response_cache.stats()
+        return stats
+
+    @app.get("/metrics")
+    async def metrics() -> PlainTextResponse:
+        return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+    @app.post("/v1/chat/completions", response_model=None)
+    async def chat_completions(
+        request: ChatRequest,
+    ) -> dict[str, Any] | StreamingResponse:
+        if not request.messages:
+            raise HTTPException(status_code=400, detail="No messages provided")
+        try:
+            await startup.wait()
+        except RuntimeError as e:
+            raise HTTPException(status_code=503, detail=str(e)) from e
+
+        model_id = request.model or config.model_id
+        header = {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "created": int(time.time()),
+            "model": model_id,
+        }
+
+        if request.stream:
+            target, target_scheduler, pooled = await serving(model_id)
+            try:
+                sequence, future = target_scheduler.enqueue(
+                    _generation(request, target), stream=True
+                )
+            except BaseException:
+                release(pooled)
+                raise
+            # A stream releases its model once it has ended
+            return StreamingResponse(
+                _stream_chunks(
+                    header, sequence, future, functools.partial(release, pooled)
+                ),
+                media_type="text/event-stream",
+            )
+
+        async def complete() -> dict[str, Any]:
+            # Acquired here, so cached responses do not load (or evict) models
+            target, target_scheduler, pooled = await serving(model_id)
+            try:
+                sequence = await target_scheduler.submit(_generation(request, target))
+            finally:
+                release(pooled)
+            return {
+                "object": "chat.completion",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": sequence.text},
+                        "finish_reason": sequence.finish_reason,
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": sequence.prompt_tokens,
+                    "prompt_tokens_details": {"cached_tokens": sequence.cached_tokens},
+                    "completion_tokens": sequence.completion_tokens,
+                    "total_tokens": sequence.prompt_tokens + sequence.completion_tokens,
+                },
+            }
+
+        if response_cache is not None:
+            key = request_key(jsonable_encoder(request))
+            if key is not None:
+                value = await response_cache.get_or_compute(key, complete)
+                return {**header, **value}
+        return {**header, **await complete()}
+
+    async def serving(model_id: str) -> tuple[Any, Any, PooledModel | None]:
+        """Backend and scheduler of a model, acquired from the pool if any."""
+        if pool is None:
+            return backend, scheduler, None
+        pooled = await _acquire(pool, model_id)
+        return pooled.backend, pooled.scheduler, pooled
+
+    def release(pooled: PooledModel | None) -> None:
+        """Release a model acquired by ``serving``."""
+        if pool is not None and pooled is not None:
+            pool.release(pooled)
+
+    return app
+
+
+def _generation(request: ChatRequest, backend: Any) -> GenerationRequest:
+    """Generation request of a chat request, with the backend's prompt format."""
+    prompt = backend.format_prompt(request.messages)
+    return GenerationRequest(prompt, request.max_tokens, request.temperature)
+
+
+async def _acquire(pool: ModelPool, model_id: str) -> PooledModel:
+    """Get the requested model of a pool ready, as an HTTP error if it cannot be."""
+    if model_id not in pool.models:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown model {model_id!r} (serving: {', '.join(pool.models)})",
+        )
+    try:
+        return await pool.acquire(model_id)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+
+async def _warmup(
+    backend: Any, config: ServerConfig, shapes: list[tuple[int, int]]
+) -> None:
+    """Run the warmup batches.
+
+    A separate scheduler is used so warmup requests do not show up in the
+    server's metrics.
+    """
+    scheduler = BatchScheduler(backend, config.max_batch_size, max_wait_ms=0)
+    scheduler.start()
+    try:
+        for batch_size, length in shapes:
+            requests = [
+                GenerationRequest(
+                    warmup_prompt(length, i), config.warmup_max_tokens, temperature=0
+                )
+                for i in range(batch_size)
+            ]
+            await asyncio.gather(*map(scheduler.submit, requests))
+            logger.info(f"Warmed up batch of {batch_size} x {length}-word prompts")
+    finally:
+        await scheduler.stop()
+
+
+async def _stream_chunks(
+    header: dict[str, Any],
+    sequence: Sequence,
+    future: "asyncio.Future[Sequence]",
+    on_close: Callable[[], None] | None = None,
+) -> AsyncIterator[str]:
+    """Server-sent events in the OpenAI ``chat.completion.chunk`` format.
+
+    Closing the response early (client disconnect) cancels the request.
+    ``on_close`` is called once the stream has ended either way.
+    """
+
+    def chunk(delta: dict[str, str], finish_reason: str | None = None) -> str:
+        body = {
+            **header,
+            "object": "chat.completion.chunk",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(body)}\n\n"
+
+    assert sequence.stream is not None
+    try:
+        yield chunk({"role": "assistant"})
+        async for delta in sequence.stream:
+            yield chunk({"content": delta})
+        try:
+            await future
+        except Exception as e:
+            yield f"data: {json.dumps({'error': {'message': str(e)}})}\n\n"
+        else:
+            yield chunk({}, sequence.finish_reason)
+        yield "data: [DONE]\n\n"
+    finally:
+        future.cancel()
+        if on_close is not None:
+            on_close()
+
+
+def main() -> None:
+    """Load the model and serve it."""
+    parser = argparse.ArgumentParser(description="EZ Runner inference server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    config = ServerConfig.from_env()
+    # Start reading weights before torch is imported
+    prefetcher = Prefetcher(config.model_path, config.prefetch_threads)
+    prefetcher.start()
+
+    import uvicorn
+
+    def load(model_id: str, model_path: str) -> Any:
+        logger.info(f"Loading {model_id} from {model_path}")
+        started = time.perf_counter()
+        from .backend import TransformersBackend
+
+        imported = time.perf_counter()
+        backend = TransformersBackend.load(model_path, config.prefix_cache_mb)
+        backend.load_timings = {"import": imported - started, **backend.load_timings}
+        default = model_path == config.model_path
+        _log_load(backend.load_timings, model_path, prefetcher if default else None)
+        return backend
+
+    paths = config.model_paths()
+    backend: Any = functools.partial(load, config.model_id, config.model_path)
+    if len(paths) > 1:
+        backend = ModelPool(
+            {
+                model_id: (
+                    functools.partial(load, model_id, path),
+                    sum(f.stat().st_size for f in weight_files(path)),
+                )
+                for model_id, path in paths.items()
+            },
+            budget=functools.partial(_pool_budget, config.gpu_memory_gb),
+            max_batch_size=config.max_batch_size,
+            max_wait_ms=config.max_wait_ms,
+            park=config.park_models,
+        )
+    uvicorn.run(create_app(backend, config), host=args.host, port=args.port)
+
+
+def _pool_budget(gpu_memory_gb: float) -> int:
+    """Memory the models of a pool may take together, in bytes.
+
+    Defaults to a share of the GPUs' memory, or of RAM without a GPU.
+    """
+    if gpu_memory_gb > 0:
+        return int(gpu_memory_gb * 1e9)
+    import torch
+
+    if torch.cuda.is_available():
+        total = sum(
+            torch.cuda.get_device_properties(i).total_memory
+            for i in range(torch.cuda.device_count())
+        )
+    else:
+        total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    return int(total * POOL_MEMORY_FRACTION)
+
+
+def _log_load(
+    timings: dict[str, float], model_path: str, prefetcher: Prefetcher | None
+) -> None:
+    """Log where model loading spent its time."""
+    steps = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in timings.items())
+    size = sum(path.stat().st_size for path in weight_files(model_path))
+    message = f"Loaded in {sum(timings.values()):.1f}s: {steps}"
+    if "weights" in timings:
+        message += f" ({size / 1e9 / max(timings['weights'], 1e-9):.2f} GB/s)"
+    # Only the default model is prefetched
+    stats = prefetcher.wait(0) if prefetcher is not None else None
+    if prefetcher is not None and stats is None:
+        message += "; prefetch still running"
+    elif stats is not None and stats.files:
+        message += f"; prefetch {stats.seconds:.1f}s ({stats.throughput_gb_s:.2f} GB/s)"
+    logger.info(message)
+
+
+if __name__ == "__main__":
+    main()
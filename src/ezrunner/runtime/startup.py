@@ -0,0 +1,126 @@
+"""Startup phases and readiness.
+
+Servers start listening before the model is loaded, so liveness
+(``/health``) and readiness (``/ready``) are reported separately. Each
+startup phase (loading, warmup) is timed, and ``/ready`` returns the
+timings once every phase has finished; ``ezrunner run --wait`` polls it.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from .config import ServerConfig
+from .metrics import Registry
+
+logger = logging.getLogger(__name__)
+
+
+class Startup:
+    """Track startup phases and signal readiness."""
+
+    def __init__(self, registry: Registry | None = None) -> None:
+        """Initialize tracker.
+
+        Args:
+            registry: Registry for the readiness and phase metrics
+        """
+        self.phases: dict[str, float] = {}
+        # Finer timings within phases (e.g. import, tokenizer, weights)
+        self.breakdown: dict[str, float] = {}
+        self.phase_name: str | None = None
+        self.error: str | None = None
+        self._done = asyncio.Event()
+        if registry is not None:
+            registry.gauge(
+                "ezrunner_ready",
+                "Whether the server is ready to serve requests",
+                function=lambda: int(self.ready),
+            )
+            registry.gauge(
+                "ezrunner_startup_seconds",
+                "Total duration of the startup phases",
+                function=lambda: sum(self.phases.values()) if self.ready else None,
+            )
+
+    @property
+    def ready(self) -> bool:
+        """Whether startup finished successfully."""
+        return self._done.is_set() and self.error is None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a startup phase."""
+        self.phase_name = name
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started
+            self.phase_name = None
+            logger.info(f"Startup phase {name} took {self.phases[name]:.2f}s")
+
+    def finish(self, error: BaseException | None = None) -> None:
+        """Mark startup as finished, successfully unless ``error`` is given."""
+        if error is not None:
+            self.error = str(error) or type(error).__name__
+        self._done.set()
+
+    async def wait(self) -> None:
+        """Wait for startup to finish.
+
+        Raises:
+            RuntimeError: If startup failed
+        """
+        await self._done.wait()
+        if self.error is not None:
+            raise RuntimeError(f"Server failed to start: {self.error}")
+
+    def status(self) -> dict[str, Any]:
+        """Readiness report returned by ``/ready``."""
+        if self.error is not None:
+            state = "failed"
+        elif self._done.is_set():
+            state = "ready"
+        else:
+            state = "starting"
+        status: dict[str, Any] = {
+            "status": state,
+            "phase": self.phase_name,
+            "phases": {name: round(s, 3) for name, s in self.phases.items()},
+        }
+        if self.breakdown:
+            status["breakdown"] = {n: round(s, 3) for n, s in self.breakdown.items()}
+        if self.error is not None:
+            status["error"] = self.error
+        return status
+
+
+def warmup_shapes(config: ServerConfig) -> list[tuple[int, int]]:
+    """Warmup batches as (batch size, prompt words).
+
+    Every configured prompt length is run alone and as a full batch, which
+    covers CUDA context setup, allocator growth to peak batch memory and
+    kernel selection for both ends of the batch size range.
+
+    Args:
+        config: Server configuration
+
+    Returns:
+        Shapes to run, in order (empty if warmup is disabled)
+    """
+    lengths = [int(n) for n in config.warmup_prompt_tokens.split(",") if n.strip()]
+    batch_sizes = sorted({1, config.max_batch_size})
+    return [(size, length) for length in lengths if length > 0 for size in batch_sizes]
+
+
+def warmup_prompt(length: int, index: int = 0) -> str:
+    """Prompt of roughly ``length`` tokens for any tokenizer.
+
+    Prompts with different ``index`` differ in their first token, so a
+    warmup batch runs full prefill instead of hitting the prefix cache.
+    """
+    return " ".join([str(index), *["hello"] * (length - 1)])
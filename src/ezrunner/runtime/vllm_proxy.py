@@ -0,0 +1,363 @@
+"""Front end for the vLLM image.
+
+Runs vLLM's OpenAI-compatible server on an internal port and proxies the
+public port to it, adding the features the Transformers server has (the
+response cache, ``/stats``) without patching vLLM. Streaming responses are
+passed through chunk by chunk. ``/metrics`` serves vLLM's own Prometheus
+metrics (queue time, time to first token, token counts, ...) followed by
+the front end's. ``/ready`` reports ready once vLLM answers its health
+check and the warmup requests have completed.
+
+Example:
+    python3 -m ezrunner_runtime.vllm_proxy --port 8080
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shlex
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+
+from .config import ServerConfig
+from .metrics import CONTENT_TYPE, Registry
+from .response_cache import ResponseCache, request_key
+from .startup import Startup, warmup_prompt, warmup_shapes
+from .weights import Prefetcher
+
+logger = logging.getLogger(__name__)
+
+# Endpoints whose deterministic responses are cached
+CACHED_PATHS = ("v1/chat/completions", "v1/completions")
+# Hop-by-hop headers, and headers the proxied body invalidates
+DROPPED_HEADERS = {"connection", "content-length", "transfer-encoding", "host"}
+# Interval between health checks while vLLM is loading
+HEALTH_POLL_S = 0.5
+# config.json keys holding a model's context length, by preference
+CONTEXT_LENGTH_KEYS = (
+    "max_position_embeddings",
+    "max_sequence_length",
+    "seq_length",
+    "n_positions",
+)
+
+
+class UpstreamError(Exception):
+    """Non-success response from vLLM (never cached)."""
+
+    def __init__(self, response: httpx.Response) -> None:
+        super().__init__(f"vLLM returned {response.status_code}")
+        self.response = response
+
+
+def vllm_command(config: ServerConfig) -> list[str]:
+    """Command line starting vLLM's OpenAI server on the internal port.
+
+    Settings baked in by ``pack`` become engine arguments; ``vllm_args``
+    comes last, so its arguments override them.
+
+    Args:
+        config: Server configuration
+
+    Returns:
+        Command line
+    """
+    command = [
+        sys.executable,
+        "-m",
+        "vllm.entrypoints.openai.api_server",
+        "--model",
+        config.model_path,
+        "--served-model-name",
+        config.model_id,
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(config.vllm_port),
+        "--max-num-seqs",
+        str(config.max_batch_size),
+        "--gpu-memory-utilization",
+        f"{config.vllm_gpu_memory_utilization:g}",
+        "--kv-cache-dtype",
+        config.vllm_kv_cache_dtype,
+    ]
+    max_model_len = config.vllm_max_model_len
+    context_length = model_context_length(config.model_path)
+    if max_model_len and context_length:
+        # vLLM refuses a limit beyond what the model supports
+        max_model_len = min(max_model_len, context_length)
+    if max_model_len:
+        command += ["--max-model-len", str(max_model_len)]
+    if config.vllm_max_num_batched_tokens:
+        command += [
+            "--max-num-batched-tokens",
+            str(config.vllm_max_num_batched_tokens),
+        ]
+    if config.vllm_enable_chunked_prefill:
+        command.append("--enable-chunked-prefill")
+    if config.vllm_enable_prefix_caching:
+        command.append("--enable-prefix-caching")
+    return [*command, *shlex.split(config.vllm_args)]
+
+
+def model_context_length(model_path: str) -> int | None:
+    """Context length declared in a model's ``config.json``.
+
+    Args:
+        model_path: Model directory
+
+    Returns:
+        Context length in tokens, or None if unknown
+    """
+    try:
+        model_config = json.loads(Path(model_path, "config.json").read_text())
+    except (OSError, ValueError):
+        return None
+    for key in CONTEXT_LENGTH_KEYS:
+        value = model_config.get(key)
+        if isinstance(value, int) and value > 0:
+            return value
+    return None
+
+
+def create_app(
+    config: ServerConfig, client: httpx.AsyncClient | None = None
+) -> FastAPI:
+    """Create the proxy application.
+
+    Args:
+        config: Server configuration
+        client: HTTP client for vLLM (default: one for the internal port)
+
+    Returns:
+        FastAPI application
+    """
+    upstream = client or httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{config.vllm_port}", timeout=None
+    )
+    response_cache = ResponseCache.from_config(config)
+    registry = Registry()
+    startup = Startup(registry)
+    if response_cache is not None:
+        response_cache.register_metrics(registry)
+
+    async def start() -> None:
+        try:
+            with startup.phase("load"):
+                await _wait_healthy(upstream)
+            shapes = warmup_shapes(config)
+            if shapes:
+                with startup.phase("warmup"):
+                    await _warmup(upstream, config, shapes)
+        except Exception as e:
+            logger.exception("vLLM failed to start")
+            startup.finish(e)
+        else:
+            startup.finish()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        task = asyncio.create_task(start())
+        yield
+        task.cancel()
+        await upstream.aclose()
+
+    app = FastAPI(title="EZ Runner - vLLM", lifespan=lifespan)
+
+    @app.get("/stats")
+    async def stats() -> dict[str, Any]:
+        if response_cache is None:
+            return {}
+        return {"response_cache": response_cache.stats()}
+
+    @app.get("/health")
+    async def health() -> dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/ready")
+    async def ready() -> JSONResponse:
+        status_code = 200 if startup.ready else 503
+        return JSONResponse(startup.status(), status_code=status_code)
+
+    @app.get("/metrics")
+    async def metrics() -> Response:
+        text = registry.render()
+        try:
+            response = await upstream.get("/metrics")
+        except httpx.TransportError:
+            # Still loading: serve the front end's metrics alone
+            response = None
+        if response is not None and response.status_code == 200:
+            text = response.text.rstrip("\n") + "\n" + text
+        return Response(text, media_type=CONTENT_TYPE)
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
+    async def proxy(path: str, request: Request) -> Response:
+        body = await request.body()
+        if response_cache is not None and path in CACHED_PATHS:
+            key = _cache_key(body)
+            if key is not None:
+                return await cached(key, path, body, request)
+        return await forward(path, body, request)
+
+    async def cached(key: str, path: str, body: bytes, request: Request) -> Response:
+        async def compute() -> dict[str, Any]:
+            response = await upstream.post(
+                f"/{path}", content=body, headers=_headers(request.headers)
+            )
+            if response.status_code != 200:
+                raise UpstreamError(response)
+            completion: dict[str, Any] = response.json()
+            return completion
+
+        assert response_cache is not None
+        try:
+            value = await response_cache.get_or_compute(key, compute)
+        except UpstreamError as e:
+            return Response(
+                e.response.content,
+                status_code=e.response.status_code,
+                media_type=e.response.headers.get("content-type"),
+            )
+        except httpx.TransportError as e:
+            return _unavailable(e)
+        # Fresh identity for every response, as if it had been generated
+        prefix = str(value.get("id", "cmpl")).split("-")[0]
+        return JSONResponse(
+            {**value, "id": f"{prefix}-{uuid.uuid4().hex}", "created": int(time.time())}
+        )
+
+    async def forward(path: str, body: bytes, request: Request) -> Response:
+        upstream_request = upstream.build_request(
+            request.method,
+            f"/{path}",
+            params=request.query_params,
+            content=body,
+            headers=_headers(request.headers),
+        )
+        try:
+            response = await upstream.send(upstream_request, stream=True)
+        except httpx.TransportError as e:
+            return _unavailable(e)
+        return StreamingResponse(
+            response.aiter_raw(),
+            status_code=response.status_code,
+            headers=_headers(response.headers),
+            background=BackgroundTask(response.aclose),
+        )
+
+    return app
+
+
+async def _wait_healthy(upstream: httpx.AsyncClient) -> None:
+    """Wait until vLLM has loaded the model and answers health checks."""
+    while True:
+        try:
+            response = await upstream.get("/health")
+            if response.status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(HEALTH_POLL_S)
+
+
+async def _warmup(
+    upstream: httpx.AsyncClient, config: ServerConfig, shapes: list[tuple[int, int]]
+) -> None:
+    """Send the warmup batches to vLLM."""
+
+    async def complete(prompt: str) -> None:
+        response = await upstream.post(
+            "/v1/completions",
+            json={
+                "model": config.model_id,
+                "prompt": prompt,
+                "max_tokens": config.warmup_max_tokens,
+                "temperature": 0,
+            },
+        )
+        response.raise_for_status()
+
+    for batch_size, length in shapes:
+        prompts = [warmup_prompt(length, i) for i in range(batch_size)]
+        await asyncio.gather(*map(complete, prompts))
+        logger.info(f"Warmed up batch of {batch_size} x {length}-word prompts")
+
+
+def _cache_key(body: bytes) -> str | None:
+    """Cache key of a raw request body (None if not cacheable)."""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return None
+    return request_key(payload) if isinstance(payload, dict) else None
+
+
+def _headers(headers: Any) -> dict[str, str]:
+    """Headers safe to pass across the proxy."""
+    return {
+        name: value
+        for name, value in headers.items()
+        if name.lower() not in DROPPED_HEADERS
+    }
+
+
+def _unavailable(error: Exception) -> JSONResponse:
+    """Response while vLLM is not accepting connections (e.g. still loading)."""
+    logger.warning(f"vLLM unavailable: {error}")
+    return JSONResponse(
+        {"error": {"message": "Model server is not available yet"}}, status_code=503
+    )
+
+
+def main() -> None:
+    """Start vLLM and serve the front end."""
+    parser = argparse.ArgumentParser(description="EZ Runner vLLM front end")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    config = ServerConfig.from_env()
+    # Fill the page cache while vLLM imports torch and initializes CUDA
+    Prefetcher(config.model_path, config.prefetch_threads).start()
+    command = vllm_command(config)
+    logger.info(f"Starting vLLM: {shlex.join(command)}")
+    process = subprocess.Popen(command)
+
+    def watch() -> None:
+        # Take the front end down with vLLM, so the container exits too
+        code = process.wait()
+        logger.error(f"vLLM exited with status {code}")
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    threading.Thread(target=watch, daemon=True).start()
+
+    import uvicorn
+
+    try:
+        uvicorn.run(create_app(config), host=args.host, port=args.port)
+    finally:
+        process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Tracing utilities for EZ Runner.
+
+Components record spans through the module-level :func:`span`, the same
+way they log through :func:`get_logger`: no tracer is passed around.
+Spans go to the tracer activated with :func:`tracing` in the current
+context and cost nothing when none is active. A finished trace is
+written in the Chrome trace-event format, which ``chrome://tracing``,
+Perfetto and speedscope open directly.
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+# Counters summed over a span and its descendants in the summary
+COUNTERS = ("bytes", "cache_hits", "cache_misses")
+
+
+@dataclass
+class Span:
+    """A timed operation.
+
+    Attributes:
+        name: Operation name
+        category: Kind of operation (e.g., "pack", "http", "docker")
+        start: ``time.perf_counter()`` at the start
+        end: ``time.perf_counter()`` at the end (None while running)
+        parent: Enclosing span
+        args: Details and counters (e.g., bytes moved, cache hits)
+        thread: ID of the thread the span ran on
+    """
+
+    name: str
+    category: str
+    start: float
+    end: float | None = None
+    parent: "Span | None" = None
+    args: dict[str, Any] = field(default_factory=dict)
+    thread: int = 0
+
+    @property
+    def seconds(self) -> float:
+        """Duration (up to now while running)."""
+        return (self.end or time.perf_counter()) - self.start
+
+    def set(self, **args: Any) -> None:
+        """Record details of the operation."""
+        self.args.update(args)
+
+    def add(self, counter: str, amount: int = 1) -> None:
+        """Increase a counter of the operation."""
+        self.args[counter] = self.args.get(counter, 0) + amount
+
+    def root(self) -> "Span":
+        """Outermost enclosing span."""
+        span = self
+        while span.parent is not None:
+            span = span.parent
+        return span
+
+
+class Tracer:
+    """Collect the spans of one run."""
+
+    def __init__(self) -> None:
+        """Initialize empty tracer."""
+        self.origin = time.perf_counter()
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def begin(
+        self,
+        name: str,
+        category: str,
+        parent: Span | None,
+        start: float | None = None,
+    ) -> Span:
+        """Start recording a span (now, or at an earlier ``start``)."""
+        span = Span(
+            name,
+            category,
+            time.perf_counter() if start is None else start,
+            parent=parent,
+            thread=threading.get_ident(),
+        )
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Per-stage totals: each top-level span with its descendants.
+
+        Returns:
+            One row per top-level span, in start order, with ``name``,
+            ``seconds``, ``http_calls``, the :data:`COUNTERS` and
+            ``throughput_mb_s`` when bytes were moved
+        """
+        rows: dict[int, dict[str, Any]] = {}
+        for span in self.spans:
+            root = span.root()
+            row = rows.setdefault(
+                id(root),
+                {"name": root.name, "seconds": root.seconds, "http_calls": 0}
+                | dict.fromkeys(COUNTERS, 0),
+            )
+            if span.category == "http":
+                row["http_calls"] += 1
+            for counter in COUNTERS:
+                row[counter] += span.args.get(counter, 0)
+        for row in rows.values():
+            if row["bytes"]:
+                row["throughput_mb_s"] = row["bytes"] / 1e6 / max(row["seconds"], 1e-9)
+        return list(rows.values())
+
+    def events(self) -> list[dict[str, Any]]:
+        """Spans as Chrome trace events (complete events, microseconds)."""
+        pid = os.getpid()
+        return [
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": round((span.start - self.origin) * 1e6, 3),
+                "dur": round(span.seconds * 1e6, 3),
+                "pid": pid,
+                "tid": span.thread,
+                "args": span.args,
+            }
+            for span in self.spans
+        ]
+
+    def write(self, path: Path) -> None:
+        """Write the trace as a Chrome trace-event JSON file."""
+        trace = {"traceEvents": self.events(), "displayTimeUnit": "ms"}
+        path.write_text(json.dumps(trace, indent=1, default=str))
+
+
+_tracer: ContextVar[Tracer | None] = ContextVar("ezrunner_tracer", default=None)
+_current: ContextVar[Span | None] = ContextVar("ezrunner_span", default=None)
+
+
+@contextmanager
+def tracing(tracer: Tracer) -> Iterator[Tracer]:
+    """Record spans of the enclosed code (in this context) to ``tracer``."""
+    token = _tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _tracer.reset(token)
+
+
+@contextmanager
+def span(name: str, category: str = "pack", **args: Any) -> Iterator[Span]:
+    """Time the enclosed code as a span of the active tracer.
+
+    Without an active tracer the span is still returned, so callers can
+    record details unconditionally, but it is not kept.
+
+    Args:
+        name: Operation name
+        category: Kind of operation
+        **args: Initial details
+
+    Yields:
+        The span
+    """
+    tracer = _tracer.get()
+    parent = _current.get()
+    if tracer is None:
+        current = Span(name, category, time.perf_counter(), parent=parent)
+    else:
+        current = tracer.begin(name, category, parent)
+    current.args.update(args)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current.reset(token)
+
+
+def record(name: str, category: str, start: float, end: float, **args: Any) -> Span:
+    """Record an operation timed elsewhere, under the current span.
+
+    For operations whose boundaries are observed rather than enclosed,
+    such as Dockerfile steps parsed from a build log.
+
+    Args:
+        name: Operation name
+        category: Kind of operation
+        start: ``time.perf_counter()`` at the start
+        end: ``time.perf_counter()`` at the end
+        **args: Details
+
+    Returns:
+        The span (kept only if a tracer is active)
+    """
+    tracer = _tracer.get()
+    parent = _current.get()
+    if tracer is None:
+        current = Span(name, category, start, parent=parent)
+    else:
+        current = tracer.begin(name, category, parent, start=start)
+    current.args.update(args)
+    current.end = end
+    return current
@@ -0,0 +1,165 @@
+"""Fixtures of the benchmark suite.
+
+Everything runs locally: Docker is replaced by fakes, model hubs by
+stub HTTP servers, and multi-GB archives are written sparsely so they
+cost no disk space or time to create.
+
+Run with ``pytest tests/benchmarks --benchmark --no-cov``; add
+``--benchmark-save`` to record the results as the baseline later runs
+are checked against.
+"""
+
+import hashlib
+import json
+import os
+import tarfile
+import threading
+from collections.abc import Callable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from tests.benchmarks.harness import (
+    Measurement,
+    compare,
+    load_results,
+    measure,
+    save_results,
+)
+
+GiB = 1024**3
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(
+    request: pytest.FixtureRequest,
+) -> Iterator[list[Measurement]]:
+    """Measurements of the session, stored when it ends."""
+    results: list[Measurement] = []
+    yield results
+    if not results:
+        return
+    config = request.config
+    save_results(config.rootpath / ".benchmarks" / "latest.json", results)
+    if config.getoption("--benchmark-save"):
+        save_results(
+            config.rootpath / config.getoption("--benchmark-baseline"), results
+        )
+
+
+@pytest.fixture
+def benchmark(
+    request: pytest.FixtureRequest, benchmark_results: list[Measurement]
+) -> Callable[..., Measurement]:
+    """Time an operation and fail if it regressed against the baseline.
+
+    Returns:
+        ``benchmark(func, rounds=5, data_bytes=0)``, named after the test
+    """
+    config = request.config
+    if not config.getoption("--benchmark"):
+        pytest.skip("benchmarks run with --benchmark")
+    baseline = load_results(config.rootpath / config.getoption("--benchmark-baseline"))
+    threshold = config.getoption("--benchmark-threshold")
+    name = request.node.name.removeprefix("test_")
+
+    def run(
+        func: Callable[[], object], rounds: int = 5, data_bytes: int = 0
+    ) -> Measurement:
+        result = measure(name, func, rounds=rounds, data_bytes=data_bytes)
+        benchmark_results.append(result)
+        regression = compare(result, baseline.get(name), threshold)
+        if regression is not None and not config.getoption("--benchmark-save"):
+            pytest.fail(f"Performance regression: {regression}")
+        return result
+
+    return run
+
+
+@pytest.fixture
+def hub_server() -> Iterator[Callable[[dict[str, Any]], str]]:
+    """Start stub model-hub APIs serving fixed JSON documents.
+
+    Returns:
+        Factory taking ``{path: document}`` and returning the base URL
+    """
+    servers = []
+
+    def start(documents: dict[str, Any]) -> str:
+        bodies = {path: json.dumps(doc).encode() for path, doc in documents.items()}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = bodies.get(self.path)
+                self.send_response(200 if body is not None else 404)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body or b"")))
+                self.end_headers()
+                self.wfile.write(body or b"")
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(scope="session")
+def sparse_archive(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Callable[[str, dict[str, list[int]]], Path]:
+    """Factory writing ``docker save`` archives with sparse layers.
+
+    Layer data is a hole in the file: the archive has its full size and
+    reads back as zeros, but takes no disk space or time to write.
+
+    Returns:
+        Factory taking a file name and ``{tag: [layer sizes]}``
+    """
+    root = tmp_path_factory.mktemp("archives")
+
+    def write(name: str, images: dict[str, list[int]]) -> Path:
+        path = root / name
+        manifest = []
+        with open(path, "wb") as f:
+            for tag, sizes in images.items():
+                layers = []
+                for i, size in enumerate(sizes):
+                    layer = f"{tag.split(':')[0]}-{i}/layer.tar"
+                    _write_member(f, layer, size)
+                    layers.append(layer)
+                config = json.dumps({"tag": tag}).encode()
+                config_name = f"{hashlib.sha256(config).hexdigest()}.json"
+                _write_member(f, config_name, len(config), config)
+                manifest.append(
+                    {"Config": config_name, "RepoTags": [tag], "Layers": layers}
+                )
+            data = json.dumps(manifest).encode()
+            _write_member(f, "manifest.json", len(data), data)
+            f.write(tarfile.NUL * (2 * tarfile.BLOCKSIZE))
+        return path
+
+    return write
+
+
+def _write_member(f: Any, name: str, size: int, data: bytes | None = None) -> None:
+    """Append a tar member; without ``data`` its content is left as a hole."""
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mode = 0o644
+    f.write(info.tobuf(format=tarfile.PAX_FORMAT))
+    if data is not None:
+        f.write(data)
+    else:
+        f.seek(size, os.SEEK_CUR)
+    padding = -size % tarfile.BLOCKSIZE
+    f.write(tarfile.NUL * padding)
@@ -0,0 +1,144 @@
+"""Timing, baseline storage and regression checks for the benchmark suite."""
+
+import json
+import os
+import platform
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """Timings of one benchmark.
+
+    Attributes:
+        name: Benchmark name
+        seconds: Median wall time of a round
+        best_s: Fastest round
+        rounds: Number of timed rounds
+        data_bytes: Bytes processed per round (0 if not a throughput case)
+    """
+
+    name: str
+    seconds: float
+    best_s: float
+    rounds: int
+    data_bytes: int = 0
+
+    @property
+    def throughput_mb_s(self) -> float | None:
+        """Median throughput in MB/s (None if not a throughput case)."""
+        if not self.data_bytes:
+            return None
+        return self.data_bytes / 1e6 / max(self.seconds, 1e-9)
+
+
+@dataclass(frozen=True)
+class Regression:
+    """A benchmark slower than its baseline beyond the threshold.
+
+    Attributes:
+        name: Benchmark name
+        baseline_s: Median wall time recorded in the baseline
+        current_s: Median wall time of this run
+    """
+
+    name: str
+    baseline_s: float
+    current_s: float
+
+    @property
+    def slowdown(self) -> float:
+        """Relative slowdown (0.5 means 50% slower)."""
+        return self.current_s / self.baseline_s - 1
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.current_s * 1000:.2f} ms vs baseline "
+            f"{self.baseline_s * 1000:.2f} ms (+{self.slowdown:.0%})"
+        )
+
+
+def measure(
+    name: str,
+    func: Callable[[], object],
+    rounds: int = 5,
+    warmup: int = 1,
+    data_bytes: int = 0,
+) -> Measurement:
+    """Time ``func`` over several rounds.
+
+    The median is what gets compared: it ignores the odd round disturbed
+    by the rest of the machine, unlike the mean.
+
+    Args:
+        name: Benchmark name
+        func: Operation to time
+        rounds: Timed rounds
+        warmup: Untimed rounds first (imports, page cache, allocators)
+        data_bytes: Bytes ``func`` processes per call
+
+    Returns:
+        Measurement
+    """
+    for _ in range(warmup):
+        func()
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return Measurement(name, statistics.median(times), min(times), rounds, data_bytes)
+
+
+def compare(
+    current: Measurement, baseline: dict[str, Any] | None, threshold: float
+) -> Regression | None:
+    """Check a measurement against its baseline entry.
+
+    Args:
+        current: This run's measurement
+        baseline: Stored entry for the benchmark (None if never recorded)
+        threshold: Allowed relative slowdown (0.25 allows 25%)
+
+    Returns:
+        The regression, or None if within the threshold or no baseline
+    """
+    if baseline is None:
+        return None
+    if current.seconds <= baseline["seconds"] * (1 + threshold):
+        return None
+    return Regression(current.name, baseline["seconds"], current.seconds)
+
+
+def load_results(path: Path) -> dict[str, dict[str, Any]]:
+    """Stored measurements, by benchmark name (empty if none)."""
+    try:
+        return dict(json.loads(path.read_text())["benchmarks"])
+    except FileNotFoundError:
+        return {}
+
+
+def save_results(path: Path, measurements: list[Measurement]) -> None:
+    """Store measurements, keeping entries of benchmarks not run this time."""
+    results = load_results(path)
+    for measurement in measurements:
+        entry = asdict(measurement)
+        entry["throughput_mb_s"] = measurement.throughput_mb_s
+        results[measurement.name] = entry
+    document = {
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "benchmarks": dict(sorted(results.items())),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(document, indent=2))
+    os.replace(tmp, path)
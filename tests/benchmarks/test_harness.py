@@ -0,0 +1,36 @@
+"""Tests for the benchmark harness."""
+
+from pathlib import Path
+
+from tests.benchmarks.harness import Measurement, compare, load_results, save_results
+
+
+class TestHarness:
+    """Test baseline storage and regression checks."""
+
+    def test_compare(self) -> None:
+        """Test slowdowns beyond the threshold are regressions."""
+        baseline = {"seconds": 0.100}
+
+        within = compare(Measurement("a", 0.120, 0.1, 5), baseline, 0.25)
+        beyond = compare(Measurement("a", 0.130, 0.1, 5), baseline, 0.25)
+
+        assert within is None
+        assert beyond is not None
+        assert round(beyond.slowdown, 2) == 0.30
+        assert str(beyond) == "a: 130.00 ms vs baseline 100.00 ms (+30%)"
+        # Never recorded: nothing to regress against
+        assert compare(Measurement("a", 9.0, 9.0, 5), None, 0.25) is None
+
+    def test_save_merges(self, tmp_path: Path) -> None:
+        """Test saving keeps entries of benchmarks not run this time."""
+        path = tmp_path / "baseline.json"
+
+        save_results(path, [Measurement("a", 1.0, 1.0, 3, data_bytes=10**6)])
+        save_results(path, [Measurement("b", 2.0, 2.0, 3)])
+        results = load_results(path)
+
+        assert set(results) == {"a", "b"}
+        assert results["a"]["throughput_mb_s"] == 1.0
+        assert results["b"]["throughput_mb_s"] is None
+        assert load_results(tmp_path / "missing.json") == {}
@@ -0,0 +1,176 @@
+"""Benchmarks of the pack and load paths."""
+
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from types import SimpleNamespace
+from typing import IO, Any
+
+import pytest
+
+from ezrunner.api.modelscope import ModelScopeClient
+from ezrunner.core.archive import iter_image, read_manifest, select_image
+from ezrunner.core.cache import PackCache
+from ezrunner.core.discovery import ModelDiscovery
+from ezrunner.core.dockerfile import DockerfileGenerator
+from ezrunner.core.exporter import TarExporter
+from ezrunner.core.loader import ImageLoader
+from ezrunner.models.engine import Engine
+from ezrunner.models.model_info import ModelInfo
+from tests.benchmarks.conftest import GiB
+from tests.benchmarks.harness import Measurement
+
+MODEL = ModelInfo(
+    model_id="qwen/Qwen2-72B-Instruct",
+    size_gb=135.4,
+    format="safetensors",
+    repo_type="modelscope",
+    architecture="qwen2",
+    revision="abc",
+)
+
+# Files in the stub repository (a large checkpoint with many shards)
+TREE_FILES = 20_000
+EXPORT_BYTES = 1 * GiB
+CHUNK = b"\0" * (2 * 1024 * 1024)
+
+
+class FakeImage:
+    """Image whose ``docker save`` stream is ``size`` zero bytes."""
+
+    id = "sha256:" + "0" * 64
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+    def save(self, named: bool = False) -> Iterator[bytes]:
+        remaining = self.size
+        while remaining:
+            chunk = CHUNK[: min(len(CHUNK), remaining)]
+            remaining -= len(chunk)
+            yield chunk
+
+
+class FakeImages:
+    """``client.images`` that drains loaded archives and knows every image."""
+
+    def load(self, data: IO[bytes] | Iterable[bytes]) -> list[Any]:
+        if hasattr(data, "read"):
+            while data.read(len(CHUNK)):
+                pass
+        else:
+            for _ in data:
+                pass
+        return [SimpleNamespace(tags=[])]
+
+    def get(self, image_id: str) -> Any:
+        return SimpleNamespace(id=image_id, tags=["ezrunner-a:latest"])
+
+
+@pytest.fixture
+def loader() -> ImageLoader:
+    """Image loader talking to a fake daemon."""
+    return ImageLoader(client=SimpleNamespace(images=FakeImages()))
+
+
+def test_discovery_large_tree(
+    benchmark: Callable[..., Measurement],
+    hub_server: Callable[[dict[str, Any]], str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Discover a model whose repository lists many files."""
+    files = [
+        {"path": f"model-{i:05d}-of-{TREE_FILES:05d}.safetensors", "size": 7 * GiB}
+        for i in range(TREE_FILES)
+    ]
+    url = hub_server(
+        {
+            "/api/v1/models/big/model": {"model_type": "qwen2"},
+            "/api/v1/models/big/model/repo/files": {"files": files},
+        }
+    )
+    monkeypatch.setattr(ModelScopeClient, "BASE_URL", f"{url}/api/v1")
+    discovery = ModelDiscovery()
+
+    benchmark(lambda: discovery.discover("big/model"), rounds=10)
+
+    assert discovery.discover("big/model").format == "safetensors"
+
+
+@pytest.mark.parametrize("engine", [Engine.VLLM, Engine.TRANSFORMERS])
+def test_dockerfile_generate(
+    benchmark: Callable[..., Measurement], engine: Engine
+) -> None:
+    """Render a Dockerfile."""
+    generator = DockerfileGenerator()
+    settings = {"EZRUNNER_MAX_BATCH_SIZE": "32"}
+
+    benchmark(lambda: generator.generate(MODEL, engine, 8080, settings), rounds=50)
+
+
+def test_pack_cache_key(benchmark: Callable[..., Measurement]) -> None:
+    """Key a pack, hashing the runtime package shipped in the context."""
+    generator = DockerfileGenerator()
+    context = generator.context(Engine.VLLM)
+    dockerfile = generator.generate(MODEL, Engine.VLLM)
+    cache = PackCache()
+
+    benchmark(
+        lambda: cache.key(MODEL, Engine.VLLM, dockerfile, 8080, context), rounds=20
+    )
+
+
+def test_tar_export(benchmark: Callable[..., Measurement], tmp_path: Path) -> None:
+    """Export a 1 GiB image to a tar file."""
+    image = FakeImage(EXPORT_BYTES)
+    output = tmp_path / "model.tar"
+
+    result = benchmark(
+        lambda: TarExporter().export(image, output),
+        rounds=3,
+        data_bytes=EXPORT_BYTES,
+    )
+
+    assert output.stat().st_size == EXPORT_BYTES
+    assert result.throughput_mb_s is not None
+
+
+def test_read_manifest(
+    benchmark: Callable[..., Measurement],
+    sparse_archive: Callable[[str, dict[str, list[int]]], Path],
+) -> None:
+    """Read the manifest of a 24 GiB bundle (headers only)."""
+    archive = sparse_archive(
+        "bundle.tar",
+        {"ezrunner-a:latest": [4 * GiB, 8 * GiB], "ezrunner-b:latest": [12 * GiB]},
+    )
+
+    benchmark(lambda: read_manifest(archive), rounds=20)
+
+
+def test_find_loaded(
+    benchmark: Callable[..., Measurement],
+    sparse_archive: Callable[[str, dict[str, list[int]]], Path],
+    loader: ImageLoader,
+) -> None:
+    """Check a 16 GiB archive is already loaded, as ``run`` does first."""
+    archive = sparse_archive("model.tar", {"ezrunner-a:latest": [16 * GiB]})
+
+    benchmark(lambda: loader.find_loaded(archive), rounds=20)
+
+    assert loader.find_loaded(archive) is not None
+
+
+def test_load_model_from_bundle(
+    benchmark: Callable[..., Measurement],
+    sparse_archive: Callable[[str, dict[str, list[int]]], Path],
+    loader: ImageLoader,
+) -> None:
+    """Stream one 1 GiB image out of a bundle to the daemon."""
+    archive = sparse_archive(
+        "pair.tar", {"ezrunner-a:latest": [1 * GiB], "ezrunner-b:latest": [8 * GiB]}
+    )
+    image = select_image(read_manifest(archive), "ezrunner-a:latest")
+
+    benchmark(lambda: loader.load(archive, "ezrunner-a"), rounds=3, data_bytes=GiB)
+
+    assert sum(len(chunk) for chunk in iter_image(archive, image)) > GiB
@@ -1,11 +1,50 @@
 """Pytest configuration and shared fixtures."""
 
+import hashlib
+import io
+import json
+import tarfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
 import pytest
 
 from ezrunner.models.hardware import Hardware
 from ezrunner.models.model_info import ModelInfo
 
 
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Options of the benchmark suite (tests/benchmarks)."""
+    group = parser.getgroup("benchmarks")
+    group.addoption(
+        "--benchmark",
+        action="store_true",
+        help="Run the benchmarks (skipped otherwise)",
+    )
+    group.addoption(
+        "--benchmark-baseline",
+        type=Path,
+        default=Path(".benchmarks/baseline.json"),
+        help="Baseline results to compare against",
+    )
+    group.addoption(
+        "--benchmark-save",
+        action="store_true",
+        help="Record this run's results as the baseline",
+    )
+    group.addoption(
+        "--benchmark-threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown against the baseline (0.25 = 25%%)",
+    )
+
+
 @pytest.fixture
 def sample_model() -> ModelInfo:
     """Sample model for testing."""
@@ -52,3 +91,182 @@ def cpu_only_hardware() -> Hardware:
         ram_gb=64.0,
         gpu_vendor="none",
     )
+
+
+@pytest.fixture
+def make_archive(tmp_path: Path) -> Callable[..., Path]:
+    """Factory writing synthetic ``docker save`` archives (legacy layout).
+
+    Each image is ``(tag, [layer bytes, ...])``; layer directories are
+    named after the tag so equal content under different paths can be
+    exercised.
+    """
+
+    def _make(name: str, images: list[tuple[str, list[bytes]]]) -> Path:
+        path = tmp_path / name
+        manifest = []
+        with tarfile.open(path, "w") as tar:
+            for tag, layers in images:
+                layer_paths = []
+                for i, data in enumerate(layers):
+                    layer_path = f"{tag.split(':')[0]}-{i}/layer.tar"
+                    _add_bytes(tar, layer_path, data)
+                    layer_paths.append(layer_path)
+                diff_ids = [
+                    f"sha256:{hashlib.sha256(data).hexdigest()}" for data in layers
+                ]
+                config = json.dumps(
+                    {"tag": tag, "rootfs": {"type": "layers", "diff_ids": diff_ids}}
+                ).encode()
+                config_path = f"{hashlib.sha256(config).hexdigest()}.json"
+                _add_bytes(tar, config_path, config)
+                manifest.append(
+                    {"Config": config_path, "RepoTags": [tag], "Layers": layer_paths}
+                )
+            _add_bytes(tar, "manifest.json", json.dumps(manifest).encode())
+        return path
+
+    return _make
+
+
+def _add_bytes(tar: tarfile.TarFile, name: str, data: bytes) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    tar.addfile(info, io.BytesIO(data))
+
+
+@pytest.fixture
+def chat_server() -> Iterator[Callable[..., str]]:
+    """Factory starting in-process OpenAI-style chat servers.
+
+    Each server answers ``/v1/models`` and ``/v1/chat/completions``, as a
+    full response or as server-sent events: a role chunk, one chunk per
+    token (the first after ``first_token_s``, then every ``token_s``), a
+    finish chunk and ``[DONE]``. Returns the server's base URL.
+    """
+    servers: list[ThreadingHTTPServer] = []
+
+    def _start(
+        tokens: int = 4,
+        first_token_s: float = 0.0,
+        token_s: float = 0.0,
+        usage_in_stream: bool = False,
+        error: str | None = None,
+    ) -> str:
+        class Handler(BaseHTTPRequestHandler):
+            # Chunked streaming, like uvicorn
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                self._send_json({"data": [{"id": "stub/model"}]})
+
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                usage = {"prompt_tokens": 10, "completion_tokens": tokens}
+                if not body.get("stream"):
+                    time.sleep(first_token_s + token_s * (tokens - 1))
+                    self._send_json({"choices": [], "usage": usage})
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                self._event({"choices": [{"delta": {"role": "assistant"}}]})
+                time.sleep(first_token_s)
+                for i in range(tokens):
+                    if i:
+                        time.sleep(token_s)
+                    self._event({"choices": [{"delta": {"content": "hi"}}]})
+                if error is not None:
+                    self._event({"error": {"message": error}})
+                else:
+                    self._event({"choices": [{"delta": {}, "finish_reason": "length"}]})
+                if usage_in_stream:
+                    self._event({"choices": [], "usage": usage})
+                self._chunk(b"data: [DONE]\n\n")
+                self._chunk(b"")
+
+            def _event(self, body: dict[str, Any]) -> None:
+                self._chunk(f"data: {json.dumps(body)}\n\n".encode())
+
+            def _chunk(self, data: bytes) -> None:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def _send_json(self, body: dict[str, Any]) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        servers.append(server)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield _start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep pack caches out of the real home directory."""
+    cache = tmp_path / "cache"
+    monkeypatch.setenv("EZRUNNER_CACHE_DIR", str(cache))
+    return cache
+
+
+class FakeDockerClient:
+    """Docker client that replays a recorded build log stream.
+
+    The stream is a list of decoded build chunks as the daemon sends
+    them; a number in the list pauses the replay for that many seconds,
+    standing in for a slow step. ``history`` maps image IDs to layer
+    sizes, as ``docker history`` reports them.
+    """
+
+    def __init__(
+        self, stream: list[dict[str, Any] | float], history: dict[str, int]
+    ) -> None:
+        self.stream = stream
+        self.history = history
+        self.build_kwargs: dict[str, Any] = {}
+        self.api = SimpleNamespace(build=self._build, history=self._history)
+        self.images = SimpleNamespace(get=self._get)
+
+    def _build(self, **kwargs: Any) -> Iterator[dict[str, Any]]:
+        self.build_kwargs = kwargs
+        for item in self.stream:
+            if isinstance(item, float | int):
+                time.sleep(item)
+            else:
+                yield item
+
+    def _history(self, image_id: str) -> list[dict[str, Any]]:
+        return [{"Id": layer, "Size": size} for layer, size in self.history.items()]
+
+    def _get(self, image_id: str) -> SimpleNamespace:
+        return SimpleNamespace(id=image_id)
+
+
+@pytest.fixture
+def fake_docker(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Callable[..., FakeDockerClient]:
+    """Install a replaying fake as the Docker client ``docker.from_env`` returns."""
+
+    def install(
+        stream: list[dict[str, Any] | float], history: dict[str, int] | None = None
+    ) -> FakeDockerClient:
+        client = FakeDockerClient(stream, history or {})
+        monkeypatch.setattr("docker.from_env", lambda: client)
+        return client
+
+    return install
@@ -0,0 +1,189 @@
+"""Tests for the replica load balancer."""
+
+import asyncio
+import json
+import socket
+import threading
+from collections.abc import Callable, Iterator
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+import requests
+
+from ezrunner.core.balancer import CHUNK_SIZE, Head, LoadBalancer, Replica
+
+
+def replica(url: str) -> Replica:
+    """Replica for a stub server URL."""
+    return Replica("127.0.0.1", int(url.rsplit(":", 1)[1]))
+
+
+def free_port() -> int:
+    """A port nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+@pytest.fixture
+def balance() -> Iterator[Callable[[LoadBalancer], str]]:
+    """Factory starting balancers on a background event loop."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    started: list[tuple[LoadBalancer, asyncio.Server]] = []
+
+    def _start(balancer: LoadBalancer) -> str:
+        start = balancer.start("127.0.0.1", 0)
+        server = asyncio.run_coroutine_threadsafe(start, loop).result(5)
+        started.append((balancer, server))
+        return f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+    yield _start
+    for balancer, server in started:
+        loop.call_soon_threadsafe(server.close)
+        loop.call_soon_threadsafe(balancer.close)
+    # One more turn of the loop lets the health checks finish cancelling
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+
+
+def test_pick_least_outstanding() -> None:
+    """Test requests go to the ready replica with the fewest in flight."""
+    replicas = [Replica("127.0.0.1", port) for port in (1, 2, 3)]
+    for r, outstanding in zip(replicas, (3, 1, 0), strict=True):
+        r.healthy, r.outstanding = True, outstanding
+    balancer = LoadBalancer(replicas)
+
+    assert balancer.pick() is replicas[2]
+
+    replicas[2].healthy = False
+    assert balancer.pick() is replicas[1]
+    assert balancer.pick(exclude=[replicas[1]]) is replicas[0]
+
+    replicas[0].outstanding = 1
+    assert {balancer.pick(), balancer.pick()} == {replicas[0], replicas[1]}
+
+
+def test_proxy(
+    chat_server: Callable[..., str], balance: Callable[[LoadBalancer], str]
+) -> None:
+    """Test requests and streams pass through, spread over the replicas."""
+    balancer = LoadBalancer([replica(chat_server()), replica(chat_server())])
+    url = balance(balancer)
+
+    with requests.Session() as session:
+        for _ in range(4):
+            response = session.post(
+                f"{url}/v1/chat/completions", json={"messages": []}, timeout=5
+            )
+            assert response.json()["usage"]["completion_tokens"] == 4
+        with session.post(
+            f"{url}/v1/chat/completions", json={"stream": True}, stream=True, timeout=5
+        ) as response:
+            events = [line for line in response.iter_lines() if line]
+        stats = session.get(f"{url}/balancer", timeout=5).json()
+
+    assert response.headers["Transfer-Encoding"] == "chunked"
+    assert len(events) == 7
+    assert events[-1] == b"data: [DONE]"
+    assert json.loads(events[1][6:])["choices"][0]["delta"]["content"] == "hi"
+    assert sorted(r["requests"] for r in stats["replicas"]) == [2, 3]
+    assert all(r["outstanding"] == 0 for r in stats["replicas"])
+
+
+def test_failover(
+    chat_server: Callable[..., str], balance: Callable[[LoadBalancer], str]
+) -> None:
+    """Test a replica that went down is skipped and taken out."""
+    down = Replica("127.0.0.1", free_port())
+    balancer = LoadBalancer([down, replica(chat_server())], health_interval_s=60)
+    url = balance(balancer)
+    down.healthy = True  # went down since the last check
+
+    for _ in range(3):
+        response = requests.get(f"{url}/v1/models", timeout=5)
+        assert response.json()["data"][0]["id"] == "stub/model"
+
+    assert not down.healthy
+    assert (down.failures, down.requests) == (1, 1)
+
+
+def test_client_gone_mid_response() -> None:
+    """Test a client hanging up closes the upstream connection, not the replica."""
+
+    async def run() -> tuple[bool, Replica]:
+        upstream_closed = asyncio.Event()
+
+        async def respond(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 1000000\r\n\r\n")
+            writer.write(b"x" * CHUNK_SIZE)
+            await writer.drain()
+            await reader.read()  # until the balancer closes the connection
+            upstream_closed.set()
+            writer.close()
+
+        server = await asyncio.start_server(respond, "127.0.0.1", 0)
+        up = Replica("127.0.0.1", server.sockets[0].getsockname()[1])
+        up.healthy = True
+        client = Mock(drain=AsyncMock(side_effect=ConnectionResetError("reset")))
+        head = Head("POST /v1/chat/completions HTTP/1.1", (("Content-Length", "0"),))
+
+        forward = LoadBalancer([up])._forward(head, b"", client)
+        reusable = await asyncio.wait_for(forward, 5)
+        await asyncio.wait_for(upstream_closed.wait(), 5)
+        server.close()
+        return reusable, up
+
+    reusable, up = asyncio.run(run())
+
+    assert not reusable
+    assert (up.healthy, up.failures, up.outstanding) == (True, 0, 0)
+
+
+def test_upstream_close_not_pooled() -> None:
+    """Test an upstream closing the connection, in any case, is not pooled."""
+
+    async def run() -> tuple[bool, Replica]:
+        async def respond(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nConnection: Close\r\n"
+                b"Content-Length: 2\r\n\r\nok"
+            )
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(respond, "127.0.0.1", 0)
+        up = Replica("127.0.0.1", server.sockets[0].getsockname()[1])
+        up.healthy = True
+        client = Mock(drain=AsyncMock())
+        head = Head("GET /v1/models HTTP/1.1", ())
+
+        reusable = await asyncio.wait_for(
+            LoadBalancer([up])._forward(head, b"", client), 5
+        )
+        server.close()
+        return reusable, up
+
+    reusable, up = asyncio.run(run())
+
+    assert reusable
+    assert up._idle == []
+    assert (up.failures, up.outstanding) == (0, 0)
+
+
+def test_no_ready_replica(balance: Callable[[LoadBalancer], str]) -> None:
+    """Test clients get a 503 with an OpenAI-style error until a replica is up."""
+    url = balance(LoadBalancer([Replica("127.0.0.1", free_port())]))
+
+    response = requests.post(f"{url}/v1/chat/completions", json={}, timeout=5)
+
+    assert response.status_code == 503
+    assert response.json()["error"]["message"] == "No replica is ready"
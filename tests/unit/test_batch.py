@@ -0,0 +1,295 @@
+"""Tests for batch packing."""
+
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import replace
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import Mock
+
+import docker
+import pytest
+
+from ezrunner.core.batch import (
+    DEFAULT_LIMITS,
+    BatchPacker,
+    load_manifest,
+    load_report,
+    write_report,
+)
+from ezrunner.core.cache import PackCache
+from ezrunner.core.pipeline import JobResult, PackJob
+from ezrunner.exceptions import ManifestError
+from ezrunner.models.model_info import ModelInfo
+
+
+class BatchDocker:
+    """Docker client whose builds take a while, counting concurrent builds.
+
+    Image IDs hash the Dockerfile; a saved archive holds the ID of the
+    image its tag names at the time of the save, as ``docker save`` does.
+    A build that would move a tag to another image finishes while a save
+    of the tag runs, if the packer lets one run, so a pack that does not
+    keep the tag for itself until its save is done exports the wrong image.
+    """
+
+    def __init__(self, build_s: float = 0.05, fail: tuple[str, ...] = ()) -> None:
+        self.build_s = build_s
+        self.fail = fail
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.running = 0
+        self.peak = 0
+        self.builds: list[str] = []
+        self.images_built: set[str] = set()
+        self.tags: dict[str, str] = {}
+        self.saving: set[str] = set()
+        self.api = SimpleNamespace(build=self._build, history=lambda image_id: [])
+        self.images = SimpleNamespace(get=self._get)
+
+    def _build(self, tag: str, path: str, **kwargs: Any) -> Iterator[dict[str, Any]]:
+        dockerfile = (Path(path) / "Dockerfile").read_bytes()
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.builds.append(tag)
+        time.sleep(self.build_s)
+        with self.lock:
+            self.running -= 1
+        yield {"stream": "Step 1/1 : FROM scratch\n"}
+        if tag in self.fail:
+            yield {"error": "pip install failed"}
+        image_id = "sha256:" + hashlib.sha256(dockerfile).hexdigest()
+        with self.changed:
+            if self.tags.get(tag, image_id) != image_id:
+                self.changed.wait_for(lambda: tag in self.saving, self.build_s)
+            self.images_built.add(image_id)
+            self.tags[tag] = image_id
+            self.changed.notify_all()
+        yield {"aux": {"ID": image_id}}
+
+    def _get(self, image_id: str) -> SimpleNamespace:
+        if image_id not in self.images_built:
+            raise docker.errors.ImageNotFound(image_id)
+
+        def tags() -> list[str]:
+            return [
+                f"{tag}:latest" for tag, id_ in self.tags.items() if id_ == image_id
+            ]
+
+        def tag(repository: str) -> None:
+            with self.lock:
+                self.tags[repository] = image_id
+
+        def save(named: str | bool = False) -> Iterator[bytes]:
+            if isinstance(named, str) and named not in image.tags:
+                raise docker.errors.InvalidArgument(f"{named} is not a tag of it")
+            name = (named if isinstance(named, str) else image.tags[0]).removesuffix(
+                ":latest"
+            )
+            with self.changed:
+                self.saving.add(name)
+                self.changed.notify_all()
+                # Give a build moving the tag the time to do it
+                self.changed.wait_for(lambda: self.tags[name] != image_id, self.build_s)
+                self.saving.discard(name)
+                saved = self.tags[name] if named else image_id
+            yield saved.encode()
+
+        image = SimpleNamespace(id=image_id, tags=tags(), tag=tag, save=save)
+        image.reload = lambda: setattr(image, "tags", tags())
+        return image
+
+
+def discover(model_id: str) -> ModelInfo:
+    """Discovery result of a small model."""
+    return ModelInfo(
+        model_id=model_id,
+        size_gb=1.0,
+        format="safetensors",
+        repo_type="huggingface",
+        architecture="llama",
+        revision="r1",
+    )
+
+
+def make_packer(client: BatchDocker, tmp_path: Path, **limits: int) -> BatchPacker:
+    """Packer using a fake daemon, stub discovery and a private cache."""
+    packer = BatchPacker(limits, client=client, cache=PackCache(tmp_path / "cache"))
+    packer.discovery = Mock(discover=Mock(side_effect=discover))
+    return packer
+
+
+def _holds(result: JobResult) -> bool:
+    """Check a job's archive holds the image the job packed."""
+    return Path(result.output).read_bytes() == (result.image_id or "").encode()
+
+
+def job(tmp_path: Path, model_id: str, output: str | None = None) -> PackJob:
+    """Transformers job writing a tar under ``tmp_path``."""
+    name = output or f"{model_id.replace('/', '-')}.tar"
+    return PackJob(model_id, tmp_path / "out" / name, engine="transformers")
+
+
+class TestManifest:
+    """Test manifest loading."""
+
+    def test_load_yaml(self, tmp_path: Path) -> None:
+        """Test defaults, shorthand entries, outputs and limits."""
+        path = tmp_path / "models.yaml"
+        path.write_text(
+            "output_dir: packs\n"
+            "limits: {daemon: 1}\n"
+            "defaults: {engine: vllm, target_gpu: 24, warmup: [64, 128]}\n"
+            "models:\n"
+            "  - qwen/Qwen2-7B-Instruct\n"
+            "  - id: meta/Llama-3-8B\n"
+            "    output: llama.tar\n"
+            "    max_batch_size: 16\n"
+            "  - id: a/b\n"
+            "    format: oci\n"
+        )
+
+        manifest = load_manifest(path)
+
+        assert manifest.limits == DEFAULT_LIMITS | {"daemon": 1}
+        qwen, llama, oci = manifest.jobs
+        assert qwen.output == tmp_path / "packs" / "qwen-qwen2-7b-instruct.tar"
+        assert (qwen.engine, qwen.target_gpu, qwen.warmup) == ("vllm", 24, "64,128")
+        assert llama.output == tmp_path / "packs" / "llama.tar"
+        assert llama.max_batch_size == 16
+        assert oci.output == tmp_path / "packs" / "oci"
+
+    def test_load_json(self, tmp_path: Path) -> None:
+        """Test JSON manifests."""
+        path = tmp_path / "models.json"
+        path.write_text(json.dumps({"models": [{"id": "a/b", "port": 9000}]}))
+
+        (only,) = load_manifest(path).jobs
+
+        assert only == PackJob("a/b", tmp_path / "a-b.tar", port=9000)
+
+    @pytest.mark.parametrize(
+        ("document", "message"),
+        [
+            ({"models": []}, "no models"),
+            ({"models": [{"output": "x.tar"}]}, "needs an 'id'"),
+            ({"models": [{"id": "a/b", "gpu": 1}]}, "unknown options gpu"),
+            ({"models": [{"id": "a/b", "port": "80"}]}, "port must be int"),
+            ({"models": [{"id": "a/b", "format": "zip"}]}, "format must be"),
+            ({"models": [{"id": "a/b", "warmup": "short"}]}, "warmup must be"),
+            ({"models": ["a/b", {"id": "c/d", "output": "a-b.tar"}]}, "several"),
+            ({"models": ["a/b"], "limits": {"gpu": 1}}, "'limits' keys"),
+            ({"models": ["a/b"], "limits": {"disk": 0}}, "limits.disk"),
+        ],
+    )
+    def test_invalid(
+        self, tmp_path: Path, document: dict[str, Any], message: str
+    ) -> None:
+        """Test invalid manifests are rejected with the reason."""
+        path = tmp_path / "models.json"
+        path.write_text(json.dumps(document))
+
+        with pytest.raises(ManifestError, match=message):
+            load_manifest(path)
+
+
+class TestBatchPacker:
+    """Test BatchPacker."""
+
+    def test_daemon_limit(self, tmp_path: Path) -> None:
+        """Test builds never exceed the daemon limit, and all jobs finish."""
+        client = BatchDocker()
+        packer = make_packer(client, tmp_path, daemon=2)
+        jobs = [job(tmp_path, f"org/model-{i}") for i in range(5)]
+
+        results = packer.run(jobs)
+
+        assert [result.status for result in results] == ["built"] * 5
+        assert client.peak == 2
+        assert all(_holds(result) for result in results)
+        assert all(result.stages["build"] >= client.build_s for result in results)
+        # The engine's base layers were built once, before any model
+        assert client.builds[0] == "ezrunner-base-transformers"
+        assert len(client.builds) == 6
+        assert max(result.waited_s for result in results) >= client.build_s
+
+    def test_identical_jobs_build_once(self, tmp_path: Path) -> None:
+        """Test a second identical pack reuses the first one's archive."""
+        client = BatchDocker()
+        packer = make_packer(client, tmp_path)
+
+        first, second = packer.run(
+            [job(tmp_path, "org/model", "a.tar"), job(tmp_path, "org/model", "b.tar")]
+        )
+
+        assert client.builds.count("ezrunner-org-model") == 1
+        assert sorted([first.status, second.status]) == ["built", "cached"]
+        assert _holds(first) and _holds(second)
+
+    def test_same_model_exports_own_image(self, tmp_path: Path) -> None:
+        """Test jobs of one model with different settings export their image."""
+        client = BatchDocker()
+        packer = make_packer(client, tmp_path)
+        jobs = [
+            replace(job(tmp_path, "org/model", f"{port}.tar"), port=port)
+            for port in (8080, 9090)
+        ]
+
+        first, second = packer.run(jobs)
+
+        assert (first.status, second.status) == ("built", "built")
+        assert first.image_id != second.image_id
+        assert _holds(first) and _holds(second)
+
+    def test_failure_and_resume(self, tmp_path: Path) -> None:
+        """Test a failed job does not stop the others, and resuming reruns it."""
+        client = BatchDocker(fail=("ezrunner-org-bad",))
+        jobs = [job(tmp_path, "org/good"), job(tmp_path, "org/bad")]
+
+        good, bad = make_packer(client, tmp_path).run(jobs)
+
+        assert good.status == "built"
+        assert bad.status == "failed"
+        assert "pip install failed" in (bad.error or "")
+
+        client.fail = ()
+        received: list[JobResult] = []
+        previous = {result.output: result for result in (good, bad)}
+        packer = make_packer(client, tmp_path, network=1)
+        good, bad = packer.run(jobs, previous, received.append)
+
+        assert (good.status, bad.status) == ("resumed", "built")
+        assert packer.discovery.discover.call_count == 1
+        assert {result.model_id for result in received} == {"org/good", "org/bad"}
+
+    def test_resume_checks_output(self, tmp_path: Path) -> None:
+        """Test a finished job is packed again if its output changed."""
+        client = BatchDocker()
+        packed = make_packer(client, tmp_path).run([job(tmp_path, "org/model")])
+        Path(packed[0].output).write_bytes(b"edited")
+
+        (result,) = make_packer(client, tmp_path).run(
+            [job(tmp_path, "org/model")], {packed[0].output: packed[0]}
+        )
+
+        assert result.status == "exported"
+        assert _holds(result)
+
+    def test_report_roundtrip(self, tmp_path: Path) -> None:
+        """Test the report stores results and totals."""
+        path = tmp_path / "report.json"
+        results = [
+            JobResult("a/b", "a.tar", "built", seconds=2.0, stages={"build": 1.5}),
+            JobResult("c/d", "c.tar", "failed", error="boom"),
+        ]
+
+        write_report(path, results, DEFAULT_LIMITS, 2.5)
+
+        assert load_report(path) == {"a.tar": results[0], "c.tar": results[1]}
+        assert json.loads(path.read_text())["totals"] == {"built": 1, "failed": 1}
+        assert load_report(tmp_path / "missing.json") == {}
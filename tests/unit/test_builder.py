@@ -1,12 +1,56 @@
 """Tests for ImageBuilder."""
 
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
 from unittest.mock import Mock, patch
 
 import docker
 import pytest
 
-from ezrunner.core.builder import ImageBuilder
+from ezrunner.core.builder import BuildLog, BuildStep, ImageBuilder
 from ezrunner.exceptions import BuildError, DockerError
+from ezrunner.utils.tracing import Tracer, tracing
+
+# Recorded from a classic-builder build of a three-step Dockerfile whose
+# first two steps were cached. Numbers pause the replay (slow steps).
+RECORDED_BUILD: list[dict[str, Any] | float] = [
+    {"stream": "Step 1/3 : FROM python:3.10-slim"},
+    {"stream": "\n"},
+    {"stream": " ---> 2c3b8a7f1e0d\n"},
+    {"stream": "Step 2/3 : COPY ezrunner_runtime /app/ezrunner_runtime\n"},
+    {"stream": " ---> Using cache\n"},
+    {"stream": " ---> 5d6e7f8a9b0c\n"},
+    {"stream": "Step 3/3 : RUN pip install --no-cache-dir vllm\n"},
+    {"stream": " ---> Running in 0a1b2c3d4e5f\n"},
+    {"stream": "Collecting vllm\n"},
+    0.05,
+    {"stream": "Successfully installed vllm-0.6.3\n"},
+    {"stream": "Removing intermediate container 0a1b2c3d4e5f\n"},
+    {"stream": " ---> 9f8e7d6c5b4a\n"},
+    {"aux": {"ID": "sha256:9f8e7d6c5b4a3f2e1d0c"}},
+    {"stream": "Successfully built 9f8e7d6c5b4a\n"},
+    {"stream": "Successfully tagged ezrunner-test:latest\n"},
+]
+
+RECORDED_HISTORY = {
+    "sha256:9f8e7d6c5b4a3f2e1d0c": 4_000_000_000,
+    "sha256:5d6e7f8a9b0c1d2e3f4a": 120_000,
+    "sha256:2c3b8a7f1e0d2c3b8a7f": 0,
+}
+
+RECORDED_FAILURE: list[dict[str, Any] | float] = [
+    {"stream": "Step 1/2 : FROM python:3.10-slim\n"},
+    {"stream": " ---> 2c3b8a7f1e0d\n"},
+    {"stream": "Step 2/2 : RUN pip install vllm==0.0.0\n"},
+    {"stream": " ---> Running in 0a1b2c3d4e5f\n"},
+    {"stream": "ERROR: No matching distribution found for vllm==0.0.0\n"},
+    {
+        "error": "The command '/bin/sh -c pip install vllm==0.0.0' "
+        "returned a non-zero code: 1",
+        "errorDetail": {"code": 1},
+    },
+]
 
 
 class TestImageBuilder:
@@ -40,7 +84,9 @@ class TestImageBuilder:
 
         # Mock build result
         mock_image = Mock()
-        mock_client.images.build.return_value = (mock_image, [])
+        mock_client.api.build.return_value = iter([{"aux": {"ID": "sha256:abc"}}])
+        mock_client.api.history.return_value = []
+        mock_client.images.get.return_value = mock_image
 
         # Build image
         builder = ImageBuilder()
@@ -48,10 +94,11 @@ class TestImageBuilder:
         image = builder.build(dockerfile, "test:latest")
 
         assert image == mock_image
-        mock_client.images.build.assert_called_once()
+        mock_client.api.build.assert_called_once()
+        mock_client.images.get.assert_called_once_with("sha256:abc")
 
         # Verify build was called with correct arguments
-        call_args = mock_client.images.build.call_args
+        call_args = mock_client.api.build.call_args
         assert call_args.kwargs["tag"] == "test:latest"
         assert call_args.kwargs["rm"] is True
 
@@ -63,9 +110,7 @@ class TestImageBuilder:
         mock_docker.return_value = mock_client
 
         # Mock build error
-        mock_client.images.build.side_effect = docker.errors.BuildError(
-            "Build failed", ""
-        )
+        mock_client.api.build.side_effect = docker.errors.APIError("Build failed")
 
         # Build should raise BuildError
         builder = ImageBuilder()
@@ -80,8 +125,8 @@ class TestImageBuilder:
         mock_docker.return_value = mock_client
 
         # Mock build result
-        mock_image = Mock()
-        mock_client.images.build.return_value = (mock_image, [])
+        mock_client.api.build.return_value = iter([{"aux": {"ID": "sha256:abc"}}])
+        mock_client.api.history.return_value = []
 
         # Build with buildargs
         builder = ImageBuilder()
@@ -89,5 +134,104 @@ class TestImageBuilder:
         builder.build("FROM ubuntu", "test:latest", buildargs=buildargs)
 
         # Verify buildargs were passed
-        call_args = mock_client.images.build.call_args
+        call_args = mock_client.api.build.call_args
         assert call_args.kwargs["buildargs"] == buildargs
+
+    @patch("docker.from_env")
+    def test_build_with_context(self, mock_docker: Mock, tmp_path: Path) -> None:
+        """Test context files are copied next to the Dockerfile."""
+        mock_client = Mock()
+        mock_docker.return_value = mock_client
+        package = tmp_path / "runtime"
+        (package / "__pycache__").mkdir(parents=True)
+        (package / "server.py").write_text("print('hi')")
+        (package / "__pycache__" / "server.cpython-311.pyc").write_bytes(b"")
+
+        def build(path: str, **kwargs: object) -> list[dict[str, Any]]:
+            copied = Path(path) / "ezrunner_runtime"
+            assert (copied / "server.py").read_text() == "print('hi')"
+            assert not (copied / "__pycache__").exists()
+            return [{"aux": {"ID": "sha256:abc"}}]
+
+        mock_client.api.build.side_effect = build
+        mock_client.api.history.return_value = []
+
+        builder = ImageBuilder()
+        builder.build(
+            "FROM ubuntu", "test:latest", context={"ezrunner_runtime": package}
+        )
+
+        mock_client.api.build.assert_called_once()
+
+    def test_build_steps(self, fake_docker: Callable[..., Any]) -> None:
+        """Test step timing, cache hits and layer sizes from a replayed log."""
+        client = fake_docker(RECORDED_BUILD, RECORDED_HISTORY)
+        started = []
+
+        builder = ImageBuilder()
+        image = builder.build(
+            "FROM python:3.10-slim",
+            "ezrunner-test:latest",
+            on_step=lambda *step: started.append(step),
+        )
+
+        assert image.id == "sha256:9f8e7d6c5b4a3f2e1d0c"
+        assert client.build_kwargs["decode"] is True
+        assert [step[:2] for step in started] == [(1, 3), (2, 3), (3, 3)]
+        first, copy, install = builder.steps
+        assert first.instruction == "FROM python:3.10-slim"
+        assert (copy.cached, copy.layer_id, copy.size_bytes) == (
+            True,
+            "5d6e7f8a9b0c",
+            120_000,
+        )
+        assert install.instruction == "RUN pip install --no-cache-dir vllm"
+        assert not install.cached
+        assert install.size_bytes == 4_000_000_000
+        # The pause falls inside the install step
+        assert install.seconds >= 0.05
+        assert max(builder.steps, key=lambda step: step.seconds) is install
+
+    def test_build_error(self, fake_docker: Callable[..., Any]) -> None:
+        """Test a failing step is named in the error with its output."""
+        fake_docker(RECORDED_FAILURE)
+
+        with pytest.raises(BuildError) as excinfo:
+            ImageBuilder().build("FROM python:3.10-slim", "test:latest")
+
+        message = str(excinfo.value)
+        assert "at step 2/2 (RUN pip install vllm==0.0.0)" in message
+        assert "returned a non-zero code: 1" in message
+        assert "No matching distribution found" in message
+        assert "Running in" not in message
+
+    def test_build_traced(self, fake_docker: Callable[..., Any]) -> None:
+        """Test each step is recorded as a span of the build."""
+        fake_docker(RECORDED_BUILD, RECORDED_HISTORY)
+
+        tracer = Tracer()
+        with tracing(tracer):
+            ImageBuilder().build("FROM python:3.10-slim", "test:latest")
+
+        build, *steps = tracer.spans
+        assert build.name == "docker build"
+        assert build.args == {"tag": "test:latest", "steps": 3}
+        assert all(step.parent is build for step in steps)
+        assert [step.args.get("cache_hits", 0) for step in steps] == [0, 1, 0]
+        # Only the layer actually written counts as data moved
+        assert [step.args.get("bytes") for step in steps] == [0, None, 4_000_000_000]
+
+
+class TestBuildLog:
+    """Test BuildLog."""
+
+    def test_split_chunks(self) -> None:
+        """Test lines split across chunks are reassembled."""
+        ticks = iter(range(10))
+        log = BuildLog(clock=lambda: float(next(ticks)))
+
+        for chunk in ("Step 1/1 : RUN ", "make\n --->", " abcdef012345\n"):
+            log.feed({"stream": chunk})
+        steps = log.finish()
+
+        assert steps == [BuildStep(1, 1, "RUN make", 1.0, False, "abcdef012345")]
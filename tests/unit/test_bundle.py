@@ -0,0 +1,99 @@
+"""Tests for BundleWriter and archive helpers."""
+
+import io
+import tarfile
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from ezrunner.core.archive import iter_image, read_manifest, select_image
+from ezrunner.core.bundle import BundleWriter
+from ezrunner.exceptions import ArchiveError
+
+BASE = b"c" * (2 * 1024 * 1024)  # shared CUDA/Python layer
+
+
+class TestBundleWriter:
+    """Test BundleWriter."""
+
+    def test_shared_layers_stored_once(
+        self, make_archive: Callable[..., Path], tmp_path: Path
+    ) -> None:
+        """Test identical layers under different paths are symlinked."""
+        qwen = make_archive("qwen.tar", [("ezrunner-qwen:latest", [BASE, b"qwen"])])
+        llama = make_archive("llama.tar", [("ezrunner-llama:latest", [BASE, b"llama"])])
+
+        output = tmp_path / "bundle.tar"
+        stats = BundleWriter().write([qwen, llama], output)
+
+        assert stats.images == 2
+        assert stats.bytes_deduplicated == len(BASE)
+        assert output.stat().st_size < qwen.stat().st_size + len(BASE)
+
+        with tarfile.open(output) as tar:
+            link = tar.getmember("ezrunner-llama-0/layer.tar")
+            assert link.issym()
+            assert link.linkname == "../ezrunner-qwen-0/layer.tar"
+
+    def test_manifest_merged(
+        self, make_archive: Callable[..., Path], tmp_path: Path
+    ) -> None:
+        """Test the bundle lists every image."""
+        qwen = make_archive("qwen.tar", [("ezrunner-qwen:latest", [BASE])])
+        llama = make_archive("llama.tar", [("ezrunner-llama:latest", [BASE])])
+
+        output = tmp_path / "bundle.tar"
+        BundleWriter().write([qwen, llama, qwen], output)
+
+        tags = [image.repo_tags for image in read_manifest(output)]
+        assert tags == [("ezrunner-qwen:latest",), ("ezrunner-llama:latest",)]
+
+    def test_invalid_archive(self, tmp_path: Path) -> None:
+        """Test a non-archive input is rejected."""
+        bogus = tmp_path / "bogus.tar"
+        bogus.write_bytes(b"not a tar")
+
+        with pytest.raises(ArchiveError, match="Invalid image archive"):
+            BundleWriter().write([bogus], tmp_path / "bundle.tar")
+
+
+class TestIterImage:
+    """Test extracting one image from a bundle."""
+
+    def test_extract_resolves_symlinks(
+        self, make_archive: Callable[..., Path], tmp_path: Path
+    ) -> None:
+        """Test an image with deduplicated layers is self-contained."""
+        qwen = make_archive("qwen.tar", [("ezrunner-qwen:latest", [BASE])])
+        llama = make_archive("llama.tar", [("ezrunner-llama:latest", [BASE, b"llama"])])
+        output = tmp_path / "bundle.tar"
+        BundleWriter().write([qwen, llama], output)
+
+        image = select_image(read_manifest(output), "ezrunner-llama")
+        stream = b"".join(iter_image(output, image))
+
+        with tarfile.open(fileobj=io.BytesIO(stream)) as tar:
+            layer = tar.extractfile("ezrunner-llama-0/layer.tar")
+            assert layer is not None
+            assert layer.read() == BASE
+            names = tar.getnames()
+        assert "ezrunner-qwen-0/layer.tar" not in names
+        assert "manifest.json" in names
+
+    def test_select_by_model_id(self, make_archive: Callable[..., Path]) -> None:
+        """Test images can be picked by the model ID they were packed from."""
+        archive = make_archive(
+            "qwen.tar", [("ezrunner-qwen-qwen-7b:latest", [b"layer"])]
+        )
+
+        image = select_image(read_manifest(archive), "qwen/Qwen-7B")
+
+        assert image.repo_tags == ("ezrunner-qwen-qwen-7b:latest",)
+
+    def test_select_missing(self, make_archive: Callable[..., Path]) -> None:
+        """Test selecting an image that is not in the archive."""
+        archive = make_archive("qwen.tar", [("ezrunner-qwen:latest", [b"layer"])])
+
+        with pytest.raises(ArchiveError, match="No image named llama"):
+            select_image(read_manifest(archive), "llama")
@@ -0,0 +1,109 @@
+"""Tests for PackCache."""
+
+import os
+from dataclasses import replace
+from pathlib import Path
+
+from ezrunner.core.cache import PackCache, PackEntry
+from ezrunner.models.engine import Engine
+from ezrunner.models.model_info import ModelInfo
+
+
+class TestPackCache:
+    """Test PackCache."""
+
+    def test_key_depends_on_inputs(
+        self, sample_model: ModelInfo, tmp_path: Path
+    ) -> None:
+        """Test every pack input changes the key."""
+        cache = PackCache(tmp_path)
+        model = replace(sample_model, revision="abc")
+        base = cache.key(model, Engine.VLLM, "FROM ubuntu", 8080)
+
+        assert base == cache.key(model, Engine.VLLM, "FROM ubuntu", 8080)
+        assert base != cache.key(
+            replace(model, revision="def"), Engine.VLLM, "FROM ubuntu", 8080
+        )
+        assert base != cache.key(model, Engine.TRANSFORMERS, "FROM ubuntu", 8080)
+        assert base != cache.key(model, Engine.VLLM, "FROM debian", 8080)
+        assert base != cache.key(model, Engine.VLLM, "FROM ubuntu", 9000)
+        assert base == cache.key(model, Engine.VLLM, "FROM ubuntu", 8080, None, ())
+        extra = cache.key(
+            model, Engine.VLLM, "FROM ubuntu", 8080, extra_models=[sample_model]
+        )
+        assert extra != base
+        assert extra != cache.key(
+            model,
+            Engine.VLLM,
+            "FROM ubuntu",
+            8080,
+            extra_models=[replace(sample_model, revision="def")],
+        )
+
+    def test_key_hashes_context_files(
+        self, sample_model: ModelInfo, tmp_path: Path
+    ) -> None:
+        """Test editing a build-context file changes the key."""
+        cache = PackCache(tmp_path / "cache")
+        runtime = tmp_path / "runtime"
+        runtime.mkdir()
+        (runtime / "server.py").write_text("v1")
+        context = {"ezrunner_runtime": runtime}
+        base = cache.key(
+            sample_model, Engine.TRANSFORMERS, "FROM ubuntu", 8080, context
+        )
+
+        (runtime / "server.py").write_text("v2")
+
+        assert base != cache.key(
+            sample_model, Engine.TRANSFORMERS, "FROM ubuntu", 8080, context
+        )
+
+    def test_store_and_lookup(self, tmp_path: Path) -> None:
+        """Test entries round-trip."""
+        cache = PackCache(tmp_path)
+        entry = PackEntry(image_id="sha256:abc", tag="ezrunner-qwen")
+
+        assert cache.lookup("key") is None
+        cache.store("key", entry)
+
+        assert cache.lookup("key") == entry
+
+    def test_corrupt_entry_ignored(self, tmp_path: Path) -> None:
+        """Test a damaged entry is a miss, not a crash."""
+        (tmp_path / "key.json").write_text("{not json")
+
+        assert PackCache(tmp_path).lookup("key") is None
+
+    def test_artifact_rewritten(self, tmp_path: Path) -> None:
+        """Test an artifact overwritten by another pack is not reused."""
+        artifact = tmp_path / "model.tar"
+        artifact.write_bytes(b"qwen")
+        entry = PackEntry.for_artifact("sha256:abc", "ezrunner-qwen", artifact)
+        assert entry.artifact_valid()
+
+        artifact.write_bytes(b"llama-archive")
+
+        assert not entry.artifact_valid()
+
+    def test_materialize_hardlink(self, tmp_path: Path) -> None:
+        """Test the output is linked rather than copied."""
+        artifact = tmp_path / "model.tar"
+        artifact.write_bytes(b"archive")
+        entry = PackEntry.for_artifact("sha256:abc", "ezrunner-qwen", artifact)
+        output = tmp_path / "copy.tar"
+
+        method = PackCache(tmp_path).materialize(entry, output)
+
+        assert method == "hardlink"
+        assert os.path.samefile(artifact, output)
+        assert entry.artifact_valid()
+
+    def test_materialize_same_path(self, tmp_path: Path) -> None:
+        """Test packing to the cached path again leaves the file alone."""
+        artifact = tmp_path / "model.tar"
+        artifact.write_bytes(b"archive")
+        entry = PackEntry.for_artifact("sha256:abc", "ezrunner-qwen", artifact)
+
+        assert PackCache(tmp_path).materialize(entry, artifact) == "existing"
+        assert artifact.read_bytes() == b"archive"
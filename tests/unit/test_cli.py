@@ -1,13 +1,31 @@
 """Tests for CLI commands."""
 
+import json
+import os
+import subprocess
+import sys
+from collections.abc import Callable
+from contextlib import nullcontext
 from pathlib import Path
-from unittest.mock import Mock, patch
+from typing import Any
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from click.testing import CliRunner
 
-from ezrunner.cli import main
-from ezrunner.exceptions import DockerError, ModelNotFoundError
+import ezrunner
+from ezrunner.cli import COMMANDS, main
+from ezrunner.core.exporter import ExportStats, LayoutStats
+from ezrunner.core.loadgen import LoadStats, RequestResult
+from ezrunner.core.pipeline import JobResult
+from ezrunner.core.placement import GPUDevice
+from ezrunner.core.sweep import load_tuning, save_tuning, tuning_path
+from ezrunner.exceptions import (
+    DaemonError,
+    DockerError,
+    ModelNotFoundError,
+    StartupError,
+)
 from ezrunner.models.engine import Engine
 from ezrunner.models.hardware import Hardware
 from ezrunner.models.model_info import ModelInfo
@@ -16,12 +34,12 @@ from ezrunner.models.model_info import ModelInfo
 class TestPackCommand:
     """Test pack command."""
 
-    @patch("ezrunner.cli.TarExporter")
-    @patch("ezrunner.cli.ImageBuilder")
-    @patch("ezrunner.cli.DockerfileGenerator")
-    @patch("ezrunner.cli.EngineSelector")
-    @patch("ezrunner.cli.HardwareAnalyzer")
-    @patch("ezrunner.cli.ModelDiscovery")
+    @patch("ezrunner.core.pipeline.TarExporter")
+    @patch("ezrunner.core.pipeline.ImageBuilder")
+    @patch("ezrunner.core.pipeline.DockerfileGenerator")
+    @patch("ezrunner.core.pipeline.EngineSelector")
+    @patch("ezrunner.core.pipeline.HardwareAnalyzer")
+    @patch("ezrunner.core.pipeline.ModelDiscovery")
     def test_pack_success(
         self,
         mock_discovery_cls: Mock,
@@ -49,6 +67,7 @@ class TestPackCommand:
             gpu_vendor="nvidia",
         )
         mock_image = Mock()
+        mock_image.id = "sha256:abc123"
         mock_image.tags = ["ezrunner-qwen-7b:latest"]
 
         mock_discovery = Mock()
@@ -65,6 +84,7 @@ class TestPackCommand:
 
         mock_generator = Mock()
         mock_generator.generate.return_value = "FROM ubuntu"
+        mock_generator.context.return_value = {}
         mock_generator_cls.return_value = mock_generator
 
         mock_builder = Mock()
@@ -72,6 +92,7 @@ class TestPackCommand:
         mock_builder_cls.return_value = mock_builder
 
         mock_exporter = Mock()
+        mock_exporter.export.return_value = ExportStats(bytes_written=4, seconds=1.0)
         mock_exporter_cls.return_value = mock_exporter
 
         # Run command
@@ -96,7 +117,13 @@ class TestPackCommand:
         mock_builder.build.assert_called_once()
         mock_exporter.export.assert_called_once()
 
-    @patch("ezrunner.cli.ModelDiscovery")
+        # vLLM settings sized to the 24 GB target
+        settings = mock_generator.generate.call_args.args[3]
+        assert settings["EZRUNNER_VLLM_GPU_MEMORY_UTILIZATION"] == "0.91"
+        assert settings["EZRUNNER_VLLM_KV_CACHE_DTYPE"] == "fp8"
+        assert settings["EZRUNNER_VLLM_ENABLE_PREFIX_CACHING"] == "True"
+
+    @patch("ezrunner.core.pipeline.ModelDiscovery")
     def test_pack_model_not_found(self, mock_discovery_cls: Mock) -> None:
         """Test pack with non-existent model."""
         mock_discovery = Mock()
@@ -109,11 +136,11 @@ class TestPackCommand:
         assert result.exit_code == 1
         assert "Error" in result.output
 
-    @patch("ezrunner.cli.ModelDiscovery")
-    @patch("ezrunner.cli.HardwareAnalyzer")
-    @patch("ezrunner.cli.EngineSelector")
-    @patch("ezrunner.cli.DockerfileGenerator")
-    @patch("ezrunner.cli.ImageBuilder")
+    @patch("ezrunner.core.pipeline.ModelDiscovery")
+    @patch("ezrunner.core.pipeline.HardwareAnalyzer")
+    @patch("ezrunner.core.pipeline.EngineSelector")
+    @patch("ezrunner.core.pipeline.DockerfileGenerator")
+    @patch("ezrunner.core.pipeline.ImageBuilder")
     def test_pack_docker_error(
         self,
         mock_builder_cls: Mock,
@@ -153,6 +180,7 @@ class TestPackCommand:
 
         mock_generator = Mock()
         mock_generator.generate.return_value = "FROM ubuntu"
+        mock_generator.context.return_value = {}
         mock_generator_cls.return_value = mock_generator
 
         # Builder fails
@@ -166,12 +194,12 @@ class TestPackCommand:
         assert result.exit_code == 1
         assert "Docker Error" in result.output
 
-    @patch("ezrunner.cli.TarExporter")
-    @patch("ezrunner.cli.ImageBuilder")
-    @patch("ezrunner.cli.DockerfileGenerator")
-    @patch("ezrunner.cli.EngineSelector")
-    @patch("ezrunner.cli.HardwareAnalyzer")
-    @patch("ezrunner.cli.ModelDiscovery")
+    @patch("ezrunner.core.pipeline.TarExporter")
+    @patch("ezrunner.core.pipeline.ImageBuilder")
+    @patch("ezrunner.core.pipeline.DockerfileGenerator")
+    @patch("ezrunner.core.pipeline.EngineSelector")
+    @patch("ezrunner.core.pipeline.HardwareAnalyzer")
+    @patch("ezrunner.core.pipeline.ModelDiscovery")
     def test_pack_with_engine_option(
         self,
         mock_discovery_cls: Mock,
@@ -199,6 +227,7 @@ class TestPackCommand:
             gpu_vendor="nvidia",
         )
         mock_image = Mock()
+        mock_image.id = "sha256:abc123"
         mock_image.tags = ["test:latest"]
 
         mock_discovery = Mock()
@@ -215,6 +244,7 @@ class TestPackCommand:
 
         mock_generator = Mock()
         mock_generator.generate.return_value = "FROM ubuntu"
+        mock_generator.context.return_value = {}
         mock_generator_cls.return_value = mock_generator
 
         mock_builder = Mock()
@@ -222,6 +252,7 @@ class TestPackCommand:
         mock_builder_cls.return_value = mock_builder
 
         mock_exporter = Mock()
+        mock_exporter.export.return_value = ExportStats(bytes_written=4, seconds=1.0)
         mock_exporter_cls.return_value = mock_exporter
 
         # Run with explicit engine
@@ -239,11 +270,485 @@ class TestPackCommand:
         call_args = mock_selector.select.call_args
         assert call_args.kwargs["force_engine"] == Engine.VLLM
 
+    @patch("ezrunner.core.pipeline.TarExporter")
+    @patch("ezrunner.core.pipeline.ImageBuilder")
+    @patch("ezrunner.core.pipeline.DockerfileGenerator")
+    @patch("ezrunner.core.pipeline.EngineSelector")
+    @patch("ezrunner.core.pipeline.HardwareAnalyzer")
+    @patch("ezrunner.core.pipeline.ModelDiscovery")
+    def test_pack_to_stdout(
+        self,
+        mock_discovery_cls: Mock,
+        mock_analyzer_cls: Mock,
+        mock_selector_cls: Mock,
+        mock_generator_cls: Mock,
+        mock_builder_cls: Mock,
+        mock_exporter_cls: Mock,
+    ) -> None:
+        """Test -o - streams the archive to stdout and status to stderr."""
+        mock_discovery_cls.return_value.discover.return_value = ModelInfo(
+            model_id="qwen/Qwen-7B",
+            size_gb=14.2,
+            format="safetensors",
+            repo_type="modelscope",
+            architecture="qwen2",
+        )
+        mock_analyzer_cls.return_value.analyze.return_value = Hardware(
+            gpu_memory_gb=24.0,
+            gpu_count=1,
+            cpu_cores=16,
+            ram_gb=64.0,
+            gpu_vendor="nvidia",
+        )
+        mock_selector_cls.return_value.select.return_value = Engine.VLLM
+        mock_generator_cls.return_value.generate.return_value = "FROM ubuntu"
+        mock_generator_cls.return_value.context.return_value = {}
+        mock_builder_cls.return_value.build.return_value.id = "sha256:abc123"
+
+        def stream(image: Mock, sink: Any, tag: str) -> ExportStats:
+            assert tag == "ezrunner-qwen-qwen-7b:latest"
+            sink.write(b"TARDATA")
+            return ExportStats(bytes_written=7, seconds=0.5)
+
+        mock_exporter = mock_exporter_cls.return_value
+        mock_exporter.stream.side_effect = stream
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["pack", "qwen/Qwen-7B", "-o", "-"])
+
+        assert result.exit_code == 0
+        assert result.stdout_bytes == b"TARDATA"
+        assert "Success" in result.stderr
+        mock_exporter.export.assert_not_called()
+
+    @patch("ezrunner.core.pipeline.TarExporter")
+    @patch("ezrunner.core.pipeline.ImageBuilder")
+    @patch("ezrunner.core.pipeline.DockerfileGenerator")
+    @patch("ezrunner.core.pipeline.EngineSelector")
+    @patch("ezrunner.core.pipeline.HardwareAnalyzer")
+    @patch("ezrunner.core.pipeline.ModelDiscovery")
+    def test_pack_converts_pickle_checkpoint(
+        self,
+        mock_discovery_cls: Mock,
+        mock_analyzer_cls: Mock,
+        mock_selector_cls: Mock,
+        mock_generator_cls: Mock,
+        mock_builder_cls: Mock,
+        mock_exporter_cls: Mock,
+        tmp_path: Path,
+    ) -> None:
+        """Test .bin models are packed as converted safetensors."""
+        mock_discovery_cls.return_value.discover.return_value = ModelInfo(
+            model_id="qwen/Qwen-7B",
+            size_gb=14.2,
+            format="pytorch",
+            repo_type="huggingface",
+            architecture="qwen2",
+        )
+        mock_analyzer_cls.return_value.analyze.return_value = Hardware(
+            gpu_memory_gb=24.0,
+            gpu_count=1,
+            cpu_cores=16,
+            ram_gb=64.0,
+            gpu_vendor="nvidia",
+        )
+        mock_selector_cls.return_value.select.return_value = Engine.TRANSFORMERS
+        mock_generator_cls.return_value.generate.return_value = "FROM ubuntu"
+        mock_generator_cls.return_value.context.return_value = {}
+        mock_builder_cls.return_value.build.return_value.id = "sha256:abc123"
+        mock_exporter_cls.return_value.export.return_value = ExportStats(
+            bytes_written=4, seconds=1.0
+        )
+        output_path = tmp_path / "test.tar"
+        output_path.write_bytes(b"test")
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main, ["pack", "qwen/Qwen-7B", "-o", str(output_path), "--force"]
+        )
+
+        assert result.exit_code == 0
+        assert "pytorch → safetensors" in result.output
+        model = mock_generator_cls.return_value.generate.call_args.args[0]
+        assert (model.format, model.converted_from) == ("safetensors", "pytorch")
+
+    @patch("ezrunner.core.pipeline.TarExporter")
+    @patch("ezrunner.core.pipeline.ImageBuilder")
+    @patch("ezrunner.core.pipeline.DockerfileGenerator")
+    @patch("ezrunner.core.pipeline.EngineSelector")
+    @patch("ezrunner.core.pipeline.HardwareAnalyzer")
+    @patch("ezrunner.core.pipeline.ModelDiscovery")
+    def test_pack_multi_model(
+        self,
+        mock_discovery_cls: Mock,
+        mock_analyzer_cls: Mock,
+        mock_selector_cls: Mock,
+        mock_generator_cls: Mock,
+        mock_builder_cls: Mock,
+        mock_exporter_cls: Mock,
+        tmp_path: Path,
+    ) -> None:
+        """Test several models are packed into one Transformers image."""
+        mock_discovery_cls.return_value.discover.side_effect = lambda model_id: (
+            ModelInfo(
+                model_id=model_id,
+                size_gb=3.1,
+                format="safetensors",
+                repo_type="huggingface",
+                architecture="qwen2",
+            )
+        )
+        mock_analyzer_cls.return_value.analyze.return_value = Hardware(
+            gpu_memory_gb=24.0,
+            gpu_count=1,
+            cpu_cores=16,
+            ram_gb=64.0,
+            gpu_vendor="nvidia",
+        )
+        mock_selector_cls.return_value.select.return_value = Engine.TRANSFORMERS
+        mock_generator_cls.return_value.generate.return_value = "FROM ubuntu"
+        mock_generator_cls.return_value.context.return_value = {}
+        mock_builder = mock_builder_cls.return_value
+        mock_builder.build.return_value.id = "sha256:abc123"
+        mock_exporter_cls.return_value.export.return_value = ExportStats(
+            bytes_written=4, seconds=1.0
+        )
+        output_path = tmp_path / "small.tar"
+        output_path.write_bytes(b"test")
+        models = ["qwen/Qwen2-1.5B", "meta-llama/Llama-3.2-1B"]
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["pack", *models, "-o", str(output_path)])
+
+        assert result.exit_code == 0
+        assert "Model: meta-llama/Llama-3.2-1B (3.1 GB" in result.output
+        select = mock_selector_cls.return_value.select.call_args
+        assert select.kwargs["force_engine"] == Engine.TRANSFORMERS
+        generate = mock_generator_cls.return_value.generate.call_args
+        assert generate.args[0].model_id == "qwen/Qwen2-1.5B"
+        assert [m.model_id for m in generate.kwargs["extra_models"]] == models[1:]
+        tag = mock_builder.build.call_args.args[1]
+        assert tag.startswith("ezrunner-qwen-qwen2-1.5b-multi-")
+
+        result = runner.invoke(main, ["pack", *models, "--engine", "vllm"])
+        assert result.exit_code == 2
+        assert "vLLM serves one model per container" in result.output
+        result = runner.invoke(main, ["pack", models[0], models[0]])
+        assert result.exit_code == 2
+        assert "Each model can be packed only once" in result.output
+
+    @patch("ezrunner.core.pipeline.TarExporter")
+    @patch("ezrunner.core.pipeline.ImageBuilder")
+    @patch("ezrunner.core.pipeline.DockerfileGenerator")
+    @patch("ezrunner.core.pipeline.EngineSelector")
+    @patch("ezrunner.core.pipeline.HardwareAnalyzer")
+    @patch("ezrunner.core.pipeline.ModelDiscovery")
+    def test_pack_reuses_cache(
+        self,
+        mock_discovery_cls: Mock,
+        mock_analyzer_cls: Mock,
+        mock_selector_cls: Mock,
+        mock_generator_cls: Mock,
+        mock_builder_cls: Mock,
+        mock_exporter_cls: Mock,
+        tmp_path: Path,
+    ) -> None:
+        """Test repacking unchanged inputs skips build and export."""
+        mock_discovery_cls.return_value.discover.return_value = ModelInfo(
+            model_id="qwen/Qwen-7B",
+            size_gb=14.2,
+            format="safetensors",
+            repo_type="modelscope",
+            architecture="qwen2",
+            revision="abc",
+        )
+        mock_analyzer_cls.return_value.analyze.return_value = Hardware(
+            gpu_memory_gb=24.0,
+            gpu_count=1,
+            cpu_cores=16,
+            ram_gb=64.0,
+            gpu_vendor="nvidia",
+        )
+        mock_selector_cls.return_value.select.return_value = Engine.VLLM
+        mock_generator_cls.return_value.generate.return_value = "FROM ubuntu"
+        mock_generator_cls.return_value.context.return_value = {}
+        mock_builder = mock_builder_cls.return_value
+        mock_builder.build.return_value.id = "sha256:abc123"
+        mock_exporter = mock_exporter_cls.return_value
+        mock_exporter.export.return_value = ExportStats(bytes_written=4, seconds=1.0)
+
+        runner = CliRunner()
+        output_path = tmp_path / "test.tar"
+        output_path.write_bytes(b"test")
+        args = ["pack", "qwen/Qwen-7B", "-o", str(output_path)]
+        args += ["--response-cache", "500", "--max-batch-size", "16"]
+
+        assert runner.invoke(main, args).exit_code == 0
+        settings = mock_generator_cls.return_value.generate.call_args.args[3]
+        assert settings["EZRUNNER_RESPONSE_CACHE_SIZE"] == "500"
+        # An explicit batch size overrides the tuned one
+        assert settings["EZRUNNER_MAX_BATCH_SIZE"] == "16"
+        result = runner.invoke(main, args)
+
+        assert result.exit_code == 0
+        assert "cached archive" in result.output
+        mock_builder.build.assert_called_once()
+        mock_exporter.export.assert_called_once()
+
+        result = runner.invoke(main, [*args, "--force"])
+
+        assert result.exit_code == 0
+        assert mock_builder.build.call_count == 2
+
+        # Archive overwritten: the cached image is tagged again and re-exported
+        output_path.write_bytes(b"other")
+        mock_builder.client.images.get.return_value.id = "sha256:abc123"
+        result = runner.invoke(main, args)
+
+        assert result.exit_code == 0
+        assert "Image reused" in result.output
+        assert mock_builder.build.call_count == 2
+        reused = mock_builder.client.images.get.return_value
+        reused.tag.assert_called_once_with("ezrunner-qwen-qwen-7b")
+        assert mock_exporter.export.call_args.args == (
+            reused,
+            output_path,
+            "ezrunner-qwen-qwen-7b:latest",
+        )
+
+    @patch("ezrunner.core.pipeline.LayoutExporter")
+    @patch("ezrunner.core.pipeline.ImageBuilder")
+    @patch("ezrunner.core.pipeline.DockerfileGenerator")
+    @patch("ezrunner.core.pipeline.EngineSelector")
+    @patch("ezrunner.core.pipeline.HardwareAnalyzer")
+    @patch("ezrunner.core.pipeline.ModelDiscovery")
+    def test_pack_oci_format(
+        self,
+        mock_discovery_cls: Mock,
+        mock_analyzer_cls: Mock,
+        mock_selector_cls: Mock,
+        mock_generator_cls: Mock,
+        mock_builder_cls: Mock,
+        mock_exporter_cls: Mock,
+        tmp_path: Path,
+    ) -> None:
+        """Test pack into an OCI image-layout directory."""
+        mock_discovery_cls.return_value.discover.return_value = ModelInfo(
+            model_id="qwen/Qwen-7B",
+            size_gb=14.2,
+            format="safetensors",
+            repo_type="modelscope",
+            architecture="qwen2",
+        )
+        mock_analyzer_cls.return_value.analyze.return_value = Hardware(
+            gpu_memory_gb=24.0,
+            gpu_count=1,
+            cpu_cores=16,
+            ram_gb=64.0,
+            gpu_vendor="nvidia",
+        )
+        mock_selector_cls.return_value.select.return_value = Engine.VLLM
+        mock_generator_cls.return_value.generate.return_value = "FROM ubuntu"
+        mock_generator_cls.return_value.context.return_value = {}
+        mock_builder_cls.return_value.build.return_value.id = "sha256:abc123"
+        mock_exporter = mock_exporter_cls.return_value
+        mock_exporter.export.return_value = LayoutStats(
+            blobs_written=2, blobs_shared=5, bytes_written=1024 * 1024
+        )
+
+        runner = CliRunner()
+        output_dir = tmp_path / "models"
+        result = runner.invoke(
+            main, ["pack", "qwen/Qwen-7B", "--format", "oci", "-o", str(output_dir)]
+        )
+
+        assert result.exit_code == 0
+        assert "Success" in result.output
+        mock_exporter.export.assert_called_once_with(
+            mock_builder_cls.return_value.build.return_value,
+            output_dir,
+            "ezrunner-qwen-qwen-7b:latest",
+        )
+
+    @patch("ezrunner.core.pipeline.TarExporter")
+    @patch("ezrunner.core.pipeline.ImageBuilder")
+    @patch("ezrunner.core.pipeline.DockerfileGenerator")
+    @patch("ezrunner.core.pipeline.EngineSelector")
+    @patch("ezrunner.core.pipeline.HardwareAnalyzer")
+    @patch("ezrunner.core.pipeline.ModelDiscovery")
+    def test_pack_trace(
+        self,
+        mock_discovery_cls: Mock,
+        mock_analyzer_cls: Mock,
+        mock_selector_cls: Mock,
+        mock_generator_cls: Mock,
+        mock_builder_cls: Mock,
+        mock_exporter_cls: Mock,
+        tmp_path: Path,
+    ) -> None:
+        """Test pack reports per-stage timings and writes a Chrome trace."""
+        mock_discovery_cls.return_value.discover.return_value = ModelInfo(
+            model_id="qwen/Qwen-7B",
+            size_gb=14.2,
+            format="safetensors",
+            repo_type="modelscope",
+            architecture="qwen2",
+        )
+        mock_analyzer_cls.return_value.analyze.return_value = Hardware(
+            gpu_memory_gb=0.0, gpu_count=0, cpu_cores=16, ram_gb=64.0, gpu_vendor="none"
+        )
+        mock_selector_cls.return_value.select.return_value = Engine.TRANSFORMERS
+        mock_generator_cls.return_value.generate.return_value = "FROM ubuntu"
+        mock_generator_cls.return_value.context.return_value = {}
+        mock_builder_cls.return_value.build.return_value.id = "sha256:abc123"
+        mock_exporter_cls.return_value.export.return_value = ExportStats(
+            bytes_written=4, seconds=1.0
+        )
+        output_path = tmp_path / "test.tar"
+        output_path.write_bytes(b"test")
+        trace_path = tmp_path / "trace.json"
+
+        result = CliRunner().invoke(
+            main,
+            ["pack", "qwen/Qwen-7B", "-o", str(output_path)]
+            + ["--trace", str(trace_path)],
+        )
+
+        assert result.exit_code == 0
+        assert "Pack stages" in result.output
+        events = json.loads(trace_path.read_text())["traceEvents"]
+        assert [e["name"] for e in events] == [
+            "discover",
+            "analyze",
+            "select engine",
+            "generate",
+            "build",
+            "export",
+        ]
+        assert all(e["ph"] == "X" for e in events)
+        assert events[4]["args"] == {"cache_misses": 1}
+
+
+class TestPackBatchCommand:
+    """Test pack-batch command."""
+
+    @patch("ezrunner.commands.pack_batch.BatchPacker")
+    def test_pack_batch(self, mock_packer: Mock, tmp_path: Path) -> None:
+        """Test packing from a manifest, with a failure and a resume."""
+        manifest = tmp_path / "models.yaml"
+        manifest.write_text("limits: {daemon: 1}\nmodels: [a/one, b/two]\n")
+        results = [
+            JobResult("a/one", "a-one.tar", "built", 3.0, stages={"build": 2.0}),
+            JobResult("b/two", "b-two.tar", "failed", 1.0, error="Build failed\nlog"),
+        ]
+
+        def run(jobs: Any, previous: Any, on_result: Any) -> list[JobResult]:
+            for result in results:
+                on_result(result)
+            return results
+
+        mock_packer.return_value.run.side_effect = run
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["pack-batch", str(manifest), "--disk", "2"])
+
+        assert result.exit_code == 1
+        assert mock_packer.call_args.args[0] == {"network": 4, "daemon": 1, "disk": 2}
+        assert "a/one: built" in result.output
+        assert "b/two: Build failed" in result.output
+        assert "1 of 2 models failed" in result.output
+        report = tmp_path / "models.report.json"
+        assert json.loads(report.read_text())["totals"] == {"built": 1, "failed": 1}
+
+        runner.invoke(main, ["pack-batch", str(manifest), "--resume"])
+
+        previous = mock_packer.return_value.run.call_args.args[1]
+        assert set(previous) == {"a-one.tar", "b-two.tar"}
+
+    def test_pack_batch_invalid_manifest(self, tmp_path: Path) -> None:
+        """Test an invalid manifest is reported."""
+        manifest = tmp_path / "models.json"
+        manifest.write_text('{"models": [{"id": "a/b", "format": "zip"}]}')
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["pack-batch", str(manifest)])
+
+        assert result.exit_code == 1
+        assert "a/b: format must be" in result.output
+
+
+class TestJobCommands:
+    """Test submit and jobs commands."""
+
+    @patch("ezrunner.commands.jobs.DaemonClient")
+    def test_submit_pack_follow(
+        self, mock_client: Mock, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test only the options given are sent, with absolute paths."""
+        monkeypatch.chdir(tmp_path)
+        client = mock_client.return_value
+        client.submit.return_value = {"id": "abc123"}
+        client.follow.return_value = [
+            {"time": 0.0, "message": "building image"},
+            {"job": {"id": "abc123", "kind": "pack", "status": "failed", "error": "x"}},
+        ]
+
+        result = CliRunner().invoke(
+            main,
+            ["submit", "pack", "a/b", "-o", "a.tar", "--engine", "vllm"]
+            + ["--priority", "2", "--follow", "--address", "127.0.0.1:8700"],
+        )
+
+        assert result.exit_code == 1
+        mock_client.assert_called_once_with("127.0.0.1:8700")
+        client.submit.assert_called_once_with(
+            "pack",
+            {"id": "a/b", "output": str(tmp_path / "a.tar"), "engine": "vllm"},
+            2,
+        )
+        assert "Queued pack job abc123" in result.output
+        assert "building image" in result.output
+        assert "failed" in result.output
+
+    @patch("ezrunner.commands.jobs.DaemonClient")
+    def test_jobs(self, mock_client: Mock) -> None:
+        """Test listing jobs, and an unreachable daemon."""
+        mock_client.return_value.jobs.return_value = [
+            {
+                "id": "abc123",
+                "kind": "verify",
+                "priority": 0,
+                "status": "running",
+                "started": 1.0,
+                "finished": None,
+                "progress": "verifying archive",
+            }
+        ]
+
+        result = CliRunner().invoke(main, ["jobs"])
+
+        assert result.exit_code == 0
+        assert "abc123" in result.output
+        assert "verifying archive" in result.output
+
+        mock_client.return_value.jobs.side_effect = DaemonError("No ezrunner daemon")
+        result = CliRunner().invoke(main, ["jobs"])
+
+        assert result.exit_code == 1
+        assert "No ezrunner daemon" in result.output
+
+    def test_jobs_follow_needs_id(self) -> None:
+        """Test --follow without a job is a usage error."""
+        result = CliRunner().invoke(main, ["jobs", "--follow"])
+
+        assert result.exit_code == 2
+        assert "need a JOB_ID" in result.output
+
 
 class TestRunCommand:
     """Test run command."""
 
-    @patch("ezrunner.cli.docker")
+    @patch("ezrunner.commands.run.docker")
     def test_run_success(self, mock_docker: Mock, tmp_path: Path) -> None:
         """Test successful run command."""
         # Create a fake tar file
@@ -274,8 +779,273 @@ class TestRunCommand:
 
         mock_client.images.load.assert_called_once()
         mock_client.containers.run.assert_called_once()
+        ports = mock_client.containers.run.call_args.kwargs["ports"]
+        assert ports == {"8080/tcp": 8080}
 
-    @patch("ezrunner.cli.docker")
+    @patch("ezrunner.commands.run.docker")
+    def test_run_untagged_image(self, mock_docker: Mock, tmp_path: Path) -> None:
+        """Test an image that lost its tag is run by its ID."""
+        tar_path = tmp_path / "test.tar"
+        tar_path.write_bytes(b"fake tar content")
+        mock_client = Mock()
+        mock_docker.from_env.return_value = mock_client
+        mock_image = Mock(id="sha256:abc", tags=[], labels={}, attrs={})
+        mock_client.images.load.return_value = [mock_image]
+        mock_client.containers.run.return_value = Mock(short_id="abc123")
+
+        result = CliRunner().invoke(main, ["run", str(tar_path)])
+
+        assert result.exit_code == 0, result.output
+        assert "Image loaded: sha256:abc" in result.output
+        assert mock_client.containers.run.call_args.args[0] == "sha256:abc"
+
+    @patch("ezrunner.commands.run.docker")
+    def test_run_maps_exposed_port(self, mock_docker: Mock, tmp_path: Path) -> None:
+        """Test --port publishes the port the image was packed to listen on."""
+        tar_path = tmp_path / "test.tar"
+        tar_path.write_bytes(b"fake tar content")
+        mock_client = Mock()
+        mock_docker.from_env.return_value = mock_client
+        mock_image = Mock(tags=["ezrunner-test:latest"], labels={})
+        mock_image.attrs = {"Config": {"ExposedPorts": {"8000/tcp": {}}}}
+        mock_client.images.load.return_value = [mock_image]
+        mock_client.containers.run.return_value = Mock(short_id="abc123")
+
+        result = CliRunner().invoke(main, ["run", str(tar_path), "--port", "8081"])
+
+        assert result.exit_code == 0, result.output
+        ports = mock_client.containers.run.call_args.kwargs["ports"]
+        assert ports == {"8000/tcp": 8081}
+        assert "http://localhost:8081" in result.output
+
+    @patch("ezrunner.commands.run.docker")
+    def test_run_with_env(self, mock_docker: Mock, tmp_path: Path) -> None:
+        """Test server settings are passed to the container."""
+        tar_path = tmp_path / "test.tar"
+        tar_path.write_bytes(b"fake tar content")
+        mock_client = Mock()
+        mock_docker.from_env.return_value = mock_client
+        mock_image = Mock()
+        mock_image.tags = ["ezrunner-test:latest"]
+        mock_client.images.load.return_value = [mock_image]
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main,
+            ["run", str(tar_path), "-e", "EZRUNNER_MAX_BATCH_SIZE=16", "--force-load"],
+        )
+
+        assert result.exit_code == 0
+        call_args = mock_client.containers.run.call_args
+        assert call_args.kwargs["environment"] == {"EZRUNNER_MAX_BATCH_SIZE": "16"}
+
+    @patch("ezrunner.commands.run.docker")
+    def test_run_with_response_cache(self, mock_docker: Mock, tmp_path: Path) -> None:
+        """Test the response cache directory is mounted into the container."""
+        tar_path = tmp_path / "test.tar"
+        tar_path.write_bytes(b"fake tar content")
+        cache_dir = tmp_path / "cache"
+        mock_client = Mock()
+        mock_docker.from_env.return_value = mock_client
+        mock_image = Mock()
+        mock_image.tags = ["ezrunner-test:latest"]
+        mock_client.images.load.return_value = [mock_image]
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main,
+            [
+                "run",
+                str(tar_path),
+                "--response-cache",
+                "1000",
+                "--response-cache-dir",
+                str(cache_dir),
+                "--force-load",
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert cache_dir.is_dir()
+        call_args = mock_client.containers.run.call_args
+        assert call_args.kwargs["environment"] == {
+            "EZRUNNER_RESPONSE_CACHE_SIZE": "1000",
+            "EZRUNNER_RESPONSE_CACHE_PATH": "/var/cache/ezrunner/responses.db",
+        }
+        assert call_args.kwargs["volumes"] == {
+            str(cache_dir.resolve()): {"bind": "/var/cache/ezrunner", "mode": "rw"}
+        }
+
+    @patch("ezrunner.commands.run.ReadinessProbe")
+    @patch("ezrunner.commands.run.docker")
+    def test_run_wait(
+        self, mock_docker: Mock, mock_probe_cls: Mock, tmp_path: Path
+    ) -> None:
+        """Test --wait blocks until ready and reports startup phases."""
+        tar_path = tmp_path / "test.tar"
+        tar_path.write_bytes(b"fake tar content")
+        mock_client = Mock()
+        mock_docker.from_env.return_value = mock_client
+        mock_image = Mock()
+        mock_image.tags = ["ezrunner-test:latest"]
+        mock_client.images.load.return_value = [mock_image]
+        mock_probe_cls.return_value.wait.return_value = {
+            "status": "ready",
+            "phases": {"load": 12.5, "warmup": 1.25},
+            "breakdown": {"weights": 11.75},
+        }
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main, ["run", str(tar_path), "--wait", "--port", "9000", "--force-load"]
+        )
+
+        assert result.exit_code == 0
+        mock_probe_cls.assert_called_once_with("http://localhost:9000")
+        assert mock_probe_cls.return_value.wait.call_args.args == (900.0,)
+        assert "Ready in" in result.output
+        assert "load" in result.output and "12.50s" in result.output
+        assert "warmup" in result.output and "1.25s" in result.output
+        assert "weights" in result.output and "11.75s" in result.output
+
+    @patch("ezrunner.commands.run.ReadinessProbe")
+    @patch("ezrunner.commands.run.docker")
+    def test_run_wait_failed(
+        self, mock_docker: Mock, mock_probe_cls: Mock, tmp_path: Path
+    ) -> None:
+        """Test --wait fails when the server does not become ready."""
+        tar_path = tmp_path / "test.tar"
+        tar_path.write_bytes(b"fake tar content")
+        mock_client = Mock()
+        mock_docker.from_env.return_value = mock_client
+        mock_image = Mock()
+        mock_image.tags = ["ezrunner-test:latest"]
+        mock_client.images.load.return_value = [mock_image]
+        mock_probe_cls.return_value.wait.side_effect = StartupError(
+            "Model server failed to start: CUDA out of memory"
+        )
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["run", str(tar_path), "--wait", "--force-load"])
+
+        assert result.exit_code != 0
+        assert "CUDA out of memory" in result.output
+
+    @patch("ezrunner.commands.run.probe_gpus")
+    @patch("ezrunner.commands.run.docker")
+    def test_run_places_gpus(
+        self, mock_docker: Mock, mock_probe: Mock, tmp_path: Path
+    ) -> None:
+        """Test GPUs are assigned explicitly and kept across restarts."""
+        tar_path = tmp_path / "test.tar"
+        tar_path.write_bytes(b"fake tar content")
+        mock_client = Mock()
+        mock_docker.from_env.return_value = mock_client
+        mock_image = Mock(
+            tags=["ezrunner-test:latest"],
+            labels={"ezrunner.engine": "vllm", "ezrunner.model.size-gb": "100"},
+        )
+        mock_client.images.load.return_value = [mock_image]
+        mock_client.containers.run.return_value = Mock(id="c1", short_id="c1")
+        mock_probe.return_value = [
+            GPUDevice(i, f"GPU-{i}", "H100", 80.0, nvlink=(i ^ 1,)) for i in range(4)
+        ]
+        profile = tmp_path / "gpus.json"
+
+        runner = CliRunner()
+        args = ["run", str(tar_path), "--gpus", "2", "--gpu-profile", str(profile)]
+        result = runner.invoke(main, [*args, "--force-load"])
+
+        assert result.exit_code == 0, result.output
+        kwargs = mock_client.containers.run.call_args.kwargs
+        (request,) = kwargs["device_requests"]
+        assert request["DeviceIDs"] == ["GPU-0", "GPU-1"]
+        assert kwargs["shm_size"] == "16g"
+        assert kwargs["environment"] == {
+            "EZRUNNER_VLLM_ARGS": "--tensor-parallel-size 2"
+        }
+        assert profile.exists()
+
+        # A second model goes around the running one; a restart gets its GPUs back
+        mock_client.containers.get.return_value = Mock(status="running")
+        runner.invoke(main, [*args, "--port", "8081", "--force-load"])
+        request = mock_client.containers.run.call_args.kwargs["device_requests"][0]
+        assert request["DeviceIDs"] == ["GPU-2", "GPU-3"]
+
+        mock_client.containers.get.return_value = Mock(status="exited")
+        runner.invoke(main, [*args, "--force-load"])
+        request = mock_client.containers.run.call_args.kwargs["device_requests"][0]
+        assert request["DeviceIDs"] == ["GPU-0", "GPU-1"]
+        assert mock_probe.call_count == 1  # later runs read the profile
+
+        result = runner.invoke(main, ["run", str(tar_path), "--gpus", "8"])
+        assert result.exit_code == 1
+        assert "needs 8 GPUs, the node has 4" in result.output
+
+    @patch("ezrunner.commands.run.signal")
+    @patch("ezrunner.commands.run.LoadBalancer")
+    @patch("ezrunner.commands.run.probe_gpus")
+    @patch("ezrunner.commands.run.docker")
+    def test_run_replicas(
+        self,
+        mock_docker: Mock,
+        mock_probe: Mock,
+        mock_balancer: Mock,
+        mock_signal: Mock,
+        tmp_path: Path,
+    ) -> None:
+        """Test replicas get their own GPUs and ports, behind the balancer."""
+        tar_path = tmp_path / "test.tar"
+        tar_path.write_bytes(b"fake tar content")
+        mock_client = Mock()
+        mock_docker.from_env.return_value = mock_client
+        mock_client.images.load.return_value = [
+            Mock(tags=["ezrunner-test:latest"], labels={"ezrunner.engine": "vllm"})
+        ]
+        containers = [Mock(id=f"c{i}", short_id=f"c{i}") for i in range(3)]
+        mock_client.containers.run.side_effect = containers
+        mock_probe.return_value = [
+            GPUDevice(i, f"GPU-{i}", "H100", 80.0) for i in range(4)
+        ]
+        mock_balancer.return_value.serve = AsyncMock(side_effect=KeyboardInterrupt)
+
+        result = CliRunner().invoke(main, ["run", str(tar_path), "--replicas", "3"])
+
+        assert result.exit_code == 0, result.output
+        calls = mock_client.containers.run.call_args_list
+        assert [c.kwargs["ports"] for c in calls] == [
+            {"8080/tcp": ("127.0.0.1", port)} for port in (8081, 8082, 8083)
+        ]
+        devices = [c.kwargs["device_requests"][0]["DeviceIDs"] for c in calls]
+        assert sorted(devices) == [["GPU-0"], ["GPU-1"], ["GPU-2"]]
+        replicas = mock_balancer.call_args.args[0]
+        assert [r.port for r in replicas] == [8081, 8082, 8083]
+        mock_balancer.return_value.serve.assert_awaited_once_with("0.0.0.0", 8080)
+        for container in containers:
+            container.stop.assert_called_once()
+
+        # Replicas already started are stopped if a later one cannot be placed
+        mock_client.containers.run.side_effect = containers
+        mock_client.containers.get.return_value = Mock(status="running")
+        result = CliRunner().invoke(
+            main, ["run", str(tar_path), "--replicas", "2", "--port", "9000"]
+        )
+        assert result.exit_code == 1
+        assert "GPU3 has another replica" in result.output
+        assert containers[0].stop.call_count == 2
+
+    def test_run_invalid_env(self, tmp_path: Path) -> None:
+        """Test malformed --env values are rejected."""
+        tar_path = tmp_path / "test.tar"
+        tar_path.write_bytes(b"fake tar content")
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["run", str(tar_path), "-e", "NOVALUE"])
+
+        assert result.exit_code != 0
+        assert "NAME=VALUE" in result.output
+
+    @patch("ezrunner.commands.run.docker")
     def test_run_no_images(self, mock_docker: Mock, tmp_path: Path) -> None:
         """Test run with tar containing no images."""
         # Create a fake tar file
@@ -303,3 +1073,315 @@ class TestRunCommand:
 
         assert result.exit_code == 2  # Click exits with 2 for invalid args
         assert "does not exist" in result.output.lower()
+
+    @patch("ezrunner.commands.run.docker")
+    def test_run_skips_loaded_image(
+        self, mock_docker: Mock, make_archive: Callable[..., Path]
+    ) -> None:
+        """Test run does not reload an image the daemon already has."""
+        tar_path = make_archive("qwen.tar", [("ezrunner-qwen:latest", [b"q"])])
+
+        mock_client = Mock()
+        mock_docker.from_env.return_value = mock_client
+        mock_client.images.get.return_value = Mock(tags=["ezrunner-qwen:latest"])
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["run", str(tar_path)])
+
+        assert result.exit_code == 0
+        assert "already loaded" in result.output
+        mock_client.images.load.assert_not_called()
+        mock_client.containers.run.assert_called_once()
+
+    @patch("ezrunner.commands.run.docker")
+    def test_run_bundle_requires_model(self, mock_docker: Mock, tmp_path: Path) -> None:
+        """Test run refuses to guess which image of a bundle to start."""
+        tar_path = tmp_path / "bundle.tar"
+        tar_path.write_bytes(b"fake tar content")
+
+        mock_client = Mock()
+        mock_docker.from_env.return_value = mock_client
+        mock_client.images.load.return_value = [
+            Mock(tags=["ezrunner-qwen:latest"]),
+            Mock(tags=["ezrunner-llama:latest"]),
+        ]
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["run", str(tar_path)])
+
+        assert result.exit_code == 1
+        assert "--model" in result.output
+        mock_client.containers.run.assert_not_called()
+
+    @patch("ezrunner.commands.run.docker")
+    def test_run_applies_tuning(self, mock_docker: Mock, tmp_path: Path) -> None:
+        """Test settings found by tune apply, below explicit ones."""
+        tar_path = tmp_path / "test.tar"
+        tar_path.write_bytes(b"fake tar content")
+        tuned = {"EZRUNNER_MAX_BATCH_SIZE": "16", "EZRUNNER_MAX_WAIT_MS": "2"}
+        save_tuning(tar_path, "sha256:abc", {"settings": tuned})
+        mock_client = Mock()
+        mock_docker.from_env.return_value = mock_client
+        mock_client.images.load.return_value = [
+            Mock(id="sha256:abc", tags=["ezrunner-test:latest"])
+        ]
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main,
+            ["run", str(tar_path), "-e", "EZRUNNER_MAX_WAIT_MS=5", "--force-load"],
+        )
+
+        assert result.exit_code == 0
+        assert "Tuned settings" in result.output
+        call_args = mock_client.containers.run.call_args
+        assert call_args.kwargs["environment"] == {
+            "EZRUNNER_MAX_BATCH_SIZE": "16",
+            "EZRUNNER_MAX_WAIT_MS": "5",
+        }
+
+
+class TestTuneCommand:
+    """Test tune command."""
+
+    @patch("ezrunner.commands.tune.LoadGenerator")
+    @patch("ezrunner.commands.tune.ContainerLauncher")
+    @patch("ezrunner.commands.tune.docker")
+    def test_tune_saves_best(
+        self,
+        mock_docker: Mock,
+        mock_launcher_cls: Mock,
+        mock_generator_cls: Mock,
+        tmp_path: Path,
+    ) -> None:
+        """Test the fastest configuration within the SLO is recorded."""
+        tar_path = tmp_path / "test.tar"
+        tar_path.write_bytes(b"fake tar content")
+        mock_client = mock_docker.from_env.return_value
+        mock_client.images.load.return_value = [
+            Mock(
+                id="sha256:abc",
+                tags=["ezrunner-test:latest"],
+                labels={"ezrunner.engine": "vllm", "ezrunner.model.id": "qwen/Qwen"},
+            )
+        ]
+        mock_launcher_cls.return_value.launch.side_effect = lambda settings: (
+            nullcontext("http://localhost:8080")
+        )
+        # Throughput grows with batch size; the largest breaks the SLO
+        mock_generator_cls.return_value.run.side_effect = [
+            LoadStats((RequestResult(0.5, 100),), 1.0),
+            LoadStats((RequestResult(1.0, 200),), 1.0),
+            LoadStats((RequestResult(9.0, 400),), 1.0),
+        ]
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main,
+            [
+                "tune",
+                str(tar_path),
+                "--grid",
+                "EZRUNNER_MAX_BATCH_SIZE=8,16,32",
+                "--max-p95-latency",
+                "2",
+                "--force-load",
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert "EZRUNNER_MAX_BATCH_SIZE=16" in result.output
+        assert mock_generator_cls.call_args.kwargs["model"] == "qwen/Qwen"
+        assert load_tuning(tar_path, "sha256:abc") == {"EZRUNNER_MAX_BATCH_SIZE": "16"}
+
+    @patch("ezrunner.commands.tune.LoadGenerator")
+    @patch("ezrunner.commands.tune.ContainerLauncher")
+    @patch("ezrunner.commands.tune.docker")
+    def test_tune_nothing_meets_slo(
+        self,
+        mock_docker: Mock,
+        mock_launcher_cls: Mock,
+        mock_generator_cls: Mock,
+        tmp_path: Path,
+    ) -> None:
+        """Test tune fails without recording when the SLO is unreachable."""
+        tar_path = tmp_path / "test.tar"
+        tar_path.write_bytes(b"fake tar content")
+        mock_client = mock_docker.from_env.return_value
+        mock_client.images.load.return_value = [
+            Mock(id="sha256:abc", tags=["ezrunner-test:latest"], labels={})
+        ]
+        mock_launcher_cls.return_value.launch.side_effect = lambda settings: (
+            nullcontext("http://localhost:8080")
+        )
+        mock_generator_cls.return_value.run.return_value = LoadStats(
+            (RequestResult(60.0, 100),), 60.0
+        )
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["tune", str(tar_path), "--force-load"])
+
+        assert result.exit_code == 1
+        assert "No configuration met" in result.output
+        # Default transformers grid: batch sizes x max waits
+        assert mock_generator_cls.return_value.run.call_count == 12
+        assert not tuning_path(tar_path).exists()
+
+    def test_tune_invalid_grid(self, tmp_path: Path) -> None:
+        """Test malformed --grid values are rejected."""
+        tar_path = tmp_path / "test.tar"
+        tar_path.write_bytes(b"fake tar content")
+
+        runner = CliRunner()
+        result = runner.invoke(main, ["tune", str(tar_path), "--grid", "X"])
+
+        assert result.exit_code == 2
+        assert "NAME=V1,V2" in result.output
+
+
+class TestBenchCommand:
+    """Test bench command."""
+
+    def test_bench_url(self, chat_server: Callable[..., str], tmp_path: Path) -> None:
+        """Test benchmarking a running server writes a comparable report."""
+        url = chat_server(tokens=3)
+        report_path = tmp_path / "report.json"
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main,
+            [
+                "bench",
+                url,
+                "--requests",
+                "4",
+                "--concurrency",
+                "2",
+                "--max-tokens",
+                "2-8",
+                "-o",
+                str(report_path),
+            ],
+        )
+
+        assert result.exit_code == 0
+        assert "Time to first token" in result.output
+        report = json.loads(report_path.read_text())
+        assert report["workload"]["max_tokens"] == "2-8"
+        assert report["workload"]["seed"] == 0
+        assert report["results"]["requests"] == 4
+        assert report["results"]["errors"] == 0
+        assert report["results"]["output_throughput_tok_s"] > 0
+
+    def test_bench_invalid_lengths(self) -> None:
+        """Test malformed length distributions are rejected."""
+        runner = CliRunner()
+        result = runner.invoke(
+            main, ["bench", "http://localhost:8080", "--prompt-tokens", "lots"]
+        )
+
+        assert result.exit_code == 2
+        assert "--prompt-tokens" in result.output
+
+    def test_bench_unreachable(self) -> None:
+        """Test a run where every request fails exits with an error."""
+        runner = CliRunner()
+        result = runner.invoke(main, ["bench", "http://127.0.0.1:9", "--requests", "2"])
+
+        assert result.exit_code == 1
+        assert "Every request failed" in result.output
+
+
+class TestBundleCommand:
+    """Test bundle command."""
+
+    def test_bundle_archives(
+        self, make_archive: Callable[..., Path], tmp_path: Path
+    ) -> None:
+        """Test bundling packed tar files."""
+        qwen = make_archive("qwen.tar", [("ezrunner-qwen:latest", [b"q"])])
+        llama = make_archive("llama.tar", [("ezrunner-llama:latest", [b"l"])])
+        output = tmp_path / "bundle.tar"
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main, ["bundle", str(qwen), str(llama), "-o", str(output)]
+        )
+
+        assert result.exit_code == 0
+        assert "Bundled 2 images" in result.output
+        assert output.exists()
+
+
+# Longest `import ezrunner.cli` may take, on the best of a few runs
+STARTUP_BUDGET_S = 0.15
+HEAVY_MODULES = ("docker", "requests", "jinja2", "rich", "ezrunner.core")
+
+
+def _python(code: str, **env: str) -> str:
+    """Run code in a fresh interpreter and return its stdout and stderr."""
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={
+            **os.environ,
+            "PYTHONPATH": str(Path(ezrunner.__file__).parents[1]),
+            **env,
+        },
+    )
+    return result.stdout + result.stderr
+
+
+class TestStartup:
+    """Test the CLI starts without importing its commands."""
+
+    def test_import_is_lazy(self) -> None:
+        """Test importing the CLI loads no command or heavy dependency."""
+        output = _python(
+            "import sys, ezrunner.cli; "
+            f"print([m for m in sys.modules if m.startswith({HEAVY_MODULES})])"
+        )
+
+        assert output.strip() == "[]"
+
+    def test_startup_budget(self) -> None:
+        """Test importing the CLI stays within the startup budget."""
+        code = (
+            "import time; start = time.perf_counter(); import ezrunner.cli; "
+            "print(time.perf_counter() - start)"
+        )
+
+        best = min(float(_python(code)) for _ in range(3))
+
+        assert best < STARTUP_BUDGET_S
+
+    def test_help_lists_commands(self) -> None:
+        """Test --help lists every registered command."""
+        runner = CliRunner()
+        result = runner.invoke(main, ["--help"])
+
+        assert result.exit_code == 0
+        for name, entry in COMMANDS.items():
+            assert f"{name}  " in result.output
+            assert entry.help.split(".")[0] in result.output
+
+    @pytest.mark.parametrize("name", sorted(COMMANDS))
+    def test_registry_matches_command(self, name: str) -> None:
+        """Test the registered help is the first line of the command's own."""
+        command = main.get_command(Mock(), name)
+
+        assert command is not None
+        assert command.name == name
+        assert (command.help or "").splitlines()[0] == COMMANDS[name].help
+
+    def test_import_time_report(self) -> None:
+        """Test EZRUNNER_IMPORT_TIME reports the CLI and command imports."""
+        output = _python(
+            "from ezrunner.cli import main; main(['load', '--help'])",
+            EZRUNNER_IMPORT_TIME="1",
+        )
+
+        assert "import ezrunner.cli: " in output
+        assert "import ezrunner.commands.load: " in output
@@ -0,0 +1,101 @@
+"""Tests for the pickle-to-safetensors converter."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+torch = pytest.importorskip("torch")
+safetensors_torch = pytest.importorskip("safetensors.torch")
+
+from ezrunner.runtime.convert import convert, parse_size  # noqa: E402
+
+
+def write_checkpoint(model_dir: Path, shards: list[dict]) -> None:
+    """Save state dict shards the way ``save_pretrained`` does for .bin."""
+    weight_map = {}
+    for i, shard in enumerate(shards):
+        name = f"pytorch_model-{i + 1:05d}-of-{len(shards):05d}.bin"
+        torch.save(shard, model_dir / name)
+        weight_map.update(dict.fromkeys(shard, name))
+    index = {"metadata": {}, "weight_map": weight_map}
+    (model_dir / "pytorch_model.bin.index.json").write_text(json.dumps(index))
+
+
+class TestConvert:
+    """Test convert."""
+
+    def test_sharded_checkpoint(self, tmp_path: Path) -> None:
+        """Test tensors are re-sharded by size and pickle files removed."""
+        torch.manual_seed(0)
+        embed = torch.randn(16, 8)
+        tensors = {
+            "embed.weight": embed,
+            "lm_head.weight": embed,  # tied: same storage
+            "layer.0.weight": torch.randn(8, 8),
+            "layer.1.weight": torch.randn(8, 8, dtype=torch.float16),
+        }
+        write_checkpoint(
+            tmp_path,
+            [
+                {k: tensors[k] for k in ("embed.weight", "lm_head.weight")},
+                {k: tensors[k] for k in ("layer.0.weight", "layer.1.weight")},
+            ],
+        )
+
+        shards = convert(tmp_path, max_shard_size=300)
+
+        files = sorted(p.name for p in tmp_path.iterdir())
+        assert files == [
+            "model-00001-of-00003.safetensors",
+            "model-00002-of-00003.safetensors",
+            "model-00003-of-00003.safetensors",
+            "model.safetensors.index.json",
+        ]
+        assert shards == 3
+        index = json.loads((tmp_path / "model.safetensors.index.json").read_text())
+        assert index["metadata"]["total_size"] == 16 * 8 * 4 + 8 * 8 * 4 + 8 * 8 * 2
+        assert "lm_head.weight" not in index["weight_map"]
+        for name, file in index["weight_map"].items():
+            loaded = safetensors_torch.load_file(str(tmp_path / file))
+            assert torch.equal(loaded[name], tensors[name])
+
+    def test_loads_with_transformers(self, tmp_path: Path) -> None:
+        """Test a converted model loads through the safetensors path."""
+        transformers = pytest.importorskip("transformers")
+        config = transformers.LlamaConfig(
+            vocab_size=32,
+            hidden_size=16,
+            intermediate_size=32,
+            num_hidden_layers=2,
+            num_attention_heads=2,
+        )
+        model = transformers.LlamaForCausalLM(config).eval()
+        model.save_pretrained(tmp_path, safe_serialization=False)
+
+        convert(tmp_path)
+        loaded = transformers.AutoModelForCausalLM.from_pretrained(
+            tmp_path, use_safetensors=True
+        ).eval()
+
+        input_ids = torch.tensor([[1, 2, 3]])
+        assert not list(tmp_path.glob("*.bin"))
+        assert torch.equal(model(input_ids).logits, loaded(input_ids).logits)
+
+    def test_nothing_to_convert(self, tmp_path: Path) -> None:
+        """Test directories without a pickle checkpoint are left alone."""
+        assert convert(tmp_path) == 0
+
+
+@pytest.mark.parametrize(
+    "size,expected", [("2GB", 2 * 10**9), ("500MB", 5 * 10**8), ("1024", 1024)]
+)
+def test_parse_size(size: str, expected: int) -> None:
+    """Test shard size parsing."""
+    assert parse_size(size) == expected
+
+
+def test_parse_invalid_size() -> None:
+    """Test malformed sizes are rejected."""
+    with pytest.raises(ValueError, match="Invalid size"):
+        parse_size("lots")
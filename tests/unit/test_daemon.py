@@ -0,0 +1,261 @@
+"""Tests for the pack daemon and its client."""
+
+import os
+import stat
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from ezrunner.api.daemon import DaemonClient, parse_address
+from ezrunner.core.daemon import DaemonServer, JobQueue, JobRunner
+from ezrunner.exceptions import DaemonError, ManifestError
+
+Progress = Callable[[str], None]
+
+
+def task(
+    result: dict[str, Any] | None = None,
+    gate: threading.Event | None = None,
+    ran: list[str] | None = None,
+    name: str = "",
+) -> Callable[[Progress], dict[str, Any]]:
+    """Task reporting progress, optionally waiting for ``gate`` first."""
+
+    def run(progress: Progress) -> dict[str, Any]:
+        if gate is not None:
+            gate.wait(5)
+        if ran is not None:
+            ran.append(name)
+        progress("working")
+        return result or {}
+
+    return run
+
+
+def failing(progress: Progress) -> dict[str, Any]:
+    """Task that fails."""
+    raise RuntimeError("disk full")
+
+
+@pytest.fixture
+def queue() -> Iterator[JobQueue]:
+    """Queue with one worker."""
+    jobs = JobQueue(workers=1)
+    jobs.start()
+    yield jobs
+    jobs.stop(timeout=5)
+
+
+class TestJobQueue:
+    """Test JobQueue."""
+
+    def test_priority_order(self, queue: JobQueue) -> None:
+        """Test queued jobs run highest priority first, then in order."""
+        gate = threading.Event()
+        ran: list[str] = []
+        blocker = queue.submit("pack", {}, task(gate=gate))
+        jobs = [
+            queue.submit("verify", {}, task(ran=ran, name=name), priority)
+            for name, priority in (("low", 0), ("high", 5), ("low2", 0), ("mid", 1))
+        ]
+        gate.set()
+
+        for job in (blocker, *jobs):
+            list(queue.follow(job.id, poll_s=0.1))
+
+        assert ran == ["high", "mid", "low", "low2"]
+        assert queue.counts()["done"] == 5
+
+    def test_follow_events(self, queue: JobQueue) -> None:
+        """Test following a job yields every event until it finishes."""
+        job = queue.submit("pack", {}, task({"output": "a.tar"}))
+
+        messages = [event["message"] for event in queue.follow(job.id)]
+
+        assert messages == ["queued", "started", "working", "done"]
+        assert queue.snapshot(job.id) == {
+            **job.to_dict(),
+            "result": {"output": "a.tar"},
+        }
+
+    def test_failure(self, queue: JobQueue) -> None:
+        """Test a failing task fails its job, not the worker."""
+        bad = queue.submit("pack", {}, failing)
+        good = queue.submit("pack", {}, task())
+        list(queue.follow(good.id))
+
+        assert queue.snapshot(bad.id)["status"] == "failed"  # type: ignore[index]
+        assert queue.snapshot(bad.id)["error"] == "disk full"  # type: ignore[index]
+        assert queue.snapshot(good.id)["status"] == "done"  # type: ignore[index]
+
+    def test_cancel(self, queue: JobQueue) -> None:
+        """Test queued jobs can be cancelled, running ones cannot."""
+        gate = threading.Event()
+        ran: list[str] = []
+        running = queue.submit("pack", {}, task(gate=gate))
+        queued = queue.submit("pack", {}, task(ran=ran, name="queued"))
+        while queue.snapshot(running.id)["status"] != "running":  # type: ignore[index]
+            time.sleep(0.01)
+
+        assert queue.cancel(queued.id)["status"] == "cancelled"
+        with pytest.raises(DaemonError, match="is running"):
+            queue.cancel(running.id)
+        gate.set()
+        list(queue.follow(running.id))
+        assert ran == []
+
+    def test_history(self) -> None:
+        """Test only the latest finished jobs are kept."""
+        jobs = JobQueue(workers=1, history=2)
+        jobs.start()
+        try:
+            submitted = [jobs.submit("pack", {}, task()) for _ in range(4)]
+            list(jobs.follow(submitted[-1].id))
+            assert [job["id"] for job in jobs.snapshots()] == [
+                job.id for job in submitted[2:]
+            ]
+        finally:
+            jobs.stop(timeout=5)
+
+
+class TestJobRunner:
+    """Test JobRunner."""
+
+    def test_invalid_requests(self) -> None:
+        """Test invalid jobs are rejected before they are queued."""
+        runner = JobRunner(Mock())
+
+        with pytest.raises(DaemonError, match="Unknown job kind"):
+            runner.task("build", {})
+        with pytest.raises(DaemonError, match="'output'"):
+            runner.task("export", {"image": "a"})
+        with pytest.raises(ManifestError, match="unknown options gpu"):
+            runner.task("pack", {"id": "a/b", "gpu": 1})
+
+    def test_verify(self, make_archive: Callable[..., Path]) -> None:
+        """Test verify jobs report what they checked."""
+        archive = make_archive("a.tar", [("ezrunner-a:latest", [b"layer"])])
+        packer = MagicMock()
+        progress = Mock()
+
+        result = JobRunner(packer).task("verify", {"archive": str(archive)})(progress)
+
+        assert result["images"] == 1
+        packer.slot.assert_called_once_with("disk")
+        progress.assert_called_once_with("verifying archive")
+
+
+@pytest.fixture
+def daemon(tmp_path: Path) -> Iterator[DaemonClient]:
+    """Daemon on a Unix socket whose jobs are stub tasks, and its client."""
+    runner = Mock()
+    runner.task.side_effect = lambda kind, params: (
+        failing if params.get("fail") else task({"kind": kind})
+    )
+    server = DaemonServer(JobQueue(workers=1), runner, f"unix:{tmp_path / 'd.sock'}")
+    server.jobs.start()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield DaemonClient(server.address, timeout=5)
+    server.shutdown()
+    server.jobs.stop(timeout=5)
+
+
+class TestDaemonServer:
+    """Test the job API through DaemonClient."""
+
+    def test_submit_and_follow(self, daemon: DaemonClient) -> None:
+        """Test a submitted job streams its progress and final state."""
+        job = daemon.submit("verify", {"archive": "a.tar"}, priority=3)
+
+        *events, final = daemon.follow(job["id"])
+
+        assert job["status"] == "queued"
+        assert job["priority"] == 3
+        assert [event["message"] for event in events][-2:] == ["working", "done"]
+        assert final["job"]["result"] == {"kind": "verify"}
+        assert daemon.job(job["id"])["status"] == "done"
+        assert [j["id"] for j in daemon.jobs()] == [job["id"]]
+        assert daemon.health()["done"] == 1
+
+    def test_failed_job(self, daemon: DaemonClient) -> None:
+        """Test a failed job reports its error."""
+        job = daemon.submit("pack", {"fail": True})
+
+        *_, final = daemon.follow(job["id"])
+
+        assert final["job"]["status"] == "failed"
+        assert final["job"]["error"] == "disk full"
+
+    def test_errors(self, daemon: DaemonClient) -> None:
+        """Test unknown jobs and rejected requests raise DaemonError."""
+        with pytest.raises(DaemonError, match="No job 0123"):
+            daemon.job("0123")
+        with pytest.raises(DaemonError, match="params must be a mapping"):
+            daemon.submit("pack", [])  # type: ignore[arg-type]
+        job = daemon.submit("pack", {})
+        list(daemon.follow(job["id"]))
+        with pytest.raises(DaemonError, match="is done"):
+            daemon.cancel(job["id"])
+
+    def test_already_running(self, daemon: DaemonClient) -> None:
+        """Test a second daemon does not take over a live socket."""
+        with pytest.raises(DaemonError, match="Another daemon"):
+            DaemonServer(JobQueue(), Mock(), daemon.address)
+
+    def test_socket_owner_only(self, tmp_path: Path) -> None:
+        """Test the socket is created owner-only and the umask restored."""
+        path = tmp_path / "d.sock"
+        previous = os.umask(0o022)
+        try:
+            server = DaemonServer(JobQueue(), Mock(), f"unix:{path}")
+            umask = os.umask(0o022)
+        finally:
+            os.umask(previous)
+
+        assert stat.S_IMODE(path.stat().st_mode) == 0o600
+        assert umask == 0o022
+        server.close()
+
+    def test_tcp_loopback_only(self) -> None:
+        """Test TCP is refused on other hosts unless explicitly allowed."""
+        with pytest.raises(DaemonError, match="Refusing to listen on 0.0.0.0:0"):
+            DaemonServer(JobQueue(), Mock(), "0.0.0.0:0")
+        with pytest.raises(DaemonError, match="Refusing"):
+            DaemonServer(JobQueue(), Mock(), "build-host:8700")
+
+        for address, allow_remote in (("127.0.0.1:0", False), ("0.0.0.0:0", True)):
+            server = DaemonServer(JobQueue(), Mock(), address, allow_remote)
+            assert server.address.startswith(address.removesuffix(":0"))
+            server.close()
+
+    def test_no_daemon(self, tmp_path: Path) -> None:
+        """Test a missing daemon is reported with how to start one."""
+        client = DaemonClient(f"unix:{tmp_path / 'none.sock'}")
+
+        with pytest.raises(DaemonError, match="ezrunner serve"):
+            client.health()
+
+
+@pytest.mark.parametrize(
+    ("address", "expected"),
+    [
+        ("unix:/run/ez.sock", "/run/ez.sock"),
+        ("127.0.0.1:8700", ("127.0.0.1", 8700)),
+        ("http://localhost:8700/", ("localhost", 8700)),
+        (":8700", ("127.0.0.1", 8700)),
+    ],
+)
+def test_parse_address(address: str, expected: str | tuple[str, int]) -> None:
+    """Test daemon addresses."""
+    assert parse_address(address) == expected
+
+
+def test_parse_address_invalid() -> None:
+    """Test invalid daemon addresses."""
+    with pytest.raises(DaemonError, match="Invalid daemon address"):
+        parse_address("localhost")
@@ -89,3 +89,34 @@ class TestModelDiscovery:
         model = discovery.discover("test/pytorch-model")
 
         assert model.format == "pytorch"
+
+    @patch("ezrunner.api.modelscope.ModelScopeClient.get_model_info")
+    @patch("ezrunner.api.huggingface.HuggingFaceClient.get_model_info")
+    @patch("ezrunner.api.huggingface.HuggingFaceClient.get_model_files")
+    def test_discover_revision_from_sha(
+        self, mock_hf_files: Mock, mock_hf_info: Mock, mock_ms_info: Mock
+    ) -> None:
+        """Test the commit SHA is recorded as the revision."""
+        mock_ms_info.side_effect = requests.RequestException("Not found")
+        mock_hf_info.return_value = {"pipeline_tag": "text-generation", "sha": "abc"}
+        mock_hf_files.return_value = [{"path": "model.safetensors", "size": 10**9}]
+
+        model = ModelDiscovery().discover("meta-llama/Llama-2-7b")
+
+        assert model.revision == "abc"
+
+    @patch("ezrunner.api.modelscope.ModelScopeClient.get_model_info")
+    @patch("ezrunner.api.modelscope.ModelScopeClient.get_model_files")
+    def test_discover_revision_from_files(
+        self, mock_get_files: Mock, mock_get_info: Mock
+    ) -> None:
+        """Test repositories without a SHA get a file-listing revision."""
+        mock_get_info.return_value = {"model_type": "qwen2"}
+        mock_get_files.return_value = [{"path": "model.safetensors", "size": 10**9}]
+        first = ModelDiscovery().discover("qwen/Qwen-7B").revision
+
+        mock_get_files.return_value = [{"path": "model.safetensors", "size": 10**9 + 1}]
+        second = ModelDiscovery().discover("qwen/Qwen-7B").revision
+
+        assert first is not None and first.startswith("files:")
+        assert first != second
@@ -1,5 +1,9 @@
 """Tests for DockerfileGenerator."""
 
+from dataclasses import replace
+
+import pytest
+
 from ezrunner.core.dockerfile import DockerfileGenerator
 from ezrunner.models.engine import Engine
 from ezrunner.models.model_info import ModelInfo
@@ -59,3 +63,159 @@ class TestDockerfileGenerator:
 
         # Should convert to lowercase and replace /
         assert "modelscope-special-model" in dockerfile
+
+    def test_transformers_runtime_settings(self) -> None:
+        """Test the Transformers image copies the runtime and bakes settings."""
+        model = ModelInfo(
+            model_id="qwen/Qwen-7B",
+            size_gb=14.2,
+            format="safetensors",
+            repo_type="modelscope",
+            architecture="qwen2",
+        )
+
+        generator = DockerfileGenerator()
+        dockerfile = generator.generate(
+            model, Engine.TRANSFORMERS, settings={"EZRUNNER_MAX_BATCH_SIZE": "16"}
+        )
+        context = generator.context(Engine.TRANSFORMERS)
+
+        assert "ENV EZRUNNER_MAX_BATCH_SIZE=16" in dockerfile
+        assert "COPY ezrunner_runtime /app/ezrunner_runtime" in dockerfile
+        assert "/ready" in dockerfile.split("HEALTHCHECK", 1)[1]
+        assert "<< " not in dockerfile  # no heredocs: legacy builder compatible
+        assert (context["ezrunner_runtime"] / "server.py").is_file()
+        assert generator.context(Engine.VLLM) == context
+
+    def test_pickle_checkpoint_converted(self) -> None:
+        """Test .bin checkpoints are converted in the download layer."""
+        model = ModelInfo(
+            model_id="qwen/Qwen-7B",
+            size_gb=14.2,
+            format="pytorch",
+            repo_type="huggingface",
+            architecture="qwen2",
+            revision="abc123",
+        ).with_safetensors()
+
+        generator = DockerfileGenerator()
+        for engine in (Engine.TRANSFORMERS, Engine.VLLM):
+            dockerfile = generator.generate(model, engine)
+
+            run = dockerfile.split("COPY ezrunner_runtime/convert.py", 1)[1]
+            run = run.split("\n\n", 1)[0]
+            assert "snapshot_download" in run
+            assert "&& \\\n    python3 /app/convert.py ${MODEL_PATH}" in run
+            assert "save_pretrained" not in dockerfile
+            assert 'LABEL ezrunner.weights.converted-from="pytorch"' in dockerfile
+            assert 'LABEL ezrunner.model.revision="abc123"' in dockerfile
+
+    def test_revision_pinned(self) -> None:
+        """Test Hub commits pin the download; other revisions only key the cache."""
+        model = ModelInfo(
+            model_id="qwen/Qwen-7B",
+            size_gb=14.2,
+            format="safetensors",
+            repo_type="huggingface",
+            architecture="qwen2",
+            revision="abc123",
+        )
+        generator = DockerfileGenerator()
+
+        for engine in (Engine.TRANSFORMERS, Engine.VLLM):
+            dockerfile = generator.generate(model, engine)
+
+            assert "ARG MODEL_REVISION=abc123" in dockerfile
+            assert (
+                "AutoModelForCausalLM.from_pretrained('${MODEL_ID}', "
+                "revision='${MODEL_REVISION}')" in dockerfile
+            )
+
+        for other in (
+            replace(model, revision="files:0f1e"),
+            replace(model, repo_type="modelscope", revision="v1.0.2"),
+        ):
+            dockerfile = generator.generate(other, Engine.TRANSFORMERS)
+
+            assert f"ARG MODEL_REVISION={other.revision}" in dockerfile
+            assert "revision='" not in dockerfile
+
+    def test_safetensors_not_converted(self) -> None:
+        """Test safetensors models keep the plain download."""
+        model = ModelInfo(
+            model_id="qwen/Qwen-7B",
+            size_gb=14.2,
+            format="safetensors",
+            repo_type="huggingface",
+            architecture="qwen2",
+        )
+
+        dockerfile = DockerfileGenerator().generate(model, Engine.TRANSFORMERS)
+
+        assert "convert.py" not in dockerfile
+        assert "converted-from" not in dockerfile
+        assert 'LABEL ezrunner.weights.format="safetensors"' in dockerfile
+        assert 'LABEL ezrunner.engine="transformers"' in dockerfile
+        assert 'LABEL ezrunner.model.size-gb="14.2"' in dockerfile
+
+    def test_multi_model_image(self) -> None:
+        """Test further models are downloaded and listed for the server."""
+        model, small, legacy = (
+            ModelInfo(
+                model_id=model_id,
+                size_gb=3.1,
+                format=weights,
+                repo_type="huggingface",
+                architecture="qwen2",
+            ).with_safetensors()
+            for model_id, weights in (
+                ("qwen/Qwen2-1.5B", "safetensors"),
+                ("meta-llama/Llama-3.2-1B", "safetensors"),
+                ("gpt2/GPT2", "pytorch"),
+            )
+        )
+        generator = DockerfileGenerator()
+
+        dockerfile = generator.generate(
+            model, Engine.TRANSFORMERS, extra_models=[small, legacy]
+        )
+
+        assert "ENV MODEL_PATH=/models/qwen-qwen2-1.5b" in dockerfile
+        assert "save_pretrained('/models/meta-llama-llama-3.2-1b'" in dockerfile
+        assert "python3 /app/convert.py /models/gpt2-gpt2" in dockerfile
+        assert dockerfile.count("COPY ezrunner_runtime/convert.py") == 1
+        assert (
+            "ENV EZRUNNER_MODELS=qwen/Qwen2-1.5B=/models/qwen-qwen2-1.5b,"
+            "meta-llama/Llama-3.2-1B=/models/meta-llama-llama-3.2-1b,"
+            "gpt2/GPT2=/models/gpt2-gpt2"
+        ) in dockerfile
+        assert (
+            'LABEL ezrunner.models="qwen/Qwen2-1.5B,meta-llama/Llama-3.2-1B,gpt2/GPT2"'
+            in dockerfile
+        )
+        assert "EZRUNNER_MODELS" not in generator.generate(model, Engine.TRANSFORMERS)
+        with pytest.raises(ValueError, match="one model per image"):
+            generator.generate(model, Engine.VLLM, extra_models=[small])
+
+    def test_base_layers(self) -> None:
+        """Test the base steps are the same for every model of an engine."""
+        generator = DockerfileGenerator()
+        qwen, llama = (
+            ModelInfo(
+                model_id=model_id,
+                size_gb=3.1,
+                format="safetensors",
+                repo_type="huggingface",
+                architecture="qwen2",
+            )
+            for model_id in ("qwen/Qwen2-1.5B", "meta-llama/Llama-3.2-1B")
+        )
+
+        for engine in (Engine.TRANSFORMERS, Engine.VLLM):
+            base = generator.base(generator.generate(qwen, engine))
+            assert base == generator.base(generator.generate(llama, engine))
+            assert base.startswith("# EZ Runner")
+            assert "pip3 install" in base
+            assert "MODEL_ID" not in base
+        with pytest.raises(ValueError, match="no model steps"):
+            generator.base("FROM ubuntu")
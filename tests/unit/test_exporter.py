@@ -1,5 +1,6 @@
 """Tests for TarExporter."""
 
+import io
 from pathlib import Path
 from unittest.mock import Mock, mock_open, patch
 
@@ -57,3 +58,38 @@ class TestTarExporter:
 
         # Verify file size
         assert output_path.stat().st_size == 10 * 1024 * 1024
+
+    def test_export_keeps_tag(self, tmp_path: Path) -> None:
+        """Test the archive is saved with its repository tag."""
+        mock_image = Mock()
+        mock_image.save.return_value = [b"chunk"]
+
+        TarExporter().export(mock_image, tmp_path / "test.tar")
+
+        mock_image.save.assert_called_once_with(named=True)
+
+        TarExporter().export(mock_image, tmp_path / "test.tar", "ezrunner-a:latest")
+
+        mock_image.save.assert_called_with(named="ezrunner-a:latest")
+
+    def test_stream_to_sink(self) -> None:
+        """Test streaming to an open sink reports byte counts."""
+        mock_image = Mock()
+        mock_image.save.return_value = [b"a" * 1000, b"b" * 24]
+        sink = io.BytesIO()
+
+        stats = TarExporter().stream(mock_image, sink)
+
+        assert sink.getvalue() == b"a" * 1000 + b"b" * 24
+        assert stats.bytes_written == 1024
+        assert stats.throughput_mb_s > 0
+
+    def test_stream_broken_pipe(self) -> None:
+        """Test a closed reader surfaces as DockerError."""
+        mock_image = Mock()
+        mock_image.save.return_value = [b"chunk"]
+        sink = Mock()
+        sink.write.side_effect = BrokenPipeError("reader went away")
+
+        with pytest.raises(DockerError, match="reader went away"):
+            TarExporter().stream(mock_image, sink)
@@ -0,0 +1,130 @@
+"""Tests for LayoutExporter and ImageLayout."""
+
+import hashlib
+import io
+import json
+import tarfile
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from ezrunner.core.exporter import LayoutExporter
+from ezrunner.core.layout import ImageLayout
+from ezrunner.core.loader import ImageLoader
+from ezrunner.exceptions import ArchiveError
+
+BASE = b"c" * (3 * 1024 * 1024 + 7)
+
+
+def saved_image(archive: Path) -> Mock:
+    """Mock image whose ``save()`` streams an archive in small chunks."""
+    data = archive.read_bytes()
+    image = Mock()
+    image.save.return_value = [data[i : i + 4096] for i in range(0, len(data), 4096)]
+    return image
+
+
+class TestLayoutExporter:
+    """Test LayoutExporter."""
+
+    def test_export_blobs_named_by_digest(
+        self, make_archive: Callable[..., Path], tmp_path: Path
+    ) -> None:
+        """Test every blob is stored under its SHA-256."""
+        archive = make_archive("qwen.tar", [("ezrunner-qwen:latest", [BASE])])
+        output = tmp_path / "layout"
+
+        stats = LayoutExporter().export(saved_image(archive), output)
+
+        assert stats.blobs_written == 3  # layer, config, manifest
+        assert stats.blobs_shared == 0
+        for blob in (output / "blobs" / "sha256").iterdir():
+            assert hashlib.sha256(blob.read_bytes()).hexdigest() == blob.name
+        assert json.loads((output / "oci-layout").read_text()) == {
+            "imageLayoutVersion": "1.0.0"
+        }
+
+    def test_models_share_blobs(
+        self, make_archive: Callable[..., Path], tmp_path: Path
+    ) -> None:
+        """Test a second model in the same directory reuses common layers."""
+        qwen = make_archive("qwen.tar", [("ezrunner-qwen:latest", [BASE, b"q"])])
+        llama = make_archive("llama.tar", [("ezrunner-llama:latest", [BASE, b"l"])])
+        output = tmp_path / "layout"
+
+        LayoutExporter().export(saved_image(qwen), output)
+        stats = LayoutExporter().export(saved_image(llama), output)
+
+        assert stats.blobs_shared == 1
+        assert stats.bytes_written < len(BASE)
+        tags = {
+            tag
+            for image in ImageLayout(output).read_images()
+            for tag in image.repo_tags
+        }
+        assert tags == {"ezrunner-qwen:latest", "ezrunner-llama:latest"}
+
+    def test_reexport_replaces_tag(
+        self, make_archive: Callable[..., Path], tmp_path: Path
+    ) -> None:
+        """Test exporting the same tag again does not duplicate index entries."""
+        archive = make_archive("qwen.tar", [("ezrunner-qwen:latest", [BASE])])
+        output = tmp_path / "layout"
+
+        LayoutExporter().export(saved_image(archive), output)
+        stats = LayoutExporter().export(saved_image(archive), output)
+
+        assert stats.blobs_written == 0
+        assert len(ImageLayout(output).read_images()) == 1
+
+
+class TestImageLayout:
+    """Test loading from an image layout."""
+
+    def test_iter_archive_round_trip(
+        self, make_archive: Callable[..., Path], tmp_path: Path
+    ) -> None:
+        """Test the streamed archive is a valid docker load input."""
+        archive = make_archive("qwen.tar", [("ezrunner-qwen:latest", [BASE])])
+        output = tmp_path / "layout"
+        LayoutExporter().export(saved_image(archive), output)
+
+        layout = ImageLayout(output)
+        images = layout.read_images()
+        stream = b"".join(layout.iter_archive(images))
+
+        with tarfile.open(fileobj=io.BytesIO(stream)) as tar:
+            manifest_file = tar.extractfile("manifest.json")
+            assert manifest_file is not None
+            manifest = json.load(manifest_file)
+            layer = tar.extractfile(manifest[0]["Layers"][0])
+            assert layer is not None
+            assert layer.read() == BASE
+        assert manifest[0]["RepoTags"] == ["ezrunner-qwen:latest"]
+
+    def test_not_a_layout(self, tmp_path: Path) -> None:
+        """Test reading a plain directory."""
+        with pytest.raises(ArchiveError, match="Not an OCI image layout"):
+            ImageLayout(tmp_path).read_images()
+
+    def test_loader_streams_layout(
+        self, make_archive: Callable[..., Path], tmp_path: Path
+    ) -> None:
+        """Test ImageLoader accepts a layout directory."""
+        qwen = make_archive("qwen.tar", [("ezrunner-qwen:latest", [b"q"])])
+        llama = make_archive("llama.tar", [("ezrunner-llama:latest", [b"l"])])
+        output = tmp_path / "layout"
+        LayoutExporter().export(saved_image(qwen), output)
+        LayoutExporter().export(saved_image(llama), output)
+
+        client = Mock()
+        client.images.load.side_effect = lambda data: [b"".join(data)]
+        loaded = ImageLoader(client).load(output, model="ezrunner-llama")
+
+        with tarfile.open(fileobj=io.BytesIO(loaded[0])) as tar:
+            manifest_file = tar.extractfile("manifest.json")
+            assert manifest_file is not None
+            manifest = json.load(manifest_file)
+        assert [entry["RepoTags"] for entry in manifest] == [["ezrunner-llama:latest"]]
@@ -0,0 +1,95 @@
+"""Tests for ImageLoader."""
+
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import Mock
+
+import docker
+import pytest
+
+from ezrunner.core.archive import read_manifest
+from ezrunner.core.loader import ImageLoader
+from ezrunner.exceptions import ArchiveError
+
+
+class TestImageLoader:
+    """Test ImageLoader."""
+
+    def test_load_streams_file(self, tmp_path: Path) -> None:
+        """Test archives are passed to the daemon as a file, not bytes."""
+        archive = tmp_path / "model.tar"
+        archive.write_bytes(b"tar content")
+        client = Mock()
+        client.images.load.return_value = [Mock()]
+
+        ImageLoader(client).load(archive)
+
+        (data,), _ = client.images.load.call_args
+        assert not isinstance(data, bytes)
+
+    def test_load_unknown_model(self, make_archive: Callable[..., Path]) -> None:
+        """Test asking a bundle for an image it does not hold."""
+        archive = make_archive("qwen.tar", [("ezrunner-qwen:latest", [b"q"])])
+
+        with pytest.raises(ArchiveError):
+            ImageLoader(Mock()).load(archive, model="llama")
+
+
+class TestFindLoaded:
+    """Test the already-loaded fast path."""
+
+    def test_image_present(self, make_archive: Callable[..., Path]) -> None:
+        """Test a loaded image is found by its config digest."""
+        archive = make_archive("qwen.tar", [("ezrunner-qwen:latest", [b"q"])])
+        image_id = read_manifest(archive)[0].image_id
+        local = Mock(tags=["ezrunner-qwen:latest"])
+        client = Mock()
+        client.images.get.return_value = local
+
+        images = ImageLoader(client).find_loaded(archive)
+
+        assert images == [local]
+        client.images.get.assert_called_once_with(image_id)
+        client.images.load.assert_not_called()
+        local.tag.assert_not_called()
+
+    def test_image_missing(self, make_archive: Callable[..., Path]) -> None:
+        """Test a missing image means the archive must be loaded."""
+        archive = make_archive("qwen.tar", [("ezrunner-qwen:latest", [b"q"])])
+        client = Mock()
+        client.images.get.side_effect = docker.errors.ImageNotFound("missing")
+
+        assert ImageLoader(client).find_loaded(archive) is None
+
+    def test_retag(self, make_archive: Callable[..., Path]) -> None:
+        """Test a present but untagged image gets its tag back."""
+        archive = make_archive("qwen.tar", [("ezrunner-qwen:latest", [b"q"])])
+        local = Mock(tags=[])
+        client = Mock()
+        client.images.get.return_value = local
+
+        ImageLoader(client).find_loaded(archive)
+
+        local.tag.assert_called_once_with("ezrunner-qwen", "latest")
+        local.reload.assert_called_once()
+
+    def test_bundle_model(self, make_archive: Callable[..., Path]) -> None:
+        """Test only the requested image of a bundle is checked."""
+        archive = make_archive(
+            "bundle.tar",
+            [("ezrunner-qwen:latest", [b"q"]), ("ezrunner-llama:latest", [b"l"])],
+        )
+        llama_id = read_manifest(archive)[1].image_id
+        client = Mock()
+        client.images.get.return_value = Mock(tags=["ezrunner-llama:latest"])
+
+        ImageLoader(client).find_loaded(archive, model="ezrunner-llama")
+
+        client.images.get.assert_called_once_with(llama_id)
+
+    def test_unreadable_archive(self, tmp_path: Path) -> None:
+        """Test archives that cannot be inspected fall back to loading."""
+        archive = tmp_path / "model.tar"
+        archive.write_bytes(b"not a tar")
+
+        assert ImageLoader(Mock()).find_loaded(archive) is None
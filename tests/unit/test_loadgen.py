@@ -0,0 +1,142 @@
+"""Tests for the load generator."""
+
+import random
+from collections.abc import Callable
+
+import pytest
+
+from ezrunner.core.loadgen import (
+    LengthDistribution,
+    LoadGenerator,
+    LoadStats,
+    RequestResult,
+    served_model,
+)
+
+
+class TestLengthDistribution:
+    """Test LengthDistribution."""
+
+    @pytest.mark.parametrize(
+        ("spec", "expected"),
+        [
+            ("256", LengthDistribution("fixed", 256)),
+            ("128-512", LengthDistribution("uniform", 128, 512)),
+            ("normal:256,64", LengthDistribution("normal", 256, 64)),
+        ],
+    )
+    def test_parse(self, spec: str, expected: LengthDistribution) -> None:
+        """Test the accepted forms round-trip."""
+        assert LengthDistribution.parse(spec) == expected
+        assert str(expected) == spec
+
+    @pytest.mark.parametrize("spec", ["", "abc", "512-128", "normal:1"])
+    def test_parse_invalid(self, spec: str) -> None:
+        """Test unrecognized forms are rejected."""
+        with pytest.raises(ValueError, match="Invalid length distribution"):
+            LengthDistribution.parse(spec)
+
+    def test_sample(self) -> None:
+        """Test samples stay within bounds and are at least 1."""
+        rng = random.Random(0)
+        uniform = [
+            LengthDistribution("uniform", 10, 20).sample(rng) for _ in range(100)
+        ]
+        normal = [LengthDistribution("normal", 1, 50).sample(rng) for _ in range(100)]
+
+        assert min(uniform) >= 10 and max(uniform) <= 20
+        assert min(normal) >= 1
+
+
+class TestLoadGenerator:
+    """Test LoadGenerator against stub servers."""
+
+    def test_streaming_timings(self, chat_server: Callable[..., str]) -> None:
+        """Test TTFT and inter-token gaps are measured from the stream."""
+        url = chat_server(tokens=5, first_token_s=0.05, token_s=0.01)
+
+        stats = LoadGenerator(url, stream=True).run(concurrency=2, requests_total=2)
+        result = stats.results[0]
+
+        assert stats.errors == 0
+        assert result.completion_tokens == 5
+        assert result.ttft_s is not None and result.ttft_s >= 0.05
+        assert len(result.inter_token_s) == 4
+        assert all(gap >= 0.009 for gap in result.inter_token_s)
+        assert result.tpot_s is not None and result.tpot_s >= 0.009
+        assert result.latency_s >= result.ttft_s
+
+    def test_stream_usage_preferred(self, chat_server: Callable[..., str]) -> None:
+        """Test token counts reported in the stream replace chunk counts."""
+        url = chat_server(tokens=3, usage_in_stream=True)
+
+        result = LoadGenerator(url, stream=True).send(0, 8, 16)
+
+        assert result.completion_tokens == 3
+        assert result.prompt_tokens == 10
+
+    def test_stream_error(self, chat_server: Callable[..., str]) -> None:
+        """Test an error event fails the request."""
+        url = chat_server(error="CUDA out of memory")
+
+        result = LoadGenerator(url, stream=True).send(0, 8, 16)
+
+        assert result.error == "CUDA out of memory"
+
+    def test_open_loop_counts_queueing(self, chat_server: Callable[..., str]) -> None:
+        """Test open-loop latency includes waiting for a free worker."""
+        url = chat_server(tokens=1, first_token_s=0.02)
+
+        stats = LoadGenerator(url).run_rate(
+            rate=1000, requests_total=5, max_in_flight=1
+        )
+
+        assert stats.errors == 0
+        # Five requests due at once, served one at a time
+        assert stats.latency(1.0) >= 4 * 0.02
+
+    def test_workload_is_seeded(self) -> None:
+        """Test the same seed produces the same request lengths."""
+        lengths = LengthDistribution("uniform", 1, 1000)
+
+        def workload(seed: int) -> list[tuple[int, int]]:
+            generator = LoadGenerator(
+                "http://unused", prompt_tokens=lengths, max_tokens=lengths, seed=seed
+            )
+            return generator.workload(20)
+
+        assert workload(0) == workload(0)
+        assert workload(0) != workload(1)
+
+    def test_served_model(self, chat_server: Callable[..., str]) -> None:
+        """Test the model name is read from /v1/models."""
+        assert served_model(chat_server()) == "stub/model"
+        assert served_model("http://127.0.0.1:9", timeout=1) is None
+
+
+class TestLoadStats:
+    """Test LoadStats."""
+
+    def test_summary(self) -> None:
+        """Test throughput and latency distributions skip failed requests."""
+        stats = LoadStats(
+            (
+                RequestResult(1.0, 10, prompt_tokens=5, ttft_s=0.1),
+                RequestResult(2.0, 20, prompt_tokens=5, ttft_s=0.2),
+                RequestResult(30.0, error="timeout"),
+            ),
+            seconds=2.0,
+        )
+
+        summary = stats.summary()
+
+        assert summary["requests"] == 3
+        assert summary["errors"] == 1
+        assert summary["request_throughput"] == 1.0
+        assert summary["output_throughput_tok_s"] == 15.0
+        assert summary["total_throughput_tok_s"] == 20.0
+        assert summary["latency_s"]["p99"] == 2.0
+        assert summary["ttft_s"]["mean"] == 0.15
+        assert summary["tpot_s"]["p50"] == pytest.approx(1.8 / 19, abs=1e-5)
+        # Not streamed with gaps
+        assert summary["itl_s"] is None
@@ -0,0 +1,68 @@
+"""Tests for the runtime Prometheus metrics."""
+
+import pytest
+
+from ezrunner.runtime.metrics import Registry
+
+
+class TestRegistry:
+    """Test metric rendering."""
+
+    def test_counter_with_labels(self) -> None:
+        """Test labelled counters render one sample per label set."""
+        registry = Registry()
+        counter = registry.counter(
+            "requests_total", "Requests", labelnames=("finish_reason",)
+        )
+        counter.inc(finish_reason="stop")
+        counter.inc(2, finish_reason="length")
+
+        assert registry.render() == (
+            "# HELP requests_total Requests\n"
+            "# TYPE requests_total counter\n"
+            'requests_total{finish_reason="stop"} 1\n'
+            'requests_total{finish_reason="length"} 2\n'
+        )
+        assert counter.value(finish_reason="length") == 2
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        """Test histogram buckets count observations at or below each bound."""
+        registry = Registry()
+        histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+
+        lines = registry.render().splitlines()[2:]
+
+        assert lines == [
+            'latency_seconds_bucket{le="0.1"} 2',
+            'latency_seconds_bucket{le="1"} 3',
+            'latency_seconds_bucket{le="+Inf"} 4',
+            "latency_seconds_sum 3.65",
+            "latency_seconds_count 4",
+        ]
+
+    def test_callback_gauge(self) -> None:
+        """Test gauges read their callback and skip None."""
+        registry = Registry()
+        values = [3, None]
+        registry.gauge("depth", "Depth", function=lambda: values[0])
+
+        assert "depth 3\n" in registry.render()
+        values[0] = None
+        assert registry.render() == "# HELP depth Depth\n# TYPE depth gauge\n"
+
+    def test_label_escaping(self) -> None:
+        """Test label values are escaped."""
+        registry = Registry()
+        registry.counter("c_total", "C", labelnames=("v",)).inc(v='a"b\\')
+
+        assert 'c_total{v="a\\"b\\\\"} 1' in registry.render()
+
+    def test_duplicate_name(self) -> None:
+        """Test registering the same name twice fails."""
+        registry = Registry()
+        registry.gauge("depth", "Depth")
+
+        with pytest.raises(ValueError, match="Duplicate metric"):
+            registry.gauge("depth", "Depth")
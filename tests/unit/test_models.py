@@ -71,6 +71,34 @@ class TestModelInfo:
         with pytest.raises(AttributeError):
             model.size_gb = 20.0  # type: ignore
 
+    def test_with_safetensors(self) -> None:
+        """Test pickle checkpoints are recorded as converted."""
+        model = ModelInfo(
+            model_id="qwen/Qwen-7B",
+            size_gb=14.2,
+            format="pytorch",
+            repo_type="modelscope",
+            architecture="qwen2",
+        )
+
+        packed = model.with_safetensors()
+
+        assert packed.format == "safetensors"
+        assert packed.converted_from == "pytorch"
+        assert packed.with_safetensors() is packed
+
+    def test_invalid_converted_from(self) -> None:
+        """Test unknown source formats are rejected."""
+        with pytest.raises(ValueError, match="Unsupported source format"):
+            ModelInfo(
+                model_id="qwen/Qwen-7B",
+                size_gb=14.2,
+                format="safetensors",
+                repo_type="modelscope",
+                architecture="qwen2",
+                converted_from="gguf",
+            )
+
 
 class TestHardware:
     """Test Hardware dataclass."""
@@ -0,0 +1,204 @@
+"""Tests for GPU placement."""
+
+import subprocess
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from ezrunner.core.placement import (
+    GPUDevice,
+    GPURequest,
+    Placement,
+    PlacementStore,
+    container_options,
+    gpu_request,
+    load_profile,
+    plan,
+    probe_gpus,
+    save_profile,
+)
+from ezrunner.exceptions import PlacementError
+
+TOPOLOGY = """\
+\x1b[4mGPU0\tGPU1\tGPU2\tGPU3\tCPU Affinity\tNUMA Affinity\x1b[0m
+GPU0\t X \tNV12\tSYS\tSYS\t0-31\t0
+GPU1\tNV12\t X \tSYS\tSYS\t0-31\t0
+GPU2\tSYS\tSYS\t X \tNV12\t32-63\t1
+GPU3\tSYS\tSYS\tNV12\t X \t32-63\t1
+"""
+
+
+def node(memory_gb: float = 80.0) -> list[GPUDevice]:
+    """Two NVLink pairs, one per NUMA node."""
+    return [
+        GPUDevice(0, "GPU-a", "H100", memory_gb, 0, "0-31", (1,)),
+        GPUDevice(1, "GPU-b", "H100", memory_gb, 0, "0-31", (0,)),
+        GPUDevice(2, "GPU-c", "H100", memory_gb, 1, "32-63", (3,)),
+        GPUDevice(3, "GPU-d", "H100", memory_gb, 1, "32-63", (2,)),
+    ]
+
+
+class TestPlan:
+    """Test plan."""
+
+    def test_best_fit_sharing(self) -> None:
+        """Test small models share a GPU, leaving whole GPUs for large ones."""
+        requests = [
+            GPURequest("small-a", 1, 20.0),
+            GPURequest("small-b", 1, 20.0),
+            GPURequest("large", 1, 70.0),
+        ]
+
+        placements = plan(requests, node())
+
+        assert placements["large"].devices == (0,)
+        assert placements["small-a"].devices == placements["small-b"].devices == (1,)
+
+    def test_exclusive(self) -> None:
+        """Test exclusive containers never share a device."""
+        requests = [GPURequest(f"vllm-{i}", 1, 0.0, exclusive=True) for i in range(4)]
+        used = [Placement("small", (0,), ("GPU-a",), 10.0)]
+
+        with pytest.raises(PlacementError, match="GPU0 70.0 GB free, GPU1 in use"):
+            plan(requests, node(), used)
+
+        placements = plan(requests[:3], node(), used)
+        assert sorted(p.devices[0] for p in placements.values()) == [1, 2, 3]
+
+    def test_multi_gpu_locality(self) -> None:
+        """Test multi-GPU containers get an NVLink pair on one NUMA node."""
+        used = [Placement("other", (1,), ("GPU-b",), 50.0)]
+
+        (placement,) = plan([GPURequest("tp2", 2, 40.0)], node(), used).values()
+
+        assert placement.devices == (2, 3)
+        assert placement.uuids == ("GPU-c", "GPU-d")
+
+    def test_previous_placement_kept(self) -> None:
+        """Test a restarted container gets its GPUs back while they fit."""
+        request = [GPURequest("m", 1, 20.0)]
+        previous = {"m": Placement("m", (3,), ("GPU-d",), 20.0)}
+
+        assert plan(request, node(), [], previous)["m"].devices == (3,)
+
+        used = [Placement("other", (3,), ("GPU-d",), 0.0, exclusive=True)]
+        assert plan(request, node(), used, previous)["m"].devices == (0,)
+
+        # The same index now names a different GPU
+        swapped = [*node()[:3], GPUDevice(3, "GPU-new", "H100", 80.0)]
+        assert plan(request, swapped, [], previous)["m"].devices == (0,)
+
+    def test_replicas_avoid_siblings(self) -> None:
+        """Test a replica does not share a device with its siblings."""
+        request = GPURequest("m@8082", 1, 10.0, avoid=frozenset({0, 1, 2}))
+
+        assert plan([request], node())["m@8082"].devices == (3,)
+        with pytest.raises(PlacementError, match="GPU2 has another replica"):
+            plan([request], node()[:3])
+
+    def test_not_enough_gpus(self) -> None:
+        """Test a request for more GPUs than the node has."""
+        with pytest.raises(PlacementError, match="needs 8 GPUs, the node has 4"):
+            plan([GPURequest("big", 8, 10.0)], node())
+
+
+def test_gpu_request() -> None:
+    """Test requests derive from the image labels."""
+    labels = {"ezrunner.engine": "transformers", "ezrunner.model.size-gb": "14"}
+
+    assert gpu_request("k", labels, 2) == GPURequest("k", 2, 10.4)
+    assert gpu_request("k", labels, 1, memory_gb=30) == GPURequest("k", 1, 30.0)
+    assert gpu_request("k", {"ezrunner.engine": "vllm"}, 1).exclusive
+    assert gpu_request("k", {**labels, "ezrunner.models": "a,b"}, 1).exclusive
+    assert gpu_request("k", {}, 1) == GPURequest("k", 1, 0.0, exclusive=True)
+
+
+def test_probe_gpus(tmp_path: Path) -> None:
+    """Test devices, NVLink peers and NUMA nodes are probed."""
+    pci = tmp_path / "bus/pci/devices"
+    (pci / "0000:3b:00.0").mkdir(parents=True)
+    (pci / "0000:3b:00.0/numa_node").write_text("1\n")
+    (tmp_path / "devices/system/node/node1").mkdir(parents=True)
+    (tmp_path / "devices/system/node/node1/cpulist").write_text("32-63\n")
+
+    def run(command: list[str], **kwargs: Any) -> subprocess.CompletedProcess[str]:
+        if command[1] == "topo":
+            return subprocess.CompletedProcess(command, 0, TOPOLOGY)
+        return subprocess.CompletedProcess(
+            command,
+            0,
+            "0, GPU-a, NVIDIA H100, 81559, 00000000:1A:00.0\n"
+            "2, GPU-c, NVIDIA H100, 81559, 00000000:3B:00.0\n",
+        )
+
+    devices = probe_gpus(run, sysfs=tmp_path)
+
+    assert devices == [
+        GPUDevice(0, "GPU-a", "NVIDIA H100", 85.5, None, None, (1,)),
+        GPUDevice(2, "GPU-c", "NVIDIA H100", 85.5, 1, "32-63", (3,)),
+    ]
+
+
+def test_probe_without_nvidia_smi() -> None:
+    """Test nodes without NVIDIA GPUs have no devices."""
+
+    def run(command: list[str], **kwargs: Any) -> subprocess.CompletedProcess[str]:
+        raise FileNotFoundError(command[0])
+
+    assert probe_gpus(run) == []
+
+
+def test_profile_roundtrip(tmp_path: Path) -> None:
+    """Test a saved profile loads back, and invalid ones are rejected."""
+    path = tmp_path / "gpus.json"
+    save_profile(path, node())
+
+    assert load_profile(path) == node()
+
+    path.write_text('{"gpus": [{"index": 0}]}')
+    with pytest.raises(PlacementError, match="Invalid GPU profile"):
+        load_profile(path)
+
+
+def test_container_options() -> None:
+    """Test devices, shared memory, ulimits and NUMA pinning."""
+    placement = Placement("m", (2, 3), ("GPU-c", "GPU-d"), 40.0)
+
+    options = container_options(placement, node())
+
+    (request,) = options["device_requests"]
+    assert request["DeviceIDs"] == ["GPU-c", "GPU-d"]
+    assert request["Capabilities"] == [["gpu"]]
+    assert options["shm_size"] == "16g"
+    assert {u["Name"]: u["Hard"] for u in options["ulimits"]} == {
+        "memlock": -1,
+        "stack": 67108864,
+    }
+    assert (options["cpuset_cpus"], options["cpuset_mems"]) == ("32-63", "1")
+
+    spread = container_options(Placement("m", (1, 2), ("GPU-b", "GPU-c"), 40.0), node())
+    assert "cpuset_cpus" not in spread
+    assert container_options(None, [], "4g")["shm_size"] == "4g"
+
+
+def test_store(tmp_path: Path) -> None:
+    """Test only placements of running containers take up room."""
+    store = PlacementStore(tmp_path / "placements.json")
+    exclusive = GPURequest("vllm@8080", 1, 0.0, exclusive=True)
+
+    with store.lock():
+        first = store.place(exclusive, node(), running=lambda container: True)
+        store.record(first, "c1")
+
+    second = store.place(
+        GPURequest("vllm@8081", 1, 0.0, exclusive=True), node(), lambda c: True
+    )
+    assert second.devices != first.devices
+    assert store.place(exclusive, node(), lambda c: False).devices == first.devices
+
+    freed = store.place(
+        GPURequest("vllm@8081", 1, 0.0, exclusive=True), node(), lambda c: False
+    )
+    assert store.load()["vllm@8080"].container == "c1"
+    assert freed.devices == (0,)
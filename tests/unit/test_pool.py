@@ -0,0 +1,164 @@
+"""Tests for the runtime model pool."""
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from ezrunner.runtime.pool import ModelPool
+from ezrunner.runtime.scheduler import GenerationRequest, Sequence
+
+
+class SizedBackend:
+    """Backend of a given size that answers with its name."""
+
+    park_seconds = 0.0
+
+    def __init__(self, name: str, memory_bytes: int, log: list[str]) -> None:
+        self.name = name
+        self.memory_bytes = memory_bytes
+        self.log = log
+        self.parking = False
+
+    def prefill(self, sequences: list[Sequence]) -> None:
+        for sequence in sequences:
+            sequence.emit(self.name)
+            sequence.finish_reason = "stop"
+
+    def decode(self, sequences: list[Sequence]) -> None:
+        pass
+
+    def park(self) -> None:
+        self.parking = True
+        time.sleep(self.park_seconds)
+        self.log.append(f"park {self.name}")
+
+    def resume(self) -> None:
+        self.log.append(f"resume {self.name}")
+
+    def unload(self) -> None:
+        self.log.append(f"unload {self.name}")
+
+
+def make_pool(sizes: dict[str, int], log: list[str], **kwargs: Any) -> ModelPool:
+    """Pool of sized backends with a 100-byte budget."""
+
+    def loader(name: str, size: int) -> Any:
+        def load() -> SizedBackend:
+            if name == "broken":
+                raise OSError("No model weights")
+            log.append(f"load {name}")
+            return SizedBackend(name, size, log)
+
+        return load
+
+    return ModelPool(
+        {name: (loader(name, size), size) for name, size in sizes.items()},
+        budget=lambda: 100,
+        **kwargs,
+    )
+
+
+async def use(pool: ModelPool, *names: str) -> list[str]:
+    """Run one request on each model in turn, returning the answers."""
+    answers = []
+    for name in names:
+        model = await pool.acquire(name)
+        try:
+            assert model.scheduler is not None
+            sequence = await model.scheduler.submit(GenerationRequest("hi"))
+            answers.append(sequence.text)
+        finally:
+            pool.release(model)
+    await pool.stop()
+    return answers
+
+
+class TestModelPool:
+    """Test ModelPool."""
+
+    def test_lazy_load_and_lru_eviction(self) -> None:
+        """Test models load on first use and the least recently used is parked."""
+        log: list[str] = []
+        pool = make_pool({"a": 60, "b": 30, "c": 50}, log)
+
+        answers = asyncio.run(use(pool, "a", "b", "a", "c", "b"))
+
+        assert answers == ["a", "b", "a", "c", "b"]
+        # c needs 50 of 100: b (used before a) goes first, then a
+        assert log == [
+            "load a",
+            "load b",
+            "park b",
+            "park a",
+            "load c",
+            "resume b",
+        ]
+        assert {m: s["state"] for m, s in pool.stats()["models"].items()} == {
+            "a": "parked",
+            "b": "loaded",
+            "c": "loaded",
+        }
+        assert pool.swaps == {"load": 3, "resume": 1, "park": 2, "unload": 0}
+
+    def test_busy_model_not_evicted(self) -> None:
+        """Test a model with requests in flight stays until they finish."""
+        log: list[str] = []
+        pool = make_pool({"a": 60, "b": 60}, log)
+
+        async def scenario() -> None:
+            a = await pool.acquire("a")
+            waiting = asyncio.create_task(pool.acquire("b"))
+            await asyncio.sleep(0.05)
+            assert not waiting.done()
+            pool.release(a)
+            pool.release(await asyncio.wait_for(waiting, 5))
+            await pool.stop()
+
+        asyncio.run(scenario())
+
+        assert log == ["load a", "park a", "load b"]
+
+    def test_no_request_while_parking(self) -> None:
+        """Test a model being parked is resumed before it serves a request."""
+        log: list[str] = []
+        pool = make_pool({"a": 60, "b": 60}, log)
+
+        async def scenario() -> str:
+            a = await pool.acquire("a")
+            pool.release(a)
+            a.backend.park_seconds = 0.05
+            loading_b = asyncio.create_task(pool.acquire("b"))
+            while not a.backend.parking:
+                await asyncio.sleep(0.001)
+            # a is on its way to CPU memory: wait for it, not serve on it
+            loading_a = asyncio.create_task(pool.acquire("a"))
+            pool.release(await loading_b)
+            await loading_a
+            state = a.state
+            pool.release(a)
+            await pool.stop()
+            return state
+
+        assert asyncio.run(scenario()) == "loaded"
+        assert log == ["load a", "park a", "load b", "park b", "resume a"]
+
+    def test_unload_without_parking(self) -> None:
+        """Test evicted models are unloaded, and reloaded, without parking."""
+        log: list[str] = []
+        pool = make_pool({"a": 60, "b": 60}, log, park=False)
+
+        asyncio.run(use(pool, "a", "b", "a"))
+
+        assert log == ["load a", "unload a", "load b", "unload b", "load a"]
+
+    def test_load_failure(self) -> None:
+        """Test a model that fails to load is reported and stays unloaded."""
+        pool = make_pool({"a": 10, "broken": 10}, [])
+
+        with pytest.raises(RuntimeError, match="Could not load broken: No model"):
+            asyncio.run(use(pool, "broken"))
+        assert pool.models["broken"].state == "unloaded"
+        with pytest.raises(KeyError):
+            asyncio.run(use(pool, "missing"))
@@ -0,0 +1,69 @@
+"""Tests for the runtime prompt prefix cache."""
+
+from ezrunner.runtime.prefix_cache import PrefixCache
+
+
+class TestPrefixCache:
+    """Test PrefixCache."""
+
+    def test_longest_prefix_match(self) -> None:
+        """Test the longest block-aligned shared prefix is found."""
+        cache = PrefixCache(max_bytes=1000, block_size=4)
+        cache.put(list(range(8)), "kv-8", nbytes=10)
+        cache.put(list(range(4)), "kv-4", nbytes=10)
+
+        length, value = cache.match(list(range(10)) + [99])
+
+        assert (length, value) == (8, "kv-8")
+        assert cache.stats()["hit_tokens"] == 8
+
+    def test_leaves_one_token_to_prefill(self) -> None:
+        """Test a fully cached prompt still has a token left to run."""
+        cache = PrefixCache(max_bytes=1000, block_size=4)
+        cache.put(list(range(8)), "kv-8", nbytes=10)
+
+        length, value = cache.match(list(range(8)))
+
+        assert (length, value) == (4, "kv-8")
+
+    def test_miss(self) -> None:
+        """Test prompts diverging inside the first block miss."""
+        cache = PrefixCache(max_bytes=1000, block_size=4)
+        cache.put([1, 2, 3, 4], "kv", nbytes=10)
+
+        assert cache.match([1, 2, 9, 4, 5]) == (0, None)
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["hits"] == 0
+
+    def test_lru_eviction_by_bytes(self) -> None:
+        """Test the least recently used entry is evicted to stay in budget."""
+        cache = PrefixCache(max_bytes=25, block_size=2)
+        cache.put([1, 1], "a", nbytes=10)
+        cache.put([2, 2], "b", nbytes=10)
+        cache.match([1, 1, 0])  # touch "a"
+        cache.put([3, 3], "c", nbytes=10)
+
+        assert cache.match([2, 2, 0]) == (0, None)
+        assert cache.match([1, 1, 0]) == (2, "a")
+        assert cache.match([3, 3, 0]) == (2, "c")
+        assert cache.stats()["bytes"] == 20
+        assert len(cache) == 2
+
+    def test_shorter_prefix_survives_eviction(self) -> None:
+        """Test evicting a longer prefix keeps the shorter ones it extended."""
+        cache = PrefixCache(max_bytes=25, block_size=2)
+        cache.put([1, 1], "short", nbytes=10)
+        cache.put([1, 1, 2, 2], "long", nbytes=10)
+        cache.put([1, 1], "short", nbytes=10)  # touch "short"
+        cache.put([3, 3], "other", nbytes=10)  # evicts "long"
+
+        assert cache.match([1, 1, 2, 2, 0]) == (2, "short")
+        assert cache.stats()["bytes"] == 20
+        assert len(cache) == 2
+
+    def test_oversized_value_not_cached(self) -> None:
+        """Test a value larger than the whole budget is skipped."""
+        cache = PrefixCache(max_bytes=5, block_size=2)
+        cache.put([1, 1], "a", nbytes=10)
+
+        assert len(cache) == 0
@@ -0,0 +1,71 @@
+"""Tests for the readiness probe."""
+
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from ezrunner.core.readiness import ReadinessProbe
+from ezrunner.exceptions import StartupError
+
+
+def responses(*bodies: object) -> Mock:
+    """Session answering successive GETs with the given JSON bodies."""
+    session = Mock()
+    results = []
+    for body in bodies:
+        if isinstance(body, Exception):
+            results.append(body)
+        else:
+            results.append(Mock(json=Mock(return_value=body)))
+    session.get.side_effect = results
+    return session
+
+
+class TestReadinessProbe:
+    """Test ReadinessProbe."""
+
+    def test_wait_until_ready(self) -> None:
+        """Test polling through connection errors and startup phases."""
+        ready = {"status": "ready", "phase": None, "phases": {"load": 3.2}}
+        session = responses(
+            requests.ConnectionError("refused"),
+            {"status": "starting", "phase": "load", "phases": {}},
+            ready,
+        )
+        probe = ReadinessProbe("http://localhost:8080/", interval=0, session=session)
+        seen = []
+
+        status = probe.wait(60, on_status=seen.append)
+
+        assert status == ready
+        assert seen == [None, {"status": "starting", "phase": "load", "phases": {}}]
+        session.get.assert_called_with("http://localhost:8080/ready", timeout=5)
+
+    def test_startup_failed(self) -> None:
+        """Test a failed startup is reported with the server's error."""
+        session = responses({"status": "failed", "error": "CUDA out of memory"})
+        probe = ReadinessProbe("http://localhost:8080", interval=0, session=session)
+
+        with pytest.raises(StartupError, match="CUDA out of memory"):
+            probe.wait(60)
+
+    def test_container_exited(self) -> None:
+        """Test waiting stops when the container is gone."""
+        session = responses(requests.ConnectionError("refused"))
+        probe = ReadinessProbe("http://localhost:8080", interval=0, session=session)
+
+        with pytest.raises(StartupError, match="exited"):
+            probe.wait(60, alive=lambda: False)
+
+    def test_timeout(self) -> None:
+        """Test waiting gives up after the timeout."""
+        session = Mock()
+        session.get.side_effect = requests.ConnectionError("refused")
+        probe = ReadinessProbe("http://localhost:8080", interval=0, session=session)
+
+        with (
+            patch("ezrunner.core.readiness.time.monotonic", side_effect=[0, 5, 11]),
+            pytest.raises(StartupError, match="not ready after 10s"),
+        ):
+            probe.wait(10)
@@ -0,0 +1,129 @@
+"""Tests for the runtime response cache."""
+
+import asyncio
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from ezrunner.runtime.config import ServerConfig
+from ezrunner.runtime.response_cache import ResponseCache, request_key
+
+BODY = {
+    "model": "qwen",
+    "messages": [{"role": "user", "content": "hi"}],
+    "temperature": 0,
+}
+
+
+class TestRequestKey:
+    """Test request normalization."""
+
+    def test_ignores_field_order_and_transport_fields(self) -> None:
+        """Test equivalent requests share a key."""
+        reordered = {"temperature": 0, "messages": BODY["messages"], "model": "qwen"}
+
+        assert request_key(BODY) == request_key(reordered)
+        assert request_key(BODY) == request_key({**BODY, "user": "alice"})
+
+    def test_sampling_params_change_key(self) -> None:
+        """Test parameters that change the output change the key."""
+        assert request_key(BODY) != request_key({**BODY, "max_tokens": 5})
+
+    def test_uncacheable_requests(self) -> None:
+        """Test sampled and streamed requests are not cached."""
+        assert request_key({**BODY, "temperature": 0.7}) is None
+        assert (
+            request_key({k: v for k, v in BODY.items() if k != "temperature"}) is None
+        )
+        assert request_key({**BODY, "stream": True}) is None
+
+
+class TestResponseCache:
+    """Test ResponseCache."""
+
+    def test_concurrent_requests_coalesced(self) -> None:
+        """Test identical in-flight requests share one computation."""
+        cache = ResponseCache(max_entries=10)
+        calls = 0
+
+        async def compute() -> dict[str, Any]:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"text": "hello"}
+
+        async def scenario() -> list[dict[str, Any]]:
+            results = await asyncio.gather(
+                *(cache.get_or_compute("k", compute) for _ in range(5))
+            )
+            results.append(await cache.get_or_compute("k", compute))
+            return list(results)
+
+        results = asyncio.run(scenario())
+
+        assert calls == 1
+        assert results == [{"text": "hello"}] * 6
+        assert cache.stats() == {"hits": 1, "misses": 1, "coalesced": 4, "entries": 1}
+
+    def test_failures_not_cached(self) -> None:
+        """Test an error reaches every waiter and is retried next time."""
+        cache = ResponseCache(max_entries=10)
+
+        async def fail() -> dict[str, Any]:
+            raise RuntimeError("boom")
+
+        async def scenario() -> None:
+            results = await asyncio.gather(
+                cache.get_or_compute("k", fail),
+                cache.get_or_compute("k", fail),
+                return_exceptions=True,
+            )
+            assert all(isinstance(r, RuntimeError) for r in results)
+
+        asyncio.run(scenario())
+
+        assert len(cache) == 0
+
+    def test_lru_eviction(self) -> None:
+        """Test the least recently used response is evicted."""
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", {"v": 1})
+        cache.put("b", {"v": 2})
+        cache.get("a")
+        cache.put("c", {"v": 3})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+
+    def test_ttl_expiry(self) -> None:
+        """Test responses expire after their time to live."""
+        cache = ResponseCache(max_entries=2, ttl_s=60)
+        with patch("ezrunner.runtime.response_cache.time.time", return_value=1000.0):
+            cache.put("a", {"v": 1})
+        with patch("ezrunner.runtime.response_cache.time.time", return_value=1059.0):
+            assert cache.get("a") == {"v": 1}
+        with patch("ezrunner.runtime.response_cache.time.time", return_value=1061.0):
+            assert cache.get("a") is None
+
+    def test_persistence(self, tmp_path: Path) -> None:
+        """Test entries survive reopening the on-disk store."""
+        path = str(tmp_path / "cache" / "responses.db")
+        cache = ResponseCache(max_entries=2, path=path)
+        cache.put("a", {"v": 1})
+        cache.put("b", {"v": 2})
+        cache.put("c", {"v": 3})
+
+        reopened = ResponseCache(max_entries=2, path=path)
+
+        assert reopened.get("a") is None
+        assert reopened.get("c") == {"v": 3}
+        assert len(reopened) == 2
+
+    @pytest.mark.parametrize("size,enabled", [(0, False), (100, True)])
+    def test_from_config(self, size: int, enabled: bool) -> None:
+        """Test the cache is only created when sized."""
+        config = ServerConfig(response_cache_size=size)
+
+        assert (ResponseCache.from_config(config) is not None) == enabled
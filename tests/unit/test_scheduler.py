@@ -0,0 +1,200 @@
+"""Tests for the runtime batching scheduler."""
+
+import asyncio
+import threading
+
+import pytest
+
+from ezrunner.runtime.metrics import Registry
+from ezrunner.runtime.scheduler import BatchScheduler, GenerationRequest, Sequence
+
+
+class StubBackend:
+    """Backend emitting one word per step and recording each batch."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.prefills: list[list[str]] = []
+        self.decodes: list[list[str]] = []
+        self.threads: set[str] = set()
+
+    def prefill(self, sequences: list[Sequence]) -> None:
+        self.prefills.append([s.request.prompt for s in sequences])
+        self._step(sequences)
+
+    def decode(self, sequences: list[Sequence]) -> None:
+        self.decodes.append([s.request.prompt for s in sequences])
+        self._step(sequences)
+
+    def _step(self, sequences: list[Sequence]) -> None:
+        self.threads.add(threading.current_thread().name)
+        if self.fail:
+            raise RuntimeError("CUDA out of memory")
+        for sequence in sequences:
+            sequence.completion_tokens += 1
+            sequence.emit(f"{sequence.request.prompt}{sequence.completion_tokens} ")
+            if sequence.completion_tokens >= sequence.request.max_tokens:
+                sequence.finish_reason = "length"
+
+
+async def generate(
+    scheduler: BatchScheduler, *requests: GenerationRequest
+) -> list[Sequence]:
+    """Run requests concurrently through a started scheduler."""
+    scheduler.start()
+    try:
+        return await asyncio.gather(*(scheduler.submit(r) for r in requests))
+    finally:
+        await scheduler.stop()
+
+
+class TestBatchScheduler:
+    """Test BatchScheduler."""
+
+    def test_concurrent_requests_share_batches(self) -> None:
+        """Test requests arriving together are prefilled and decoded together."""
+        backend = StubBackend()
+        scheduler = BatchScheduler(backend, max_batch_size=8, max_wait_ms=50)
+
+        results = asyncio.run(
+            generate(
+                scheduler,
+                GenerationRequest("a", max_tokens=3),
+                GenerationRequest("b", max_tokens=3),
+                GenerationRequest("c", max_tokens=3),
+            )
+        )
+
+        assert [r.text for r in results] == ["a1 a2 a3 ", "b1 b2 b3 ", "c1 c2 c3 "]
+        assert backend.prefills == [["a", "b", "c"]]
+        assert backend.decodes == [["a", "b", "c"], ["a", "b", "c"]]
+
+    def test_metrics(self) -> None:
+        """Test latencies, batch sizes and tokens are recorded."""
+        registry = Registry()
+        scheduler = BatchScheduler(StubBackend(), max_wait_ms=50, registry=registry)
+
+        asyncio.run(
+            generate(
+                scheduler,
+                GenerationRequest("a", max_tokens=3),
+                GenerationRequest("b", max_tokens=1),
+            )
+        )
+
+        metrics = scheduler.metrics
+        assert metrics.queue.count == 2
+        assert metrics.first_token.count == 2
+        assert metrics.prefill.count == 1
+        assert metrics.decode.count == 2
+        assert metrics.batch_size.sum == 2
+        assert metrics.total.count == 2
+        assert metrics.requests.value(finish_reason="length") == 2
+        assert metrics.completion_tokens.value() == 4
+        assert "ezrunner_queue_depth 0" in registry.render()
+
+    def test_max_batch_size(self) -> None:
+        """Test excess requests wait for a free slot."""
+        backend = StubBackend()
+        scheduler = BatchScheduler(backend, max_batch_size=2, max_wait_ms=50)
+
+        asyncio.run(
+            generate(
+                scheduler,
+                GenerationRequest("a", max_tokens=2),
+                GenerationRequest("b", max_tokens=2),
+                GenerationRequest("c", max_tokens=2),
+            )
+        )
+
+        assert backend.prefills == [["a", "b"], ["c"]]
+        assert max(len(batch) for batch in backend.decodes) == 2
+
+    def test_short_request_joins_running_batch(self) -> None:
+        """Test a request arriving mid-generation is admitted at the next step."""
+        backend = StubBackend()
+        scheduler = BatchScheduler(backend, max_batch_size=4, max_wait_ms=0)
+
+        async def scenario() -> list[str]:
+            scheduler.start()
+            finished: list[str] = []
+
+            async def submit(request: GenerationRequest) -> None:
+                await scheduler.submit(request)
+                finished.append(request.prompt)
+
+            long = asyncio.ensure_future(submit(GenerationRequest("long", 50)))
+            while not backend.decodes:
+                await asyncio.sleep(0)
+            await submit(GenerationRequest("short", 2))
+            await long
+            await scheduler.stop()
+            return finished
+
+        assert asyncio.run(scenario()) == ["short", "long"]
+        assert ["long", "short"] in backend.decodes
+
+    def test_stream_deltas(self) -> None:
+        """Test a streaming request yields each delta as it is generated."""
+        scheduler = BatchScheduler(StubBackend(), max_wait_ms=0)
+
+        async def scenario() -> tuple[list[str], Sequence]:
+            scheduler.start()
+            sequence, future = scheduler.enqueue(
+                GenerationRequest("a", max_tokens=3), stream=True
+            )
+            assert sequence.stream is not None
+            deltas = [delta async for delta in sequence.stream]
+            result = await future
+            await scheduler.stop()
+            return deltas, result
+
+        deltas, result = asyncio.run(scenario())
+
+        assert deltas == ["a1 ", "a2 ", "a3 "]
+        assert result.text == "".join(deltas)
+
+    def test_generation_off_event_loop(self) -> None:
+        """Test backend calls run on the worker thread."""
+        backend = StubBackend()
+        scheduler = BatchScheduler(backend)
+
+        asyncio.run(generate(scheduler, GenerationRequest("a", max_tokens=2)))
+
+        assert backend.threads and all(
+            name.startswith("ezrunner-generate") for name in backend.threads
+        )
+
+    def test_backend_error(self) -> None:
+        """Test backend failures reach the waiting requests."""
+        scheduler = BatchScheduler(StubBackend(fail=True))
+
+        with pytest.raises(RuntimeError, match="out of memory"):
+            asyncio.run(generate(scheduler, GenerationRequest("a")))
+
+    def test_cancelled_request_leaves_batch(self) -> None:
+        """Test a request whose client went away stops being decoded."""
+        backend = StubBackend()
+        scheduler = BatchScheduler(backend, max_wait_ms=0)
+
+        async def scenario() -> None:
+            scheduler.start()
+            task = asyncio.ensure_future(
+                scheduler.submit(GenerationRequest("a", max_tokens=1000))
+            )
+            while len(backend.decodes) < 2:
+                await asyncio.sleep(0)
+            task.cancel()
+            await asyncio.sleep(0.05)
+            steps = len(backend.decodes)
+            await asyncio.sleep(0.05)
+            assert len(backend.decodes) == steps
+            assert scheduler.batch_size == 0
+            await scheduler.stop()
+
+        asyncio.run(scenario())
+
+    def test_invalid_batch_size(self) -> None:
+        """Test the batch size must be positive."""
+        with pytest.raises(ValueError, match="Invalid max batch size"):
+            BatchScheduler(StubBackend(), max_batch_size=0)
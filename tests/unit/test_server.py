@@ -0,0 +1,319 @@
+"""Tests for the runtime inference server."""
+
+import json
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from ezrunner.runtime.config import ServerConfig
+from ezrunner.runtime.scheduler import Sequence
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from ezrunner.runtime.pool import ModelPool  # noqa: E402
+from ezrunner.runtime.server import create_app  # noqa: E402
+
+
+class EchoBackend:
+    """Backend that answers with the prompt, one word per step."""
+
+    def format_prompt(self, messages: list[dict[str, Any]]) -> str:
+        return str(messages[-1]["content"])
+
+    def prefill(self, sequences: list[Sequence]) -> None:
+        for sequence in sequences:
+            sequence.prompt_tokens = len(sequence.request.prompt.split())
+            sequence.state = sequence.request.prompt.split()
+        self.decode(sequences)
+
+    def decode(self, sequences: list[Sequence]) -> None:
+        for sequence in sequences:
+            words = sequence.state
+            sequence.emit(("" if sequence.text == "" else " ") + words.pop(0))
+            sequence.completion_tokens += 1
+            if not words:
+                sequence.finish_reason = "stop"
+
+
+@pytest.fixture
+def client() -> TestClient:
+    """Test client for a server with the echo backend."""
+    config = ServerConfig(model_id="qwen/Qwen-7B")
+    with TestClient(create_app(EchoBackend(), config)) as test_client:
+        yield test_client
+
+
+class TestServer:
+    """Test the OpenAI-compatible endpoints."""
+
+    def test_chat_completion(self, client: TestClient) -> None:
+        """Test a completion goes through the scheduler."""
+        response = client.post(
+            "/v1/chat/completions",
+            json={"model": "m", "messages": [{"role": "user", "content": "hi there"}]},
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["choices"][0]["message"]["content"] == "hi there"
+        assert body["choices"][0]["finish_reason"] == "stop"
+        assert body["usage"] == {
+            "prompt_tokens": 2,
+            "prompt_tokens_details": {"cached_tokens": 0},
+            "completion_tokens": 2,
+            "total_tokens": 4,
+        }
+
+    def test_stream_chat_completion(self, client: TestClient) -> None:
+        """Test ``stream: true`` returns OpenAI-style SSE chunks."""
+        response = client.post(
+            "/v1/chat/completions",
+            json={
+                "messages": [{"role": "user", "content": "one two three"}],
+                "stream": True,
+            },
+        )
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            line.removeprefix("data: ")
+            for line in response.text.splitlines()
+            if line.startswith("data: ")
+        ]
+        assert events[-1] == "[DONE]"
+        chunks = [json.loads(event) for event in events[:-1]]
+        assert {chunk["object"] for chunk in chunks} == {"chat.completion.chunk"}
+        assert chunks[0]["choices"][0]["delta"] == {"role": "assistant"}
+        deltas = [c["choices"][0]["delta"].get("content", "") for c in chunks]
+        assert deltas[1:4] == ["one", " two", " three"]
+        assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+
+    def test_no_messages(self, client: TestClient) -> None:
+        """Test an empty conversation is rejected."""
+        response = client.post("/v1/chat/completions", json={"messages": []})
+
+        assert response.status_code == 400
+
+    def test_stats(self, client: TestClient) -> None:
+        """Test the stats endpoint reports scheduler state."""
+        response = client.get("/stats")
+
+        assert response.json() == {"queue_depth": 0, "batch_size": 0}
+
+    def test_list_models(self, client: TestClient) -> None:
+        """Test the model list reports the packed model."""
+        response = client.get("/v1/models")
+
+        assert response.json()["data"][0]["id"] == "qwen/Qwen-7B"
+
+
+class TestStartup:
+    """Test background loading, warmup and readiness."""
+
+    def test_ready_after_load_and_warmup(self) -> None:
+        """Test /ready turns 200 once the model has loaded and warmed up."""
+        loaded = threading.Event()
+        backend = EchoBackend()
+        prompts: list[str] = []
+        prefill = backend.prefill
+
+        def record(sequences: list[Sequence]) -> None:
+            prompts.extend(s.request.prompt for s in sequences)
+            prefill(sequences)
+
+        backend.prefill = record  # type: ignore[method-assign]
+
+        def load() -> EchoBackend:
+            loaded.wait(5)
+            backend.load_timings = {"import": 1.0, "weights": 2.5}  # type: ignore
+            return backend
+
+        config = ServerConfig(max_batch_size=4, warmup_prompt_tokens="3")
+        with TestClient(create_app(load, config)) as client:
+            assert client.get("/health").json() == {"status": "ok"}
+            starting = client.get("/ready")
+            loaded.set()
+            for _ in range(100):
+                response = client.get("/ready")
+                if response.status_code == 200:
+                    break
+                time.sleep(0.01)
+
+        assert starting.status_code == 503
+        assert starting.json()["phase"] == "load"
+        assert response.status_code == 200
+        assert set(response.json()["phases"]) == {"load", "warmup"}
+        assert response.json()["breakdown"] == {"import": 1.0, "weights": 2.5}
+        assert prompts == ["0 hello hello"] + [f"{i} hello hello" for i in range(4)]
+
+    def test_load_failure(self) -> None:
+        """Test a failed load is reported and fails requests."""
+
+        def load() -> Any:
+            raise OSError("No model weights in /models")
+
+        with TestClient(create_app(load, ServerConfig())) as client:
+            completion = client.post(
+                "/v1/chat/completions",
+                json={"messages": [{"role": "user", "content": "hi"}]},
+            )
+            ready = client.get("/ready")
+
+        assert completion.status_code == 503
+        assert ready.status_code == 503
+        assert ready.json()["status"] == "failed"
+        assert ready.json()["error"] == "No model weights in /models"
+
+
+class TestMetrics:
+    """Test the Prometheus endpoint."""
+
+    def test_metrics(self) -> None:
+        """Test completions show up in the exposed metrics."""
+        config = ServerConfig(response_cache_size=10)
+        with TestClient(create_app(EchoBackend(), config)) as client:
+            client.post(
+                "/v1/chat/completions",
+                json={"messages": [{"role": "user", "content": "a b c"}]},
+            )
+            response = client.get("/metrics")
+
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        lines = response.text.splitlines()
+        assert 'ezrunner_requests_total{finish_reason="stop"} 1' in lines
+        assert "ezrunner_completion_tokens_total 3" in lines
+        assert "ezrunner_request_seconds_count 1" in lines
+        assert 'ezrunner_batch_size_bucket{le="1"} 2' in lines
+        assert "ezrunner_response_cache_hits_total 0" in lines
+
+
+class TestResponseCaching:
+    """Test the response cache in front of generation."""
+
+    def test_deterministic_requests_cached(self) -> None:
+        """Test a repeated temperature-0 request skips generation."""
+        backend = EchoBackend()
+        config = ServerConfig(response_cache_size=10)
+        body = {"messages": [{"role": "user", "content": "a b"}], "temperature": 0}
+
+        with TestClient(create_app(backend, config)) as client:
+            first = client.post("/v1/chat/completions", json=body).json()
+            second = client.post("/v1/chat/completions", json=body).json()
+            stats = client.get("/stats").json()
+
+        assert first["choices"] == second["choices"]
+        assert first["id"] != second["id"]
+        assert stats["response_cache"]["hits"] == 1
+        assert stats["response_cache"]["misses"] == 1
+
+
+class TestMultiModel:
+    """Test serving a pool of models."""
+
+    def test_routes_by_model(self) -> None:
+        """Test requests go to the model they name, loaded on first use."""
+        loaded: list[str] = []
+
+        def loader(name: str) -> Any:
+            def load() -> EchoBackend:
+                loaded.append(name)
+                return EchoBackend()
+
+            return load
+
+        pool = ModelPool(
+            {name: (loader(name), 1) for name in ("qwen/Qwen-1.5B", "llama/L-1B")},
+            budget=lambda: 10,
+        )
+        config = ServerConfig(model_id="qwen/Qwen-1.5B", warmup_prompt_tokens="")
+        body = {"messages": [{"role": "user", "content": "hi there"}]}
+
+        with TestClient(create_app(pool, config)) as client:
+            models = client.get("/v1/models").json()
+            default = client.post("/v1/chat/completions", json=body)
+            assert loaded == ["qwen/Qwen-1.5B"]
+            with client.stream(
+                "POST",
+                "/v1/chat/completions",
+                json={**body, "model": "llama/L-1B", "stream": True},
+            ) as response:
+                events = [line for line in response.iter_lines() if line]
+            unknown = client.post(
+                "/v1/chat/completions", json={**body, "model": "gpt-4"}
+            )
+            stats = client.get("/stats").json()
+
+        assert [m["id"] for m in models["data"]] == ["qwen/Qwen-1.5B", "llama/L-1B"]
+        assert default.json()["model"] == "qwen/Qwen-1.5B"
+        assert json.loads(events[0][6:])["model"] == "llama/L-1B"
+        assert loaded == ["qwen/Qwen-1.5B", "llama/L-1B"]
+        assert unknown.status_code == 404
+        assert "serving: qwen/Qwen-1.5B, llama/L-1B" in unknown.json()["detail"]
+        assert stats["pool"]["models"]["llama/L-1B"] == {
+            "state": "loaded",
+            "gb": 0.0,
+            "active": 0,
+        }
+
+    def test_cached_response_skips_pool(self) -> None:
+        """Test a cached response neither loads its model nor evicts others."""
+        loaded: list[str] = []
+
+        def loader(name: str) -> Any:
+            def load() -> EchoBackend:
+                loaded.append(name)
+                return EchoBackend()
+
+            return load
+
+        # Room for one model at a time
+        pool = ModelPool({name: (loader(name), 1) for name in "ab"}, budget=lambda: 1)
+        config = ServerConfig(
+            model_id="a", warmup_prompt_tokens="", response_cache_size=10
+        )
+        body = {"messages": [{"role": "user", "content": "hi"}], "temperature": 0}
+
+        with TestClient(create_app(pool, config)) as client:
+            client.post("/v1/chat/completions", json={**body, "model": "b"})
+            client.post("/v1/chat/completions", json={**body, "model": "a"})
+            cached = client.post("/v1/chat/completions", json={**body, "model": "b"})
+            stats = client.get("/stats").json()
+
+        assert cached.json()["choices"][0]["message"]["content"] == "hi"
+        assert loaded == ["a", "b", "a"]
+        assert stats["pool"]["models"]["a"]["state"] == "loaded"
+        assert stats["response_cache"]["hits"] == 1
+
+
+class TestServerConfig:
+    """Test ServerConfig."""
+
+    def test_from_env(self) -> None:
+        """Test settings are read and converted from the environment."""
+        config = ServerConfig.from_env(
+            {"MODEL_ID": "qwen/Qwen-7B", "EZRUNNER_MAX_BATCH_SIZE": "16"}
+        )
+
+        assert config.model_id == "qwen/Qwen-7B"
+        assert config.max_batch_size == 16
+        assert config.max_wait_ms == 10.0
+
+    def test_model_paths(self) -> None:
+        """Test multi-model images list every model with its directory."""
+        config = ServerConfig.from_env(
+            {
+                "MODEL_ID": "a/A",
+                "MODEL_PATH": "/models/a-a",
+                "EZRUNNER_MODELS": "a/A=/models/a-a,b/B=/models/b-b",
+            }
+        )
+
+        assert config.model_paths() == {"a/A": "/models/a-a", "b/B": "/models/b-b"}
+        assert ServerConfig().model_paths() == {"model": "/models"}
+        with pytest.raises(ValueError, match="Invalid EZRUNNER_MODELS entry"):
+            ServerConfig(models="b/B").model_paths()
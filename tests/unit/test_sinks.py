@@ -0,0 +1,96 @@
+"""Tests for export sinks."""
+
+import io
+import os
+import socket
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from ezrunner.core.sinks import is_sink, open_sink, register_sink
+from ezrunner.exceptions import DockerError
+
+
+class TestSinks:
+    """Test sink resolution and opening."""
+
+    def test_regular_file_is_not_sink(self, tmp_path: Path) -> None:
+        """Test plain paths keep the regular file export."""
+        existing = tmp_path / "model.tar"
+        existing.write_bytes(b"")
+
+        assert not is_sink(existing)
+        assert not is_sink(tmp_path / "new.tar")
+
+    def test_stdout(self) -> None:
+        """Test '-' writes to stdout without closing it."""
+        stdout = io.TextIOWrapper(io.BytesIO())
+        with patch("sys.stdout", stdout):
+            assert is_sink(Path("-"))
+            with open_sink(Path("-")) as sink:
+                sink.write(b"data")
+            assert stdout.buffer.getvalue() == b"data"
+            assert not stdout.closed
+
+    def test_named_pipe(self, tmp_path: Path) -> None:
+        """Test streaming into a FIFO."""
+        fifo = tmp_path / "model.fifo"
+        os.mkfifo(fifo)
+        received = []
+        reader = threading.Thread(target=lambda: received.append(fifo.read_bytes()))
+        reader.start()
+
+        assert is_sink(fifo)
+        with open_sink(fifo) as sink:
+            sink.write(b"layer data")
+        reader.join(timeout=5)
+
+        assert received == [b"layer data"]
+
+    def test_unix_socket(self, tmp_path: Path) -> None:
+        """Test streaming into a listening Unix socket."""
+        path = tmp_path / "load.sock"
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(path))
+        server.listen(1)
+        received = []
+
+        def accept() -> None:
+            conn, _ = server.accept()
+            with conn:
+                chunks = iter(lambda: conn.recv(4096), b"")
+                received.append(b"".join(chunks))
+
+        thread = threading.Thread(target=accept)
+        thread.start()
+
+        output = Path(f"unix:{path}")
+        assert is_sink(output)
+        with open_sink(output) as sink:
+            sink.write(b"x" * 10000)
+        thread.join(timeout=5)
+        server.close()
+
+        assert received == [b"x" * 10000]
+        assert is_sink(path)
+
+    def test_unix_socket_refused(self, tmp_path: Path) -> None:
+        """Test a missing socket is reported."""
+        with (
+            pytest.raises(DockerError, match="Cannot open output"),
+            open_sink(Path(f"unix:{tmp_path / 'missing.sock'}")),
+        ):
+            pass
+
+    def test_register_sink(self) -> None:
+        """Test custom sink schemes."""
+        buffer = io.BytesIO()
+        buffer.close = lambda: None  # type: ignore[method-assign]
+        with patch.dict("ezrunner.core.sinks._SINKS"):
+            register_sink("memory", lambda target: buffer)
+            with open_sink(Path("memory:anything")) as sink:
+                sink.write(b"data")
+
+        assert buffer.getvalue() == b"data"
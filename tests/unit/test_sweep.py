@@ -0,0 +1,182 @@
+"""Tests for the serving parameter sweep."""
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from ezrunner.core.loadgen import LoadGenerator, LoadStats, RequestResult
+from ezrunner.core.sweep import (
+    ParameterSweep,
+    SweepResult,
+    best,
+    grid_points,
+    load_tuning,
+    save_tuning,
+    tuning_path,
+)
+from ezrunner.exceptions import StartupError
+
+
+@contextmanager
+def stub_server(batch_size: int) -> Iterator[str]:
+    """Chat server whose batch size trades latency for throughput.
+
+    Each request takes 20 ms per batched sequence and returns as many
+    tokens as the batch holds, like a decoder that batches more
+    sequences into each (slower) step.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            self.rfile.read(int(self.headers["Content-Length"]))
+            time.sleep(0.02 * batch_size)
+            body = json.dumps({"usage": {"completion_tokens": batch_size}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def launch(settings: dict[str, str]) -> AbstractContextManager[str]:
+    """Start a stub server configured like a packed image."""
+    batch_size = int(settings["EZRUNNER_MAX_BATCH_SIZE"])
+    if batch_size > 16:
+        raise StartupError("CUDA out of memory")
+    return stub_server(batch_size)
+
+
+def stats(*latencies: float, tokens: int = 10, seconds: float = 1.0) -> LoadStats:
+    return LoadStats(tuple(RequestResult(s, tokens) for s in latencies), seconds)
+
+
+class TestLoadGenerator:
+    """Test LoadGenerator."""
+
+    def test_run(self) -> None:
+        """Test requests are sent at the given concurrency and measured."""
+        with stub_server(batch_size=2) as url:
+            result = LoadGenerator(url, max_tokens=16).run(
+                concurrency=4, requests_total=8
+            )
+
+        assert result.requests == 8
+        assert result.errors == 0
+        assert result.completion_tokens == 16
+        assert 0.04 <= result.latency(0.5) < 1.0
+        # Concurrent: well under 8 sequential requests
+        assert result.seconds < 8 * 0.04
+
+    def test_errors_counted(self) -> None:
+        """Test failed requests are recorded, not raised."""
+        result = LoadGenerator("http://127.0.0.1:9", timeout=1).run(1, 2)
+
+        assert result.errors == 2
+        assert result.latency(0.95) == 0.0
+
+    def test_percentiles(self) -> None:
+        """Test nearest-rank latency quantiles."""
+        result = stats(*[i / 100 for i in range(1, 101)])
+
+        assert result.latency(0.5) == 0.5
+        assert result.latency(0.95) == 0.95
+        assert result.latency(1.0) == 1.0
+
+
+class TestParameterSweep:
+    """Test ParameterSweep against stub servers."""
+
+    def test_picks_fastest_within_slo(self) -> None:
+        """Test the highest-throughput point under the SLO wins."""
+        points = grid_points({"EZRUNNER_MAX_BATCH_SIZE": ["1", "4", "8", "32"]})
+
+        def load(url: str) -> LoadStats:
+            return LoadGenerator(url).run(concurrency=4, requests_total=8)
+
+        results = ParameterSweep(launch, load).run(points)
+        winner = best(results, max_p95_s=0.12)
+
+        assert [r.settings["EZRUNNER_MAX_BATCH_SIZE"] for r in results] == [
+            "1",
+            "4",
+            "8",
+            "32",
+        ]
+        # 8 is faster but breaks the SLO; 32 does not start
+        assert results[3].error == "CUDA out of memory"
+        assert winner is not None
+        assert winner.settings == {"EZRUNNER_MAX_BATCH_SIZE": "4"}
+
+    def test_no_point_meets_slo(self) -> None:
+        """Test no winner when every point is too slow or failed."""
+        results = [
+            SweepResult({"A": "1"}, stats(0.5)),
+            SweepResult({"A": "2"}, error="CUDA out of memory"),
+        ]
+
+        assert best(results, max_p95_s=0.1) is None
+
+    def test_errors_disqualify(self) -> None:
+        """Test a point with failed requests never wins."""
+        failing = LoadStats(
+            (RequestResult(0.01, 100), RequestResult(0.01, error="500")), 1.0
+        )
+        results = [
+            SweepResult({"A": "1"}, failing),
+            SweepResult({"A": "2"}, stats(0.01)),
+        ]
+
+        assert best(results, max_p95_s=1.0) == results[1]
+
+    def test_grid_points(self) -> None:
+        """Test every combination is measured, in order."""
+        points = grid_points({"A": ["1", "2"], "B": ["x", "y"]})
+
+        assert points == [
+            {"A": "1", "B": "x"},
+            {"A": "1", "B": "y"},
+            {"A": "2", "B": "x"},
+            {"A": "2", "B": "y"},
+        ]
+
+
+class TestTuningFile:
+    """Test the tuning file kept next to an archive."""
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        """Test settings are recorded per image."""
+        archive = tmp_path / "model.tar"
+        archive.write_bytes(b"")
+
+        path = save_tuning(archive, "sha256:a", {"settings": {"X": "1"}})
+        save_tuning(archive, "sha256:b", {"settings": {"X": "2"}})
+
+        assert path == tmp_path / "model.tar.tuning.json"
+        assert load_tuning(archive, "sha256:a") == {"X": "1"}
+        assert load_tuning(archive, "sha256:b") == {"X": "2"}
+        # Repacked archive: new image, no stale settings
+        assert load_tuning(archive, "sha256:c") == {}
+
+    def test_missing_or_corrupt(self, tmp_path: Path) -> None:
+        """Test an absent or unreadable tuning file applies nothing."""
+        archive = tmp_path / "model.tar"
+        assert load_tuning(archive, "sha256:a") == {}
+
+        tuning_path(archive).write_text("{not json")
+        assert load_tuning(archive, "sha256:a") == {}
@@ -0,0 +1,110 @@
+"""Tests for tracing utilities."""
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from ezrunner.utils.tracing import Tracer, span, tracing
+
+
+class TestTracer:
+    """Test Tracer."""
+
+    def test_spans_nest(self) -> None:
+        """Test spans record their enclosing span."""
+        tracer = Tracer()
+        with (
+            tracing(tracer),
+            span("build") as outer,
+            span("docker build", "docker") as inner,
+        ):
+            inner.set(steps=3)
+
+        assert tracer.spans == [outer, inner]
+        assert inner.parent is outer
+        assert inner.root() is outer
+        assert outer.end is not None and outer.end >= inner.end  # type: ignore[operator]
+        assert inner.args == {"steps": 3}
+
+    def test_inactive_records_nothing(self) -> None:
+        """Test spans outside a tracing context are not kept."""
+        tracer = Tracer()
+        with span("discover") as current:
+            current.add("bytes", 10)
+        with tracing(tracer):
+            pass
+        with span("discover"):
+            pass
+
+        assert current.args == {"bytes": 10}
+        assert tracer.spans == []
+
+    def test_summary(self) -> None:
+        """Test counters of descendants roll up into their top-level stage."""
+        tracer = Tracer()
+        with tracing(tracer):
+            with span("discover"):
+                for size in (100, 200):
+                    with span("GET", "http") as call:
+                        call.set(bytes=size)
+            with span("build") as build:
+                build.add("cache_hits")
+                with span("docker build", "docker") as docker_build:
+                    docker_build.set(cache_hits=2, cache_misses=1)
+
+        discover, build_row = tracer.summary()
+
+        assert discover["name"] == "discover"
+        assert discover["http_calls"] == 2
+        assert discover["bytes"] == 300
+        assert discover["throughput_mb_s"] > 0
+        assert build_row["http_calls"] == 0
+        assert (build_row["cache_hits"], build_row["cache_misses"]) == (3, 1)
+        assert "throughput_mb_s" not in build_row
+
+    def test_error_recorded(self) -> None:
+        """Test a failing span is closed and records the error."""
+        tracer = Tracer()
+        with tracing(tracer), pytest.raises(ValueError), span("export"):
+            raise ValueError("disk full")
+
+        (failed,) = tracer.spans
+        assert failed.end is not None
+        assert failed.args["error"] == "ValueError: disk full"
+
+    def test_threads(self) -> None:
+        """Test spans from worker threads are collected in their own context."""
+        tracer = Tracer()
+
+        def work() -> None:
+            with tracing(tracer), span("worker"):
+                pass
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(tracer.spans) == 4
+        assert all(s.parent is None for s in tracer.spans)
+
+    def test_write_chrome_trace(self, tmp_path: Path) -> None:
+        """Test the trace is written as Chrome complete events."""
+        tracer = Tracer()
+        with tracing(tracer), span("export", bytes=1024):
+            pass
+        path = tmp_path / "trace.json"
+
+        tracer.write(path)
+        trace = json.loads(path.read_text())
+
+        (event,) = trace["traceEvents"]
+        assert event["name"] == "export"
+        assert event["cat"] == "pack"
+        assert event["ph"] == "X"
+        assert event["ts"] >= 0 and event["dur"] >= 0
+        assert event["args"] == {"bytes": 1024}
+        assert trace["displayTimeUnit"] == "ms"
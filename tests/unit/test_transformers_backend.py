@@ -0,0 +1,229 @@
+"""Tests for the runtime Transformers backend on a tiny CPU model."""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from ezrunner.runtime.backend import TransformersBackend  # noqa: E402
+from ezrunner.runtime.prefix_cache import PrefixCache  # noqa: E402
+from ezrunner.runtime.scheduler import BatchScheduler, GenerationRequest  # noqa: E402
+
+WORDS = ["<pad>", "<s>", "</s>", "<unk>"] + [f"w{i}" for i in range(60)]
+
+
+class WordTokenizer:
+    """Whitespace tokenizer over a fixed vocabulary."""
+
+    pad_token_id = 0
+    bos_token = "<s>"
+    eos_token_id = 2
+
+    def __call__(self, text: str, add_special_tokens: bool = True) -> dict[str, Any]:
+        ids = [WORDS.index(word) for word in text.split()]
+        return {"input_ids": ([1] if add_special_tokens else []) + ids}
+
+    def decode(self, ids: list[int], skip_special_tokens: bool = True) -> str:
+        return " ".join(WORDS[i] for i in ids if i > 3 or not skip_special_tokens)
+
+    def apply_chat_template(self, messages: list[dict[str, Any]], **kwargs: Any) -> str:
+        raise ValueError("no chat template")
+
+
+@pytest.fixture(scope="module")
+def model() -> Any:
+    """Randomly initialized two-layer Llama."""
+    torch.manual_seed(0)
+    config = transformers.LlamaConfig(
+        vocab_size=len(WORDS),
+        hidden_size=32,
+        intermediate_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        max_position_embeddings=128,
+        pad_token_id=0,
+        bos_token_id=1,
+        eos_token_id=2,
+    )
+    return transformers.LlamaForCausalLM(config).eval()
+
+
+def reference(model: Any, prompt: str, max_tokens: int) -> str:
+    """Greedy completion of one prompt with ``model.generate``."""
+    tokenizer = WordTokenizer()
+    input_ids = torch.tensor([tokenizer(prompt)["input_ids"]])
+    output = model.generate(
+        input_ids,
+        max_new_tokens=max_tokens,
+        do_sample=False,
+        pad_token_id=0,
+        eos_token_id=2,
+    )
+    return tokenizer.decode(output[0, input_ids.shape[1] :].tolist())
+
+
+class TestTransformersBackend:
+    """Test TransformersBackend."""
+
+    def test_continuous_batching_matches_generate(self, model: Any) -> None:
+        """Test sequences joining and leaving a batch decode like they would alone."""
+        backend = TransformersBackend(model, WordTokenizer())
+        scheduler = BatchScheduler(backend, max_batch_size=3, max_wait_ms=0)
+        requests = [
+            GenerationRequest("w1 w2 w3 w4 w5 w6 w7", max_tokens=12, temperature=0),
+            GenerationRequest("w9", max_tokens=4, temperature=0),
+            GenerationRequest("w10 w11 w12", max_tokens=8, temperature=0),
+            GenerationRequest("w20 w21", max_tokens=6, temperature=0),
+        ]
+
+        async def run() -> list[str]:
+            scheduler.start()
+            try:
+                results = await asyncio.gather(*map(scheduler.submit, requests))
+            finally:
+                await scheduler.stop()
+            return [result.text for result in results]
+
+        texts = asyncio.run(run())
+
+        assert texts == [reference(model, r.prompt, r.max_tokens) for r in requests]
+
+    def test_cache_repadded_on_join_and_leave(self, model: Any) -> None:
+        """Test decode steps grow one batched cache, re-padding only on changes."""
+        backend = TransformersBackend(model, WordTokenizer())
+        scheduler = BatchScheduler(backend, max_batch_size=2, max_wait_ms=20)
+        requests = [
+            GenerationRequest("w1 w2 w3", max_tokens=3, temperature=0),
+            GenerationRequest("w4", max_tokens=8, temperature=0),
+            GenerationRequest("w5 w6", max_tokens=6, temperature=0),
+        ]
+        decode, batches = backend.decode, []
+
+        def record(sequences: list[Any]) -> None:
+            decode(sequences)
+            batches.append(backend._batch)
+
+        backend.decode = record  # type: ignore[method-assign]
+
+        async def run() -> list[str]:
+            scheduler.start()
+            try:
+                results = await asyncio.gather(*map(scheduler.submit, requests))
+            finally:
+                await scheduler.stop()
+            return [result.text for result in results]
+
+        texts = asyncio.run(run())
+
+        assert texts == [reference(model, r.prompt, r.max_tokens) for r in requests]
+        # Distinct batches: the first two, then the second with the third
+        assert len({id(batch) for batch in batches if batch is not None}) == 2
+        assert len(batches) > 3
+        assert backend._batch is None
+
+    def test_usage_and_finish_reason(self, model: Any) -> None:
+        """Test token accounting of a length-limited completion."""
+        backend = TransformersBackend(model, WordTokenizer())
+        scheduler = BatchScheduler(backend)
+
+        async def run() -> Any:
+            scheduler.start()
+            try:
+                return await scheduler.submit(
+                    GenerationRequest("w1 w2", max_tokens=3, temperature=0.8)
+                )
+            finally:
+                await scheduler.stop()
+
+        sequence = asyncio.run(run())
+
+        assert sequence.prompt_tokens == 3
+        assert sequence.completion_tokens <= 3
+        assert sequence.finish_reason in ("stop", "length")
+
+    def test_stream_matches_text(self, model: Any) -> None:
+        """Test streamed deltas add up to the completion."""
+        backend = TransformersBackend(model, WordTokenizer())
+        scheduler = BatchScheduler(backend)
+
+        async def run() -> tuple[str, str]:
+            scheduler.start()
+            try:
+                sequence, future = scheduler.enqueue(
+                    GenerationRequest("w1 w2", max_tokens=6, temperature=0),
+                    stream=True,
+                )
+                assert sequence.stream is not None
+                streamed = "".join([delta async for delta in sequence.stream])
+                return streamed, (await future).text
+            finally:
+                await scheduler.stop()
+
+        streamed, text = asyncio.run(run())
+
+        assert streamed == text
+        assert text == reference(model, "w1 w2", 6)
+
+    def test_prefix_cache_reuse(self, model: Any) -> None:
+        """Test prompts sharing a preamble reuse its KV cache, batched with misses."""
+        prefix_cache = PrefixCache(max_bytes=64 * 1024 * 1024, block_size=4)
+        backend = TransformersBackend(model, WordTokenizer(), prefix_cache)
+        preamble = " ".join(f"w{i}" for i in range(30, 42))
+        first = GenerationRequest(f"{preamble} w1 w2", max_tokens=5, temperature=0)
+        later = [
+            GenerationRequest(f"{preamble} w5", max_tokens=5, temperature=0),
+            GenerationRequest("w7 w8 w9", max_tokens=5, temperature=0),
+            GenerationRequest(f"{preamble} w1 w2 w3 w4", max_tokens=5, temperature=0),
+        ]
+
+        async def run() -> list[Any]:
+            scheduler = BatchScheduler(backend, max_wait_ms=20)
+            scheduler.start()
+            try:
+                results = [await scheduler.submit(first)]
+                results += await asyncio.gather(*map(scheduler.submit, later))
+            finally:
+                await scheduler.stop()
+            return results
+
+        results = asyncio.run(run())
+
+        assert [r.text for r in results] == [
+            reference(model, r.prompt, r.max_tokens) for r in [first, *later]
+        ]
+        assert [r.cached_tokens for r in results] == [0, 12, 0, 12]
+        assert backend.stats()["prefix_cache"]["hits"] == 2
+
+    def test_prompt_fallback(self, model: Any) -> None:
+        """Test prompts without a chat template use the last message."""
+        backend = TransformersBackend(model, WordTokenizer())
+
+        prompt = backend.format_prompt([{"role": "user", "content": "w1 w2"}])
+
+        assert prompt == "w1 w2"
+
+    def test_park_and_resume(self, model: Any) -> None:
+        """Test a parked and resumed model generates as before."""
+        prefix_cache = PrefixCache(max_bytes=64 * 1024 * 1024, block_size=4)
+        backend = TransformersBackend(model, WordTokenizer(), prefix_cache)
+        request = GenerationRequest("w1 w2 w3 w4 w5", max_tokens=5, temperature=0)
+
+        async def run() -> str:
+            scheduler = BatchScheduler(backend)
+            scheduler.start()
+            try:
+                await scheduler.submit(request)
+                backend.park()
+                assert len(prefix_cache) == 0
+                backend.resume()
+                return (await scheduler.submit(request)).text
+            finally:
+                await scheduler.stop()
+
+        text = asyncio.run(run())
+
+        assert text == reference(model, request.prompt, request.max_tokens)
+        assert backend.memory_bytes == model.get_memory_footprint()
@@ -0,0 +1,62 @@
+"""Tests for VLLMTuner."""
+
+from ezrunner.core.tuning import VLLMTuner
+from ezrunner.models.hardware import Hardware
+from ezrunner.models.model_info import ModelInfo
+
+
+def _model(size_gb: float) -> ModelInfo:
+    return ModelInfo(
+        model_id="qwen/Qwen-7B",
+        size_gb=size_gb,
+        format="safetensors",
+        repo_type="modelscope",
+        architecture="qwen2",
+    )
+
+
+def _gpu(memory_gb: float) -> Hardware:
+    return Hardware(
+        gpu_memory_gb=memory_gb,
+        gpu_count=1,
+        cpu_cores=16,
+        ram_gb=64.0,
+        gpu_vendor="nvidia",
+    )
+
+
+class TestVLLMTuner:
+    """Test VLLMTuner."""
+
+    def test_large_gpu(self) -> None:
+        """Test a small model on a large GPU gets long contexts and big batches."""
+        tuning = VLLMTuner().tune(_model(14.0), _gpu(80.0))
+
+        assert tuning.gpu_memory_utilization == 0.95
+        assert tuning.kv_cache_dtype == "auto"
+        assert tuning.max_model_len == 16384
+        assert tuning.max_num_seqs == 32
+        assert tuning.max_num_batched_tokens == 8192
+        assert tuning.enable_chunked_prefill
+        assert tuning.enable_prefix_caching
+
+    def test_tight_gpu(self) -> None:
+        """Test a GPU the weights nearly fill falls back to an fp8 KV cache."""
+        tuning = VLLMTuner().tune(_model(14.0), _gpu(24.0))
+
+        assert tuning.gpu_memory_utilization == 0.91
+        assert tuning.kv_cache_dtype == "fp8"
+        assert tuning.max_model_len == 4096
+        assert tuning.max_num_seqs == 8
+        # Whole prompts fit in one step
+        assert tuning.max_num_batched_tokens >= tuning.max_model_len
+        assert not tuning.enable_chunked_prefill
+
+    def test_settings(self) -> None:
+        """Test the tuning maps to server settings."""
+        settings = VLLMTuner().tune(_model(14.0), _gpu(80.0)).settings()
+
+        assert settings["EZRUNNER_MAX_BATCH_SIZE"] == "32"
+        assert settings["EZRUNNER_VLLM_GPU_MEMORY_UTILIZATION"] == "0.95"
+        assert settings["EZRUNNER_VLLM_MAX_MODEL_LEN"] == "16384"
+        assert settings["EZRUNNER_VLLM_ENABLE_CHUNKED_PREFILL"] == "True"
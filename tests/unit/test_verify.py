@@ -0,0 +1,80 @@
+"""Tests for archive verification."""
+
+import io
+import tarfile
+from collections.abc import Callable
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from ezrunner.core.bundle import BundleWriter
+from ezrunner.core.exporter import LayoutExporter
+from ezrunner.core.verify import VerifyStats, verify_archive
+from ezrunner.exceptions import ArchiveError
+
+BASE = b"b" * (2 * 1024 * 1024)  # shared base layer
+
+
+def corrupt(archive: Path, member: str, data: bytes) -> None:
+    """Rewrite an archive with one member's content replaced."""
+    with tarfile.open(archive) as tar:
+        members = [(info, tar.extractfile(info)) for info in tar.getmembers()]
+        contents = [(info, f.read() if f else b"") for info, f in members]
+    with tarfile.open(archive, "w") as tar:
+        for info, content in contents:
+            if info.name == member:
+                content = data
+                info.size = len(data)
+            tar.addfile(info, io.BytesIO(content))
+
+
+class TestVerifyArchive:
+    """Test verify_archive."""
+
+    def test_valid_archive(self, make_archive: Callable[..., Path]) -> None:
+        """Test every config and layer is hashed once."""
+        archive = make_archive("qwen.tar", [("ezrunner-qwen:latest", [BASE, b"qwen"])])
+
+        stats = verify_archive(archive)
+
+        assert stats == VerifyStats(images=1, layers=2, bytes_read=stats.bytes_read)
+        assert stats.bytes_read > len(BASE) + len(b"qwen")
+
+    def test_corrupt_layer(self, make_archive: Callable[..., Path]) -> None:
+        """Test a layer not matching its diff ID is reported."""
+        archive = make_archive("qwen.tar", [("ezrunner-qwen:latest", [BASE, b"qwen"])])
+        corrupt(archive, "ezrunner-qwen-1/layer.tar", b"qwen!")
+
+        with pytest.raises(ArchiveError, match="layer ezrunner-qwen-1/layer.tar"):
+            verify_archive(archive)
+
+    def test_bundle_shares_layers(
+        self, make_archive: Callable[..., Path], tmp_path: Path
+    ) -> None:
+        """Test layers shared by the images of a bundle are hashed once."""
+        qwen = make_archive("qwen.tar", [("ezrunner-qwen:latest", [BASE, b"qwen"])])
+        llama = make_archive("llama.tar", [("ezrunner-llama:latest", [BASE, b"ll"])])
+        bundle = tmp_path / "bundle.tar"
+        BundleWriter().write([qwen, llama], bundle)
+
+        assert verify_archive(bundle).layers == 3
+
+    def test_oci_layout(
+        self, make_archive: Callable[..., Path], tmp_path: Path
+    ) -> None:
+        """Test layout directories are verified from their blobs."""
+        archive = make_archive("qwen.tar", [("ezrunner-qwen:latest", [BASE])])
+        image = Mock()
+        image.save.return_value = [archive.read_bytes()]
+        LayoutExporter().export(image, tmp_path / "layout")
+
+        assert verify_archive(tmp_path / "layout").images == 1
+
+    def test_not_an_archive(self, tmp_path: Path) -> None:
+        """Test unreadable files are rejected."""
+        path = tmp_path / "model.tar"
+        path.write_bytes(b"not a tar")
+
+        with pytest.raises(ArchiveError, match="Invalid image archive"):
+            verify_archive(path)
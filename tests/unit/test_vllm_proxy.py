@@ -0,0 +1,215 @@
+"""Tests for the vLLM front end."""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from ezrunner.runtime.config import ServerConfig
+
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import PlainTextResponse, StreamingResponse  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from ezrunner.runtime.vllm_proxy import create_app, vllm_command  # noqa: E402
+
+
+def fake_vllm() -> tuple[FastAPI, list[dict[str, Any]]]:
+    """Stand-in for vLLM's OpenAI server, recording requests."""
+    app = FastAPI()
+    received: list[dict[str, Any]] = []
+
+    @app.post("/v1/chat/completions", response_model=None)
+    async def chat(request: Request) -> Any:
+        body = await request.json()
+        received.append(body)
+        if body.get("stream"):
+
+            async def events() -> Any:
+                for word in ("hello", "world"):
+                    yield f"data: {word}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+        return {"id": "cmpl-1", "created": 1, "choices": [{"text": "hi"}]}
+
+    @app.get("/health")
+    async def health() -> dict[str, Any]:
+        return {}
+
+    @app.post("/v1/completions")
+    async def completions(request: Request) -> dict[str, Any]:
+        received.append(await request.json())
+        return {"id": "cmpl-1", "choices": [{"text": "hi"}]}
+
+    @app.get("/metrics")
+    async def metrics() -> PlainTextResponse:
+        return PlainTextResponse("vllm:num_requests_running 1\n")
+
+    @app.get("/v1/models")
+    async def models() -> dict[str, Any]:
+        return {"data": [{"id": "qwen"}]}
+
+    return app, received
+
+
+async def call(app: FastAPI, method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """Send one request to the proxy in-process."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://proxy") as c:
+        return await c.request(method, url, **kwargs)
+
+
+def proxy(config: ServerConfig) -> tuple[FastAPI, list[dict[str, Any]]]:
+    """Proxy in front of a fake vLLM."""
+    upstream, received = fake_vllm()
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=upstream), base_url="http://vllm"
+    )
+    return create_app(config, client), received
+
+
+class TestVLLMProxy:
+    """Test the vLLM front end."""
+
+    def test_passthrough(self) -> None:
+        """Test other endpoints are forwarded unchanged."""
+        app, _ = proxy(ServerConfig())
+
+        response = asyncio.run(call(app, "GET", "/v1/models"))
+
+        assert response.json() == {"data": [{"id": "qwen"}]}
+
+    def test_streaming_passthrough(self) -> None:
+        """Test SSE responses are relayed."""
+        app, received = proxy(ServerConfig(response_cache_size=10))
+        body = {"messages": [], "temperature": 0, "stream": True}
+
+        response = asyncio.run(call(app, "POST", "/v1/chat/completions", json=body))
+
+        assert response.text == "data: hello\n\ndata: world\n\ndata: [DONE]\n\n"
+        assert len(received) == 1
+
+    def test_deterministic_requests_cached(self) -> None:
+        """Test identical temperature-0 requests reach vLLM once."""
+        app, received = proxy(ServerConfig(response_cache_size=10))
+        body = {"messages": [{"role": "user", "content": "hi"}], "temperature": 0}
+
+        async def scenario() -> list[httpx.Response]:
+            return list(
+                await asyncio.gather(
+                    *(
+                        call(app, "POST", "/v1/chat/completions", json=body)
+                        for _ in range(3)
+                    )
+                )
+            )
+
+        responses = asyncio.run(scenario())
+
+        assert len(received) == 1
+        assert {r.json()["choices"][0]["text"] for r in responses} == {"hi"}
+        assert len({r.json()["id"] for r in responses}) == 3
+
+    def test_sampled_requests_not_cached(self) -> None:
+        """Test requests with temperature > 0 always reach vLLM."""
+        app, received = proxy(ServerConfig(response_cache_size=10))
+        body = {"messages": [], "temperature": 0.7}
+
+        for _ in range(2):
+            asyncio.run(call(app, "POST", "/v1/chat/completions", json=body))
+
+        assert len(received) == 2
+
+    def test_metrics_merged(self) -> None:
+        """Test vLLM's metrics are served with the front end's."""
+        app, _ = proxy(ServerConfig(response_cache_size=10))
+
+        response = asyncio.run(call(app, "GET", "/metrics"))
+
+        lines = response.text.splitlines()
+        assert lines[0] == "vllm:num_requests_running 1"
+        assert "ezrunner_response_cache_hits_total 0" in lines
+
+    def test_ready_after_warmup(self) -> None:
+        """Test readiness waits for vLLM's health check and warmup."""
+        config = ServerConfig(model_id="qwen", warmup_prompt_tokens="2,4")
+        app, received = proxy(config)
+
+        with TestClient(app) as client:
+            for _ in range(100):
+                response = client.get("/ready")
+                if response.status_code == 200:
+                    break
+                time.sleep(0.01)
+
+        assert response.status_code == 200
+        assert set(response.json()["phases"]) == {"load", "warmup"}
+        assert sorted(r["prompt"] for r in received) == sorted(
+            ["0 hello", "0 hello hello hello"]
+            + [f"{i} hello" for i in range(8)]
+            + [f"{i} hello hello hello" for i in range(8)]
+        )
+        assert {r["model"] for r in received} == {"qwen"}
+
+    def test_unavailable(self) -> None:
+        """Test a 503 is returned while vLLM is not listening."""
+        client = httpx.AsyncClient(base_url="http://127.0.0.1:9")
+        app = create_app(ServerConfig(), client)
+
+        response = asyncio.run(call(app, "GET", "/v1/models"))
+
+        assert response.status_code == 503
+
+
+class TestVLLMCommand:
+    """Test the vLLM command line."""
+
+    def test_settings_become_flags(self) -> None:
+        """Test server settings map to vLLM arguments."""
+        config = ServerConfig(
+            model_id="qwen/Qwen-7B",
+            model_path="/models/qwen",
+            max_batch_size=32,
+            vllm_args="--gpu-memory-utilization 0.85",
+        )
+
+        command = vllm_command(config)
+
+        assert command[1:3] == ["-m", "vllm.entrypoints.openai.api_server"]
+        assert command[command.index("--max-num-seqs") + 1] == "32"
+        assert command[command.index("--port") + 1] == "8001"
+        assert command[-2:] == ["--gpu-memory-utilization", "0.85"]
+
+    def test_tuning_flags(self, tmp_path: Path) -> None:
+        """Test tuned engine arguments, capped to the model's context length."""
+        (tmp_path / "config.json").write_text('{"max_position_embeddings": 8192}')
+        config = ServerConfig(
+            model_path=str(tmp_path),
+            vllm_gpu_memory_utilization=0.91,
+            vllm_max_model_len=16384,
+            vllm_max_num_batched_tokens=4096,
+            vllm_kv_cache_dtype="fp8",
+            vllm_enable_prefix_caching=True,
+        )
+
+        command = vllm_command(config)
+
+        assert command[command.index("--gpu-memory-utilization") + 1] == "0.91"
+        assert command[command.index("--max-model-len") + 1] == "8192"
+        assert command[command.index("--max-num-batched-tokens") + 1] == "4096"
+        assert command[command.index("--kv-cache-dtype") + 1] == "fp8"
+        assert "--enable-prefix-caching" in command
+        assert "--enable-chunked-prefill" not in command
+
+    def test_untuned_defaults(self) -> None:
+        """Test images packed without tuning leave limits to vLLM."""
+        command = vllm_command(ServerConfig(model_path="/nonexistent"))
+
+        assert "--max-model-len" not in command
+        assert "--max-num-batched-tokens" not in command
@@ -0,0 +1,61 @@
+"""Tests for the weight prefetcher."""
+
+from pathlib import Path
+
+from ezrunner.runtime.weights import Prefetcher, weight_files
+
+
+def write_shards(root: Path, names: list[str], size: int) -> None:
+    """Create weight files of ``size`` bytes."""
+    root.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        (root / name).write_bytes(b"\0" * size)
+
+
+class TestWeightFiles:
+    """Test weight file discovery."""
+
+    def test_prefers_safetensors(self, tmp_path: Path) -> None:
+        """Test safetensors shards are used when present."""
+        write_shards(tmp_path, ["b.safetensors", "a.safetensors", "c.bin"], 1)
+
+        assert [p.name for p in weight_files(str(tmp_path))] == [
+            "a.safetensors",
+            "b.safetensors",
+        ]
+
+    def test_falls_back_to_bin(self, tmp_path: Path) -> None:
+        """Test pickle checkpoints are found when there is no safetensors."""
+        write_shards(tmp_path / "sub", ["pytorch_model.bin"], 1)
+
+        assert [p.name for p in weight_files(str(tmp_path))] == ["pytorch_model.bin"]
+
+
+class TestPrefetcher:
+    """Test Prefetcher."""
+
+    def test_reads_every_byte(self, tmp_path: Path) -> None:
+        """Test shards are read completely, split into ranges across threads."""
+        write_shards(tmp_path, ["model-1.safetensors", "model-2.safetensors"], 10_000)
+        prefetcher = Prefetcher(str(tmp_path), threads=3, range_size=4096)
+
+        prefetcher.start()
+        stats = prefetcher.wait(10)
+
+        assert stats is not None
+        assert stats.files == 2
+        assert stats.bytes == 20_000
+
+    def test_disabled(self, tmp_path: Path) -> None:
+        """Test zero threads reads nothing."""
+        write_shards(tmp_path, ["model.safetensors"], 100)
+
+        stats = Prefetcher(str(tmp_path), threads=0).run()
+
+        assert (stats.files, stats.bytes) == (0, 0)
+
+    def test_missing_directory(self, tmp_path: Path) -> None:
+        """Test a missing model directory is not an error."""
+        stats = Prefetcher(str(tmp_path / "missing")).run()
+
+        assert stats.files == 0